@@ -11,6 +11,8 @@ from resources.lib.ui import database, get_meta, utils, control, client
 from resources.lib.ui.BrowserBase import BrowserBase
 from resources.lib.ui.divide_flavors import div_flavor
 
+BROWSE_MAX_STALE = 4  # browse pages are served up to 4x their TTL old while they refresh in the background
+
 
 class AniListBrowser(BrowserBase):
     _BASE_URL = "https://graphql.anilist.co"
@@ -107,7 +109,7 @@ class AniListBrowser(BrowserBase):
         if self.tag:
             variables['includedTags'] = self.tag
 
-        airing = database.get(self.get_base_res, 24, variables)
+        airing = database.get(self.get_base_res, 24, variables, max_stale=BROWSE_MAX_STALE)
         base_plugin_url = f"{prefix}?page=%d" if prefix else "airing_last_season?page=%d"
         return self.process_anilist_view(airing, base_plugin_url, page)
 
@@ -140,7 +142,7 @@ class AniListBrowser(BrowserBase):
         if self.tag:
             variables['includedTags'] = self.tag
 
-        airing = database.get(self.get_base_res, 24, variables)
+        airing = database.get(self.get_base_res, 24, variables, max_stale=BROWSE_MAX_STALE)
         base_plugin_url = f"{prefix}?page=%d" if prefix else "airing_this_season?page=%d"
         return self.process_anilist_view(airing, base_plugin_url, page)
 
@@ -173,7 +175,7 @@ class AniListBrowser(BrowserBase):
         if self.tag:
             variables['includedTags'] = self.tag
 
-        airing = database.get(self.get_base_res, 24, variables)
+        airing = database.get(self.get_base_res, 24, variables, max_stale=BROWSE_MAX_STALE)
         base_plugin_url = f"{prefix}?page=%d" if prefix else "airing_next_season?page=%d"
         return self.process_anilist_view(airing, base_plugin_url, page)
 
@@ -205,7 +207,7 @@ class AniListBrowser(BrowserBase):
         if self.tag:
             variables['includedTags'] = self.tag
 
-        trending = database.get(self.get_base_res, 24, variables)
+        trending = database.get(self.get_base_res, 24, variables, max_stale=BROWSE_MAX_STALE)
         base_plugin_url = f"{prefix}?page=%d" if prefix else "trending_last_year?page=%d"
         return self.process_anilist_view(trending, base_plugin_url, page)
 
@@ -237,7 +239,7 @@ class AniListBrowser(BrowserBase):
         if self.tag:
             variables['includedTags'] = self.tag
 
-        trending = database.get(self.get_base_res, 24, variables)
+        trending = database.get(self.get_base_res, 24, variables, max_stale=BROWSE_MAX_STALE)
         base_plugin_url = f"{prefix}?page=%d" if prefix else "trending_this_year?page=%d"
         return self.process_anilist_view(trending, base_plugin_url, page)
 
@@ -270,7 +272,7 @@ class AniListBrowser(BrowserBase):
         if self.tag:
             variables['includedTags'] = self.tag
 
-        trending = database.get(self.get_base_res, 24, variables)
+        trending = database.get(self.get_base_res, 24, variables, max_stale=BROWSE_MAX_STALE)
         base_plugin_url = f"{prefix}?page=%d" if prefix else "trending_last_season?page=%d"
         return self.process_anilist_view(trending, base_plugin_url, page)
 
@@ -303,7 +305,7 @@ class AniListBrowser(BrowserBase):
         if self.tag:
             variables['includedTags'] = self.tag
 
-        trending = database.get(self.get_base_res, 24, variables)
+        trending = database.get(self.get_base_res, 24, variables, max_stale=BROWSE_MAX_STALE)
         base_plugin_url = f"{prefix}?page=%d" if prefix else "trending_this_season?page=%d"
         return self.process_anilist_view(trending, base_plugin_url, page)
 
@@ -333,7 +335,7 @@ class AniListBrowser(BrowserBase):
         if self.tag:
             variables['includedTags'] = self.tag
 
-        trending = database.get(self.get_base_res, 24, variables)
+        trending = database.get(self.get_base_res, 24, variables, max_stale=BROWSE_MAX_STALE)
         base_plugin_url = f"{prefix}?page=%d" if prefix else "all_time_trending?page=%d"
         return self.process_anilist_view(trending, base_plugin_url, page)
 
@@ -365,7 +367,7 @@ class AniListBrowser(BrowserBase):
         if self.tag:
             variables['includedTags'] = self.tag
 
-        popular = database.get(self.get_base_res, 24, variables)
+        popular = database.get(self.get_base_res, 24, variables, max_stale=BROWSE_MAX_STALE)
         base_plugin_url = f"{prefix}?page=%d" if prefix else "popular_last_year?page=%d"
         return self.process_anilist_view(popular, base_plugin_url, page)
 
@@ -397,7 +399,7 @@ class AniListBrowser(BrowserBase):
         if self.tag:
             variables['includedTags'] = self.tag
 
-        popular = database.get(self.get_base_res, 24, variables)
+        popular = database.get(self.get_base_res, 24, variables, max_stale=BROWSE_MAX_STALE)
         base_plugin_url = f"{prefix}?page=%d" if prefix else "popular_this_year?page=%d"
         return self.process_anilist_view(popular, base_plugin_url, page)
 
@@ -430,7 +432,7 @@ class AniListBrowser(BrowserBase):
         if self.tag:
             variables['includedTags'] = self.tag
 
-        popular = database.get(self.get_base_res, 24, variables)
+        popular = database.get(self.get_base_res, 24, variables, max_stale=BROWSE_MAX_STALE)
         base_plugin_url = f"{prefix}?page=%d" if prefix else "popular_last_season?page=%d"
         return self.process_anilist_view(popular, base_plugin_url, page)
 
@@ -463,7 +465,7 @@ class AniListBrowser(BrowserBase):
         if self.tag:
             variables['includedTags'] = self.tag
 
-        popular = database.get(self.get_base_res, 24, variables)
+        popular = database.get(self.get_base_res, 24, variables, max_stale=BROWSE_MAX_STALE)
         base_plugin_url = f"{prefix}?page=%d" if prefix else "popular_this_season?page=%d"
         return self.process_anilist_view(popular, base_plugin_url, page)
 
@@ -493,7 +495,7 @@ class AniListBrowser(BrowserBase):
         if self.tag:
             variables['includedTags'] = self.tag
 
-        popular = database.get(self.get_base_res, 24, variables)
+        popular = database.get(self.get_base_res, 24, variables, max_stale=BROWSE_MAX_STALE)
         base_plugin_url = f"{prefix}?page=%d" if prefix else "all_time_popular?page=%d"
         return self.process_anilist_view(popular, base_plugin_url, page)
 
@@ -525,7 +527,7 @@ class AniListBrowser(BrowserBase):
         if self.tag:
             variables['includedTags'] = self.tag
 
-        voted = database.get(self.get_base_res, 24, variables)
+        voted = database.get(self.get_base_res, 24, variables, max_stale=BROWSE_MAX_STALE)
         base_plugin_url = f"{prefix}?page=%d" if prefix else "voted_last_year?page=%d"
         return self.process_anilist_view(voted, base_plugin_url, page)
 
@@ -557,7 +559,7 @@ class AniListBrowser(BrowserBase):
         if self.tag:
             variables['includedTags'] = self.tag
 
-        voted = database.get(self.get_base_res, 24, variables)
+        voted = database.get(self.get_base_res, 24, variables, max_stale=BROWSE_MAX_STALE)
         base_plugin_url = f"{prefix}?page=%d" if prefix else "voted_this_year?page=%d"
         return self.process_anilist_view(voted, base_plugin_url, page)
 
@@ -590,7 +592,7 @@ class AniListBrowser(BrowserBase):
         if self.tag:
             variables['includedTags'] = self.tag
 
-        voted = database.get(self.get_base_res, 24, variables)
+        voted = database.get(self.get_base_res, 24, variables, max_stale=BROWSE_MAX_STALE)
         base_plugin_url = f"{prefix}?page=%d" if prefix else "voted_last_season?page=%d"
         return self.process_anilist_view(voted, base_plugin_url, page)
 
@@ -623,7 +625,7 @@ class AniListBrowser(BrowserBase):
         if self.tag:
             variables['includedTags'] = self.tag
 
-        voted = database.get(self.get_base_res, 24, variables)
+        voted = database.get(self.get_base_res, 24, variables, max_stale=BROWSE_MAX_STALE)
         base_plugin_url = f"{prefix}?page=%d" if prefix else "voted_this_season?page=%d"
         return self.process_anilist_view(voted, base_plugin_url, page)
 
@@ -653,7 +655,7 @@ class AniListBrowser(BrowserBase):
         if self.tag:
             variables['includedTags'] = self.tag
 
-        voted = database.get(self.get_base_res, 24, variables)
+        voted = database.get(self.get_base_res, 24, variables, max_stale=BROWSE_MAX_STALE)
         base_plugin_url = f"{prefix}?page=%d" if prefix else "all_time_voted?page=%d"
         return self.process_anilist_view(voted, base_plugin_url, page)
 
@@ -685,7 +687,7 @@ class AniListBrowser(BrowserBase):
         if self.tag:
             variables['includedTags'] = self.tag
 
-        favourites = database.get(self.get_base_res, 24, variables)
+        favourites = database.get(self.get_base_res, 24, variables, max_stale=BROWSE_MAX_STALE)
         base_plugin_url = f"{prefix}?page=%d" if prefix else "favourites_last_year?page=%d"
         return self.process_anilist_view(favourites, base_plugin_url, page)
 
@@ -717,7 +719,7 @@ class AniListBrowser(BrowserBase):
         if self.tag:
             variables['includedTags'] = self.tag
 
-        favourites = database.get(self.get_base_res, 24, variables)
+        favourites = database.get(self.get_base_res, 24, variables, max_stale=BROWSE_MAX_STALE)
         base_plugin_url = f"{prefix}?page=%d" if prefix else "favourites_this_year?page=%d"
         return self.process_anilist_view(favourites, base_plugin_url, page)
 
@@ -750,7 +752,7 @@ class AniListBrowser(BrowserBase):
         if self.tag:
             variables['includedTags'] = self.tag
 
-        favourites = database.get(self.get_base_res, 24, variables)
+        favourites = database.get(self.get_base_res, 24, variables, max_stale=BROWSE_MAX_STALE)
         base_plugin_url = f"{prefix}?page=%d" if prefix else "favourites_last_season?page=%d"
         return self.process_anilist_view(favourites, base_plugin_url, page)
 
@@ -783,7 +785,7 @@ class AniListBrowser(BrowserBase):
         if self.tag:
             variables['includedTags'] = self.tag
 
-        favourites = database.get(self.get_base_res, 24, variables)
+        favourites = database.get(self.get_base_res, 24, variables, max_stale=BROWSE_MAX_STALE)
         base_plugin_url = f"{prefix}?page=%d" if prefix else "favourites_this_season?page=%d"
         return self.process_anilist_view(favourites, base_plugin_url, page)
 
@@ -813,7 +815,7 @@ class AniListBrowser(BrowserBase):
         if self.tag:
             variables['includedTags'] = self.tag
 
-        favourites = database.get(self.get_base_res, 24, variables)
+        favourites = database.get(self.get_base_res, 24, variables, max_stale=BROWSE_MAX_STALE)
         base_plugin_url = f"{prefix}?page=%d" if prefix else "all_time_favourites?page=%d"
         return self.process_anilist_view(favourites, base_plugin_url, page)
 
@@ -843,7 +845,7 @@ class AniListBrowser(BrowserBase):
         if self.tag:
             variables['includedTags'] = self.tag
 
-        top_100 = database.get(self.get_base_res, 24, variables)
+        top_100 = database.get(self.get_base_res, 24, variables, max_stale=BROWSE_MAX_STALE)
         base_plugin_url = f"{prefix}?page=%d" if prefix else "top_100?page=%d"
         return self.process_anilist_view(top_100, base_plugin_url, page)
 
@@ -868,7 +870,7 @@ class AniListBrowser(BrowserBase):
         if self.status:
             variables['status'] = self.status
 
-        genre = database.get(self.get_base_res, 24, variables)
+        genre = database.get(self.get_base_res, 24, variables, max_stale=BROWSE_MAX_STALE)
         base_plugin_url = f"{prefix}?page=%d" if prefix else "genre_action?page=%d"
         return self.process_anilist_view(genre, base_plugin_url, page)
 
@@ -893,7 +895,7 @@ class AniListBrowser(BrowserBase):
         if self.status:
             variables['status'] = self.status
 
-        genre = database.get(self.get_base_res, 24, variables)
+        genre = database.get(self.get_base_res, 24, variables, max_stale=BROWSE_MAX_STALE)
         base_plugin_url = f"{prefix}?page=%d" if prefix else "genre_adventure?page=%d"
         return self.process_anilist_view(genre, base_plugin_url, page)
 
@@ -918,7 +920,7 @@ class AniListBrowser(BrowserBase):
         if self.status:
             variables['status'] = self.status
 
-        genre = database.get(self.get_base_res, 24, variables)
+        genre = database.get(self.get_base_res, 24, variables, max_stale=BROWSE_MAX_STALE)
         base_plugin_url = f"{prefix}?page=%d" if prefix else "genre_comedy?page=%d"
         return self.process_anilist_view(genre, base_plugin_url, page)
 
@@ -943,7 +945,7 @@ class AniListBrowser(BrowserBase):
         if self.status:
             variables['status'] = self.status
 
-        genre = database.get(self.get_base_res, 24, variables)
+        genre = database.get(self.get_base_res, 24, variables, max_stale=BROWSE_MAX_STALE)
         base_plugin_url = f"{prefix}?page=%d" if prefix else "genre_drama?page=%d"
         return self.process_anilist_view(genre, base_plugin_url, page)
 
@@ -968,7 +970,7 @@ class AniListBrowser(BrowserBase):
         if self.status:
             variables['status'] = self.status
 
-        genre = database.get(self.get_base_res, 24, variables)
+        genre = database.get(self.get_base_res, 24, variables, max_stale=BROWSE_MAX_STALE)
         base_plugin_url = f"{prefix}?page=%d" if prefix else "genre_ecchi?page=%d"
         return self.process_anilist_view(genre, base_plugin_url, page)
 
@@ -993,7 +995,7 @@ class AniListBrowser(BrowserBase):
         if self.status:
             variables['status'] = self.status
 
-        genre = database.get(self.get_base_res, 24, variables)
+        genre = database.get(self.get_base_res, 24, variables, max_stale=BROWSE_MAX_STALE)
         base_plugin_url = f"{prefix}?page=%d" if prefix else "genre_fantasy?page=%d"
         return self.process_anilist_view(genre, base_plugin_url, page)
 
@@ -1018,7 +1020,7 @@ class AniListBrowser(BrowserBase):
         if self.status:
             variables['status'] = self.status
 
-        genre = database.get(self.get_base_res, 24, variables)
+        genre = database.get(self.get_base_res, 24, variables, max_stale=BROWSE_MAX_STALE)
         base_plugin_url = f"{prefix}?page=%d" if prefix else "genre_hentai?page=%d"
         return self.process_anilist_view(genre, base_plugin_url, page)
 
@@ -1043,7 +1045,7 @@ class AniListBrowser(BrowserBase):
         if self.status:
             variables['status'] = self.status
 
-        genre = database.get(self.get_base_res, 24, variables)
+        genre = database.get(self.get_base_res, 24, variables, max_stale=BROWSE_MAX_STALE)
         base_plugin_url = f"{prefix}?page=%d" if prefix else "genre_horror?page=%d"
         return self.process_anilist_view(genre, base_plugin_url, page)
 
@@ -1068,7 +1070,7 @@ class AniListBrowser(BrowserBase):
         if self.status:
             variables['status'] = self.status
 
-        genre = database.get(self.get_base_res, 24, variables)
+        genre = database.get(self.get_base_res, 24, variables, max_stale=BROWSE_MAX_STALE)
         base_plugin_url = f"{prefix}?page=%d" if prefix else "genre_shoujo?page=%d"
         return self.process_anilist_view(genre, base_plugin_url, page)
 
@@ -1093,7 +1095,7 @@ class AniListBrowser(BrowserBase):
         if self.status:
             variables['status'] = self.status
 
-        genre = database.get(self.get_base_res, 24, variables)
+        genre = database.get(self.get_base_res, 24, variables, max_stale=BROWSE_MAX_STALE)
         base_plugin_url = f"{prefix}?page=%d" if prefix else "genre_mecha?page=%d"
         return self.process_anilist_view(genre, base_plugin_url, page)
 
@@ -1118,7 +1120,7 @@ class AniListBrowser(BrowserBase):
         if self.status:
             variables['status'] = self.status
 
-        genre = database.get(self.get_base_res, 24, variables)
+        genre = database.get(self.get_base_res, 24, variables, max_stale=BROWSE_MAX_STALE)
         base_plugin_url = f"{prefix}?page=%d" if prefix else "genre_music?page=%d"
         return self.process_anilist_view(genre, base_plugin_url, page)
 
@@ -1143,7 +1145,7 @@ class AniListBrowser(BrowserBase):
         if self.status:
             variables['status'] = self.status
 
-        genre = database.get(self.get_base_res, 24, variables)
+        genre = database.get(self.get_base_res, 24, variables, max_stale=BROWSE_MAX_STALE)
         base_plugin_url = f"{prefix}?page=%d" if prefix else "genre_mystery?page=%d"
         return self.process_anilist_view(genre, base_plugin_url, page)
 
@@ -1168,7 +1170,7 @@ class AniListBrowser(BrowserBase):
         if self.status:
             variables['status'] = self.status
 
-        genre = database.get(self.get_base_res, 24, variables)
+        genre = database.get(self.get_base_res, 24, variables, max_stale=BROWSE_MAX_STALE)
         base_plugin_url = f"{prefix}?page=%d" if prefix else "genre_psychological?page=%d"
         return self.process_anilist_view(genre, base_plugin_url, page)
 
@@ -1193,7 +1195,7 @@ class AniListBrowser(BrowserBase):
         if self.status:
             variables['status'] = self.status
 
-        genre = database.get(self.get_base_res, 24, variables)
+        genre = database.get(self.get_base_res, 24, variables, max_stale=BROWSE_MAX_STALE)
         base_plugin_url = f"{prefix}?page=%d" if prefix else "genre_romance?page=%d"
         return self.process_anilist_view(genre, base_plugin_url, page)
 
@@ -1218,7 +1220,7 @@ class AniListBrowser(BrowserBase):
         if self.status:
             variables['status'] = self.status
 
-        genre = database.get(self.get_base_res, 24, variables)
+        genre = database.get(self.get_base_res, 24, variables, max_stale=BROWSE_MAX_STALE)
         base_plugin_url = f"{prefix}?page=%d" if prefix else "genre_sci_fi?page=%d"
         return self.process_anilist_view(genre, base_plugin_url, page)
 
@@ -1243,7 +1245,7 @@ class AniListBrowser(BrowserBase):
         if self.status:
             variables['status'] = self.status
 
-        genre = database.get(self.get_base_res, 24, variables)
+        genre = database.get(self.get_base_res, 24, variables, max_stale=BROWSE_MAX_STALE)
         base_plugin_url = f"{prefix}?page=%d" if prefix else "genre_slice_of_life?page=%d"
         return self.process_anilist_view(genre, base_plugin_url, page)
 
@@ -1268,7 +1270,7 @@ class AniListBrowser(BrowserBase):
         if self.status:
             variables['status'] = self.status
 
-        genre = database.get(self.get_base_res, 24, variables)
+        genre = database.get(self.get_base_res, 24, variables, max_stale=BROWSE_MAX_STALE)
         base_plugin_url = f"{prefix}?page=%d" if prefix else "genre_sports?page=%d"
         return self.process_anilist_view(genre, base_plugin_url, page)
 
@@ -1293,7 +1295,7 @@ class AniListBrowser(BrowserBase):
         if self.status:
             variables['status'] = self.status
 
-        genre = database.get(self.get_base_res, 24, variables)
+        genre = database.get(self.get_base_res, 24, variables, max_stale=BROWSE_MAX_STALE)
         base_plugin_url = f"{prefix}?page=%d" if prefix else "genre_supernatural?page=%d"
         return self.process_anilist_view(genre, base_plugin_url, page)
 
@@ -1318,7 +1320,7 @@ class AniListBrowser(BrowserBase):
         if self.status:
             variables['status'] = self.status
 
-        genre = database.get(self.get_base_res, 24, variables)
+        genre = database.get(self.get_base_res, 24, variables, max_stale=BROWSE_MAX_STALE)
         base_plugin_url = f"{prefix}?page=%d" if prefix else "genre_thriller?page=%d"
         return self.process_anilist_view(genre, base_plugin_url, page)
 
@@ -1568,7 +1570,7 @@ class AniListBrowser(BrowserBase):
             'year': f'{year}%',
             'sort': "TRENDING_DESC"
         }
-        trending = database.get(self.get_base_res, 24, variables)
+        trending = database.get(self.get_base_res, 24, variables, max_stale=BROWSE_MAX_STALE)
 
         if not trending or 'ANIME' not in trending:
             return main_recs
@@ -5,7 +5,7 @@ import re
 from html import unescape
 
 from resources.lib.ui import client, database, control, utils
-from resources.lib.endpoints import mdblist, anilist
+from resources.lib.endpoints import enrichment
 
 BASE_URL = "https://animeschedule.net/api/v3"
 WEBSITE_URL = "https://animeschedule.net"
@@ -536,17 +536,14 @@ class AnimeScheduleCalendar:
         # Collect all MAL IDs for batch ratings fetch
         mal_ids = [anime.get('mal_id') for anime in anime_list if anime.get('mal_id')]
 
-        # Fetch ratings for all anime in one batch request (MDBList and AniList)
+        # Fetch ratings for all anime from the persisted enrichment store (MDBList and AniList)
         ratings_map = {}
         anilist_ratings_map = {}
         if mal_ids:
             try:
-                ratings_map = mdblist.get_ratings_for_mal_ids(mal_ids)
-            except Exception:
-                pass
-
-            try:
-                anilist_ratings_map = anilist.get_anilist_ratings_for_mal_ids(mal_ids)
+                enriched = enrichment.get_enrichment(mal_ids)
+                ratings_map = {mal_id: data['mdblist'] for mal_id, data in enriched.items() if 'mdblist' in data}
+                anilist_ratings_map = {mal_id: {'anilist_score': data['anilist_score']} for mal_id, data in enriched.items() if 'anilist_score' in data}
             except Exception:
                 pass
 
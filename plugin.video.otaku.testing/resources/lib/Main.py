@@ -208,7 +208,8 @@ def save_to_watch_history(mal_id):
 @Route('animes/*')
 def ANIMES_PAGE(payload, params):
     mal_id, eps_watched = payload.rsplit("/")
-    anime_general, content = MetaBrowser.get_anime_init(mal_id)
+    anime_general, content = MetaBrowser.get_anime_episodes(mal_id, params.get('page'))
+    anime_general, content = MetaBrowser.get_episode_page(mal_id, anime_general, f'animes/{mal_id}/{eps_watched}', params.get('page'))
     control.draw_items(anime_general, content)
 
 
@@ -1744,7 +1745,7 @@ def PLAY(payload, params):
     if not params.get('tvshowtitle'):
         episode_data = database.get_episode(mal_id, episode)
         if episode_data:
-            params = pickle.loads(episode_data['kodi_meta'])
+            params = database.episode_item(episode_data)
 
     if resume:
         resume = float(resume)
@@ -2013,19 +2014,8 @@ def find_episode_by_title(mal_ids, episode_titles):
     from resources.lib.ui.source_utils import clean_text
     cleaned_titles = [clean_text(t) for t in split_titles]
     jikan_api = JikanAPI()
-    requests_made = 0
-    last_request_time = time.time()
+    # Jikan's rate limit is enforced by client.request, see rate_limit.LIMITS
     for mal_id in mal_ids:
-        # Rate limit: max 3 requests every 4 seconds, space each request by at least 1.33 seconds
-        if requests_made == 3:
-            elapsed = time.time() - last_request_time
-            if elapsed < 4.0:
-                time.sleep(4.0 - elapsed)
-            requests_made = 0
-            last_request_time = time.time()
-        # Space each request by at least 1.33 seconds
-        if requests_made > 0:
-            time.sleep(1.33)
         # Retry logic for HTTP 429
         retries = 0
         max_retries = 3
@@ -2033,7 +2023,6 @@ def find_episode_by_title(mal_ids, episode_titles):
         while retries <= max_retries:
             try:
                 episodes = jikan_api.get_episode_meta(mal_id)
-                requests_made += 1
                 break
             except Exception as e:
                 if hasattr(e, 'response') and getattr(e.response, 'status_code', None) == 429:
@@ -2197,7 +2186,7 @@ def FANART_SELECT(payload, params):
     if not (episode := database.get_episode(mal_id)):
         MetaBrowser.get_anime_init(mal_id)
         episode = database.get_episode(mal_id)
-    fanart = pickle.loads(episode['kodi_meta'])['image']['fanart'] or []
+    fanart = database.episode_item(episode)['image'].get('fanart') or []
     fanart_display = fanart + ["None", "Random (Default)"]
     fanart += ["None", ""]
     control.draw_items([utils.allocate_item(f, f'fanart/{mal_id}/{i}', False, False, [], f, {}, fanart=f, landscape=f) for i, f in enumerate(fanart_display)], '')
@@ -2207,7 +2196,7 @@ def FANART_SELECT(payload, params):
 def FANART(payload: str, params: dict):
     mal_id, select = payload.rsplit('/', 1)
     episode = database.get_episode(mal_id)
-    fanart = pickle.loads(episode['kodi_meta'])['image']['fanart'] or []
+    fanart = database.episode_item(episode)['image'].get('fanart') or []
     fanart_display = fanart + ["None", "Random"]
     fanart += ["None", ""]
 
@@ -4039,6 +4028,18 @@ def CLEAR_CACHE(payload, params):
     database.cache_clear()
 
 
+@Route('cache_report')
+def CACHE_REPORT(payload, params):
+    from resources.lib.ui import cache_maintenance
+    control.textviewer_dialog(control.lang(30465), cache_maintenance.format_report())
+
+
+@Route('provider_stats')
+def PROVIDER_STATS(payload, params):
+    from resources.lib.ui import provider_latency
+    control.textviewer_dialog(control.lang(30470), provider_latency.format_stats())
+
+
 @Route('clear_search_history')
 @Route('clear_search_history_anime')
 @Route('clear_search_history_movie')
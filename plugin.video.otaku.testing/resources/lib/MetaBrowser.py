@@ -1,3 +1,4 @@
+import ast
 import pickle
 
 from resources.lib.ui import control, database
@@ -84,6 +85,87 @@ def get_anime_init(mal_id):
     return data, 'episodes'
 
 
+EPISODE_LIST_CACHE_HOURS = 1 / 6  # how long the pages of a long list reuse the episodes parsed for its index
+
+
+def _episode_list_key(mal_id):
+    return f'episode_list_{mal_id}'
+
+
+def get_anime_episodes(mal_id, page=None):
+    """
+    get_anime_init for the animes/ route. Opening a long list keeps its parsed episodes briefly, so
+    moving between its pages reads them back instead of running the indexers over the whole list.
+    """
+    key = _episode_list_key(mal_id)
+    if page:
+        cached = database.cache_get(key)
+        if cached and database.is_cache_valid(cached['date'], EPISODE_LIST_CACHE_HOURS):
+            try:
+                return ast.literal_eval(cached['value']), 'episodes'
+            except (ValueError, SyntaxError):
+                pass
+    data, content = get_anime_init(mal_id)
+    if control.getBool('interface.episode.paging') and len(data) > control.getInt('interface.perpage.episodes'):
+        database.cache_insert(key, repr(data), EPISODE_LIST_CACHE_HOURS)
+    return data, content
+
+
+def clear_episode_list(mal_id):
+    """Drop the kept episode list of mal_id, so its pages show a newly watched episode"""
+    database.cache_remove(_episode_list_key(mal_id))
+
+
+def get_episode_page(mal_id, items, base_url, page=None):
+    """
+    Split an episode list longer than a page. Without page, returns an index of the episode ranges
+    led by a shortcut to the page of the next unwatched episode; with page, the episodes of that
+    range followed by a link to the next one.
+    """
+    page_size = control.getInt('interface.perpage.episodes')
+    if not control.getBool('interface.episode.paging') or len(items) <= page_size:
+        return items, 'episodes'
+
+    from resources.lib.ui import episode_pages, utils
+    from resources.lib.indexers import anizip
+    items = sorted(items, key=lambda x: x['info']['episode'])
+    seasons = database.get(anizip.ANIZIPAPI().get_episode_seasons, 168, mal_id) or {}
+    ranges = episode_pages.page_ranges([item['info']['episode'] for item in items], page_size, seasons)
+
+    if page:
+        page = min(max(int(page), 1), len(ranges))
+        _, first, last = ranges[page - 1]
+        page_items = [item for item in items if first <= item['info']['episode'] <= last]
+        hide_next = not control.is_addon_visible() and control.getBool('widget.hide.nextpage')
+        if page < len(ranges) and not hide_next:
+            name = "Next Page (%d)" % (page + 1)
+            page_items.append(utils.allocate_item(name, f'{base_url}?page={page + 1}', True, False, [], 'next.png', {'plot': name}, 'next.png'))
+        return page_items, 'episodes'
+
+    index = []
+    next_item = episode_pages.next_unwatched(items)
+    if next_item and next_item is not items[0]:
+        number = next_item['info']['episode']
+        name = f'Next Unwatched: Episode {number}'
+        info = {'title': name, 'plot': next_item['info'].get('title')}
+        index.append(utils.allocate_item(name, f'{base_url}?page={episode_pages.page_of(ranges, number)}', True, False, [],
+                                         next_item['image'].get('thumb'), info, next_item['image'].get('fanart'), next_item['image'].get('poster')))
+    position = 0
+    for page, (season, first, last) in enumerate(ranges, 1):
+        name = f'Episodes {first}-{last}' if first != last else f'Episode {first}'
+        if season is not None:
+            name = f'Season {season}: {name}'
+        first_item = items[position]
+        while position < len(items) and items[position]['info']['episode'] <= last:
+            position += 1
+        info = {'title': name, 'plot': first_item['info'].get('title')}
+        if items[position - 1]['info'].get('playcount') == 1:
+            info['playcount'] = 1
+        index.append(utils.allocate_item(name, f'{base_url}?page={page}', True, False, [],
+                                         first_item['image'].get('thumb'), info, first_item['image'].get('fanart'), first_item['image'].get('poster')))
+    return index, 'seasons'
+
+
 def get_sources(mal_id, episode, media_type, rescrape=False, source_select=False, silent=False):
     from resources.lib import pages
     if not (show := database.get_show(mal_id)):
@@ -106,6 +188,23 @@ def get_sources(mal_id, episode, media_type, rescrape=False, source_select=False
     return sources
 
 
+def warm_sources(mal_id, episode, media_type='show'):
+    """Scrape an episode in the background so its sources are served from cache when played"""
+    from resources.lib import pages
+    if not (show := database.get_show(mal_id)):
+        return []
+    kodi_meta = pickle.loads(show['kodi_meta'])
+    actionArgs = {
+        'query': kodi_meta['query'],
+        'mal_id': mal_id,
+        'episode': episode,
+        'status': kodi_meta['status'],
+        'duration': kodi_meta['duration'],
+        'media_type': media_type
+    }
+    return pages.warm_sources(actionArgs)
+
+
 # Lazy-loaded Next Up API instance
 _NEXT_UP_API = None
 
@@ -148,7 +247,7 @@ def get_next_up_meta(mal_id, episode_num):
             # Episodes are 1-indexed, list is 0-indexed
             ep_data = episodes[episode_num - 1] if episode_num <= len(episodes) else None
             if ep_data:
-                kodi_meta = pickle.loads(ep_data.get('kodi_meta', b''))
+                kodi_meta = database.episode_item(ep_data)
                 if kodi_meta:
                     info = kodi_meta.get('info', {})
                     image = kodi_meta.get('image', {})
@@ -3,7 +3,7 @@ import time
 import random
 import pickle
 
-from resources.lib.ui import utils, client, control, get_meta, database
+from resources.lib.ui import utils, client, control, get_meta, database, token_manager
 from resources.lib.WatchlistFlavor.WatchlistFlavorBase import WatchlistFlavorBase
 from resources.lib.ui.divide_flavors import div_flavor
 
@@ -15,6 +15,8 @@ class MyAnimeListWLF(WatchlistFlavorBase):
     _IMAGE = "myanimelist.png"
 
     def __headers(self):
+        if self.token and control.getSetting('mal.refresh'):
+            self.token = self.token_manager().get() or self.token
         headers = {
             'Authorization': f'Bearer {self.token}',
             'Content-Type': 'application/x-www-form-urlencoded'
@@ -44,7 +46,7 @@ class MyAnimeListWLF(WatchlistFlavorBase):
         res = r.json()
 
         self.token = res['access_token']
-        user = client.get(f'{self._URL}/users/@me', headers=self.__headers(), params={'fields': 'name'})
+        user = client.get(f'{self._URL}/users/@me', headers={'Authorization': f'Bearer {self.token}'}, params={'fields': 'name'})
         user = user.json()
 
         login_data = {
@@ -70,9 +72,15 @@ class MyAnimeListWLF(WatchlistFlavorBase):
         if not r:
             return
         res = r.json()
+        expiry = int(time.time()) + int(res['expires_in'])
         control.setSetting('mal.token', res['access_token'])
         control.setSetting('mal.refresh', res['refresh_token'])
-        control.setInt('mal.expiry', int(time.time()) + int(res['expires_in']))
+        control.setInt('mal.expiry', expiry)
+        return res['access_token'], expiry
+
+    @classmethod
+    def token_manager(cls):
+        return token_manager.get_manager('mal', cls.refresh_token, token_manager.SettingsStore('mal'))
 
     @staticmethod
     def handle_paging(next_offset, base_url, page):
@@ -65,7 +65,7 @@ class WatchlistFlavorBase:
                     next_up_meta['image'] = random.choice(fanart) if isinstance(fanart, list) else fanart
             if episodes := database.get_episode_list(mal_id):
                 try:
-                    if episode_meta := pickle.loads(episodes[next_up]['kodi_meta']):
+                    if episode_meta := database.episode_item(episodes[next_up]):
                         if control.getBool('interface.cleantitles'):
                             next_up_meta['title'] = f'Episode {episode_meta["info"]["episode"]}'
                         else:
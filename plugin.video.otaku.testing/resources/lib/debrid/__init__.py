@@ -1,8 +1,21 @@
-import threading
+import asyncio
+import time
 
 from copy import deepcopy
 from resources.lib.debrid import premiumize, torbox, easydebrid, real_debrid
-from resources.lib.ui import control, client
+from resources.lib.ui import control, client, async_client
+
+CHECK_TIMEOUT = 10  # seconds a provider's cache check may spend on requests
+
+# Host each cache check talks to, used for the async engine's per-host limits
+WORKER_HOSTS = {
+    'realdebrid': 'api.real-debrid.com',
+    'debridlink': 'debrid-link.com',
+    'premiumize': 'www.premiumize.me',
+    'alldebrid': 'api.alldebrid.com',
+    'torbox': 'api.torbox.app',
+    'easydebrid': 'easydebrid.com'
+}
 
 
 class Debrid:
@@ -19,54 +32,49 @@ class Debrid:
         self.alldebridUnCached = []
         self.debridlinkUnCached = []
         self.torboxUnCached = []
-        self.threads = []
 
     def torrentCacheCheck(self, torrent_list):
-        enabled_debrids = control.enabled_debrid()
+        """Synchronous facade over torrentCacheCheckAsync for callers outside the async engine"""
+        return async_client.run(self.torrentCacheCheckAsync(torrent_list))
 
-        # Check all enabled debrid providers
-        if enabled_debrids['realdebrid']:
-            t = threading.Thread(target=self.real_debrid_worker, args=(deepcopy(torrent_list),))
-            t.start()
-            self.threads.append(t)
-
-        if enabled_debrids['debridlink']:
-            t = threading.Thread(target=self.debrid_link_worker, args=(deepcopy(torrent_list),))
-            self.threads.append(t)
-            t.start()
-
-        if enabled_debrids['premiumize']:
-            t = threading.Thread(target=self.premiumize_worker, args=(deepcopy(torrent_list),))
-            t.start()
-            self.threads.append(t)
-
-        if enabled_debrids['alldebrid']:
-            t = threading.Thread(target=self.all_debrid_worker, args=(deepcopy(torrent_list),))
-            t.start()
-            self.threads.append(t)
-
-        if enabled_debrids['torbox']:
-            t = threading.Thread(target=self.torbox_worker, args=(deepcopy(torrent_list),))
-            t.start()
-            self.threads.append(t)
-
-        if enabled_debrids['easydebrid']:
-            t = threading.Thread(target=self.easydebrid_worker, args=(deepcopy(torrent_list),))
-            t.start()
-            self.threads.append(t)
-
-        for i in self.threads:
-            i.join(timeout=10)  # 10 second max per provider
-
-        # Log if any threads are still running
-        still_running = [t for t in self.threads if t.is_alive()]
-        if still_running:
-            control.log(f'Debrid cache check: {len(still_running)} providers timed out', 'warning')
+    async def torrentCacheCheckAsync(self, torrent_list):
+        """Awaitable cache check that runs each enabled provider through the shared async engine"""
+        enabled_debrids = control.enabled_debrid()
+        workers = {
+            'realdebrid': self.real_debrid_worker,
+            'debridlink': self.debrid_link_worker,
+            'premiumize': self.premiumize_worker,
+            'alldebrid': self.all_debrid_worker,
+            'torbox': self.torbox_worker,
+            'easydebrid': self.easydebrid_worker
+        }
+        engine = async_client.get_engine()
+        tasks = [
+            engine.call(self._timed_worker, name, worker, deepcopy(torrent_list), host=WORKER_HOSTS[name])
+            for name, worker in workers.items() if enabled_debrids[name]
+        ]
+        results = await asyncio.gather(*tasks, return_exceptions=True)
+        for r in results:
+            if isinstance(r, Exception):
+                control.log(f'Debrid cache check failed: {r}', 'warning')
 
         cached_list = self.premiumizeCached + self.torboxCached + self.easydebridCached + self.realdebridCached + self.alldebridCached + self.debridlinkCached
         uncached_list = self.realdebridUnCached + self.premiumizeUnCached + self.alldebridUnCached + self.debridlinkUnCached + self.torboxUnCached
         return cached_list, uncached_list
 
+    @staticmethod
+    def _timed_worker(name, worker, torrent_list):
+        """
+        Run a cache check with its requests bounded by CHECK_TIMEOUT through client.deadline, so a
+        slow host releases its engine worker thread instead of holding it after the check is abandoned
+        """
+        start = time.perf_counter()
+        with client.deadline(CHECK_TIMEOUT):
+            result = worker(torrent_list)
+        if time.perf_counter() - start >= CHECK_TIMEOUT:
+            control.log(f'Debrid cache check: {name} ran out of its {CHECK_TIMEOUT}s budget', 'warning')
+        return result
+
     def all_debrid_worker(self, torrent_list):
         if len(torrent_list) > 0:
             from resources.lib.debrid import all_debrid
@@ -0,0 +1,124 @@
+"""
+SQLite-backed cache of each debrid provider's cloud listing and torrent details.
+
+Cloud inspection matches against the stored catalog. The network is only hit when the
+catalog is older than REFRESH_MINUTES, and providers that can list by date only fetch
+items added since the newest one already stored.
+"""
+import pickle
+import time
+
+from resources.lib.ui import control, database
+
+REFRESH_MINUTES = 5  # catalog is served without any network call inside this window
+FULL_REFRESH_HOURS = 6  # incremental refreshes miss deletions, so rebuild from scratch this often
+
+
+def _create_tables(cursor):
+    cursor.execute('CREATE TABLE IF NOT EXISTS cloud_catalog (provider TEXT, item_id TEXT, added TEXT, data BLOB, PRIMARY KEY (provider, item_id))')
+    cursor.execute('CREATE TABLE IF NOT EXISTS cloud_catalog_state (provider TEXT PRIMARY KEY, refreshed INTEGER, full_refreshed INTEGER)')
+    cursor.execute('CREATE TABLE IF NOT EXISTS cloud_details (provider TEXT, item_id TEXT, data BLOB, date INTEGER, PRIMARY KEY (provider, item_id))')
+
+
+def _get_state(provider):
+    with database.SQL(control.cacheFile) as cursor:
+        _create_tables(cursor)
+        cursor.execute('SELECT * FROM cloud_catalog_state WHERE provider=?', (provider,))
+        return cursor.fetchone()
+
+
+def _load(provider):
+    with database.SQL(control.cacheFile) as cursor:
+        _create_tables(cursor)
+        cursor.execute('SELECT data FROM cloud_catalog WHERE provider=? ORDER BY added DESC', (provider,))
+        return [pickle.loads(row['data']) for row in cursor.fetchall()]
+
+
+def _store(provider, items, id_key, added_key, replace):
+    now = int(time.time())
+    rows = [(provider, str(item[id_key]), str(item.get(added_key) or ''), pickle.dumps(item)) for item in items if item.get(id_key)]
+    with database.SQL(control.cacheFile) as cursor:
+        _create_tables(cursor)
+        if replace:
+            cursor.execute('DELETE FROM cloud_catalog WHERE provider=?', (provider,))
+        cursor.executemany('REPLACE INTO cloud_catalog (provider, item_id, added, data) VALUES (?, ?, ?, ?)', rows)
+        if replace:
+            cursor.execute('DELETE FROM cloud_details WHERE provider=? AND item_id NOT IN (SELECT item_id FROM cloud_catalog WHERE provider=?)', (provider, provider))
+            cursor.execute('REPLACE INTO cloud_catalog_state (provider, refreshed, full_refreshed) VALUES (?, ?, ?)', (provider, now, now))
+        else:
+            cursor.execute('UPDATE cloud_catalog_state SET refreshed=? WHERE provider=?', (now, provider))
+        cursor.connection.commit()
+
+
+def _newest_added(provider):
+    with database.SQL(control.cacheFile) as cursor:
+        cursor.execute('SELECT MAX(added) AS added FROM cloud_catalog WHERE provider=?', (provider,))
+        result = cursor.fetchone()
+        return result['added'] if result else None
+
+
+def get_catalog(provider, fetch_all, id_key, added_key='added', fetch_since=None):
+    """
+    Return the provider's cloud listing, newest first, refreshing the stored copy only when stale.
+
+    :param fetch_all: callable returning the full listing (or None on failure)
+    :param fetch_since: optional callable taking the newest stored `added` value and returning newer items
+    """
+    state = _get_state(provider)
+    now = int(time.time())
+    if state and now - state['refreshed'] < REFRESH_MINUTES * 60:
+        return _load(provider)
+
+    if fetch_since and state and now - state['full_refreshed'] < FULL_REFRESH_HOURS * 3600:
+        newest = _newest_added(provider)
+        if newest:
+            items = fetch_since(newest)
+            if items is not None:
+                _store(provider, items, id_key, added_key, replace=False)
+                control.log(f'Cloud catalog {provider}: {len(items)} items added since {newest}')
+                return _load(provider)
+
+    items = fetch_all()
+    if items is None:
+        control.log(f'Cloud catalog {provider}: listing failed, serving stored catalog', 'warning')
+        return _load(provider)
+    _store(provider, items, id_key, added_key, replace=True)
+    control.log(f'Cloud catalog {provider}: full refresh with {len(items)} items')
+    return _load(provider)
+
+
+def get_details(provider, item_id, fetch, cache_if=None):
+    """
+    Return cached details for a cloud item, fetching them once.
+    Details are only stored when cache_if(details) is true (e.g. the torrent finished downloading),
+    and an item whose details can no longer be fetched is dropped from the catalog.
+    """
+    item_id = str(item_id)
+    with database.SQL(control.cacheFile) as cursor:
+        _create_tables(cursor)
+        cursor.execute('SELECT data FROM cloud_details WHERE provider=? AND item_id=?', (provider, item_id))
+        result = cursor.fetchone()
+    if result:
+        return pickle.loads(result['data'])
+
+    details = fetch(item_id)
+    with database.SQL(control.cacheFile) as cursor:
+        if not details:
+            cursor.execute('DELETE FROM cloud_catalog WHERE provider=? AND item_id=?', (provider, item_id))
+        elif cache_if is None or cache_if(details):
+            cursor.execute('REPLACE INTO cloud_details (provider, item_id, data, date) VALUES (?, ?, ?, ?)',
+                           (provider, item_id, pickle.dumps(details), int(time.time())))
+        cursor.connection.commit()
+    return details
+
+
+def clear(provider=None):
+    """Drop the stored catalog and details for one provider, or for all of them"""
+    with database.SQL(control.cacheFile) as cursor:
+        _create_tables(cursor)
+        for table in ['cloud_catalog', 'cloud_catalog_state', 'cloud_details']:
+            if provider:
+                cursor.execute(f'DELETE FROM {table} WHERE provider=?', (provider,))
+            else:
+                cursor.execute(f'DELETE FROM {table}')
+        cursor.connection.commit()
@@ -1,5 +1,5 @@
 import time
-from resources.lib.ui import client, control, source_utils, database
+from resources.lib.ui import client, control, source_utils, database, token_manager
 
 
 class DebridLink:
@@ -18,6 +18,8 @@ class DebridLink:
         self.OauthTotalTimeout = 0
 
     def headers(self):
+        if self.token and self.refresh:
+            self.token = token_manager.get_manager('debridlink', lambda: DebridLink().refreshToken(), token_manager.SettingsStore('debridlink')).get() or self.token
         return {'User-Agent': self.USER_AGENT, 'Authorization': f"Bearer {self.token}"}
 
     def auth_loop(self):
@@ -96,11 +98,13 @@ class DebridLink:
         }
         url = f"{self.api_url[:-3]}/oauth/token"
         response = client.post(url, data=postData, headers={'User-Agent': self.USER_AGENT})
-        response = response.json()
+        response = response.json() if response else {}
         if response.get('access_token'):
             self.token = response['access_token']
+            expiry = int(time.time()) + response['expires_in']
             control.setSetting('debridlink.token', self.token)
-            control.setInt('debridlink.expiry', int(time.time()) + response['expires_in'])
+            control.setInt('debridlink.expiry', expiry)
+            return self.token, expiry
 
     def check_instant_availability(self, hashes):
         """Check if hashes are cached on Debrid-Link"""
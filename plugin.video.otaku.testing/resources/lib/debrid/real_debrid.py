@@ -1,6 +1,6 @@
 import time
 
-from resources.lib.ui import client, control, source_utils, database
+from resources.lib.ui import client, control, source_utils, database, token_manager
 
 
 class RealDebrid:
@@ -22,10 +22,8 @@ class RealDebrid:
 
     def headers(self):
         if self.token and self.refresh:
-            expiry = control.getInt('realdebrid.expiry')
-            if not expiry or int(time.time()) >= expiry:
-                control.log('Real-Debrid: Token expired, refreshing...', 'info')
-                self.refreshToken()
+            # Refreshes once, under a lock, when the token is about to expire
+            self.token = token_manager.get_manager('realdebrid', lambda: RealDebrid().refreshToken(), token_manager.SettingsStore('realdebrid')).get() or self.token
         return {'Authorization': f"Bearer {self.token}"}
 
     def auth_loop(self):
@@ -153,17 +151,19 @@ class RealDebrid:
                 response = response.json()
                 self.token = response['access_token']
                 self.refresh = response['refresh_token']
+                expiry = int(time.time()) + int(response['expires_in'])
                 control.setSetting('realdebrid.token', self.token)
                 control.setSetting('realdebrid.refresh', self.refresh)
-                control.setInt('realdebrid.expiry', int(time.time()) + int(response['expires_in']))
+                control.setInt('realdebrid.expiry', expiry)
 
-                user_info_response = client.get(f'{self.BaseUrl}/user', headers=self.headers())
+                user_info_response = client.get(f'{self.BaseUrl}/user', headers={'Authorization': f"Bearer {self.token}"})
                 if user_info_response and user_info_response.ok:
                     user_info = user_info_response.json()
                     control.setSetting('realdebrid.username', user_info['username'])
                     control.setSetting('realdebrid.auth.status', user_info['type'])
                 control.log('refreshed realdebrid.token')
                 control.notify(control.ADDON_NAME, 'Real-Debrid token refreshed')
+                return self.token, expiry
             except (ValueError, KeyError) as e:
                 control.log(f"realdebrid.refresh error: {str(e)}", 'warning')
         else:
@@ -178,11 +178,32 @@ class RealDebrid:
         control.log(f'Real-Debrid addMagnet failed: status={response.status_code if response else "no response"}', 'warning')
         return None
 
-    def list_torrents(self):
-        response = client.get(f'{self.BaseUrl}/torrents', headers=self.headers())
-        if response and response.ok:
-            return response.json()
-        return []
+    def list_torrents(self, page=None, limit=None):
+        """The torrent list, or None when the request fails so cloud_catalog keeps its stored copy"""
+        params = {k: v for k, v in {'page': page, 'limit': limit}.items() if v}
+        response = client.get(f'{self.BaseUrl}/torrents', headers=self.headers(), params=params or None)
+        if response is None or not response.ok:
+            return None
+        # RD answers 204 with an empty body when there are no torrents
+        return response.json() if response.text else []
+
+    def list_torrents_since(self, added, limit=100):
+        """
+        Page through the torrent list (newest first) until reaching torrents added before `added`.
+        Returns None when a page fails so the caller can fall back to a full listing.
+        """
+        torrents = []
+        page = 1
+        while True:
+            response = client.get(f'{self.BaseUrl}/torrents', headers=self.headers(), params={'page': page, 'limit': limit})
+            if response is None or not response.ok:
+                return None
+            # RD answers 204 with an empty body once the pages run out
+            batch = response.json() if response.text else []
+            torrents += [i for i in batch if i.get('added', '') >= added]
+            if len(batch) < limit or any(i.get('added', '') < added for i in batch):
+                return torrents
+            page += 1
 
     def torrentInfo(self, torrent_id):
         response = client.get(f'{self.BaseUrl}/torrents/info/{torrent_id}', headers=self.headers())
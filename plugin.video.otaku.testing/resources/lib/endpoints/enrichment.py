@@ -0,0 +1,142 @@
+"""
+Persistent ratings/banner enrichment keyed by MAL id.
+
+AniList ratings, banners and ids come from a single combined query and MDBList ratings
+from its batch endpoint. Results (including "not found") are stored per MAL id in cache.db,
+so later calls only send the ids that are missing or expired to the network.
+"""
+import pickle
+import threading
+import time
+
+from resources.lib.ui import control, database
+
+ENRICHMENT_HOURS = 24  # how long a found entry is served without refetching
+MISSING_HOURS = 6  # ids a source returned nothing for are retried sooner
+SQL_CHUNK = 500  # stay below SQLite's bound parameter limit
+
+_lock = threading.Lock()
+
+
+def _create_table(cursor):
+    cursor.execute('CREATE TABLE IF NOT EXISTS enrichment (mal_id INTEGER, source TEXT, data BLOB, date INTEGER, PRIMARY KEY (mal_id, source))')
+
+
+def _fetch_anilist(mal_ids):
+    from resources.lib.endpoints.anilist import Anilist
+    return Anilist().get_enrichment_batch(mal_ids)
+
+
+def _fetch_mdblist(mal_ids):
+    from resources.lib.endpoints.mdblist import MDBListAPI
+    return MDBListAPI().fetch_ratings_batch(mal_ids)
+
+
+SOURCES = {
+    'anilist': _fetch_anilist,
+    'mdblist': _fetch_mdblist
+}
+
+
+def _normalize(mal_ids):
+    ids = []
+    for mal_id in mal_ids or []:
+        try:
+            mal_id = int(mal_id)
+        except (ValueError, TypeError):
+            continue
+        if mal_id and mal_id not in ids:
+            ids.append(mal_id)
+    return ids
+
+
+def _load(source, mal_ids):
+    """Return {mal_id: data} for fresh rows; data is None for ids the source had nothing for"""
+    now = int(time.time())
+    stored = {}
+    with database.SQL(control.cacheFile) as cursor:
+        _create_table(cursor)
+        for start in range(0, len(mal_ids), SQL_CHUNK):
+            chunk = mal_ids[start:start + SQL_CHUNK]
+            cursor.execute(f'SELECT mal_id, data, date FROM enrichment WHERE source=? AND mal_id IN ({",".join("?" * len(chunk))})',
+                           [source] + chunk)
+            for row in cursor.fetchall():
+                data = pickle.loads(row['data'])
+                ttl = ENRICHMENT_HOURS if data is not None else MISSING_HOURS
+                if now - row['date'] < ttl * 3600:
+                    stored[row['mal_id']] = data
+    return stored
+
+
+def _store(source, mal_ids, fetched):
+    now = int(time.time())
+    rows = [(mal_id, source, pickle.dumps(fetched.get(mal_id)), now) for mal_id in mal_ids]
+    with database.SQL(control.cacheFile) as cursor:
+        _create_table(cursor)
+        cursor.executemany('REPLACE INTO enrichment (mal_id, source, data, date) VALUES (?, ?, ?, ?)', rows)
+        cursor.connection.commit()
+
+
+def get_source(source, mal_ids):
+    """
+    Return {mal_id: data} from one source, fetching only ids that are not stored or have expired.
+    Ids the source has no entry for are left out of the result.
+    """
+    mal_ids = _normalize(mal_ids)
+    if not mal_ids:
+        return {}
+    stored = _load(source, mal_ids)
+    missing = [mal_id for mal_id in mal_ids if mal_id not in stored]
+    if missing:
+        with _lock:
+            # Another thread may have stored them while we waited
+            stored.update(_load(source, missing))
+            missing = [mal_id for mal_id in missing if mal_id not in stored]
+            if missing:
+                fetched = SOURCES[source](missing)
+                if fetched is None:
+                    control.log(f'Enrichment {source}: fetch failed for {len(missing)} ids', 'warning')
+                else:
+                    _store(source, missing, fetched)
+                    stored.update({mal_id: fetched.get(mal_id) for mal_id in missing})
+                    control.log(f'Enrichment {source}: fetched {len(missing)} of {len(mal_ids)} ids')
+    return {mal_id: data for mal_id, data in stored.items() if data is not None}
+
+
+def get_enrichment(mal_ids):
+    """
+    Return {mal_id: {'anilist_id', 'anilist_score', 'banner', 'mdblist'}} merged from all sources.
+    'mdblist' holds the MDBList ratings dict (mal, imdb, trakt, tmdb, score_average) when available.
+    """
+    anilist = get_source('anilist', mal_ids)
+    mdblist = get_source('mdblist', mal_ids)
+    merged = {}
+    for mal_id in _normalize(mal_ids):
+        entry = dict(anilist.get(mal_id) or {})
+        if mal_id in mdblist:
+            entry['mdblist'] = mdblist[mal_id]
+        if entry:
+            merged[mal_id] = entry
+    return merged
+
+
+def get_anilist_ratings(mal_ids):
+    """{mal_id: {'anilist_score': score}} in the format of Anilist.get_anilist_ratings_batch"""
+    return {mal_id: {'anilist_score': data['anilist_score']} for mal_id, data in get_source('anilist', mal_ids).items()}
+
+
+def get_banners(mal_ids):
+    """{mal_id: banner_url} in the format of Anilist.get_banners_batch"""
+    return {mal_id: data['banner'] for mal_id, data in get_source('anilist', mal_ids).items() if data.get('banner')}
+
+
+def get_mdblist_ratings(mal_ids):
+    """{mal_id: ratings} in the format of MDBListAPI.get_ratings_batch"""
+    return get_source('mdblist', mal_ids)
+
+
+def clear():
+    with database.SQL(control.cacheFile) as cursor:
+        _create_table(cursor)
+        cursor.execute('DELETE FROM enrichment')
+        cursor.connection.commit()
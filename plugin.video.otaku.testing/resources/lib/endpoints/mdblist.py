@@ -34,9 +34,16 @@ class MDBListAPI:
             dict: Dictionary mapping MAL IDs to their ratings data
                   Format: {mal_id: {'mal': score, 'imdb': score, 'trakt': score, 'tmdb': score, 'score_average': score}}
         """
+        return self.fetch_ratings_batch(mal_ids) or {}
+
+    def fetch_ratings_batch(self, mal_ids):
+        """
+        Same as get_ratings_batch, but returns None when the request fails or no API key is set,
+        so callers that persist results can tell a failure from "MDBList has no ratings".
+        """
         if not self.api_key:
             control.log("MDBList API key not available", "warning")
-            return {}
+            return None
 
         if not mal_ids:
             return {}
@@ -147,10 +154,10 @@ class MDBListAPI:
                 return ratings_map
 
             else:
-                return {}
+                return None
 
         except Exception:
-            return {}
+            return None
 
     def get_single_rating(self, mal_id):
         """
@@ -181,8 +188,8 @@ def get_ratings_for_mal_ids(mal_ids):
     Returns:
         dict: Dictionary mapping MAL IDs to ratings
     """
-    api = MDBListAPI()
-    return api.get_ratings_batch(mal_ids)
+    from resources.lib.endpoints import enrichment
+    return enrichment.get_mdblist_ratings(mal_ids)
 
 
 def get_rating_for_mal_id(mal_id):
@@ -195,5 +202,6 @@ def get_rating_for_mal_id(mal_id):
     Returns:
         dict: Ratings data or None
     """
-    api = MDBListAPI()
-    return api.get_single_rating(mal_id)
+    if not mal_id or mal_id == 0:
+        return None
+    return get_ratings_for_mal_ids([mal_id]).get(int(mal_id))
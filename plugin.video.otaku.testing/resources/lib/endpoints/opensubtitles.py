@@ -4,15 +4,56 @@ API Documentation: https://opensubtitles.stoplight.io/docs/opensubtitles-api
 """
 
 import os
-import struct
+import pickle
+import re
+import sys
+import time
 import requests
 import xbmcvfs
-from resources.lib.ui import control
+from array import array
+from concurrent.futures import ThreadPoolExecutor
+from resources.lib.ui import control, database
 
 API_BASE = "https://api.opensubtitles.com/api/v1"
 USER_AGENT = "Otaku v5.2"
 HASH_BLOCK_SIZE = 65536  # 64KB for hash calculation
 
+HASH_CACHE_DAYS = 30  # the bytes behind a URL do not change
+SEARCH_CACHE_HOURS = 24
+SUBTITLE_CACHE_DAYS = 7  # downloaded files are kept so replays do not spend download quota
+
+
+def _cache_get(kind, key, max_age):
+    with database.SQL(control.cacheFile) as cursor:
+        cursor.execute('CREATE TABLE IF NOT EXISTS opensubtitles_cache (kind TEXT, key TEXT, value BLOB, date INTEGER, PRIMARY KEY (kind, key))')
+        cursor.execute('SELECT value, date FROM opensubtitles_cache WHERE kind=? AND key=?', (kind, key))
+        row = cursor.fetchone()
+    if row and time.time() - row['date'] < max_age:
+        return pickle.loads(row['value'])
+    return None
+
+
+def _cache_put(kind, key, value):
+    with database.SQL(control.cacheFile) as cursor:
+        cursor.execute('CREATE TABLE IF NOT EXISTS opensubtitles_cache (kind TEXT, key TEXT, value BLOB, date INTEGER, PRIMARY KEY (kind, key))')
+        cursor.execute('REPLACE INTO opensubtitles_cache (kind, key, value, date) VALUES (?, ?, ?, ?)',
+                       (kind, key, pickle.dumps(value), int(time.time())))
+        cursor.connection.commit()
+
+
+def compute_hash(first_chunk, last_chunk, file_size):
+    """
+    OpenSubtitles hash: file size plus the first and last 64KB summed as little-endian
+    unsigned 64-bit integers, modulo 2**64, as a 16-character hex string.
+    """
+    hash_value = file_size
+    for chunk in (first_chunk, last_chunk):
+        words = array('Q', chunk[:len(chunk) - len(chunk) % 8])
+        if sys.byteorder == 'big':
+            words.byteswap()
+        hash_value += sum(words)
+    return format(hash_value & 0xFFFFFFFFFFFFFFFF, '016x')
+
 
 def get_api_key():
     """Get API key from settings"""
@@ -24,15 +65,28 @@ def is_enabled():
     return control.getBool('opensubtitles.enable') and bool(get_api_key())
 
 
+def _fetch_range(url, range_value):
+    """GET one byte range; returns (status, bytes, total file size or None). Never reads more than one block."""
+    headers = {'User-Agent': USER_AGENT, 'Range': f'bytes={range_value}'}
+    with requests.get(url, headers=headers, timeout=15, stream=True) as response:
+        total = None
+        content_range = response.headers.get('Content-Range', '')
+        match = re.search(r'/(\d+)$', content_range)
+        if match:
+            total = int(match.group(1))
+        elif response.status_code == 200:
+            # Range ignored: the body is the whole file
+            total = int(response.headers.get('Content-Length', 0)) or None
+        data = response.raw.read(HASH_BLOCK_SIZE, decode_content=True) if response.status_code in (200, 206) else b''
+        return response.status_code, data, total
+
+
 def calculate_hash_from_url(url):
     """
     Calculate OpenSubtitles hash from a remote video URL using range requests.
 
-    The OpenSubtitles hash algorithm:
-    1. Read first 64KB and last 64KB of file
-    2. Sum all bytes as 64-bit little-endian unsigned integers
-    3. Add the file size to the sum
-    4. Return as 16-character lowercase hex string
+    The first 64KB and the last 64KB (a suffix range) are fetched at the same time; the file size
+    comes from their Content-Range headers, so no HEAD request is needed. Hashes are cached per URL.
 
     Args:
         url: Video file URL (must support range requests)
@@ -40,66 +94,36 @@ def calculate_hash_from_url(url):
     Returns:
         Tuple of (hash_string, file_size) or (None, None) on failure
     """
-    try:
-        # First, get file size with a HEAD request
-        headers = {'User-Agent': USER_AGENT}
-        head_response = requests.head(url, headers=headers, timeout=10, allow_redirects=True)
+    cached = _cache_get('hash', url, HASH_CACHE_DAYS * 86400)
+    if cached:
+        control.log(f'OpenSubtitles Hash: Cached hash={cached[0]}, size={cached[1]}')
+        return cached
 
-        if head_response.status_code != 200:
-            control.log(f'OpenSubtitles Hash: HEAD request failed with {head_response.status_code}', 'warning')
+    try:
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            first_future = executor.submit(_fetch_range, url, f'0-{HASH_BLOCK_SIZE - 1}')
+            last_future = executor.submit(_fetch_range, url, f'-{HASH_BLOCK_SIZE}')
+            first_status, first_chunk, first_total = first_future.result()
+            last_status, last_chunk, last_total = last_future.result()
+
+        if first_status not in (200, 206):
+            control.log(f'OpenSubtitles Hash: Failed to get first chunk: {first_status}', 'warning')
             return None, None
-
-        file_size = int(head_response.headers.get('Content-Length', 0))
-
-        if file_size < HASH_BLOCK_SIZE * 2:
-            control.log(f'OpenSubtitles Hash: File too small ({file_size} bytes)', 'warning')
+        if last_status != 206:
+            control.log(f'OpenSubtitles Hash: Server does not support range requests ({last_status})', 'warning')
             return None, None
 
-        # Check if server supports range requests
-        accept_ranges = head_response.headers.get('Accept-Ranges', '')
-        if accept_ranges != 'bytes':
-            control.log('OpenSubtitles Hash: Server may not support range requests', 'warning')
-
-        # Get first 64KB
-        range_header = {'User-Agent': USER_AGENT, 'Range': f'bytes=0-{HASH_BLOCK_SIZE - 1}'}
-        first_response = requests.get(url, headers=range_header, timeout=15)
-
-        if first_response.status_code not in (200, 206):
-            control.log(f'OpenSubtitles Hash: Failed to get first chunk: {first_response.status_code}', 'warning')
+        file_size = last_total or first_total
+        if not file_size or file_size < HASH_BLOCK_SIZE * 2:
+            control.log(f'OpenSubtitles Hash: File too small ({file_size} bytes)', 'warning')
             return None, None
-
-        first_chunk = first_response.content[:HASH_BLOCK_SIZE]
-
-        # Get last 64KB
-        last_start = file_size - HASH_BLOCK_SIZE
-        range_header = {'User-Agent': USER_AGENT, 'Range': f'bytes={last_start}-{file_size - 1}'}
-        last_response = requests.get(url, headers=range_header, timeout=15)
-
-        if last_response.status_code not in (200, 206):
-            control.log(f'OpenSubtitles Hash: Failed to get last chunk: {last_response.status_code}', 'warning')
+        if len(first_chunk) < HASH_BLOCK_SIZE or len(last_chunk) < HASH_BLOCK_SIZE:
+            control.log('OpenSubtitles Hash: Short range response', 'warning')
             return None, None
 
-        last_chunk = last_response.content[-HASH_BLOCK_SIZE:]
-
-        # Calculate hash
-        hash_value = file_size
-
-        # Sum first chunk as 64-bit little-endian unsigned integers
-        for i in range(0, len(first_chunk), 8):
-            chunk = first_chunk[i:i+8]
-            if len(chunk) == 8:
-                hash_value += struct.unpack('<Q', chunk)[0]
-                hash_value &= 0xFFFFFFFFFFFFFFFF  # Keep it 64-bit
-
-        # Sum last chunk as 64-bit little-endian unsigned integers
-        for i in range(0, len(last_chunk), 8):
-            chunk = last_chunk[i:i+8]
-            if len(chunk) == 8:
-                hash_value += struct.unpack('<Q', chunk)[0]
-                hash_value &= 0xFFFFFFFFFFFFFFFF  # Keep it 64-bit
-
-        hash_string = format(hash_value, '016x')
+        hash_string = compute_hash(first_chunk, last_chunk, file_size)
         control.log(f'OpenSubtitles Hash: Calculated hash={hash_string}, size={file_size}')
+        _cache_put('hash', url, (hash_string, file_size))
         return hash_string, file_size
 
     except requests.exceptions.Timeout:
@@ -127,8 +151,6 @@ def calculate_hash_from_file(filepath):
             control.log(f'OpenSubtitles Hash: File too small ({file_size} bytes)', 'warning')
             return None, None
 
-        hash_value = file_size
-
         with open(filepath, 'rb') as f:
             # Read first 64KB
             first_chunk = f.read(HASH_BLOCK_SIZE)
@@ -137,21 +159,7 @@ def calculate_hash_from_file(filepath):
             f.seek(-HASH_BLOCK_SIZE, 2)  # Seek from end
             last_chunk = f.read(HASH_BLOCK_SIZE)
 
-        # Sum first chunk
-        for i in range(0, len(first_chunk), 8):
-            chunk = first_chunk[i:i+8]
-            if len(chunk) == 8:
-                hash_value += struct.unpack('<Q', chunk)[0]
-                hash_value &= 0xFFFFFFFFFFFFFFFF
-
-        # Sum last chunk
-        for i in range(0, len(last_chunk), 8):
-            chunk = last_chunk[i:i+8]
-            if len(chunk) == 8:
-                hash_value += struct.unpack('<Q', chunk)[0]
-                hash_value &= 0xFFFFFFFFFFFFFFFF
-
-        hash_string = format(hash_value, '016x')
+        hash_string = compute_hash(first_chunk, last_chunk, file_size)
         control.log(f'OpenSubtitles Hash: Calculated hash={hash_string}, size={file_size}')
         return hash_string, file_size
 
@@ -181,6 +189,12 @@ def search_subtitles_by_hash(moviehash, file_size=None, language='en'):
         control.log('OpenSubtitles: No API key configured', 'warning')
         return []
 
+    cache_key = f'{moviehash}|{file_size}|{language}'
+    cached = _cache_get('hash_search', cache_key, SEARCH_CACHE_HOURS * 3600)
+    if cached:
+        control.log(f'OpenSubtitles: {len(cached)} cached results for hash={moviehash}')
+        return cached
+
     headers = {
         'Api-Key': api_key,
         'User-Agent': USER_AGENT,
@@ -216,9 +230,11 @@ def search_subtitles_by_hash(moviehash, file_size=None, language='en'):
 
             if hash_matched:
                 control.log(f'OpenSubtitles: Found {len(hash_matched)} hash-matched subtitles (exact match!)')
+                _cache_put('hash_search', cache_key, hash_matched)
                 return hash_matched
             elif results:
                 control.log(f'OpenSubtitles: Found {len(results)} subtitles (no exact hash match)')
+                _cache_put('hash_search', cache_key, results)
                 return results
             else:
                 control.log('OpenSubtitles: No subtitles found for hash')
@@ -260,6 +276,12 @@ def search_subtitles(title, season=None, episode=None, language='en', imdb_id=No
         'Content-Type': 'application/json'
     }
 
+    cache_key = f'{title}|{season}|{episode}|{language}|{imdb_id}'
+    cached = _cache_get('search', cache_key, SEARCH_CACHE_HOURS * 3600)
+    if cached:
+        control.log(f'OpenSubtitles: {len(cached)} cached results for "{title}" S{season}E{episode} ({language})')
+        return cached
+
     params = {
         'languages': language,
         'order_by': 'download_count',
@@ -290,6 +312,8 @@ def search_subtitles(title, season=None, episode=None, language='en', imdb_id=No
             data = response.json()
             results = data.get('data', [])
             control.log(f'OpenSubtitles: Found {len(results)} subtitles')
+            if results:
+                _cache_put('search', cache_key, results)
             return results
         elif response.status_code == 401:
             control.log('OpenSubtitles: Invalid API key', 'error')
@@ -304,6 +328,15 @@ def search_subtitles(title, season=None, episode=None, language='en', imdb_id=No
     return []
 
 
+def _write_subtitle(content):
+    """Save subtitle bytes to Kodi's temp directory and return the path"""
+    temp_dir = xbmcvfs.translatePath('special://temp/')
+    sub_path = os.path.join(temp_dir, 'opensubtitles_temp.srt')
+    with open(sub_path, 'wb') as f:
+        f.write(content)
+    return sub_path
+
+
 def download_subtitle(file_id):
     """
     Download a subtitle file
@@ -318,6 +351,11 @@ def download_subtitle(file_id):
     if not api_key:
         return None
 
+    cached = _cache_get('subtitle', str(file_id), SUBTITLE_CACHE_DAYS * 86400)
+    if cached:
+        control.log(f'OpenSubtitles: Using cached subtitle file {file_id}')
+        return _write_subtitle(cached)
+
     headers = {
         'Api-Key': api_key,
         'User-Agent': USER_AGENT,
@@ -342,13 +380,8 @@ def download_subtitle(file_id):
                 # Download the actual subtitle file
                 sub_response = requests.get(download_link, timeout=15)
                 if sub_response.status_code == 200:
-                    # Save to Kodi's temp directory
-                    temp_dir = xbmcvfs.translatePath('special://temp/')
-                    sub_path = os.path.join(temp_dir, 'opensubtitles_temp.srt')
-
-                    with open(sub_path, 'wb') as f:
-                        f.write(sub_response.content)
-
+                    _cache_put('subtitle', str(file_id), sub_response.content)
+                    sub_path = _write_subtitle(sub_response.content)
                     control.log(f'OpenSubtitles: Downloaded subtitle to {sub_path}')
                     return sub_path
         elif response.status_code == 406:
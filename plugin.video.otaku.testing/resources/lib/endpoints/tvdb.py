@@ -1,4 +1,4 @@
-from resources.lib.ui import client, control, database
+from resources.lib.ui import client, control, database, token_manager
 
 api_info = database.get_info('TVDB')
 api_key = api_info.get('api_key') if api_info else None
@@ -7,8 +7,8 @@ lang = ['eng', 'jpn']
 language = ["jpn", 'eng'][control.getInt("titlelanguage")]
 
 
-def get_auth_token():
-    """Get authentication token for TVDB API v4"""
+def _login():
+    """Log in to TVDB API v4 and return the JWT with its expiry"""
     if not api_key:
         return None
 
@@ -17,11 +17,20 @@ def get_auth_token():
     response = client.post(f'{baseUrl}/login', json_data=data, headers=headers)
 
     if response:
-        res = response.json()
-        return res.get('data', {}).get('token')
+        token = response.json().get('data', {}).get('token')
+        if token:
+            return token, token_manager.jwt_expiry(token)
     return None
 
 
+token = token_manager.get_manager('tvdb', _login)
+
+
+def get_auth_token():
+    """Get authentication token for TVDB API v4"""
+    return token.get()
+
+
 def getArt(meta_ids, mtype, limit=None):
     """Get artwork from TVDB API v4"""
     art = {}
@@ -30,19 +39,15 @@ def getArt(meta_ids, mtype, limit=None):
     if not tvdb_id:
         return art
 
-    # Get authentication token
-    token = get_auth_token()
-    if not token:
+    if not get_auth_token():
         control.log("TVDB: Failed to authenticate")
         return art
 
-    headers = {'Authorization': f'Bearer {token}'}
-
-    # TVDB v4 - use dedicated artworks endpoint
+    # TVDB v4 - use dedicated artworks endpoint; the shared token is reused across calls and threads
     if mtype == 'movies':
-        response = client.get(f'{baseUrl}/movies/{tvdb_id}/artworks', headers=headers)
+        response = token.request(client.get, f'{baseUrl}/movies/{tvdb_id}/artworks')
     else:
-        response = client.get(f'{baseUrl}/series/{tvdb_id}/artworks', headers=headers)
+        response = token.request(client.get, f'{baseUrl}/series/{tvdb_id}/artworks')
 
     if not response:
         return art
@@ -1,13 +1,19 @@
 import pickle
+import threading
 
 from datetime import date
 from functools import partial
 from resources.lib import endpoints
 from resources.lib.ui import database, control, utils
 
+# Episode rows built by update_database, written in one transaction by save_episodes
+_pending_rows = []
+_pending_shows = {}
+_pending_lock = threading.Lock()
+
 
 def parse_episodes(res, eps_watched, dub_data=None):
-    parsed = pickle.loads(res['kodi_meta'])
+    parsed = database.episode_item(res)
     if eps_watched and int(eps_watched) >= res['number']:
         parsed['info']['playcount'] = 1
     if control.getBool('interface.cleantitles') and parsed['info'].get('playcount') != 1:
@@ -92,11 +98,24 @@ def update_database(mal_id, update_time, res, url, image, info, season, episode,
     banner = None
 
     parsed = utils.allocate_item(title, f"play/{url}", False, True, [], image, info, fanart, poster, landscape, banner, clearart, clearlogo)
-    kodi_meta = pickle.dumps(parsed)
-    if not episodes or len(episodes) <= episode or kodi_meta != episodes[episode - 1]['kodi_meta']:
-        database.update_episode(mal_id, season, episode, update_time, kodi_meta, filler, anidb_ep_id)
+    row, show_info, show_image = database.episode_row(mal_id, season, episode, update_time, filler, anidb_ep_id, parsed)
+    with _pending_lock:
+        _pending_shows[mal_id] = (show_info, show_image)
+        if not episodes or len(episodes) <= episode or database.episode_changed(episodes[episode - 1], row):
+            _pending_rows.append(row)
 
     if control.getBool('interface.cleantitles') and info.get('playcount') != 1:
         parsed['info']['title'] = f'Episode {res["episode"]}'
         parsed['info']['plot'] = None
     return parsed
+
+
+def save_episodes():
+    """Write the episodes queued by update_database"""
+    with _pending_lock:
+        rows = _pending_rows[:]
+        shows = dict(_pending_shows)
+        del _pending_rows[:]
+        _pending_shows.clear()
+    if rows or shows:
+        database.update_episodes(rows, shows)
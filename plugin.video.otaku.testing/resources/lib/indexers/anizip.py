@@ -19,6 +19,12 @@ class ANIZIPAPI:
         if response:
             return response.json()
 
+    def get_episode_seasons(self, mal_id):
+        """{episode number: TVDB season} for episode paging, empty if AniZip has no mapping"""
+        result = self.get_anime_info(mal_id) or {}
+        return {int(number): ep['seasonNumber'] for number, ep in (result.get('episodes') or {}).items()
+                if number.isdigit() and ep.get('seasonNumber') is not None}
+
     @staticmethod
     def parse_episode_view(res, mal_id, season, poster, fanart, clearart, clearlogo, eps_watched, update_time, tvshowtitle, dub_data, filler_data, episodes=None):
         if indexers.should_hide_unaired_episode(res.get('airDate', '')):
@@ -92,6 +98,7 @@ class ANIZIPAPI:
         mapfunc = partial(self.parse_episode_view, mal_id=mal_id, season=season, poster=poster, fanart=fanart, clearart=clearart, clearlogo=clearlogo, eps_watched=eps_watched, update_time=update_time, tvshowtitle=tvshowtitle, dub_data=dub_data, filler_data=filler_data)
         # Parallelize episode parsing for faster processing
         all_results = utils.parallel_process(result_ep, mapfunc, max_workers=8)
+        indexers.save_episodes()
         all_results = [r for r in all_results if r is not None]
 
         if control.getBool('override.meta.api') and control.getBool('override.meta.notify'):
@@ -107,6 +114,7 @@ class ANIZIPAPI:
             mapfunc2 = partial(self.parse_episode_view, mal_id=mal_id, season=season, poster=poster, fanart=fanart, clearart=clearart, clearlogo=clearlogo, eps_watched=eps_watched, update_time=update_time, tvshowtitle=tvshowtitle, dub_data=dub_data, filler_data=None, episodes=episodes)
             # Parallelize episode parsing
             all_results = utils.parallel_process(result_ep, mapfunc2, max_workers=8)
+            indexers.save_episodes()
             all_results = [r for r in all_results if r is not None]
             if control.getBool('override.meta.api') and control.getBool('override.meta.notify'):
                 control.notify("ANIZIP Appended", f'{tvshowtitle} Appended to Database', icon=poster)
@@ -135,6 +135,7 @@ class JikanAPI:
         mapfunc = partial(self.parse_episode_view, mal_id=mal_id, season=season, poster=poster, fanart=fanart, clearart=clearart, clearlogo=clearlogo, eps_watched=eps_watched, update_time=update_time, tvshowtitle=tvshowtitle, dub_data=dub_data, filler_data=filler_data)
         # Parallelize episode parsing for faster processing
         all_results = utils.parallel_process(result_ep, mapfunc, max_workers=8)
+        indexers.save_episodes()
         all_results = [r for r in all_results if r is not None]
         all_results = sorted(all_results, key=lambda x: x['info']['episode'])
 
@@ -150,6 +151,7 @@ class JikanAPI:
             mapfunc2 = partial(self.parse_episode_view, mal_id=mal_id, season=season, poster=poster, fanart=fanart, clearart=clearart, clearlogo=clearlogo, eps_watched=eps_watched, update_time=update_time, tvshowtitle=tvshowtitle, dub_data=dub_data, filler_data=filler_data, episodes=episodes)
             # Parallelize episode parsing
             all_results = utils.parallel_process(result, mapfunc2, max_workers=8)
+            indexers.save_episodes()
             all_results = [r for r in all_results if r is not None]
             if control.getBool('override.meta.api') and control.getBool('override.meta.notify'):
                 control.notify("Jikanmoe", f'{tvshowtitle} Appended to Database', icon=poster)
@@ -106,15 +106,8 @@ class OtakuAPI:
         return meta_ids.get('anidb_id')
 
     def get_anidb_episode_meta(self, mal_id):
-        import time
         anidb_id = self.get_anidb_id(mal_id)
-        # Rate limit: ensure at least 4 seconds between requests
-        last_request = control.getInt('anidb_last_request')
-        now = int(time.time())
-        if last_request > 0:
-            elapsed = now - last_request
-            if elapsed < 4:
-                time.sleep(4 - elapsed)
+        # client.request spaces AniDB calls, see rate_limit.LIMITS
         params = {
             'request': 'anime',
             'client': self.anidbClientName,
@@ -123,7 +116,6 @@ class OtakuAPI:
             'aid': anidb_id
         }
         response = client.get(self.anidbBaseUrl, params=params)
-        control.setInt('anidb_last_request', int(time.time()))
         episodes = []
         if response:
             import xml.etree.ElementTree as ET
@@ -236,46 +228,30 @@ class OtakuAPI:
         control.log(f"Jikan: Fetched {len(res_data)} episodes total")
         return res_data
 
+    @staticmethod
+    def index_episode_meta(meta_lists):
+        """Key each provider's episode list by episode number, keeping the first entry of a number"""
+        numbers = {
+            'jikan': lambda ep: ep.get('mal_id', ep.get('episode')),
+            'kitsu': lambda ep: ep.get('attributes', {}).get('number'),
+        }
+        meta_cache = {}
+        for provider, episodes in meta_lists.items():
+            number = numbers.get(provider, lambda ep: ep.get('episode'))
+            index = meta_cache[provider] = {}
+            for ep in episodes:
+                index.setdefault(str(number(ep)), ep)
+        return meta_cache
+
     def parse_episode_view(self, res, mal_id, season, poster, fanart, clearart, clearlogo, eps_watched, update_time, tvshowtitle, dub_data, filler_data, episodes=None, meta_cache=None):
         episode_num = str(res.get('episode', res.get('mal_id')))
-        # Use cached meta lists
-        anidb_meta_list = meta_cache.get('anidb') if meta_cache else None
-        simkl_meta_list = meta_cache.get('simkl') if meta_cache else None
-        jikan_meta_list = meta_cache.get('jikan') if meta_cache else None
-        anizip_meta_list = meta_cache.get('anizip') if meta_cache else None
-        kitsu_meta_list = meta_cache.get('kitsu') if meta_cache else None
-
-        # Find episode meta for this episode
-        anidb_meta = None
-        if anidb_meta_list:
-            for ep in anidb_meta_list:
-                if str(ep.get('episode')) == episode_num:
-                    anidb_meta = ep
-                    break
-        simkl_meta = None
-        if simkl_meta_list:
-            for ep in simkl_meta_list:
-                if str(ep.get('episode')) == episode_num:
-                    simkl_meta = ep
-                    break
-        jikan_meta = None
-        if jikan_meta_list:
-            for ep in jikan_meta_list:
-                if str(ep.get('mal_id', ep.get('episode'))) == episode_num:
-                    jikan_meta = ep
-                    break
-        anizip_meta = None
-        if anizip_meta_list:
-            for ep in anizip_meta_list:
-                if str(ep.get('episode')) == episode_num:
-                    anizip_meta = ep
-                    break
-        kitsu_meta = None
-        if kitsu_meta_list:
-            for ep in kitsu_meta_list:
-                if str(ep.get('attributes', {}).get('number')) == episode_num:
-                    kitsu_meta = ep
-                    break
+        # meta_cache holds each provider's episodes keyed by episode number, see index_episode_meta
+        meta_cache = meta_cache or {}
+        anidb_meta = meta_cache.get('anidb', {}).get(episode_num)
+        simkl_meta = meta_cache.get('simkl', {}).get(episode_num)
+        jikan_meta = meta_cache.get('jikan', {}).get(episode_num)
+        anizip_meta = meta_cache.get('anizip', {}).get(episode_num)
+        kitsu_meta = meta_cache.get('kitsu', {}).get(episode_num)
 
         kodi_meta = pickle.loads(database.get_show(mal_id)['kodi_meta'])
         episode = res.get('mal_id', res.get('episode'))
@@ -472,8 +448,9 @@ class OtakuAPI:
             return []
 
         # Parse episodes in parallel for faster processing
-        mapfunc = partial(self.parse_episode_view, mal_id=mal_id, season=season, poster=poster, fanart=fanart, clearart=clearart, clearlogo=clearlogo, eps_watched=eps_watched, update_time=update_time, tvshowtitle=tvshowtitle, dub_data=dub_data, filler_data=filler_data, meta_cache=meta_cache)
+        mapfunc = partial(self.parse_episode_view, mal_id=mal_id, season=season, poster=poster, fanart=fanart, clearart=clearart, clearlogo=clearlogo, eps_watched=eps_watched, update_time=update_time, tvshowtitle=tvshowtitle, dub_data=dub_data, filler_data=filler_data, meta_cache=self.index_episode_meta(meta_cache))
         all_results = utils.parallel_process(base_ep_list, mapfunc, max_workers=8)
+        indexers.save_episodes()
         all_results = [r for r in all_results if r is not None]
         all_results = sorted(all_results, key=lambda x: x['info']['episode'])
 
@@ -489,6 +466,7 @@ class OtakuAPI:
             mapfunc2 = partial(self.parse_episode_view, mal_id=mal_id, season=season, poster=poster, fanart=fanart, clearart=clearart, clearlogo=clearlogo, eps_watched=eps_watched, update_time=update_time, tvshowtitle=tvshowtitle, dub_data=dub_data, filler_data=filler_data, episodes=episodes)
             # Parallelize episode parsing
             all_results = utils.parallel_process(result, mapfunc2, max_workers=8)
+            indexers.save_episodes()
             all_results = [r for r in all_results if r is not None]
         else:
             mapfunc1 = partial(indexers.parse_episodes, eps_watched=eps_watched, dub_data=dub_data)
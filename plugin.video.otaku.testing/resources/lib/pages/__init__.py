@@ -2,7 +2,7 @@ import threading
 import time
 
 from resources.lib.pages import nyaa, animetosho, debrid_cloudfiles, animixplay, aniwave, animepahe, hianime, watchnixtoons2, localfiles
-from resources.lib.ui import control, database
+from resources.lib.ui import control, database, provider_latency, resolve_outcomes, utils
 from resources.lib.windows.get_sources_window import GetSources
 from resources.lib.windows import sort_select
 
@@ -38,6 +38,86 @@ def getSourcesHelper(actionArgs):
     return sources
 
 
+def debrid_priority_mode():
+    """Debrid + autoplay with debrid priority on: embeds are only scraped when debrid finds nothing"""
+    return (
+        any(control.enabled_debrid().values()) and
+        control.getInt('general.playstyle.episode') == 0 and
+        control.getBool('general.debrid.priority')
+    )
+
+
+def provider_jobs(actionArgs, debrid_priority=False, kinds=('torrent', 'embed')):
+    """
+    (provider, kind, get_sources, args) for every enabled scraper of kinds. Torrent scrapers need an
+    enabled debrid service, embed scrapers are left out in debrid priority mode.
+    """
+    query = actionArgs['query']
+    mal_id = actionArgs['mal_id']
+    episode = actionArgs['episode']
+    status = actionArgs['status']
+    media_type = actionArgs['media_type']
+
+    jobs = []
+    if 'torrent' in kinds and any(control.enabled_debrid().values()):
+        if control.getBool('provider.nyaa'):
+            jobs.append(('nyaa', 'torrent', nyaa.Sources().get_sources, (query, mal_id, episode, status, media_type)))
+        if control.getBool('provider.animetosho'):
+            jobs.append(('animetosho', 'torrent', animetosho.Sources().get_sources, (query, mal_id, episode, status, media_type)))
+    if 'embed' in kinds and not debrid_priority:
+        if control.getBool('provider.animepahe'):
+            jobs.append(('animepahe', 'embed', animepahe.Sources().get_sources, (mal_id, episode)))
+        if control.getBool('provider.animix'):
+            jobs.append(('animix', 'embed', animixplay.Sources().get_sources, (mal_id, episode)))
+        if control.getBool('provider.aniwave'):
+            jobs.append(('aniwave', 'embed', aniwave.Sources().get_sources, (mal_id, episode)))
+        if control.getBool('provider.hianime'):
+            jobs.append(('hianime', 'embed', hianime.Sources().get_sources, (mal_id, episode)))
+        if control.getBool('provider.watchnixtoons2'):
+            jobs.append(('watchnixtoons2', 'embed', watchnixtoons2.Sources().get_sources, (mal_id, episode, media_type)))
+    return jobs
+
+
+def run_job(job, rescrape=False):
+    """Sources of a provider_jobs entry, served from the 8 hour provider cache unless rescraping"""
+    provider, _, get_sources, args = job
+    if rescrape:
+        return get_sources(*args)
+    return database.get(get_sources, 8, *args, key=provider, lease=True)
+
+
+def warm_sources(actionArgs):
+    """
+    Populate the provider caches for an episode without opening the sources window.
+    Runs the same jobs as Sources.getSources, so a later scrape is served from cache.
+    Returns the sorted source list.
+    """
+    jobs = provider_jobs(actionArgs, debrid_priority_mode())
+    if not jobs:
+        return []
+
+    def _run(job):
+        try:
+            return job[1], run_job(job)
+        except Exception as e:
+            control.log(f'warm_sources {job[0]} failed: {e}', 'warning')
+            return job[1], None
+
+    torrent_list = []
+    embed_list = []
+    for source_type, result in utils.parallel_process(jobs, _run, max_workers=len(jobs)):
+        if not result:
+            continue
+        if source_type == 'torrent':
+            torrent_list += result.get('cached', []) + result.get('uncached', [])
+        else:
+            embed_list += result
+
+    if len(torrent_list) + len(embed_list) == 0:
+        return []
+    return Sources.sortSources(torrent_list, embed_list, [], [], actionArgs['media_type'], actionArgs['duration'])
+
+
 class Sources(GetSources):
     def __init__(self, xml_file, location, actionArgs=None):
         super(Sources, self).__init__(xml_file, location, actionArgs)
@@ -52,6 +132,9 @@ class Sources(GetSources):
         self.return_data = []
         self.progress = 1
         self.threads = []
+        self.started_providers = set()
+        self.recorded_providers = set()
+        self.latency_lock = threading.Lock()
 
         self.torrentSources = []
         self.torrentCacheSources = []
@@ -64,7 +147,6 @@ class Sources(GetSources):
         query = args['query']
         mal_id = args['mal_id']
         episode = args['episode']
-        status = args['status']
         media_type = args['media_type']
         duration = args['duration']
         rescrape = args['rescrape']
@@ -88,11 +170,7 @@ class Sources(GetSources):
         enabled_clouds = control.enabled_cloud()
 
         # Debrid Priority Mode: Skip embeds when debrid + autoplay enabled for faster playback
-        debrid_priority = (
-            any(enabled_debrids.values()) and
-            control.getInt('general.playstyle.episode') == 0 and
-            control.getBool('general.debrid.priority')
-        )
+        debrid_priority = debrid_priority_mode()
         if debrid_priority:
             control.log('Debrid Priority Mode: Skipping embed providers for faster autoplay', 'info')
 
@@ -104,88 +182,41 @@ class Sources(GetSources):
 
         if any(enabled_debrids.values()):
             control.log(f"Torrent search query: '{query}' for mal_id={mal_id}, episode={episode}", 'info')
-            if control.getBool('provider.nyaa'):
-                t = threading.Thread(target=self.nyaa_worker, args=(query, mal_id, episode, status, media_type, rescrape))
-                t.start()
-                self.threads.append(t)
-            else:
-                self.remainingProviders.remove('nyaa')
-
-            if control.getBool('provider.animetosho'):
-                t = threading.Thread(target=self.animetosho_worker, args=(query, mal_id, episode, status, media_type, rescrape))
-                t.start()
-                self.threads.append(t)
-            else:
-                self.remainingProviders.remove('animetosho')
 
-        else:
-            for provider in self.torrentProviders:
+        jobs = provider_jobs(args, debrid_priority)
+        started = [job[0] for job in jobs]
+        for provider in self.torrentProviders + self.embedProviders:
+            if provider not in started:
                 self.remainingProviders.remove(provider)
+        for job in jobs:
+            self._start_provider(job[0], self.provider_worker, (job, rescrape))
+
+        # Still fetch skip times in background for debrid priority mode
+        if debrid_priority:
+            for job in provider_jobs(args, kinds=('embed',)):
+                if job[0] in ('aniwave', 'hianime'):
+                    threading.Thread(target=self._fetch_skip_times, args=(job, rescrape), daemon=True).start()
 
         # cloud #
         if common_debrids:
-            t = threading.Thread(target=self.user_cloud_inspection, args=(query, mal_id, episode))
-            t.start()
-            self.threads.append(t)
+            self._start_provider('Cloud Inspection', self.user_cloud_inspection, (query, mal_id, episode))
         else:
             self.remainingProviders.remove('Cloud Inspection')
 
         # local #
         if control.getBool('provider.localfiles'):
-            t = threading.Thread(target=self.user_local_inspection, args=(query, mal_id, episode))
-            t.start()
-            self.threads.append(t)
+            self._start_provider('Local Inspection', self.user_local_inspection, (query, mal_id, episode))
         else:
             self.remainingProviders.remove('Local Inspection')
 
-        # embeds # (skip in debrid priority mode for faster playback)
-        if not debrid_priority and control.getBool('provider.animepahe'):
-            t = threading.Thread(target=self.animepahe_worker, args=(mal_id, episode, rescrape))
-            t.start()
-            self.threads.append(t)
-        else:
-            if 'animepahe' in self.remainingProviders:
-                self.remainingProviders.remove('animepahe')
-
-        if not debrid_priority and control.getBool('provider.animix'):
-            t = threading.Thread(target=self.animix_worker, args=(mal_id, episode, rescrape))
-            t.start()
-            self.threads.append(t)
-        else:
-            if 'animix' in self.remainingProviders:
-                self.remainingProviders.remove('animix')
-
-        if not debrid_priority and control.getBool('provider.aniwave'):
-            t = threading.Thread(target=self.aniwave_worker, args=(mal_id, episode, rescrape))
-            t.start()
-            self.threads.append(t)
-        else:
-            if 'aniwave' in self.remainingProviders:
-                self.remainingProviders.remove('aniwave')
-            # Still fetch skip times in background for debrid priority mode
-            if debrid_priority and control.getBool('provider.aniwave'):
-                threading.Thread(target=self._fetch_skip_times_aniwave, args=(mal_id, episode, rescrape), daemon=True).start()
-
-        if not debrid_priority and control.getBool('provider.hianime'):
-            t = threading.Thread(target=self.hianime_worker, args=(mal_id, episode, rescrape))
-            t.start()
-            self.threads.append(t)
-        else:
-            if 'hianime' in self.remainingProviders:
-                self.remainingProviders.remove('hianime')
-            # Still fetch skip times in background for debrid priority mode
-            if debrid_priority and control.getBool('provider.hianime'):
-                threading.Thread(target=self._fetch_skip_times_hianime, args=(mal_id, episode, rescrape), daemon=True).start()
-
-        if not debrid_priority and control.getBool('provider.watchnixtoons2'):
-            t = threading.Thread(target=self.watchnixtoons2_worker, args=(mal_id, episode, media_type, rescrape))
-            t.start()
-            self.threads.append(t)
-        else:
-            if 'watchnixtoons2' in self.remainingProviders:
-                self.remainingProviders.remove('watchnixtoons2')
-
         timeout = 60 if rescrape else control.getInt('general.timeout')
+        if not rescrape and control.getBool('general.timeout.adaptive'):
+            deadlines, unlikely = provider_latency.deadlines(self.remainingProviders, timeout)
+            if deadlines:
+                control.log(f'Provider deadlines: {", ".join(f"{p} {d:.1f}s" for p, d in deadlines.items())}'
+                            + (f' (not waited for: {", ".join(unlikely)})' if unlikely else ''))
+        else:
+            deadlines, unlikely = {}, set()
         start_time = time.perf_counter()
         runtime = 0
 
@@ -207,16 +238,19 @@ class Sources(GetSources):
                 or (control.getBool('general.terminate.oncloud') and len(self.cloud_files) > 0)
                 or (control.getBool('general.terminate.onlocal') and len(self.local_files) > 0)
                 or (debrid_priority and not any(p in self.remainingProviders for p in self.torrentProviders))
+                or (deadlines and not self.waiting_providers(time.perf_counter() - start_time, deadlines, unlikely))
             ):
                 break
 
             runtime = time.perf_counter() - start_time
             self.progress = runtime / timeout * 100
 
+        self.record_timeouts(time.perf_counter() - start_time, deadlines, timeout)
+
         # Debrid Priority Mode: Fall back to embeds if no debrid sources found
         if debrid_priority and len(self.torrentSources) == 0 and len(self.cloud_files) == 0:
             control.log('Debrid Priority: No debrid sources, falling back to embeds', 'info')
-            self._scrape_embeds_fallback(mal_id, episode, media_type, rescrape)
+            self._scrape_embeds_fallback(args, rescrape)
 
         if len(self.torrentSources) + len(self.embedSources) + len(self.cloud_files) + len(self.local_files) == 0:
             self.return_data = []
@@ -228,112 +262,80 @@ class Sources(GetSources):
         self.close()
         return self.return_data
 
-    # Torrents #
-    def nyaa_worker(self, query, mal_id, episode, status, media_type, rescrape):
-        if rescrape:
-            all_sources = nyaa.Sources().get_sources(query, mal_id, episode, status, media_type)
-        else:
-            all_sources = database.get(nyaa.Sources().get_sources, 8, query, mal_id, episode, status, media_type, key='nyaa')
-
-        # Defensive check to ensure all_sources is not None
-        if all_sources is None:
-            all_sources = {'cached': [], 'uncached': []}
-
-        control.log(f"Nyaa returned: {len(all_sources.get('cached', []))} cached, {len(all_sources.get('uncached', []))} uncached", 'info')
-        # Log first few source names for debugging
-        for src in (all_sources.get('cached', []) + all_sources.get('uncached', []))[:3]:
-            control.log(f"  Nyaa source: {src.get('release_title', src.get('name', 'unknown'))}", 'info')
-        self.torrentUnCacheSources += all_sources['uncached']
-        self.torrentCacheSources += all_sources['cached']
-        self.torrentSources += all_sources['cached'] + all_sources['uncached']
-        if 'nyaa' in self.remainingProviders:
-            self.remainingProviders.remove('nyaa')
-
-    def animetosho_worker(self, query, mal_id, episode, status, media_type, rescrape):
-        if rescrape:
-            all_sources = animetosho.Sources().get_sources(query, mal_id, episode, status, media_type)
-        else:
-            all_sources = database.get(animetosho.Sources().get_sources, 8, query, mal_id, episode, status, media_type, key='animetosho')
-
-        # Defensive check to ensure all_sources is not None
-        if all_sources is None:
-            all_sources = {'cached': [], 'uncached': []}
-
-        control.log(f"AnimeTosho returned: {len(all_sources.get('cached', []))} cached, {len(all_sources.get('uncached', []))} uncached", 'info')
-        # Log first few source names for debugging
-        for src in (all_sources.get('cached', []) + all_sources.get('uncached', []))[:3]:
-            control.log(f"  AnimeTosho source: {src.get('release_title', src.get('name', 'unknown'))}", 'info')
-        self.torrentUnCacheSources += all_sources['uncached']
-        self.torrentCacheSources += all_sources['cached']
-        self.torrentSources += all_sources['cached'] + all_sources['uncached']
-        if 'animetosho' in self.remainingProviders:
-            self.remainingProviders.remove('animetosho')
-
-    # embeds #
-    def animepahe_worker(self, mal_id, episode, rescrape):
-        if rescrape:
-            self.embedSources += animepahe.Sources().get_sources(mal_id, episode)
-        else:
-            self.embedSources += database.get(animepahe.Sources().get_sources, 8, mal_id, episode, key='animepahe')
-        if 'animepahe' in self.remainingProviders:
-            self.remainingProviders.remove('animepahe')
+    def _start_provider(self, provider, target, args):
+        self.started_providers.add(provider)
+        t = threading.Thread(target=self._timed_provider, args=(provider, target, args))
+        t.start()
+        self.threads.append(t)
 
-    def animix_worker(self, mal_id, episode, rescrape):
-        if rescrape:
-            self.embedSources += animixplay.Sources().get_sources(mal_id, episode)
+    def _timed_provider(self, provider, target, args):
+        start = time.perf_counter()
+        success = False
+        try:
+            target(*args)
+            success = True
+        finally:
+            self.record_latency(provider, time.perf_counter() - start, success)
+
+    def record_latency(self, provider, duration, success):
+        with self.latency_lock:
+            if provider in self.recorded_providers:
+                return
+            self.recorded_providers.add(provider)
+        provider_latency.record(provider, duration, success)
+
+    def record_timeouts(self, runtime, deadlines, timeout):
+        """Providers still running past their deadline when the wait loop ends count as not finished"""
+        for provider in list(self.remainingProviders):
+            if provider in self.started_providers and runtime >= deadlines.get(provider, timeout):
+                self.record_latency(provider, runtime, False)
+
+    def waiting_providers(self, runtime, deadlines, unlikely):
+        """
+        Providers that are still worth waiting for: within their adaptive deadline and, as long as
+        at least one provider usually answers, not among the ones that rarely do.
+        """
+        remaining = [p for p in list(self.remainingProviders) if runtime < deadlines.get(p, runtime + 1)]
+        if len(unlikely) < len(deadlines):
+            remaining = [p for p in remaining if p not in unlikely]
+        return remaining
+
+    def provider_worker(self, job, rescrape):
+        provider, kind = job[0], job[1]
+        if kind == 'torrent':
+            all_sources = run_job(job, rescrape)
+
+            # Defensive check to ensure all_sources is not None
+            if all_sources is None:
+                all_sources = {'cached': [], 'uncached': []}
+
+            control.log(f"{provider} returned: {len(all_sources.get('cached', []))} cached, {len(all_sources.get('uncached', []))} uncached", 'info')
+            # Log first few source names for debugging
+            for src in (all_sources.get('cached', []) + all_sources.get('uncached', []))[:3]:
+                control.log(f"  {provider} source: {src.get('release_title', src.get('name', 'unknown'))}", 'info')
+            self.torrentUnCacheSources += all_sources['uncached']
+            self.torrentCacheSources += all_sources['cached']
+            self.torrentSources += all_sources['cached'] + all_sources['uncached']
         else:
-            self.embedSources += database.get(animixplay.Sources().get_sources, 8, mal_id, episode, key='animix')
-        if 'animix' in self.remainingProviders:
-            self.remainingProviders.remove('animix')
+            embed_sources = run_job(job, rescrape)
+            self.embedSources += embed_sources
+            if provider in ('aniwave', 'hianime'):
+                self.set_skip_times(provider, embed_sources)
+        if provider in self.remainingProviders:
+            self.remainingProviders.remove(provider)
 
-    def aniwave_worker(self, mal_id, episode, rescrape):
-        if rescrape:
-            aniwave_sources = aniwave.Sources().get_sources(mal_id, episode)
-        else:
-            aniwave_sources = database.get(aniwave.Sources().get_sources, 8, mal_id, episode, key='aniwave')
-        self.embedSources += aniwave_sources
-        for x in aniwave_sources:
-            if x.get('skip'):
-                if x['skip'].get('intro') and x['skip']['intro']['start'] != 0:
-                    control.setInt('aniwave.skipintro.start', int(x['skip']['intro']['start']))
-                    control.setInt('aniwave.skipintro.end', int(x['skip']['intro']['end']))
-                if x['skip'].get('outro') and x['skip']['outro']['start'] != 0:
-                    control.setInt('aniwave.skipoutro.start', int(x['skip']['outro']['start']))
-                    control.setInt('aniwave.skipoutro.end', int(x['skip']['outro']['end']))
-        if 'aniwave' in self.remainingProviders:
-            self.remainingProviders.remove('aniwave')
-
-    # def gogo_worker(self, mal_id, episode, rescrape):
-    #     if rescrape:
-    #         self.embedSources += gogoanime.Sources().get_sources(mal_id, episode)
-    #     else:
-    #         self.embedSources += database.get(gogoanime.Sources().get_sources, 8, mal_id, episode, key='gogoanime')
-    #     self.remainingProviders.remove('gogo')
-
-    def hianime_worker(self, mal_id, episode, rescrape):
-        if rescrape:
-            hianime_sources = hianime.Sources().get_sources(mal_id, episode)
-        else:
-            hianime_sources = database.get(hianime.Sources().get_sources, 8, mal_id, episode, key='hianime')
-        self.embedSources += hianime_sources
-        for x in hianime_sources:
+    @staticmethod
+    def set_skip_times(provider, sources):
+        """Store the intro/outro times of the first source carrying them as <provider>.skip* settings"""
+        for x in sources:
             if x.get('skip'):
                 if x['skip'].get('intro') and x['skip']['intro']['start'] != 0:
-                    control.setInt('hianime.skipintro.start', int(x['skip']['intro']['start']))
-                    control.setInt('hianime.skipintro.end', int(x['skip']['intro']['end']))
+                    control.setInt(f'{provider}.skipintro.start', int(x['skip']['intro']['start']))
+                    control.setInt(f'{provider}.skipintro.end', int(x['skip']['intro']['end']))
                 if x['skip'].get('outro') and x['skip']['outro']['start'] != 0:
-                    control.setInt('hianime.skipoutro.start', int(x['skip']['outro']['start']))
-                    control.setInt('hianime.skipoutro.end', int(x['skip']['outro']['end']))
-        if 'hianime' in self.remainingProviders:
-            self.remainingProviders.remove('hianime')
-
-    def watchnixtoons2_worker(self, mal_id, episode, media_type, rescrape):
-        if rescrape:
-            self.embedSources += watchnixtoons2.Sources().get_sources(mal_id, episode, media_type)
-        else:
-            self.embedSources += database.get(watchnixtoons2.Sources().get_sources, 8, mal_id, episode, media_type, key='watchnixtoons2')
-        if 'watchnixtoons2' in self.remainingProviders:
-            self.remainingProviders.remove('watchnixtoons2')
+                    control.setInt(f'{provider}.skipoutro.start', int(x['skip']['outro']['start']))
+                    control.setInt(f'{provider}.skipoutro.end', int(x['skip']['outro']['end']))
+                break  # Only need first source with skip data
 
     # Local & Cloud #
     def user_local_inspection(self, query, mal_id, episode):
@@ -348,70 +350,18 @@ class Sources(GetSources):
         self.cloud_files += debrid_cloudfiles.Sources().get_sources(query, mal_id, episode, season)
         self.remainingProviders.remove('Cloud Inspection')
 
-    def _fetch_skip_times_aniwave(self, mal_id, episode, rescrape):
-        """Fetch skip times from aniwave without adding sources (for debrid priority mode)"""
+    def _fetch_skip_times(self, job, rescrape):
+        """Fetch skip times from an embed provider without adding sources (for debrid priority mode)"""
         try:
-            if rescrape:
-                aniwave_sources = aniwave.Sources().get_sources(mal_id, episode)
-            else:
-                aniwave_sources = database.get(aniwave.Sources().get_sources, 8, mal_id, episode, key='aniwave')
-            for x in aniwave_sources:
-                if x.get('skip'):
-                    if x['skip'].get('intro') and x['skip']['intro']['start'] != 0:
-                        control.setInt('aniwave.skipintro.start', int(x['skip']['intro']['start']))
-                        control.setInt('aniwave.skipintro.end', int(x['skip']['intro']['end']))
-                    if x['skip'].get('outro') and x['skip']['outro']['start'] != 0:
-                        control.setInt('aniwave.skipoutro.start', int(x['skip']['outro']['start']))
-                        control.setInt('aniwave.skipoutro.end', int(x['skip']['outro']['end']))
-                    break  # Only need first source with skip data
+            self.set_skip_times(job[0], run_job(job, rescrape))
         except Exception as e:
-            control.log(f'Error fetching aniwave skip times: {e}', 'warning')
+            control.log(f'Error fetching {job[0]} skip times: {e}', 'warning')
 
-    def _fetch_skip_times_hianime(self, mal_id, episode, rescrape):
-        """Fetch skip times from hianime without adding sources (for debrid priority mode)"""
-        try:
-            if rescrape:
-                hianime_sources = hianime.Sources().get_sources(mal_id, episode)
-            else:
-                hianime_sources = database.get(hianime.Sources().get_sources, 8, mal_id, episode, key='hianime')
-            for x in hianime_sources:
-                if x.get('skip'):
-                    if x['skip'].get('intro') and x['skip']['intro']['start'] != 0:
-                        control.setInt('hianime.skipintro.start', int(x['skip']['intro']['start']))
-                        control.setInt('hianime.skipintro.end', int(x['skip']['intro']['end']))
-                    if x['skip'].get('outro') and x['skip']['outro']['start'] != 0:
-                        control.setInt('hianime.skipoutro.start', int(x['skip']['outro']['start']))
-                        control.setInt('hianime.skipoutro.end', int(x['skip']['outro']['end']))
-                    break  # Only need first source with skip data
-        except Exception as e:
-            control.log(f'Error fetching hianime skip times: {e}', 'warning')
-
-    def _scrape_embeds_fallback(self, mal_id, episode, media_type, rescrape):
+    def _scrape_embeds_fallback(self, args, rescrape):
         """Fallback to scrape embeds when no cached debrid sources found in priority mode"""
         embed_threads = []
-
-        if control.getBool('provider.animepahe'):
-            t = threading.Thread(target=self.animepahe_worker, args=(mal_id, episode, rescrape))
-            t.start()
-            embed_threads.append(t)
-
-        if control.getBool('provider.animix'):
-            t = threading.Thread(target=self.animix_worker, args=(mal_id, episode, rescrape))
-            t.start()
-            embed_threads.append(t)
-
-        if control.getBool('provider.aniwave'):
-            t = threading.Thread(target=self.aniwave_worker, args=(mal_id, episode, rescrape))
-            t.start()
-            embed_threads.append(t)
-
-        if control.getBool('provider.hianime'):
-            t = threading.Thread(target=self.hianime_worker, args=(mal_id, episode, rescrape))
-            t.start()
-            embed_threads.append(t)
-
-        if control.getBool('provider.watchnixtoons2'):
-            t = threading.Thread(target=self.watchnixtoons2_worker, args=(mal_id, episode, media_type, rescrape))
+        for job in provider_jobs(args, kinds=('embed',)):
+            t = threading.Thread(target=self.provider_worker, args=(job, rescrape))
             t.start()
             embed_threads.append(t)
 
@@ -533,18 +483,11 @@ class Sources(GetSources):
             elif source == 2:
                 sortedList = [i for i in sortedList if i['lang'] in [0, 1, 3]]
 
-        # Sort Sources
-        SORT_METHODS = sort_select.SORT_METHODS
-        sort_options = sort_select.sort_options
-
-        for x in range(len(SORT_METHODS), 0, -1):
-            reverse = sort_options[f'sortmethod.{x}.reverse']
-            method = SORT_METHODS[int(sort_options[f'sortmethod.{x}'])]
-            # Replace spaces with underscores in the method name
-            method = method.replace(' ', '_')
-            sortedList = getattr(sort_select, f'sort_by_{method}')(sortedList, not reverse)
+        # Sources that keep failing to resolve go below the rest, otherwise in the configured order
+        penalty = resolve_outcomes.penalty_function(sortedList) if control.getBool('general.resolve.learning') else None
 
-        return sortedList
+        # Sort Sources with one composite key built from the sort configuration
+        return sort_select.sort_sources(sortedList, penalty=penalty)
 
     def updateProgress(self):
         self.torrents_qual_len = [
@@ -1,11 +1,9 @@
 import re
 import pickle
-import base64
+import time
 
-from functools import partial
-from bs4 import BeautifulSoup
 from resources.lib.ui.BrowserBase import BrowserBase
-from resources.lib.ui import database, source_utils, client, control, utils
+from resources.lib.ui import database, source_utils, control, async_client, torrent_rows
 from resources.lib.debrid import Debrid
 from resources.lib.indexers.simkl import SIMKLAPI
 from resources.lib.endpoints import anidb
@@ -131,12 +129,12 @@ class Sources(BrowserBase):
                 params4['aids'] = self.anidb_id
             search_tasks.append({'params': params4, 'name': 'season_variation'})
 
-        # Execute all searches in parallel
+        # Execute all searches concurrently on the shared async engine
         control.log(f"AnimeTosho: Running {len(search_tasks)} searches in parallel for episode {episode_zfill}")
 
-        def run_search(task):
+        async def run_search(task):
             try:
-                sources = self.process_animetosho_episodes(
+                sources = await self._process_animetosho_episodes(
                     f'{self._BASE_URL}/search',
                     task['params'],
                     mal_id,
@@ -150,7 +148,9 @@ class Sources(BrowserBase):
                 control.log(f"AnimeTosho: {task['name']} search failed: {str(e)}")
                 return []
 
-        all_search_results = utils.parallel_process(search_tasks, run_search, max_workers=4)
+        start_time = time.perf_counter()
+        all_search_results = async_client.gather([run_search(task) for task in search_tasks])
+        async_client.get_engine().log_stats('AnimeTosho: episode searches', start_time)
 
         # Combine all results
         animetosho_sources = []
@@ -216,102 +216,49 @@ class Sources(BrowserBase):
         return {'cached': self.cached, 'uncached': self.uncached}
 
     def process_animetosho_episodes(self, url, params, mal_id, episode, season, part):
-        response = client.get(url, params=params)
+        return async_client.run(self._process_animetosho_episodes(url, params, mal_id, episode, season, part))
+
+    async def _process_animetosho_episodes(self, url, params, mal_id, episode, season, part):
+        engine = async_client.get_engine()
+        response = await engine.get(url, params=params)
         if response:
-            html = response.text
-            soup = BeautifulSoup(html, "html.parser")
-            soup_all = soup.find('div', id='content').find_all('div', class_='home_list_entry')
-            rex = r'(magnet:)+[^"]*'
-            list_ = []
-            for entry in soup_all:
-                list_item = {
-                    'name': entry.find('div', class_='link').a.text,
-                    'magnet': entry.find('a', {'href': re.compile(rex)}).get('href'),
-                    'size': entry.find('div', class_='size').text,
-                    'downloads': 0,
-                    'torrent': entry.find('a', class_='dllink').get('href')
-                }
-                try:
-                    list_item['seeders'] = int(re.match(r'Seeders: (\d+)', entry.find('span', {'title': re.compile(r'Seeders')}).get('title')).group(1))
-                except AttributeError:
-                    list_item['seeders'] = -1
-
-                try:
-                    list_item['hash'] = re.match(r'https://animetosho.org/storage/torrent/([^/]+)', list_item['torrent']).group(1)
-                except AttributeError:
-                    try:
-                        hash_32 = re.search(r'btih:(\w+)&tr=http', list_item['magnet']).group(1)
-                        list_item['hash'] = base64.b16encode(base64.b32decode(hash_32)).decode().lower()
-                    except AttributeError:
-                        continue
-
-                list_.append(list_item)
-
-            filtered_list = source_utils.filter_sources('animetosho', list_, mal_id, int(season), int(episode), part, anidb_id=self.anidb_id)
-
-            cache_list, uncashed_list_ = Debrid().torrentCacheCheck(filtered_list)
-            cache_list = sorted(cache_list, key=lambda k: k['downloads'], reverse=True)
-
-            uncashed_list = [i for i in uncashed_list_ if i['seeders'] != 0]
-            uncashed_list = sorted(uncashed_list, key=lambda k: k['seeders'], reverse=True)
-
-            # Parse sources in parallel for faster processing
-            mapfunc = partial(self.parse_animetosho_view, episode=episode)
-            all_results = utils.parallel_process(cache_list, mapfunc, max_workers=5) if cache_list else []
-            if control.getBool('show.uncached') and uncashed_list:
-                mapfunc2 = partial(self.parse_animetosho_view, episode=episode, cached=False)
-                all_results += utils.parallel_process(uncashed_list, mapfunc2, max_workers=5)
-            return all_results
+            filtered_list = await engine.call(self._filter_rows, response.text, mal_id, int(season), int(episode), part, anidb_id=self.anidb_id)
+            return await self._check_and_parse(filtered_list, episode)
         return []
 
     def process_animetosho_movie(self, url, params, mal_id):
-        response = client.get(url, params=params)
-        if response:
-            html = response.text
-            soup = BeautifulSoup(html, "html.parser")
-            # Assuming the movie results use the same container as episodes:
-            soup_all = soup.find('div', id='content').find_all('div', class_='home_list_entry')
-            rex = r'(magnet:)+[^"]*'
-            list_ = []
-            for entry in soup_all:
-                list_item = {
-                    'name': entry.find('div', class_='link').a.text,
-                    'magnet': entry.find('a', {'href': re.compile(rex)}).get('href'),
-                    'size': entry.find('div', class_='size').text,
-                    'downloads': 0,
-                    'torrent': entry.find('a', class_='dllink').get('href')
-                }
-                try:
-                    list_item['seeders'] = int(re.match(r'Seeders: (\d+)', entry.find('span', {'title': re.compile(r'Seeders')}).get('title')).group(1))
-                except AttributeError:
-                    list_item['seeders'] = -1
-
-                try:
-                    list_item['hash'] = re.match(r'https://animetosho.org/storage/torrent/([^/]+)', list_item['torrent']).group(1)
-                except AttributeError:
-                    try:
-                        hash_32 = re.search(r'btih:(\w+)&tr=http', list_item['magnet']).group(1)
-                        list_item['hash'] = base64.b16encode(base64.b32decode(hash_32)).decode().lower()
-                    except AttributeError:
-                        continue
-
-                list_.append(list_item)
+        return async_client.run(self._process_animetosho_movie(url, params, mal_id))
 
+    async def _process_animetosho_movie(self, url, params, mal_id):
+        engine = async_client.get_engine()
+        response = await engine.get(url, params=params)
+        if response:
             # For movies we don't filter by season/episode
-            filtered_list = source_utils.filter_sources('animetosho', list_, mal_id)
-            cache_list, uncashed_list_ = Debrid().torrentCacheCheck(filtered_list)
-            cache_list = sorted(cache_list, key=lambda k: k['downloads'], reverse=True)
-            uncashed_list = sorted([i for i in uncashed_list_ if i['seeders'] != 0], key=lambda k: k['seeders'], reverse=True)
-
-            # Parse sources in parallel for faster processing
-            mapfunc = partial(self.parse_animetosho_view, episode="1")
-            all_results = utils.parallel_process(cache_list, mapfunc, max_workers=5) if cache_list else []
-            if control.getBool('show.uncached') and uncashed_list:
-                mapfunc2 = partial(self.parse_animetosho_view, episode="1", cached=False)
-                all_results += utils.parallel_process(uncashed_list, mapfunc2, max_workers=5)
-            return all_results
+            filtered_list = await engine.call(self._filter_rows, response.text, mal_id)
+            return await self._check_and_parse(filtered_list, "1")
         return []
 
+    @staticmethod
+    def _filter_rows(html, mal_id, season=None, episode=None, part=None, anidb_id=True):
+        return source_utils.filter_sources('animetosho', list(torrent_rows.iter_animetosho_rows(html)), mal_id, season, episode, part, anidb_id=anidb_id)
+
+    async def _check_and_parse(self, filtered_list, episode):
+        cache_list, uncashed_list_ = await Debrid().torrentCacheCheckAsync(filtered_list)
+        cache_list = sorted(cache_list, key=lambda k: k['downloads'], reverse=True)
+
+        uncashed_list = [i for i in uncashed_list_ if i['seeders'] != 0]
+        uncashed_list = sorted(uncashed_list, key=lambda k: k['seeders'], reverse=True)
+
+        # Parsing runs on an engine worker so the loop keeps serving the other searches meanwhile
+        return await async_client.get_engine().call(self._parse_results, cache_list, uncashed_list, episode)
+
+    @classmethod
+    def _parse_results(cls, cache_list, uncashed_list, episode):
+        all_results = [cls.parse_animetosho_view(res, episode) for res in cache_list]
+        if control.getBool('show.uncached') and uncashed_list:
+            all_results += [cls.parse_animetosho_view(res, episode, cached=False) for res in uncashed_list]
+        return all_results
+
     @staticmethod
     def parse_animetosho_view(res, episode, cached=True):
         source = {
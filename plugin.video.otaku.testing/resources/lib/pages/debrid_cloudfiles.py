@@ -3,7 +3,7 @@ import threading
 
 from resources.lib.ui import source_utils, control
 from resources.lib.ui.BrowserBase import BrowserBase
-from resources.lib.debrid import real_debrid, premiumize, all_debrid, torbox
+from resources.lib.debrid import real_debrid, premiumize, all_debrid, torbox, cloud_catalog
 
 
 class Sources(BrowserBase):
@@ -36,14 +36,14 @@ class Sources(BrowserBase):
 
     def rd_cloud_inspection(self, query, mal_id, episode, season=None):
         api = real_debrid.RealDebrid()
-        torrents = api.list_torrents()
-        torrents = source_utils.filter_sources('realdebrid', torrents, mal_id, season, episode)
-        filenames = [re.sub(r'\[.*?]\s*', '', i['filename'].replace(',', '')) for i in torrents]
-        resp = source_utils.get_fuzzy_match(query, filenames)
-
-        for i in resp:
-            torrent = torrents[i]
-            torrent_info = api.torrentInfo(torrent['id'])
+        torrents = cloud_catalog.get_catalog('realdebrid', api.list_torrents, 'id', 'added', fetch_since=api.list_torrents_since)
+        matched = source_utils.match_listing('realdebrid', torrents, 'filename', query, mal_id, season, episode)
+
+        for torrent in matched:
+            # Finished torrents never change, so their info is fetched once and kept
+            torrent_info = cloud_catalog.get_details('realdebrid', torrent['id'], api.torrentInfo, cache_if=lambda i: i.get('status') == 'downloaded')
+            if not torrent_info:
+                continue
             torrent_files = [selected for selected in torrent_info['files'] if selected['selected'] == 1]
 
             if len(torrent_files) > 1 and len(torrent_info['links']) == 1:
@@ -75,13 +75,10 @@ class Sources(BrowserBase):
             )
 
     def premiumize_cloud_inspection(self, query, mal_id, episode, season=None):
-        cloud_items = premiumize.Premiumize().list_folder()
-        cloud_items = source_utils.filter_sources('premiumize', cloud_items, mal_id, season, episode)
-        filenames = [re.sub(r'\[.*?]\s*', '', i['name'].replace(',', '')) for i in cloud_items]
-        resp = source_utils.get_fuzzy_match(query, filenames)
+        cloud_items = cloud_catalog.get_catalog('premiumize', premiumize.Premiumize().list_folder, 'id', 'created_at')
+        matched = source_utils.match_listing('premiumize', cloud_items, 'name', query, mal_id, season, episode)
 
-        for i in resp:
-            torrent = cloud_items[i]
+        for torrent in matched:
             filename = re.sub(r'\[.*?]', '', torrent['name']).lower()
 
             if torrent['type'] == 'file':
@@ -110,13 +107,10 @@ class Sources(BrowserBase):
             )
 
     def torbox_cloud_inspection(self, query, mal_id, episode, season=None):
-        cloud_items = torbox.TorBox().list_torrents()
-        cloud_items = source_utils.filter_sources('torbox', cloud_items, mal_id, season, episode)
-        filenames = [re.sub(r'\[.*?]\s*', '', i['name'].replace(',', '')) for i in cloud_items]
-        resp = source_utils.get_fuzzy_match(query, filenames)
+        cloud_items = cloud_catalog.get_catalog('torbox', torbox.TorBox().list_torrents, 'id', 'created_at')
+        matched = source_utils.match_listing('torbox', cloud_items, 'name', query, mal_id, season, episode)
 
-        for i in resp:
-            torrent = cloud_items[i]
+        for torrent in matched:
             if not torrent['cached'] or not torrent['download_finished'] or len(torrent['files']) < 1:
                 continue
             if not any(source_utils.is_file_ext_valid(tor_file['short_name'].lower()) for tor_file in torrent['files']):
@@ -145,13 +139,10 @@ class Sources(BrowserBase):
 
     def alldebrid_cloud_inspection(self, query, mal_id, episode, season=None):
         api = all_debrid.AllDebrid()
-        torrents = api.list_torrents()['links']
-        torrents = source_utils.filter_sources('alldebrid', torrents, mal_id, season, episode)
-        filenames = [re.sub(r'\[.*?]\s*', '', i['filename'].replace(',', '')) for i in torrents]
-        resp = source_utils.get_fuzzy_match(query, filenames)
+        torrents = cloud_catalog.get_catalog('alldebrid', lambda: (api.list_torrents() or {}).get('links'), 'link', 'date')
+        matched = source_utils.match_listing('alldebrid', torrents, 'filename', query, mal_id, season, episode)
 
-        for i in resp:
-            torrent = torrents[i]
+        for torrent in matched:
             torrent_info = api.link_info(torrent['link'])
             torrent_files = torrent_info['infos']
 
@@ -22,10 +22,7 @@ class Sources(BrowserBase):
                         'path': full_path
                     })
 
-        filenames = source_utils.filter_sources('local', filenames, mal_id, season, episode)
-        clean_filenames = [re.sub(r'\[.*?]\s*', '', i['name'].replace(',', '')) for i in filenames]
-        resp = source_utils.get_fuzzy_match(query, clean_filenames)
-        match_files = [filenames[i] for i in resp]
+        match_files = source_utils.match_listing('local', filenames, 'name', query, mal_id, season, episode)
 
         for file_info in match_files:
             filename = re.sub(r'\[.*?]', '', file_info['name']).lower()
@@ -1,10 +1,9 @@
 import re
 import pickle
+import time
 
-from functools import partial
-from bs4 import BeautifulSoup, SoupStrainer
 from resources.lib.debrid import Debrid
-from resources.lib.ui import database, source_utils, control, client, utils
+from resources.lib.ui import database, source_utils, control, async_client, torrent_rows
 from resources.lib.ui.BrowserBase import BrowserBase
 
 
@@ -115,19 +114,21 @@ class Sources(BrowserBase):
             'name': 'additional'
         })
 
-        # Execute all searches in parallel
+        # Execute all searches concurrently on the shared async engine
         control.log(f"Nyaa: Running {len(search_tasks)} searches in parallel for episode {episode_zfill}")
 
-        def run_search(task):
+        async def run_search(task):
             try:
-                sources = self.process_nyaa_episodes(self._BASE_URL, task['params'], mal_id, episode_zfill, season_zfill, part)
+                sources = await self._process_nyaa_episodes(self._BASE_URL, task['params'], mal_id, episode_zfill, season_zfill, part)
                 control.log(f"Nyaa: {task['name']} search returned {len(sources)} sources")
                 return sources
             except Exception as e:
                 control.log(f"Nyaa: {task['name']} search failed: {str(e)}")
                 return []
 
-        all_search_results = utils.parallel_process(search_tasks, run_search, max_workers=4)
+        start_time = time.perf_counter()
+        all_search_results = async_client.gather([run_search(task) for task in search_tasks])
+        async_client.get_engine().log_stats('Nyaa: episode searches', start_time)
 
         # Combine all results
         nyaa_sources = []
@@ -173,82 +174,47 @@ class Sources(BrowserBase):
         return {'cached': self.cached, 'uncached': self.uncached}
 
     def process_nyaa_episodes(self, url, params, mal_id, episode_zfill, season_zfill, part):
-        response = client.get(url, params=params)
+        return async_client.run(self._process_nyaa_episodes(url, params, mal_id, episode_zfill, season_zfill, part))
+
+    async def _process_nyaa_episodes(self, url, params, mal_id, episode_zfill, season_zfill, part):
+        engine = async_client.get_engine()
+        response = await engine.get(url, params=params)
         if response:
-            html = response.text
-            mlink = SoupStrainer('div', {'class': 'table-responsive'})
-            soup = BeautifulSoup(html, "html.parser", parse_only=mlink)
-            rex = r'(magnet:)+[^"]*'
-            list_ = [
-                {'magnet': i.find('a', {'href': re.compile(rex)}).get('href'),
-                 'name': i.find_all('a', {'class': None})[1].get('title'),
-                 'size': i.find_all('td', {'class': 'text-center'})[1].text.replace('i', ''),
-                 'downloads': int(i.find_all('td', {'class': 'text-center'})[-1].text),
-                 'seeders': int(i.find_all('td', {'class': 'text-center'})[-3].text)
-                 } for i in soup.select("tr.danger,tr.default,tr.success")
-            ]
-
-            for idx, torrent in enumerate(list_):
-                torrent['hash'] = re.findall(r'btih:(.*?)(?:&|$)', torrent['magnet'])[0]
-
-            filtered_list = source_utils.filter_sources('nyaa', list_, mal_id, int(season_zfill), int(episode_zfill), part)
-
-            cache_list, uncashed_list_ = Debrid().torrentCacheCheck(filtered_list)
-            cache_list = sorted(cache_list, key=lambda k: k['downloads'], reverse=True)
-
-            uncashed_list = [i for i in uncashed_list_ if i['seeders'] > 0]
-            uncashed_list = sorted(uncashed_list, key=lambda k: k['seeders'], reverse=True)
-
-            # Parse sources in parallel for faster processing
-            mapfunc = partial(self.parse_nyaa_view, episode=episode_zfill)
-            all_results = utils.parallel_process(cache_list, mapfunc, max_workers=5) if cache_list else []
-            if control.getBool('show.uncached') and uncashed_list:
-                mapfunc2 = partial(self.parse_nyaa_view, episode=episode_zfill, cached=False)
-                all_results += utils.parallel_process(uncashed_list, mapfunc2, max_workers=5)
-            return all_results
+            filtered_list = await engine.call(self._filter_rows, response.text, mal_id, int(season_zfill), int(episode_zfill), part)
+            return await self._check_and_parse(filtered_list, episode_zfill)
+        return []
 
     def process_nyaa_movie(self, url, params, mal_id):
-        response = client.get(url, params=params)
+        return async_client.run(self._process_nyaa_movie(url, params, mal_id))
+
+    async def _process_nyaa_movie(self, url, params, mal_id):
+        engine = async_client.get_engine()
+        response = await engine.get(url, params=params)
         if response:
-            res = response.text
-            results = BeautifulSoup(res, 'html.parser')
-            rex = r'(magnet:)+[^"]*'
-            search_results = [
-                (i.find_all('a', {'href': re.compile(rex)})[0].get('href'),
-                 i.find_all('a', {'class': None})[1].get('title'),
-                 i.find_all('td', {'class': 'text-center'})[1].text,
-                 i.find_all('td', {'class': 'text-center'})[-1].text,
-                 i.find_all('td', {'class': 'text-center'})[-3].text
-                 ) for i in results.select("tr.danger,tr.default,tr.success")]
-
-            list_ = [
-                {
-                    'magnet': magnet,
-                    'name': name,
-                    'size': size.replace('i', ''),
-                    'downloads': int(downloads),
-                    'seeders': int(seeders)
-                } for magnet, name, size, downloads, seeders in search_results
-            ]
-
-            for idx, torrent in enumerate(list_):
-                torrent['hash'] = re.findall(r'btih:(.*?)(?:&|$)', torrent['magnet'])[0]
-
-            filtered_list = source_utils.filter_sources('nyaa', list_, mal_id)
-
-            cache_list, uncashed_list_ = Debrid().torrentCacheCheck(filtered_list)
-            cache_list = sorted(cache_list, key=lambda k: k['downloads'], reverse=True)
-
-            uncashed_list = [i for i in uncashed_list_ if i['seeders'] > 0]
-            uncashed_list = sorted(uncashed_list, key=lambda k: k['seeders'], reverse=True)
-
-            # Parse sources in parallel for faster processing
-            mapfunc = partial(self.parse_nyaa_view, episode=1)
-            all_results = utils.parallel_process(cache_list, mapfunc, max_workers=5) if cache_list else []
-            if control.getBool('show.uncached') and uncashed_list:
-                mapfunc2 = partial(self.parse_nyaa_view, episode=1, cached=False)
-                all_results += utils.parallel_process(uncashed_list, mapfunc2, max_workers=5)
-            return all_results
+            filtered_list = await engine.call(self._filter_rows, response.text, mal_id)
+            return await self._check_and_parse(filtered_list, 1)
+        return []
+
+    @staticmethod
+    def _filter_rows(html, mal_id, season=None, episode=None, part=None):
+        return source_utils.filter_sources('nyaa', list(torrent_rows.iter_nyaa_rows(html)), mal_id, season, episode, part)
+
+    async def _check_and_parse(self, filtered_list, episode):
+        cache_list, uncashed_list_ = await Debrid().torrentCacheCheckAsync(filtered_list)
+        cache_list = sorted(cache_list, key=lambda k: k['downloads'], reverse=True)
+
+        uncashed_list = [i for i in uncashed_list_ if i['seeders'] > 0]
+        uncashed_list = sorted(uncashed_list, key=lambda k: k['seeders'], reverse=True)
+
+        # Parsing runs on an engine worker so the loop keeps serving the other searches meanwhile
+        return await async_client.get_engine().call(self._parse_results, cache_list, uncashed_list, episode)
+
+    @classmethod
+    def _parse_results(cls, cache_list, uncashed_list, episode):
+        all_results = [cls.parse_nyaa_view(res, episode) for res in cache_list]
+        if control.getBool('show.uncached') and uncashed_list:
+            all_results += [cls.parse_nyaa_view(res, episode, cached=False) for res in uncashed_list]
+        return all_results
 
     @staticmethod
     def parse_nyaa_view(res, episode, cached=True):
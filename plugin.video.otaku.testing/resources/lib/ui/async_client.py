@@ -0,0 +1,141 @@
+"""
+Asyncio request engine shared by the scrapers. Blocking client calls run on an executor
+bounded by GLOBAL_LIMIT and per-host slots, so fan-out never multiplies OS threads.
+"""
+import asyncio
+import concurrent.futures
+import threading
+import time
+import urllib.parse
+
+from resources.lib.ui import client, control
+
+GLOBAL_LIMIT = 8
+DEFAULT_HOST_LIMIT = 4
+
+# Per-host concurrency caps; hosts not listed use DEFAULT_HOST_LIMIT
+HOST_LIMITS = {
+    'nyaa.si': 3,
+    'nyaa-si.translate.goog': 3,
+    'animetosho.org': 3,
+    'api.real-debrid.com': 2,
+    'www.premiumize.me': 2,
+    'api.alldebrid.com': 2,
+    'debrid-link.com': 2,
+    'api.torbox.app': 2,
+    'easydebrid.com': 2,
+    'webservice.fanart.tv': 3,
+    'api.themoviedb.org': 4,
+    'api4.thetvdb.com': 2,
+}
+
+
+class AsyncEngine:
+    def __init__(self, max_concurrency=GLOBAL_LIMIT, host_limits=None, default_host_limit=DEFAULT_HOST_LIMIT):
+        self.max_concurrency = max_concurrency
+        self.host_limits = HOST_LIMITS if host_limits is None else host_limits
+        self.default_host_limit = default_host_limit
+        self._executor = concurrent.futures.ThreadPoolExecutor(max_workers=max_concurrency, thread_name_prefix='otaku-io')
+        self._loop = None
+        self._loop_thread = None
+        self._start_lock = threading.Lock()
+        self._global_sem = None
+        self._host_sems = {}
+        self._worker = threading.local()  # .active is set on executor threads while they run a call
+        self.stats = {'requests': 0, 'in_flight': 0, 'peak_in_flight': 0, 'peak_threads': 0}
+
+    # ---- loop management ----
+    def _ensure_loop(self):
+        with self._start_lock:
+            if self._loop is None:
+                self._loop = asyncio.new_event_loop()
+                self._loop_thread = threading.Thread(target=self._loop.run_forever, name='otaku-async', daemon=True)
+                self._loop_thread.start()
+        return self._loop
+
+    def _sem_for(self, host):
+        # Only ever called on the engine loop, so no locking is needed
+        if self._global_sem is None:
+            self._global_sem = asyncio.Semaphore(self.max_concurrency)
+        if host not in self._host_sems:
+            self._host_sems[host] = asyncio.Semaphore(self.host_limits.get(host, self.default_host_limit))
+        return self._global_sem, self._host_sems[host]
+
+    # ---- awaitable API ----
+    async def call(self, func, *args, host='', **kwargs):
+        """Run a blocking callable on the engine executor while holding a global and per-host slot"""
+        global_sem, host_sem = self._sem_for(host)
+        async with host_sem:
+            async with global_sem:
+                self.stats['requests'] += 1
+                self.stats['in_flight'] += 1
+                self.stats['peak_in_flight'] = max(self.stats['peak_in_flight'], self.stats['in_flight'])
+                self.stats['peak_threads'] = max(self.stats['peak_threads'], threading.active_count())
+                try:
+                    loop = asyncio.get_running_loop()
+                    return await loop.run_in_executor(self._executor, self._run_worker, func, args, kwargs)
+                finally:
+                    self.stats['in_flight'] -= 1
+
+    def _run_worker(self, func, args, kwargs):
+        self._worker.active = True
+        try:
+            return func(*args, **kwargs)
+        finally:
+            self._worker.active = False
+
+    async def get(self, url, **kwargs):
+        return await self.call(client.get, url, host=urllib.parse.urlparse(url).netloc, **kwargs)
+
+    async def post(self, url, **kwargs):
+        return await self.call(client.post, url, host=urllib.parse.urlparse(url).netloc, **kwargs)
+
+    async def request(self, url, **kwargs):
+        return await self.call(client.request, url, host=urllib.parse.urlparse(url).netloc, **kwargs)
+
+    # ---- sync facade ----
+    def run(self, coro, timeout=None):
+        """Run a coroutine on the engine loop and block until it finishes"""
+        loop = self._ensure_loop()
+        if threading.current_thread() is self._loop_thread:
+            coro.close()
+            raise RuntimeError('AsyncEngine.run() cannot be called from the engine loop; await the coroutine instead')
+        if getattr(self._worker, 'active', False):
+            # Blocking a worker on the engine would deadlock it once every worker does the same
+            coro.close()
+            raise RuntimeError('AsyncEngine.run() cannot be called from an engine worker; return a coroutine to await instead')
+        return asyncio.run_coroutine_threadsafe(coro, loop).result(timeout)
+
+    def gather(self, coros, timeout=None):
+        """Run several coroutines concurrently and return their results in order"""
+        async def _gather():
+            return await asyncio.gather(*coros)
+        return self.run(_gather(), timeout)
+
+    def map(self, func, items, host=''):
+        """Synchronous helper: apply a blocking func to each item through the engine limits"""
+        return self.gather([self.call(func, item, host=host) for item in items])
+
+    def log_stats(self, label, start_time=None):
+        elapsed = f', wall={time.perf_counter() - start_time:.2f}s' if start_time is not None else ''
+        control.log(f"{label}: requests={self.stats['requests']}, peak_in_flight={self.stats['peak_in_flight']}, peak_threads={self.stats['peak_threads']}{elapsed}")
+
+
+_engine = None
+_engine_lock = threading.Lock()
+
+
+def get_engine():
+    global _engine
+    with _engine_lock:
+        if _engine is None:
+            _engine = AsyncEngine()
+    return _engine
+
+
+def run(coro, timeout=None):
+    return get_engine().run(coro, timeout)
+
+
+def gather(coros, timeout=None):
+    return get_engine().gather(coros, timeout)
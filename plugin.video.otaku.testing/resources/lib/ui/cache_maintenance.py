@@ -0,0 +1,117 @@
+"""
+Size budget and housekeeping for cache.db.
+
+The function cache behind database.get only ever grew. run() is called by the service while
+Kodi is idle: it drops expired rows, evicts the least recently used rows until the function
+cache fits the configured budget, and returns the freed pages to the filesystem with an
+incremental vacuum.
+"""
+import re
+import time
+
+from resources.lib.ui import control, database
+
+MAINTENANCE_HOURS = 24  # run() is a no-op if it already ran within this window
+EXPIRED_GRACE_HOURS = 24  # expired rows are kept this long so a failed refresh can still fall back to them
+VACUUM_PAGES = 2000  # pages released per incremental vacuum pass
+DELETE_CHUNK = 500
+
+_key_suffix_re = re.compile(r'[0-9a-f]{32}.*$', re.S)
+
+
+def budget_bytes():
+    return control.getInt('general.cache.budget') * 1024 * 1024
+
+
+def cache_size(cursor):
+    """Bytes held by the function cache table, measured the same way rows are counted when evicting"""
+    cursor.execute('SELECT COALESCE(SUM(LENGTH(key) + LENGTH(value)), 0) AS size FROM cache')
+    return cursor.fetchone()['size']
+
+
+def function_name(key):
+    """The function part of a database.get key (the md5 of the arguments and any key suffix removed)"""
+    return _key_suffix_re.sub('', key) or key
+
+
+def evict(budget=None):
+    """
+    Delete expired rows, then the least recently used rows until the cache table fits the budget.
+    Only the cache table is measured: the other tables in cache.db are never trimmed here, so
+    counting them would evict function results without ever reaching the budget.
+    Returns (expired_rows, evicted_rows).
+    """
+    budget = budget_bytes() if budget is None else budget
+    now = int(time.time())
+    with database.SQL(control.cacheFile) as cursor:
+        database.create_cache_table(cursor)
+        cursor.execute('DELETE FROM cache WHERE expires IS NOT NULL AND expires < ?', (now - EXPIRED_GRACE_HOURS * 3600,))
+        expired = cursor.rowcount
+        cursor.connection.commit()
+
+        excess = cache_size(cursor) - budget if budget > 0 else 0
+        evicted = []
+        if excess > 0:
+            # Expired rows go first, then the oldest by last access
+            cursor.execute('SELECT key, LENGTH(key) + LENGTH(value) AS size FROM cache '
+                           'ORDER BY (expires IS NOT NULL AND expires < ?) DESC, accessed ASC', (now,))
+            freed = 0
+            for row in cursor.fetchall():
+                if freed >= excess:
+                    break
+                evicted.append(row['key'])
+                freed += row['size'] or 0
+            for start in range(0, len(evicted), DELETE_CHUNK):
+                chunk = evicted[start:start + DELETE_CHUNK]
+                cursor.execute(f'DELETE FROM cache WHERE key IN ({",".join("?" * len(chunk))})', chunk)
+            cursor.connection.commit()
+    return expired, len(evicted)
+
+
+def vacuum():
+    """Switch cache.db to incremental auto_vacuum (a one-off full VACUUM) and release free pages"""
+    with database.SQL(control.cacheFile) as cursor:
+        mode = cursor.execute('PRAGMA auto_vacuum').fetchone()['auto_vacuum']
+        if mode != 2:
+            cursor.execute('PRAGMA auto_vacuum = INCREMENTAL')
+            cursor.execute('VACUUM')
+        else:
+            cursor.execute(f'PRAGMA incremental_vacuum({VACUUM_PAGES})')
+            cursor.fetchall()
+        cursor.connection.commit()
+
+
+def size_report():
+    """Return [(function name, rows, bytes)] for the function cache, largest first"""
+    report = {}
+    with database.SQL(control.cacheFile) as cursor:
+        database.create_cache_table(cursor)
+        cursor.execute('SELECT key, LENGTH(key) + LENGTH(value) AS size FROM cache')
+        for row in cursor.fetchall():
+            name = function_name(row['key'])
+            rows, size = report.get(name, (0, 0))
+            report[name] = (rows + 1, size + (row['size'] or 0))
+    return sorted(((name, rows, size) for name, (rows, size) in report.items()), key=lambda x: x[2], reverse=True)
+
+
+def format_report(report=None):
+    report = size_report() if report is None else report
+    total = sum(size for _, _, size in report)
+    lines = [f'Function cache: {sum(rows for _, rows, _ in report)} entries, {total / 1048576:.1f} MB '
+             f'(budget {control.getInt("general.cache.budget")} MB)', '']
+    lines += [f'{size / 1048576:8.2f} MB  {rows:6d}  {name}' for name, rows, size in report]
+    return '\n'.join(lines)
+
+
+def run(force=False):
+    """Evict and vacuum at most once per MAINTENANCE_HOURS"""
+    now = int(time.time())
+    if not force and now < control.getInt('update.time.cache') + MAINTENANCE_HOURS * 3600:
+        return
+    start = time.perf_counter()
+    expired, evicted = evict()
+    vacuum()
+    control.setInt('update.time.cache', now)
+    control.log(f'### Cache maintenance: {expired} expired and {evicted} evicted rows removed in {time.perf_counter() - start:.1f}s')
+    for name, rows, size in size_report()[:5]:
+        control.log(f'### Cache: {name} {rows} rows {size / 1048576:.2f} MB')
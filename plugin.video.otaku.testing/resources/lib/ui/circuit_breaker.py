@@ -0,0 +1,166 @@
+"""
+Per-host circuit breaker and negative cache for client.request.
+
+After FAILURE_THRESHOLD consecutive timeouts, connection errors or 5xx answers a host's circuit
+opens and requests to it return None immediately. After OPEN_SECONDS one caller is let through
+as a half-open probe: success closes the circuit, failure opens it again. State lives in cache.db
+so plugin invocations and the service share it.
+
+404/410 answers to plain GETs are remembered for NEGATIVE_SECONDS so repeated lookups of
+missing episodes or ids do not hit the network again. Empty 200 answers are not: an empty body
+is too often a transient upstream hiccup to replay. Lookups read an in-process copy of the
+table, refreshed from cache.db at most every ROW_CACHE_SECONDS, so plain GETs do not each open
+the database.
+"""
+import time
+
+from resources.lib.ui import control, database
+
+FAILURE_THRESHOLD = 3
+OPEN_SECONDS = 60  # how long an open circuit rejects requests before a probe is allowed
+PROBE_SECONDS = 30  # a half-open probe that has not reported back by then is assumed lost
+NEGATIVE_SECONDS = 120
+NEGATIVE_STATUSES = (404, 410)
+
+CLOSED, OPEN, HALF_OPEN = 'closed', 'open', 'half_open'
+
+ROW_CACHE_SECONDS = 5  # breaker rows and the negative cache are re-read from cache.db at most this often
+
+# Hosts known to be open, so rejected requests do not touch the database
+_open_until = {}
+_rows = {}
+_negative = {}  # url: (status, expires)
+_negative_loaded = 0
+_tables_ready = False
+
+
+def _create_tables(cursor):
+    """Create the breaker and negative cache tables, once per process"""
+    global _tables_ready
+    if _tables_ready:
+        return
+    cursor.execute('CREATE TABLE IF NOT EXISTS circuit_breaker (host TEXT PRIMARY KEY, state TEXT, failures INTEGER, opened INTEGER)')
+    cursor.execute('CREATE TABLE IF NOT EXISTS negative_cache (url TEXT PRIMARY KEY, status INTEGER, expires INTEGER)')
+    cursor.connection.commit()
+    _tables_ready = True
+
+
+def _load(host, fresh=False):
+    cached = _rows.get(host)
+    if not fresh and cached and time.time() - cached[0] < ROW_CACHE_SECONDS:
+        return cached[1]
+    with database.SQL(control.cacheFile) as cursor:
+        _create_tables(cursor)
+        cursor.execute('SELECT * FROM circuit_breaker WHERE host=?', (host,))
+        row = cursor.fetchone()
+    _rows[host] = (time.time(), row)
+    return row
+
+
+def allow(host):
+    """Return False if requests to host should be skipped because its circuit is open"""
+    now = time.time()
+    if _open_until.get(host, 0) > now:
+        return False
+    row = _load(host)
+    if row and row['state'] != CLOSED:
+        row = _load(host, fresh=True)
+    if not row or row['state'] == CLOSED:
+        _open_until.pop(host, None)
+        return True
+    wait = OPEN_SECONDS if row['state'] == OPEN else OPEN_SECONDS + PROBE_SECONDS
+    if now - row['opened'] < wait:
+        _open_until[host] = row['opened'] + wait
+        return False
+    # Claim the probe; only the caller whose update lands goes through
+    with database.SQL(control.cacheFile) as cursor:
+        cursor.execute('UPDATE circuit_breaker SET state=?, opened=? WHERE host=? AND state=? AND opened=?',
+                       (HALF_OPEN, int(now) - OPEN_SECONDS, host, row['state'], row['opened']))
+        claimed = cursor.rowcount == 1
+        cursor.connection.commit()
+    _rows.pop(host, None)
+    if claimed:
+        control.log(f'Circuit half-open for {host}, probing')
+    return claimed
+
+
+def record(host, failed):
+    """Report the outcome of a request that allow() let through"""
+    row = _load(host)
+    if not failed:
+        if row and (row['state'] != CLOSED or row['failures']):
+            with database.SQL(control.cacheFile) as cursor:
+                cursor.execute('REPLACE INTO circuit_breaker (host, state, failures, opened) VALUES (?, ?, 0, 0)', (host, CLOSED))
+                cursor.connection.commit()
+            _rows.pop(host, None)
+            _open_until.pop(host, None)
+            if row['state'] != CLOSED:
+                control.log(f'Circuit closed for {host}', 'info')
+        return
+
+    row = _load(host, fresh=True)
+    failures = (row['failures'] if row else 0) + 1
+    opening = failures >= FAILURE_THRESHOLD or (row and row['state'] == HALF_OPEN)
+    now = int(time.time())
+    with database.SQL(control.cacheFile) as cursor:
+        _create_tables(cursor)
+        cursor.execute('REPLACE INTO circuit_breaker (host, state, failures, opened) VALUES (?, ?, ?, ?)',
+                       (host, OPEN if opening else CLOSED, failures, now if opening else 0))
+        cursor.connection.commit()
+    _rows.pop(host, None)
+    if opening:
+        _open_until[host] = now + OPEN_SECONDS
+        control.log(f'Circuit open for {host} after {failures} consecutive failures', 'warning')
+
+
+def state(host):
+    row = _load(host, fresh=True)
+    return row['state'] if row else CLOSED
+
+
+def _load_negative():
+    global _negative, _negative_loaded
+    now = int(time.time())
+    negative = {}
+    with database.SQL(control.cacheFile) as cursor:
+        _create_tables(cursor)
+        cursor.execute('SELECT url, status, expires FROM negative_cache WHERE expires>?', (now,))
+        negative = {row['url']: (row['status'], row['expires']) for row in cursor.fetchall()}
+    _negative = negative
+    _negative_loaded = time.time()
+
+
+def negative_get(url):
+    """Status of a remembered 404/410 response for url, or None"""
+    if time.time() - _negative_loaded >= ROW_CACHE_SECONDS:
+        _load_negative()
+    entry = _negative.get(url)
+    return entry[0] if entry and entry[1] > time.time() else None
+
+
+def negative_put(url, status):
+    expires = int(time.time()) + NEGATIVE_SECONDS
+    with database.SQL(control.cacheFile) as cursor:
+        _create_tables(cursor)
+        cursor.execute('REPLACE INTO negative_cache (url, status, expires) VALUES (?, ?, ?)', (url, status, expires))
+        cursor.execute('DELETE FROM negative_cache WHERE expires<?', (int(time.time()),))
+        cursor.connection.commit()
+    _negative[url] = (status, expires)
+
+
+def reset(host=None):
+    with database.SQL(control.cacheFile) as cursor:
+        _create_tables(cursor)
+        if host:
+            cursor.execute('DELETE FROM circuit_breaker WHERE host=?', (host,))
+        else:
+            cursor.execute('DELETE FROM circuit_breaker')
+            cursor.execute('DELETE FROM negative_cache')
+        cursor.connection.commit()
+    if host:
+        _open_until.pop(host, None)
+        _rows.pop(host, None)
+    else:
+        _open_until.clear()
+        _rows.clear()
+        _negative.clear()
@@ -23,8 +23,10 @@ import io
 import json
 import random
 import re
+import socket
 import ssl
 import sys
+import threading
 import time
 import urllib.request
 import urllib.parse
@@ -33,7 +35,7 @@ import urllib.response
 import http.cookiejar
 import xbmcvfs
 
-from resources.lib.ui import control
+from resources.lib.ui import control, circuit_breaker, rate_limit
 
 TRANSLATEPATH = xbmcvfs.translatePath
 CERT_FILE = TRANSLATEPATH('special://xbmc/system/certs/cacert.pem')
@@ -53,6 +55,95 @@ _cached_mobile_useragent = None
 _cached_mobile_useragent_time = 0
 _USERAGENT_CACHE_TTL = 3600  # 1 hour
 
+# HTTP status of the last failed request on each thread, see last_status()
+_request_state = threading.local()
+
+
+def last_status():
+    """HTTP error code of the most recent request made on this thread, or None if it did not fail with one"""
+    return getattr(_request_state, 'status', None)
+
+
+def last_trace():
+    """[(attempt, outcome, seconds)] of the most recent request() call on this thread"""
+    return getattr(_request_state, 'trace', [])
+
+
+class deadline:
+    """
+    Context manager bounding every request() made on this thread inside it to finish within
+    seconds: socket timeouts are cut to the time left and no request starts once it has run out.
+    Unlike cancelling a future, this frees the worker thread when the time is up.
+    """
+    def __init__(self, seconds):
+        self.seconds = seconds
+        self.previous = None
+
+    def __enter__(self):
+        self.previous = getattr(_request_state, 'deadline', None)
+        until = time.time() + self.seconds
+        _request_state.deadline = until if self.previous is None else min(until, self.previous)
+        return self
+
+    def __exit__(self, *exc):
+        _request_state.deadline = self.previous
+
+    @staticmethod
+    def remaining():
+        """Seconds left of this thread's deadline, or None outside of one"""
+        until = getattr(_request_state, 'deadline', None)
+        return None if until is None else until - time.time()
+
+
+class RetryPolicy:
+    """
+    How request() retries a failed call: up to attempts tries, sleeping a random time of up to
+    backoff * 2**n (capped at max_backoff) between them. Retries only start within deadline
+    seconds of the first attempt and are cut to end by then; the default matches the 20 s socket
+    timeout, so a call that times out once is not retried and holds its worker no longer than a
+    single attempt did. Only methods are retried, as repeating anything else may not be safe.
+    """
+    def __init__(self, attempts=3, backoff=0.5, max_backoff=8, deadline=20, methods=('GET', 'HEAD')):
+        self.attempts = attempts
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.deadline = deadline
+        self.methods = methods
+
+    def delay(self, attempt, rand=random.random):
+        """Full-jitter sleep before retry number attempt (1-based)"""
+        return rand() * min(self.max_backoff, self.backoff * 2 ** (attempt - 1))
+
+
+NO_RETRY = RetryPolicy(attempts=1)
+RETRY_POLICY = RetryPolicy()
+# Hosts whose POSTs are GraphQL; queries are retried there, mutations never are (see _is_mutation)
+HOST_RETRY_POLICIES = {
+    'graphql.anilist.co': RetryPolicy(methods=('GET', 'HEAD', 'POST')),
+}
+RETRY_STATUSES = (429, 502, 503, 504)
+
+
+def _is_mutation(post):
+    """Whether a POST body is a GraphQL mutation, which must not be sent twice"""
+    query = post.get('query') if isinstance(post, dict) else None
+    return isinstance(query, str) and query.lstrip().startswith('mutation')
+
+
+def _failure_reason():
+    """Why the last _request on this thread failed, if it is worth retrying; otherwise None"""
+    status = last_status()
+    if status in RETRY_STATUSES:
+        return f'status {status}'
+    exc = getattr(_request_state, 'exception', None)
+    if isinstance(exc, urllib.error.URLError) and not isinstance(exc, urllib.error.HTTPError):
+        exc = exc.reason
+    if isinstance(exc, (socket.timeout, TimeoutError)):
+        return 'timeout'
+    if isinstance(exc, (ConnectionError, http.client.IncompleteRead, http.client.BadStatusLine)):
+        return 'connection'
+    return None
+
 
 def _cleanup_old_sessions():
     """Clean up sessions older than timeout to prevent memory leaks"""
@@ -149,7 +240,101 @@ class Response:
         return f"<Response [{self.status_code}]>"
 
 
-def request(
+def request(url, retry=None, **kwargs):
+    """
+    Fetch url with _request, skipping hosts whose circuit breaker is open, waiting for the host's
+    rate limit, retrying timeouts, dropped connections and 429/5xx answers and replaying
+    remembered 404/410 answers to plain GETs. retry is a RetryPolicy, False to try only once, or
+    None for the host's default. Takes the same keyword arguments as _request.
+    """
+    if not url:
+        return
+    host = urllib.parse.urlparse('http:' + url if url.startswith('//') else url).netloc
+    output = kwargs.get('output', '')
+    _request_state.trace = []
+
+    negative_key = None
+    if (kwargs.get('post') is None and not kwargs.get('method') and not kwargs.get('error') and kwargs.get('limit') is None
+            and output in ('', 'extended') and 'Authorization' not in (kwargs.get('headers') or {})):
+        params = kwargs.get('params')
+        if isinstance(params, dict):
+            params = urllib.parse.urlencode(params)
+        negative_key = f'{url}?{params}' if params else url
+        status = circuit_breaker.negative_get(negative_key)
+        if status is not None:
+            _request_state.status = status
+            return None
+
+    if not circuit_breaker.allow(host):
+        _request_state.status = None
+        control.log(f'Circuit open for {host}, skipping {url}')
+        return None
+
+    if retry is False:
+        retry = NO_RETRY
+    elif retry is None:
+        retry = HOST_RETRY_POLICIES.get(host, RETRY_POLICY)
+    method = (kwargs.get('method') or ('POST' if kwargs.get('post') is not None else 'GET')).upper()
+    attempts = retry.attempts if method in retry.methods and not _is_mutation(kwargs.get('post')) else 1
+    timeout = kwargs.get('timeout', 20)
+    start = time.time()
+    budget = retry.deadline
+    if (call_remaining := deadline.remaining()) is not None:
+        budget = min(budget, call_remaining)
+    attempt = 0
+    failed = None  # outcome of the last attempt that reached the host in full, reported to the breaker once
+    while True:
+        attempt += 1
+        remaining = budget - (time.time() - start)
+        if remaining <= 0:
+            # The caller's deadline ran out before this attempt could start
+            _request_state.status = None
+            _request_state.trace.append((attempt, 'deadline', 0.0))
+            result = None
+            break
+        if not rate_limit.acquire(host, max_wait=min(rate_limit.MAX_WAIT, remaining)):
+            _request_state.status = 429
+            result = None
+            break
+        cut_short = False
+        if attempt > 1 or call_remaining is not None:
+            # Attempts must not run past the overall deadline
+            kwargs['timeout'] = max(0.5, min(timeout, budget - (time.time() - start)))
+            cut_short = kwargs['timeout'] < timeout
+
+        _request_state.failed = False
+        _request_state.retry_after = None
+        _request_state.exception = None
+        began = time.time()
+        result = _request(url, **kwargs)
+        if _request_state.retry_after and last_status() in (429, 503):
+            rate_limit.block(host, _request_state.retry_after)
+
+        reason = _failure_reason()
+        if not (cut_short and reason == 'timeout'):
+            # A timeout shortened by a deadline says nothing about the host, so the breaker never hears of it
+            failed = _request_state.failed
+        outcome = reason or (f'status {last_status()}' if last_status() else 'failed' if _request_state.failed else 'ok')
+        _request_state.trace.append((attempt, outcome, round(time.time() - began, 3)))
+        if reason is None or attempt >= attempts:
+            break
+        delay = retry.delay(attempt)
+        if time.time() - start + delay >= budget or not circuit_breaker.allow(host):
+            break
+        time.sleep(delay)
+
+    if failed is not None:
+        circuit_breaker.record(host, failed)
+    if len(_request_state.trace) > 1:
+        control.log(f'Request {url} took {len(_request_state.trace)} attempts: '
+                    f'{", ".join(f"{outcome} ({seconds:.1f}s)" for _, outcome, seconds in _request_state.trace)}')
+
+    if negative_key and last_status() in circuit_breaker.NEGATIVE_STATUSES:
+        circuit_breaker.negative_put(negative_key, last_status())
+    return result
+
+
+def _request(
         url,
         close=True,
         redirect=True,
@@ -175,6 +360,7 @@ def request(
     try:
         if not url:
             return
+        _request_state.status = None
 
         # Clean up old sessions periodically (1 in 20 requests)
         if random.randint(1, 20) == 1:
@@ -388,10 +574,14 @@ def request(
         try:
             # Use session opener if available
             if use_session and domain in _session_openers:
-                response = _session_openers[domain].open(req, timeout=int(timeout))
+                response = _session_openers[domain].open(req, timeout=float(timeout))
             else:
-                response = urllib.request.urlopen(req, timeout=int(timeout))
+                response = urllib.request.urlopen(req, timeout=float(timeout))
         except urllib.error.HTTPError as e:
+            _request_state.status = e.code
+            _request_state.retry_after = e.headers.get('Retry-After')
+            if e.code >= 500:
+                _request_state.failed = True
             if error is True:
                 response = e
             server = e.info().get('Server')
@@ -450,7 +640,7 @@ def request(
                         _headers['User-Agent'] = cf_ua
                         req = urllib.request.Request(url, data=post)
                         _add_request_header(req, _headers)
-                        response = urllib.request.urlopen(req, timeout=int(timeout))
+                        response = urllib.request.urlopen(req, timeout=float(timeout))
                     else:
                         control.log('%s has a Cloudflare challenge.' % (netloc))
                         if not error:
@@ -473,7 +663,7 @@ def request(
                     _headers['User-Agent'] = ddg_ua
                     req = urllib.request.Request(url, data=post)
                     _add_request_header(req, _headers)
-                    response = urllib.request.urlopen(req, timeout=int(timeout))
+                    response = urllib.request.urlopen(req, timeout=float(timeout))
                 else:
                     control.log('%s has a DDoS-Guard challenge.' % (netloc))
                     if not error:
@@ -483,6 +673,8 @@ def request(
                 if not error:
                     return None
         except urllib.error.URLError as e:
+            _request_state.failed = True
+            _request_state.exception = e
             if output == '':
                 control.log('Request-Error (%s): %s' % (e.reason, url))
             if not error:
@@ -654,6 +846,9 @@ def request(
                 response.close()
             return result
     except Exception as e:
+        # Timeouts and dropped connections while reading end up here
+        _request_state.failed = True
+        _request_state.exception = e
         control.log('Request-Error: (%s) => %s' % (str(e), url))
         return
 
@@ -0,0 +1,267 @@
+"""
+AES for the embed extractors.
+
+CBC, CTR and ECB with PKCS7 padding plus the CryptoJS passphrase format (EVP_BytesToKey with
+MD5). Work is handed to the cryptography or Cryptodome package when one is importable, which is
+orders of magnitude faster on low-end boxes. Otherwise the pure-Python cipher below is used: it
+takes the key schedule and T-tables from ui/pyaes and runs unrolled rounds on 32-bit words,
+several times faster than pyaes' own block loop.
+"""
+import base64
+import hashlib
+import os
+import struct
+
+from resources.lib.ui.pyaes.aes import AES as _PyAES
+
+BLOCK_SIZE = 16
+
+_backend = None
+
+
+def backend():
+    """Name of the AES implementation in use: 'cryptography', 'cryptodome' or 'python'"""
+    global _backend
+    if _backend is None:
+        try:
+            from cryptography.hazmat.primitives.ciphers import Cipher  # noqa: F401
+            _backend = 'cryptography'
+        except ImportError:
+            try:
+                from Cryptodome.Cipher import AES  # noqa: F401
+                _backend = 'cryptodome'
+            except ImportError:
+                _backend = 'python'
+    return _backend
+
+
+def set_backend(name):
+    """Force a backend (None re-detects); used to compare implementations"""
+    global _backend
+    _backend = name
+
+
+# PKCS7
+
+def pkcs7_pad(data, block_size=BLOCK_SIZE):
+    pad = block_size - len(data) % block_size
+    return data + bytes((pad,)) * pad
+
+
+def pkcs7_unpad(data, block_size=BLOCK_SIZE):
+    if not data or len(data) % block_size:
+        raise ValueError('invalid padded length')
+    pad = data[-1]
+    if not 0 < pad <= block_size or data[-pad:] != bytes((pad,)) * pad:
+        raise ValueError('invalid padding')
+    return data[:-pad]
+
+
+# Pure-Python cipher
+
+_T1, _T2, _T3, _T4 = _PyAES.T1, _PyAES.T2, _PyAES.T3, _PyAES.T4
+_T5, _T6, _T7, _T8 = _PyAES.T5, _PyAES.T6, _PyAES.T7, _PyAES.T8
+_S, _Si = _PyAES.S, _PyAES.Si
+
+_pack4 = struct.Struct('>4I')
+
+
+class _Cipher:
+    """AES block cipher on (w0, w1, w2, w3) big-endian word tuples"""
+    def __init__(self, key):
+        schedule = _PyAES(key)
+        # pyaes keeps signed round keys; unsigned ones let the rounds skip masking the top byte
+        self.ke = [tuple(w & 0xFFFFFFFF for w in r) for r in schedule._Ke]
+        self.kd = [tuple(w & 0xFFFFFFFF for w in r) for r in schedule._Kd]
+
+    def encrypt(self, w0, w1, w2, w3):
+        T1, T2, T3, T4, S = _T1, _T2, _T3, _T4, _S
+        ke = self.ke
+        k0, k1, k2, k3 = ke[0]
+        t0, t1, t2, t3 = w0 ^ k0, w1 ^ k1, w2 ^ k2, w3 ^ k3
+        for k0, k1, k2, k3 in ke[1:-1]:
+            t0, t1, t2, t3 = (
+                T1[t0 >> 24] ^ T2[(t1 >> 16) & 255] ^ T3[(t2 >> 8) & 255] ^ T4[t3 & 255] ^ k0,
+                T1[t1 >> 24] ^ T2[(t2 >> 16) & 255] ^ T3[(t3 >> 8) & 255] ^ T4[t0 & 255] ^ k1,
+                T1[t2 >> 24] ^ T2[(t3 >> 16) & 255] ^ T3[(t0 >> 8) & 255] ^ T4[t1 & 255] ^ k2,
+                T1[t3 >> 24] ^ T2[(t0 >> 16) & 255] ^ T3[(t1 >> 8) & 255] ^ T4[t2 & 255] ^ k3)
+        k0, k1, k2, k3 = ke[-1]
+        return (
+            ((S[t0 >> 24] << 24) | (S[(t1 >> 16) & 255] << 16) | (S[(t2 >> 8) & 255] << 8) | S[t3 & 255]) ^ k0,
+            ((S[t1 >> 24] << 24) | (S[(t2 >> 16) & 255] << 16) | (S[(t3 >> 8) & 255] << 8) | S[t0 & 255]) ^ k1,
+            ((S[t2 >> 24] << 24) | (S[(t3 >> 16) & 255] << 16) | (S[(t0 >> 8) & 255] << 8) | S[t1 & 255]) ^ k2,
+            ((S[t3 >> 24] << 24) | (S[(t0 >> 16) & 255] << 16) | (S[(t1 >> 8) & 255] << 8) | S[t2 & 255]) ^ k3)
+
+    def decrypt(self, w0, w1, w2, w3):
+        T5, T6, T7, T8, Si = _T5, _T6, _T7, _T8, _Si
+        kd = self.kd
+        k0, k1, k2, k3 = kd[0]
+        t0, t1, t2, t3 = w0 ^ k0, w1 ^ k1, w2 ^ k2, w3 ^ k3
+        for k0, k1, k2, k3 in kd[1:-1]:
+            t0, t1, t2, t3 = (
+                T5[t0 >> 24] ^ T6[(t3 >> 16) & 255] ^ T7[(t2 >> 8) & 255] ^ T8[t1 & 255] ^ k0,
+                T5[t1 >> 24] ^ T6[(t0 >> 16) & 255] ^ T7[(t3 >> 8) & 255] ^ T8[t2 & 255] ^ k1,
+                T5[t2 >> 24] ^ T6[(t1 >> 16) & 255] ^ T7[(t0 >> 8) & 255] ^ T8[t3 & 255] ^ k2,
+                T5[t3 >> 24] ^ T6[(t2 >> 16) & 255] ^ T7[(t1 >> 8) & 255] ^ T8[t0 & 255] ^ k3)
+        k0, k1, k2, k3 = kd[-1]
+        return (
+            ((Si[t0 >> 24] << 24) | (Si[(t3 >> 16) & 255] << 16) | (Si[(t2 >> 8) & 255] << 8) | Si[t1 & 255]) ^ k0,
+            ((Si[t1 >> 24] << 24) | (Si[(t0 >> 16) & 255] << 16) | (Si[(t3 >> 8) & 255] << 8) | Si[t2 & 255]) ^ k1,
+            ((Si[t2 >> 24] << 24) | (Si[(t1 >> 16) & 255] << 16) | (Si[(t0 >> 8) & 255] << 8) | Si[t3 & 255]) ^ k2,
+            ((Si[t3 >> 24] << 24) | (Si[(t2 >> 16) & 255] << 16) | (Si[(t1 >> 8) & 255] << 8) | Si[t0 & 255]) ^ k3)
+
+
+def _py_cbc_encrypt(key, iv, data):
+    encrypt = _Cipher(key).encrypt
+    pack = _pack4.pack
+    p0, p1, p2, p3 = _pack4.unpack(iv)
+    out = []
+    for w0, w1, w2, w3 in _pack4.iter_unpack(data):
+        p0, p1, p2, p3 = encrypt(w0 ^ p0, w1 ^ p1, w2 ^ p2, w3 ^ p3)
+        out.append(pack(p0, p1, p2, p3))
+    return b''.join(out)
+
+
+def _py_cbc_decrypt(key, iv, data):
+    decrypt = _Cipher(key).decrypt
+    pack = _pack4.pack
+    p0, p1, p2, p3 = _pack4.unpack(iv)
+    out = []
+    for c0, c1, c2, c3 in _pack4.iter_unpack(data):
+        d0, d1, d2, d3 = decrypt(c0, c1, c2, c3)
+        out.append(pack(d0 ^ p0, d1 ^ p1, d2 ^ p2, d3 ^ p3))
+        p0, p1, p2, p3 = c0, c1, c2, c3
+    return b''.join(out)
+
+
+def _py_ecb(key, data, decrypt=False):
+    cipher = _Cipher(key)
+    block = cipher.decrypt if decrypt else cipher.encrypt
+    pack = _pack4.pack
+    return b''.join(pack(*block(*words)) for words in _pack4.iter_unpack(data))
+
+
+def _py_ctr(key, counter, data):
+    encrypt = _Cipher(key).encrypt
+    pack = _pack4.pack
+    value = int.from_bytes(counter, 'big')
+    blocks = (len(data) + BLOCK_SIZE - 1) // BLOCK_SIZE
+    stream = []
+    for i in range(blocks):
+        c = (value + i) & ((1 << 128) - 1)
+        stream.append(pack(*encrypt(c >> 96, (c >> 64) & 0xFFFFFFFF, (c >> 32) & 0xFFFFFFFF, c & 0xFFFFFFFF)))
+    keystream = b''.join(stream)[:len(data)]
+    return (int.from_bytes(data, 'big') ^ int.from_bytes(keystream, 'big')).to_bytes(len(data), 'big')
+
+
+# Library backends
+
+def _lib_cipher(mode, key, iv_or_counter, decrypt):
+    name = backend()
+    if name == 'cryptography':
+        from cryptography.hazmat.primitives.ciphers import Cipher, algorithms, modes
+        mode_obj = {'cbc': modes.CBC, 'ctr': modes.CTR}.get(mode)
+        cipher = Cipher(algorithms.AES(key), mode_obj(iv_or_counter) if mode_obj else modes.ECB())
+        context = cipher.decryptor() if decrypt else cipher.encryptor()
+        return lambda data: context.update(data) + context.finalize()
+    from Cryptodome.Cipher import AES
+    if mode == 'cbc':
+        cipher = AES.new(key, AES.MODE_CBC, iv=iv_or_counter)
+    elif mode == 'ctr':
+        cipher = AES.new(key, AES.MODE_CTR, nonce=b'', initial_value=iv_or_counter)
+    else:
+        cipher = AES.new(key, AES.MODE_ECB)
+    return cipher.decrypt if decrypt else cipher.encrypt
+
+
+def _bytes(value):
+    return value.encode() if isinstance(value, str) else bytes(value)
+
+
+def _check(key, data, iv=None):
+    if len(key) not in (16, 24, 32):
+        raise ValueError('Invalid key size')
+    if iv is not None and len(iv) != BLOCK_SIZE:
+        raise ValueError('Invalid IV size')
+    if len(data) % BLOCK_SIZE:
+        raise ValueError('data is not a multiple of the block size')
+
+
+def cbc_encrypt(key, iv, data, pad=True):
+    key, iv, data = _bytes(key), _bytes(iv), _bytes(data)
+    data = pkcs7_pad(data) if pad else data
+    _check(key, data, iv)
+    if backend() == 'python':
+        return _py_cbc_encrypt(key, iv, data)
+    return _lib_cipher('cbc', key, iv, False)(data)
+
+
+def cbc_decrypt(key, iv, data, unpad=True):
+    key, iv, data = _bytes(key), _bytes(iv), _bytes(data)
+    _check(key, data, iv)
+    if backend() == 'python':
+        result = _py_cbc_decrypt(key, iv, data)
+    else:
+        result = _lib_cipher('cbc', key, iv, True)(data)
+    return pkcs7_unpad(result) if unpad else result
+
+
+def ecb_encrypt(key, data, pad=True):
+    key, data = _bytes(key), _bytes(data)
+    data = pkcs7_pad(data) if pad else data
+    _check(key, data)
+    if backend() == 'python':
+        return _py_ecb(key, data)
+    return _lib_cipher('ecb', key, None, False)(data)
+
+
+def ecb_decrypt(key, data, unpad=True):
+    key, data = _bytes(key), _bytes(data)
+    _check(key, data)
+    if backend() == 'python':
+        result = _py_ecb(key, data, decrypt=True)
+    else:
+        result = _lib_cipher('ecb', key, None, True)(data)
+    return pkcs7_unpad(result) if unpad else result
+
+
+def ctr(key, counter, data):
+    """CTR keystream XOR (encrypts and decrypts); counter is the initial 16-byte block, incremented as a 128-bit integer"""
+    key, counter, data = _bytes(key), _bytes(counter), _bytes(data)
+    _check(key, b'', counter)
+    if not data:
+        return b''
+    if backend() == 'python':
+        return _py_ctr(key, counter, data)
+    return _lib_cipher('ctr', key, counter, False)(data)
+
+
+# CryptoJS
+
+def evp_kdf(password, salt, key_size=32, iv_size=16, iterations=1, hash_name='md5'):
+    """OpenSSL EVP_BytesToKey as used by CryptoJS passphrase encryption; sizes in bytes. Returns (key, iv)"""
+    password, salt = _bytes(password), _bytes(salt)
+    derived = b''
+    block = b''
+    while len(derived) < key_size + iv_size:
+        block = hashlib.new(hash_name, block + password + salt).digest()
+        for _ in range(1, iterations):
+            block = hashlib.new(hash_name, block).digest()
+        derived += block
+    return derived[:key_size], derived[key_size:key_size + iv_size]
+
+
+def cryptojs_encrypt(plaintext, passphrase, salt=None):
+    """CryptoJS.AES.encrypt(plaintext, passphrase).toString() - base64 of 'Salted__' + salt + ciphertext"""
+    salt = salt or os.urandom(8)
+    key, iv = evp_kdf(passphrase, salt)
+    return base64.b64encode(b'Salted__' + salt + cbc_encrypt(key, iv, plaintext)).decode()
+
+
+def cryptojs_decrypt(ciphertext, passphrase, salt=None):
+    """Decrypt CryptoJS passphrase output (base64, with a 'Salted__' header unless salt is given); returns bytes"""
+    data = base64.b64decode(ciphertext)
+    if not salt:
+        salt, data = data[8:16], data[16:]
+    key, iv = evp_kdf(passphrase, salt)
+    return cbc_decrypt(key, iv, data)
@@ -1,9 +1,12 @@
 import ast
 import hashlib
+import importlib
+import inspect
 import pickle
 import re
 import time
 import threading
+import uuid
 import xbmcvfs
 
 from sqlite3 import OperationalError, dbapi2
@@ -18,7 +21,13 @@ def get(function, duration, *args, **kwargs):
     :param duration: Duration of validity of cache in hours
     :param args: Optional arguments for the provided function
     :param kwargs: Optional keyword arguments for the provided function
+    :param max_stale: (keyword, optional) serve an expired entry while it is no older than
+                      max_stale x duration, refreshing it in the background (stale-while-revalidate)
+    :param lease: (keyword, optional) declare a slow function (a provider scrape) whose misses are
+                  also held off across invocations by a lease row in cache.db
     """
+    max_stale = kwargs.pop('max_stale', None)
+    lease = kwargs.pop('lease', False)
     key = hash_function(function, args, kwargs)
     if 'key' in kwargs:
         key += kwargs.pop('key')
@@ -26,6 +35,7 @@ def get(function, duration, *args, **kwargs):
     if cache_result and is_cache_valid(cache_result['date'], duration):
         try:
             return_data = ast.literal_eval(cache_result['value'])
+            cache_touch(key, cache_result.get('accessed'))
             return return_data
         except:
             import traceback
@@ -34,14 +44,201 @@ def get(function, duration, *args, **kwargs):
             control.log("Cache corrupted for key: %s, fetching fresh data" % key, level='warning')
             # Don't return None, fall through to fetch fresh data
 
-    fresh_result = repr(function(*args, **kwargs))
-    cache_insert(key, fresh_result)
+    # Rows that may be served stale must outlive their TTL for cache maintenance
+    lifetime = duration * max_stale if max_stale else duration
+
+    def compute():
+        result = repr(function(*args, **kwargs))
+        cache_insert(key, result, lifetime)
+        return result
+
+    if max_stale and cache_result and is_cache_valid(cache_result['date'], duration * max_stale):
+        try:
+            stale_data = ast.literal_eval(cache_result['value'])
+        except Exception:
+            pass
+        else:
+            schedule_refresh(key, duration, lifetime, function, args, kwargs, compute)
+            return stale_data
+
+    fresh_result = single_flight(key, duration, compute, lease)
     if not fresh_result:
         return cache_result if cache_result else fresh_result
     data = ast.literal_eval(fresh_result)
     return data
 
 
+SINGLE_FLIGHT_TIMEOUT = 60  # seconds a thread waits for another thread computing the same key
+LEASE_SECONDS = 30  # a lease older than this is assumed abandoned by a crashed invocation
+LEASE_POLL = 0.25
+
+
+class _Flight:
+    def __init__(self):
+        self.event = threading.Event()
+        self.value = None
+
+
+_flights = {}
+_flights_lock = threading.Lock()
+
+
+def single_flight(key, duration, compute, lease=False):
+    """
+    Run compute() once for concurrent misses of the same cache key and share its repr'd result.
+    Threads of this invocation wait on the first caller. With lease, other invocations (plugin vs
+    service) are also held off by a lease row in cache.db and pick the result up from the cache;
+    that costs two committed writes, so it is reserved for slow keys and background refreshes.
+    If the first caller fails or takes too long, waiters compute the value themselves.
+    """
+    with _flights_lock:
+        flight = _flights.get(key)
+        leader = flight is None
+        if leader:
+            flight = _flights[key] = _Flight()
+    if not leader:
+        if flight.event.wait(SINGLE_FLIGHT_TIMEOUT) and flight.value is not None:
+            return flight.value
+        return compute()
+    try:
+        flight.value = _leased(key, duration, compute) if lease else compute()
+        return flight.value
+    finally:
+        with _flights_lock:
+            _flights.pop(key, None)
+        flight.event.set()
+
+
+def _leased(key, duration, compute):
+    owner = uuid.uuid4().hex
+    deadline = time.time() + LEASE_SECONDS
+    waited = False
+    while not lease_acquire(key, owner):
+        waited = True
+        time.sleep(LEASE_POLL)
+        cache_result = cache_get(key)
+        if cache_result and is_cache_valid(cache_result['date'], duration):
+            return cache_result['value']
+        if time.time() > deadline:
+            control.log(f'Cache lease for {key} not released, computing anyway', 'warning')
+            owner = None
+            break
+    if waited and owner:
+        # The holder may have stored its result and released between our last poll and acquire
+        cache_result = cache_get(key)
+        if cache_result and is_cache_valid(cache_result['date'], duration):
+            lease_release(key, owner)
+            return cache_result['value']
+    try:
+        return compute()
+    finally:
+        if owner:
+            lease_release(key, owner)
+
+
+def lease_acquire(key, owner):
+    now = int(time.time())
+    acquired = None
+    with SQL(control.cacheFile) as cursor:
+        cursor.execute('CREATE TABLE IF NOT EXISTS cache_lease (key TEXT PRIMARY KEY, owner TEXT, expires INTEGER)')
+        cursor.execute('DELETE FROM cache_lease WHERE key=? AND expires<?', (key, now))
+        cursor.execute('INSERT OR IGNORE INTO cache_lease (key, owner, expires) VALUES (?, ?, ?)', (key, owner, now + LEASE_SECONDS))
+        acquired = cursor.rowcount == 1
+        cursor.connection.commit()
+    # A swallowed database error leaves acquired as None; don't hold the caller up over the lease
+    return acquired is not False
+
+
+def lease_release(key, owner):
+    with SQL(control.cacheFile) as cursor:
+        cursor.execute('DELETE FROM cache_lease WHERE key=? AND owner=?', (key, owner))
+        cursor.connection.commit()
+
+
+REFRESH_QUEUE_DELAY = 30  # seconds the service leaves a queued refresh to the invocation that queued it
+
+
+def _function_ref(function):
+    """(module, qualname, bound) for functions the service can import again, else None"""
+    module = getattr(function, '__module__', None)
+    qualname = getattr(function, '__qualname__', '')
+    if not module or not qualname or '<' in qualname:
+        return None
+    owner = getattr(function, '__self__', None)
+    bound = owner is not None and not isinstance(owner, type) and not inspect.ismodule(owner)
+    return module, qualname, bound
+
+
+def _resolve_function(module, qualname, bound):
+    target = importlib.import_module(module)
+    parts = qualname.split('.')
+    for part in parts[:-1]:
+        target = getattr(target, part)
+    if bound:
+        # Browsers and endpoints build their state from settings, so a fresh instance is equivalent
+        target = target()
+    return getattr(target, parts[-1])
+
+
+def schedule_refresh(key, duration, lifetime, function, args, kwargs, compute):
+    """
+    Refresh a stale cache entry in a background thread. The refresh is also queued in cache.db
+    so the service completes it if this plugin invocation exits first.
+    """
+    ref = _function_ref(function)
+    if ref:
+        try:
+            data = pickle.dumps((ref, args, kwargs, lifetime))
+        except Exception:
+            data = None
+        if data:
+            with SQL(control.cacheFile) as cursor:
+                cursor.execute('CREATE TABLE IF NOT EXISTS refresh_queue (key TEXT PRIMARY KEY, data BLOB, duration REAL, queued INTEGER)')
+                cursor.execute('REPLACE INTO refresh_queue (key, data, duration, queued) VALUES (?, ?, ?, ?)', (key, data, duration, int(time.time())))
+                cursor.connection.commit()
+
+    def refresh():
+        try:
+            single_flight(key, duration, compute, lease=True)
+            refresh_dequeue(key)
+        except Exception as e:
+            control.log(f'Background refresh of {key} failed: {e}', 'warning')
+
+    threading.Thread(target=refresh, daemon=True).start()
+
+
+def refresh_dequeue(key):
+    with SQL(control.cacheFile) as cursor:
+        cursor.execute('DELETE FROM refresh_queue WHERE key=?', (key,))
+        cursor.connection.commit()
+
+
+def process_refresh_queue(limit=20):
+    """Run refreshes queued by plugin invocations that exited before finishing them. Called by the service."""
+    with SQL(control.cacheFile) as cursor:
+        cursor.execute('CREATE TABLE IF NOT EXISTS refresh_queue (key TEXT PRIMARY KEY, data BLOB, duration REAL, queued INTEGER)')
+        cursor.execute('SELECT * FROM refresh_queue WHERE queued<? ORDER BY queued LIMIT ?', (int(time.time()) - REFRESH_QUEUE_DELAY, limit))
+        rows = cursor.fetchall()
+    for row in rows:
+        key, duration = row['key'], row['duration']
+        try:
+            (module, qualname, bound), args, kwargs, lifetime = pickle.loads(row['data'])
+            function = _resolve_function(module, qualname, bound)
+
+            def compute():
+                result = repr(function(*args, **kwargs))
+                cache_insert(key, result, lifetime)
+                return result
+
+            single_flight(key, duration, compute, lease=True)
+        except Exception as e:
+            control.log(f'Queued refresh of {key} failed: {e}', 'warning')
+        finally:
+            # Failed refreshes are not retried; the next stale hit queues them again
+            refresh_dequeue(key)
+    return len(rows)
+
+
 def remove(function, *args, **kwargs):
     # type: (function, object) -> object or None
     """
@@ -76,12 +273,44 @@ def cache_get(key):
         return results
 
 
-def cache_insert(key, value):
+CACHE_TOUCH_SECONDS = 600  # last-access times are only rewritten this often to keep hits read-only
+_cache_schema_ready = False
+
+
+def create_cache_table(cursor):
+    """Create the function cache table, adding the expiry/last-access columns to older databases"""
+    global _cache_schema_ready
+    if _cache_schema_ready:
+        return
+    cursor.execute('CREATE TABLE IF NOT EXISTS cache (key TEXT, value TEXT, date INTEGER, expires INTEGER, accessed INTEGER, UNIQUE(key))')
+    cursor.execute('CREATE UNIQUE INDEX IF NOT EXISTS ix_cache ON cache (key)')
+    columns = [row['name'] for row in cursor.execute('PRAGMA table_info(cache)').fetchall()]
+    for column in ['expires', 'accessed']:
+        if column not in columns:
+            cursor.execute(f'ALTER TABLE cache ADD COLUMN {column} INTEGER')
+    cursor.execute('UPDATE cache SET accessed=date WHERE accessed IS NULL')
+    cursor.execute('CREATE INDEX IF NOT EXISTS ix_cache_accessed ON cache (accessed)')
+    cursor.connection.commit()
+    _cache_schema_ready = True
+
+
+def cache_insert(key, value, duration=None):
+    now = int(time.time())
+    expires = now + int(duration * 3600) if duration is not None else None
+    with SQL(control.cacheFile) as cursor:
+        create_cache_table(cursor)
+        cursor.execute('REPLACE INTO cache (key, value, date, expires, accessed) VALUES (?, ?, ?, ?, ?)', (key, value, now, expires, now))
+        cursor.connection.commit()
+
+
+def cache_touch(key, accessed=None):
+    """Record a cache hit for LRU eviction"""
     now = int(time.time())
+    if accessed and now - accessed < CACHE_TOUCH_SECONDS:
+        return
     with SQL(control.cacheFile) as cursor:
-        cursor.execute('CREATE TABLE IF NOT EXISTS cache (key TEXT, value TEXT, date INTEGER, UNIQUE(key))')
-        cursor.execute('CREATE UNIQUE INDEX IF NOT EXISTS ix_cache ON cache (key)')
-        cursor.execute('REPLACE INTO cache (key, value, date) VALUES (?, ?, ?)', (key, value, now))
+        create_cache_table(cursor)
+        cursor.execute('UPDATE cache SET accessed=? WHERE key=?', (now, key))
         cursor.connection.commit()
 
 
@@ -93,12 +322,20 @@ def cache_remove(key):
 
 
 def cache_clear():
+    global _cache_schema_ready
     with SQL(control.cacheFile) as cursor:
         cursor.execute("DROP TABLE IF EXISTS cache")
         cursor.execute("VACUUM")
         cursor.connection.commit()
-        cursor.execute('CREATE TABLE IF NOT EXISTS cache (key TEXT, value TEXT, date INTEGER, UNIQUE(key))')
-        control.notify(f'{control.ADDON_NAME}: {control.lang(30086)}', control.lang(30087), time=5000, sound=False)
+        _cache_schema_ready = False
+        create_cache_table(cursor)
+    from resources.lib.debrid import cloud_catalog
+    cloud_catalog.clear()
+    from resources.lib.endpoints import enrichment
+    enrichment.clear()
+    from resources.lib.ui import circuit_breaker
+    circuit_breaker.reset()
+    control.notify(f'{control.ADDON_NAME}: {control.lang(30086)}', control.lang(30087), time=5000, sound=False)
 
 
 def is_cache_valid(cached_time, cache_timeout):
@@ -212,6 +449,18 @@ def update_show_meta(mal_id, meta_ids, art):
         cursor.connection.commit()
 
 
+def update_show_meta_batch(rows):
+    """Store [(mal_id, meta_ids, art)] in one transaction"""
+    if not rows:
+        return
+    with SQL(control.malSyncDB) as cursor:
+        cursor.execute('PRAGMA foreign_keys=OFF')
+        cursor.executemany("REPLACE INTO shows_meta (mal_id, meta_ids, art) VALUES (?, ?, ?)",
+                           [(mal_id, pickle.dumps(meta_ids), pickle.dumps(art)) for mal_id, meta_ids, art in rows])
+        cursor.execute('PRAGMA foreign_keys=ON')
+        cursor.connection.commit()
+
+
 def add_mapping_id(mal_id, column, value):
     with SQL(control.malSyncDB) as cursor:
         cursor.execute('UPDATE shows SET %s=? WHERE mal_id=?' % column, (value, mal_id))
@@ -234,10 +483,91 @@ def update_show_data(mal_id, data, last_updated=''):
         cursor.connection.commit()
 
 
-def update_episode(mal_id, season, number, update_time, kodi_meta, filler='', anidb_ep_id=''):
-    with SQL(control.malSyncDB) as cursor:
-        cursor.execute('REPLACE INTO episodes (mal_id, season, kodi_meta, last_updated, number, filler, anidb_ep_id) VALUES (?, ?, ?, ?, ?, ?, ?)', (mal_id, season, kodi_meta, update_time, number, filler, anidb_ep_id))
-        cursor.connection.commit()
+# Episode rows keep their own metadata in columns; the info and artwork shared by every episode
+# of a show (tvshowtitle, cast, poster, fanart, ...) is stored once per show in episode_show.
+EPISODE_COLUMNS = ('mal_id', 'season', 'number', 'last_updated', 'filler', 'anidb_ep_id',
+                   'title', 'plot', 'aired', 'rating', 'votes', 'thumb', 'url', 'code', 'playcount')
+EPISODE_INFO_KEYS = ('title', 'plot', 'aired', 'rating', 'code', 'playcount', 'season', 'episode')
+_EPISODE_SELECT = ('SELECT episodes.*, episode_show.info AS show_info, episode_show.image AS show_image FROM episodes '
+                   'LEFT JOIN episode_show ON episode_show.mal_id=episodes.mal_id ')
+
+# Unpickled episode_show blobs, so a 1000 episode list decodes the shared part once
+_show_parts = {}
+_show_parts_lock = threading.Lock()
+
+
+def episode_row(mal_id, season, number, update_time, filler, anidb_ep_id, item):
+    """Split an episode ListItem dict into (episodes row tuple, show info, show image)"""
+    info = item.get('info') or {}
+    image = item.get('image') or {}
+    rating = info.get('rating') or {}
+    row = (mal_id, season, number, update_time, filler, anidb_ep_id,
+           info.get('title'), info.get('plot'), info.get('aired'), rating.get('score'), rating.get('votes'),
+           image.get('thumb'), item.get('url'), info.get('code'), info.get('playcount'))
+    show_info = {key: value for key, value in info.items() if key not in EPISODE_INFO_KEYS}
+    show_image = {key: value for key, value in image.items() if key not in ('icon', 'thumb')}
+    return row, show_info, show_image
+
+
+def episode_changed(stored, row):
+    """True if a stored episodes row differs from a new row tuple in anything but last_updated"""
+    return any(stored.get(column) != value for column, value in zip(EPISODE_COLUMNS, row) if column != 'last_updated')
+
+
+def _show_part(blob):
+    if not blob:
+        return {}
+    with _show_parts_lock:
+        part = _show_parts.get(blob)
+        if part is None:
+            if len(_show_parts) > 64:
+                _show_parts.clear()
+            part = _show_parts[blob] = pickle.loads(blob)
+    return part
+
+
+def episode_item(row):
+    """Rebuild the ListItem dict of an episode row from get_episode_list / get_episode"""
+    info = dict(_show_part(row.get('show_info')))
+    info['title'] = row['title']
+    info['plot'] = row['plot']
+    info['season'] = row['season']
+    info['episode'] = row['number']
+    info['code'] = row['code']
+    if row['aired'] is not None:
+        info['aired'] = row['aired']
+    if row['rating'] is not None:
+        info['rating'] = {'score': row['rating']} if row['votes'] is None else {'score': row['rating'], 'votes': row['votes']}
+    if row['playcount'] is not None:
+        info['playcount'] = row['playcount']
+    image = dict(_show_part(row.get('show_image')))
+    image['icon'] = image['thumb'] = row['thumb']
+    return {
+        'isfolder': False,
+        'isplayable': True,
+        'name': row['title'],
+        'url': row['url'],
+        'info': info,
+        'cm': [],
+        'image': image
+    }
+
+
+def update_episodes(rows, shows=None, cursor=None):
+    """
+    Bulk store episodes in one transaction. rows are tuples in EPISODE_COLUMNS order,
+    shows maps mal_id to the (info, image) shared by its episodes.
+    """
+    if cursor is None:
+        with SQL(control.malSyncDB) as cursor:
+            update_episodes(rows, shows, cursor)
+            cursor.connection.commit()
+        return
+    if shows:
+        cursor.executemany('REPLACE INTO episode_show (mal_id, info, image) VALUES (?, ?, ?)',
+                           [(mal_id, pickle.dumps(info), pickle.dumps(image)) for mal_id, (info, image) in shows.items()])
+    if rows:
+        cursor.executemany(f'REPLACE INTO episodes ({", ".join(EPISODE_COLUMNS)}) VALUES ({", ".join("?" * len(EPISODE_COLUMNS))})', rows)
 
 
 def update_episode_column(mal_id, episode, column, value):
@@ -256,7 +586,7 @@ def get_show_data(mal_id):
 
 def get_episode_list(mal_id):
     with SQL(control.malSyncDB) as cursor:
-        cursor.execute('SELECT * FROM episodes WHERE mal_id=?', (mal_id,))
+        cursor.execute(_EPISODE_SELECT + 'WHERE episodes.mal_id=? ORDER BY episodes.season, episodes.number', (mal_id,))
         episodes = cursor.fetchall()
         return episodes
 
@@ -264,9 +594,9 @@ def get_episode_list(mal_id):
 def get_episode(mal_id, episode=None):
     with SQL(control.malSyncDB) as cursor:
         if episode:
-            cursor.execute('SELECT * FROM episodes WHERE mal_id=? AND number=?', (mal_id, episode))
+            cursor.execute(_EPISODE_SELECT + 'WHERE episodes.mal_id=? AND episodes.number=?', (mal_id, episode))
         else:
-            cursor.execute('SELECT * FROM episodes WHERE mal_id=?', (mal_id,))
+            cursor.execute(_EPISODE_SELECT + 'WHERE episodes.mal_id=? ORDER BY episodes.season, episodes.number', (mal_id,))
         episode = cursor.fetchone()
         return episode
 
@@ -4,8 +4,13 @@ try:
 except ImportError:
     from sqlite3 import sqlite_version  # noQA
 
+from resources.lib.ui import database
 from resources.lib.ui.database import SQL
 
+# PRAGMA user_version of malSyncDB. Layout changes that should keep the cached metadata get a
+# _migrate_<version> step instead of a last_meta_update bump, which rebuilds the whole database.
+SCHEMA_VERSION = 1
+
 
 class SyncDatabase:
     def __init__(self):
@@ -16,6 +21,7 @@ class SyncDatabase:
         self.build_showmeta_table()
         self.build_episode_table()
         self.build_show_data_table()
+        self.migrate_schema()
 
         # If you make changes to the required meta in any indexer that is cached in this database
         # You will need to update the below version number to match the new addon version
@@ -176,15 +182,109 @@ class SyncDatabase:
         with SQL(control.malSyncDB) as cursor:
             cursor.execute('CREATE TABLE IF NOT EXISTS episodes (mal_id INTEGER NOT NULL, '
                            'season INTEGER NOT NULL, '
-                           'kodi_meta BLOB NOT NULL, '
-                           'last_updated TEXT NOT NULL, '
                            'number INTEGER NOT NULL, '
+                           'last_updated TEXT NOT NULL, '
                            'filler TEXT, '
                            'anidb_ep_id INTEGER, '
+                           'title TEXT, '
+                           'plot TEXT, '
+                           'aired TEXT, '
+                           'rating REAL, '
+                           'votes INTEGER, '
+                           'thumb TEXT, '
+                           'url TEXT, '
+                           'code TEXT, '
+                           'playcount INTEGER, '
                            'FOREIGN KEY(mal_id) REFERENCES shows(mal_id) ON DELETE CASCADE)')
             cursor.execute('CREATE UNIQUE INDEX IF NOT EXISTS ix_episodes ON episodes (mal_id ASC, season ASC, number ASC)')
+            cursor.execute('CREATE TABLE IF NOT EXISTS episode_show (mal_id INTEGER PRIMARY KEY, '
+                           'info BLOB, '
+                           'image BLOB, '
+                           'FOREIGN KEY(mal_id) REFERENCES shows(mal_id) ON DELETE CASCADE)')
             cursor.connection.commit()
 
+    @staticmethod
+    def schema_version():
+        """user_version of the sync database, or None if it could not be read"""
+        version = None
+        with SQL(control.malSyncDB) as cursor:
+            cursor.execute('PRAGMA user_version')
+            version = cursor.fetchone()['user_version']
+        return version
+
+    @staticmethod
+    def set_schema_version(version):
+        with SQL(control.malSyncDB) as cursor:
+            cursor.execute(f'PRAGMA user_version={int(version)}')
+            cursor.connection.commit()
+
+    def migrate_schema(self):
+        version = self.schema_version()
+        if version is None:
+            return
+        for step in range(version + 1, SCHEMA_VERSION + 1):
+            control.log(f'Migrating {control.malSyncDB} to schema version {step}')
+            # SQL swallows a locked database, so each step reports whether it finished
+            if not getattr(self, f'_migrate_{step}')():
+                control.log(f'Migration to schema version {step} did not finish, retrying on the next start', 'warning')
+                return
+            self.set_schema_version(step)
+
+    @staticmethod
+    def _episode_layout():
+        """(episodes columns, whether episodes_v0 exists), or None if the database could not be read"""
+        layout = None
+        with SQL(control.malSyncDB) as cursor:
+            cursor.execute('PRAGMA table_info(episodes)')
+            columns = [column['name'] for column in cursor.fetchall()]
+            cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='episodes_v0'")
+            layout = columns, cursor.fetchone() is not None
+        return layout
+
+    @staticmethod
+    def _migrate_1():
+        """
+        Move episodes from pickled kodi_meta blobs into columns. Returns True once the old table is
+        gone; a run cut short by a locked database resumes from episodes_v0 on the next start.
+        """
+        import pickle
+        layout = SyncDatabase._episode_layout()
+        if layout is None:
+            return False
+        columns, copying = layout
+        if 'kodi_meta' in columns:
+            with SQL(control.malSyncDB) as cursor:
+                cursor.execute('PRAGMA foreign_keys=OFF')
+                cursor.execute('DROP INDEX IF EXISTS ix_episodes')
+                cursor.execute('ALTER TABLE episodes RENAME TO episodes_v0')
+                cursor.connection.commit()
+            copying = True
+        SyncDatabase.build_episode_table()
+        rows, shows = [], {}
+        if copying:
+            with SQL(control.malSyncDB) as cursor:
+                cursor.execute('PRAGMA foreign_keys=OFF')
+                cursor.execute('SELECT * FROM episodes_v0')
+                for old in cursor.fetchall():
+                    try:
+                        item = pickle.loads(old['kodi_meta'])
+                    except Exception:
+                        continue
+                    row, show_info, show_image = database.episode_row(old['mal_id'], old['season'], old['number'], old['last_updated'],
+                                                                      old['filler'], old['anidb_ep_id'], item)
+                    rows.append(row)
+                    shows[old['mal_id']] = (show_info, show_image)
+                database.update_episodes(rows, shows, cursor)
+                cursor.execute('DROP TABLE episodes_v0')
+                cursor.connection.commit()
+                cursor.execute('PRAGMA foreign_keys=ON')
+        layout = SyncDatabase._episode_layout()
+        if layout is None or 'kodi_meta' in layout[0] or layout[1]:
+            return False
+        if copying:
+            control.log(f'Migrated {len(rows)} episodes of {len(shows)} shows to columns')
+        return True
+
     @staticmethod
     def build_watchlist_cache_table():
         with SQL(control.malSyncDB) as cursor:
@@ -237,6 +337,7 @@ class SyncDatabase:
         self.build_episode_table()
         self.build_show_data_table()
         self.build_watchlist_cache_table()
+        self.set_schema_version(SCHEMA_VERSION)
 
         self.set_base_activites()
         self.refresh_activites()
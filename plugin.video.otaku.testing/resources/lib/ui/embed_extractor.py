@@ -9,8 +9,7 @@ import urllib.parse
 import xbmcvfs
 import os
 
-from resources.lib.ui import client, control, jsunpack
-from resources.lib.ui.pyaes import AESModeOfOperationCBC, Decrypter, Encrypter
+from resources.lib.ui import client, control, crypto, jsunpack
 
 
 _EMBED_EXTRACTORS = {}
@@ -312,20 +311,11 @@ def __extract_voe(url, page_content, referer=None):
 
 def __extract_goload(url, page_content, referer=None):
     def _encrypt(msg, key, iv):
-        key = control.bin(key)
-        encrypter = Encrypter(AESModeOfOperationCBC(key, iv))
-        ciphertext = encrypter.feed(msg)
-        ciphertext += encrypter.feed()
-        ciphertext = base64.b64encode(ciphertext)
-        return ciphertext.decode()
+        ciphertext = crypto.cbc_encrypt(control.bin(key), iv, msg)
+        return base64.b64encode(ciphertext).decode()
 
     def _decrypt(msg, key, iv):
-        ct = base64.b64decode(msg)
-        key = control.bin(key)
-        decrypter = Decrypter(AESModeOfOperationCBC(key, iv))
-        decrypted = decrypter.feed(ct)
-        decrypted += decrypter.feed()
-        return decrypted.decode()
+        return crypto.cbc_decrypt(control.bin(key), iv, base64.b64decode(msg)).decode()
 
     pattern = r'(?://|\.)((?:gogo-(?:play|stream)|streamani|go(?:load|one|gohd)|vidstreaming|gembedhd|playgo1|anihdplay|(?:play|emb|go|s3|s3emb)taku1?)\.' \
               r'(?:io|pro|net|com|cc|online))/(?:streaming|embed(?:plus)?|ajax|load)(?:\.php)?\?id=([a-zA-Z0-9-]+)'
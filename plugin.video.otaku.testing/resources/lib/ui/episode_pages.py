@@ -0,0 +1,45 @@
+"""
+Paging for long episode lists.
+
+A show with more episodes than fit on one page is listed as an index of episode ranges instead of
+one directory holding every episode. Ranges follow the TVDB seasons AniZip maps the episodes to,
+which for long running shows are their story arcs, and a season longer than a page is split into
+page sized ranges. Nothing here talks to Kodi.
+"""
+PAGE_SIZE = 100
+
+
+def page_ranges(numbers, page_size=PAGE_SIZE, seasons=None):
+    """
+    [(season, first, last)] covering the sorted episode numbers, at most page_size episodes each.
+    seasons maps episode numbers to their season; an episode it does not map stays in the range
+    before it. season is None when seasons is empty.
+    """
+    ranges = []
+    season = count = None
+    for number in numbers:
+        if seasons:
+            season = seasons.get(number, season)
+        if ranges and ranges[-1][0] == season and count < page_size:
+            ranges[-1][2] = number
+            count += 1
+        else:
+            ranges.append([season, number, number])
+            count = 1
+    return [tuple(r) for r in ranges]
+
+
+def page_of(ranges, number):
+    """1-based index of the range holding episode number, or None"""
+    for page, (_, first, last) in enumerate(ranges, 1):
+        if first <= number <= last:
+            return page
+    return None
+
+
+def next_unwatched(items):
+    """The first episode item not marked watched, or None when all of them are"""
+    for item in items:
+        if item['info'].get('playcount') != 1:
+            return item
+    return None
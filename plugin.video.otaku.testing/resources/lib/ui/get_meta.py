@@ -1,8 +1,19 @@
-import concurrent.futures
+import asyncio
 import random
+import threading
+import time
 
 from resources.lib.endpoints import fanart, tmdb, tvdb
-from resources.lib.ui import database, control
+from resources.lib.ui import async_client, database, control
+
+# source: (endpoint module, host its lookups run against in async_client)
+SOURCES = {
+    'fanart': (fanart, 'webservice.fanart.tv'),
+    'tmdb': (tmdb, 'api.themoviedb.org'),
+    'tvdb': (tvdb, 'api4.thetvdb.com'),
+}
+# artwork.preference: sources to query; any other value queries all of them
+PREFERENCE_SOURCES = {0: ['fanart'], 1: ['tmdb'], 2: ['tvdb']}
 
 
 def collect_meta(anime_list, lightweight=False):
@@ -39,20 +50,14 @@ def collect_meta(anime_list, lightweight=False):
                 mtype = 'tv'
             anime_to_fetch.append((mal_id, mtype))
 
-    # Fetch metadata in parallel with controlled thread pool (max 8 workers)
     if anime_to_fetch:
         # Fetch AniList banners in batch if enabled
         banner_map = {}
         if control.getBool('artwork.banner'):
             mal_ids = [mal_id for mal_id, _ in anime_to_fetch]
-            from resources.lib.endpoints.anilist import Anilist
-            anilist = Anilist()
-            banner_map = anilist.get_banners_batch(mal_ids)
-
-        with concurrent.futures.ThreadPoolExecutor(max_workers=8) as executor:
-            futures = [executor.submit(update_meta, mal_id, mtype, banner_map.get(mal_id)) for mal_id, mtype in anime_to_fetch]
-            # Wait for all to complete
-            concurrent.futures.wait(futures)
+            from resources.lib.endpoints import enrichment
+            banner_map = enrichment.get_banners(mal_ids)
+        _update(anime_to_fetch, banner_map)
 
 
 def update_meta(mal_id, mtype='tv', anilist_banner=None):
@@ -65,92 +70,83 @@ def update_meta(mal_id, mtype='tv', anilist_banner=None):
         mtype: Media type ('tv' or 'movies')
         anilist_banner: AniList banner URL (from batch fetch) or None
     """
-    meta_ids = database.get_mappings(mal_id, 'mal_id')
-
-    # Read artwork settings
-    artwork_preference = control.getInt('artwork.preference')  # 0=Fanart-TV, 1=TMDb, 2=TVDB, 3=All
-    artwork_fanart_count = control.getInt('artwork.fanart.count')
-    artwork_fanart_enabled = control.getBool('artwork.fanart')
-    artwork_clearlogo_enabled = control.getBool('artwork.clearlogo')
-    artwork_clearart_enabled = control.getBool('artwork.clearart')
-    artwork_banner_enabled = control.getBool('artwork.banner')
-    artwork_landscape_enabled = control.getBool('artwork.landscape')
-
     # Fetch AniList banner individually if not provided from batch and banner is enabled
-    if artwork_banner_enabled and not anilist_banner:
-        from resources.lib.endpoints.anilist import Anilist
-        anilist = Anilist()
-        anilist_banner = anilist.get_banner(mal_id)
-
-    # Check if ANY artwork is enabled - if all disabled, return empty
-    if not (artwork_fanart_enabled or artwork_banner_enabled or artwork_landscape_enabled or artwork_clearlogo_enabled or artwork_clearart_enabled):
-        database.update_show_meta(mal_id, meta_ids, {})
+    if control.getBool('artwork.banner') and not anilist_banner:
+        from resources.lib.endpoints import enrichment
+        anilist_banner = enrichment.get_banners([mal_id]).get(int(mal_id))
+    _update([(mal_id, mtype)], {mal_id: anilist_banner})
+
+
+def _artwork_settings():
+    return {
+        'preference': control.getInt('artwork.preference'),  # 0=Fanart-TV, 1=TMDb, 2=TVDB, 3=All
+        'fanart_count': control.getInt('artwork.fanart.count'),
+        'fanart': control.getBool('artwork.fanart'),
+        'clearlogo': control.getBool('artwork.clearlogo'),
+        'clearart': control.getBool('artwork.clearart'),
+        'banner': control.getBool('artwork.banner'),
+        'landscape': control.getBool('artwork.landscape')
+    }
+
+
+def _fetch_art(source, meta_ids, mtype, limit):
+    try:
+        return SOURCES[source][0].getArt(meta_ids, mtype, limit=limit) or {}
+    except Exception as e:
+        control.log(f"{source} artwork fetch failed: {str(e)}")
+        return {}
+
+
+def _lookup_key(source, meta_ids, mtype):
+    # getArt only looks at these ids, so seasons sharing a TVDB/TMDB entry share one lookup
+    return source, mtype, meta_ids.get('themoviedb_id'), meta_ids.get('thetvdb_id')
+
+
+async def _fetch_all(items, sources, limit):
+    """Run every (source, id) lookup once on the shared engine; returns {lookup key: art}"""
+    engine = async_client.get_engine()
+    lookups = {}
+    for _, mtype, meta_ids in items:
+        for source in sources:
+            key = _lookup_key(source, meta_ids, mtype)
+            if key not in lookups:
+                lookups[key] = asyncio.ensure_future(engine.call(_fetch_art, source, meta_ids, mtype, limit, host=SOURCES[source][1]))
+    await asyncio.gather(*lookups.values())
+    return {key: task.result() for key, task in lookups.items()}
+
+
+def _update(anime_to_fetch, banner_map):
+    """Fetch artwork for [(mal_id, mtype)] through the shared engine and store it in one transaction"""
+    start = time.perf_counter()
+    threads_before = threading.active_count()
+    settings = _artwork_settings()
+    items = [(mal_id, mtype, database.get_mappings(mal_id, 'mal_id')) for mal_id, mtype in anime_to_fetch]
+
+    # Check if ANY artwork is enabled - if all disabled, store empty art
+    if not any(settings[name] for name in ('fanart', 'banner', 'landscape', 'clearlogo', 'clearart')):
+        database.update_show_meta_batch([(mal_id, meta_ids, {}) for mal_id, _, meta_ids in items])
         return
 
-    # Scrape art from providers based on preference (only if fanart is enabled)
-    def fetch_fanart():
-        try:
-            return fanart.getArt(meta_ids, mtype, limit=artwork_fanart_count)
-        except Exception as e:
-            control.log(f"Fanart.tv fetch failed: {str(e)}")
-            return {}
-
-    def fetch_tmdb():
-        try:
-            return tmdb.getArt(meta_ids, mtype, limit=artwork_fanart_count)
-        except Exception as e:
-            control.log(f"TMDB fetch failed: {str(e)}")
-            return {}
-
-    def fetch_tvdb():
-        try:
-            return tvdb.getArt(meta_ids, mtype, limit=artwork_fanart_count)
-        except Exception as e:
-            control.log(f"TVDB fetch failed: {str(e)}")
-            return {}
-
-    # Determine which providers to fetch from based on preference
-    fanart_art = {}
-    tmdb_art = {}
-    tvdb_art = {}
-
-    if artwork_preference == 0:  # Fanart-TV only
-        with concurrent.futures.ThreadPoolExecutor(max_workers=1) as executor:
-            fanart_future = executor.submit(fetch_fanart)
-            fanart_art = fanart_future.result()
-    elif artwork_preference == 1:  # TMDb only
-        with concurrent.futures.ThreadPoolExecutor(max_workers=1) as executor:
-            tmdb_future = executor.submit(fetch_tmdb)
-            tmdb_art = tmdb_future.result()
-    elif artwork_preference == 2:  # TVDB only
-        with concurrent.futures.ThreadPoolExecutor(max_workers=1) as executor:
-            tvdb_future = executor.submit(fetch_tvdb)
-            tvdb_art = tvdb_future.result()
-    else:  # All providers (3 or default)
-        with concurrent.futures.ThreadPoolExecutor(max_workers=3) as executor:
-            fanart_future = executor.submit(fetch_fanart)
-            tmdb_future = executor.submit(fetch_tmdb)
-            tvdb_future = executor.submit(fetch_tvdb)
-
-            # Wait for all to complete
-            concurrent.futures.wait([fanart_future, tmdb_future, tvdb_future])
-
-            fanart_art = fanart_future.result()
-            tmdb_art = tmdb_future.result()
-            tvdb_art = tvdb_future.result()
-
-    # Combine art from providers with settings applied
-    combined_art = merge_artwork(
-        fanart_art, tmdb_art, tvdb_art,
-        fanart_limit=artwork_fanart_count,
-        clearlogo_enabled=artwork_clearlogo_enabled,
-        clearart_enabled=artwork_clearart_enabled,
-        banner_enabled=artwork_banner_enabled,
-        landscape_enabled=artwork_landscape_enabled,
-        anilist_banner=anilist_banner
-    )
-
-    database.update_show_meta(mal_id, meta_ids, combined_art)
+    sources = PREFERENCE_SOURCES.get(settings['preference'], list(SOURCES))
+    results = async_client.run(_fetch_all(items, sources, settings['fanart_count']))
+
+    rows = []
+    for mal_id, mtype, meta_ids in items:
+        art = {source: results.get(_lookup_key(source, meta_ids, mtype), {}) for source in sources}
+        # Combine art from providers with settings applied
+        combined_art = merge_artwork(
+            art.get('fanart', {}), art.get('tmdb', {}), art.get('tvdb', {}),
+            fanart_limit=settings['fanart_count'],
+            clearlogo_enabled=settings['clearlogo'],
+            clearart_enabled=settings['clearart'],
+            banner_enabled=settings['banner'],
+            landscape_enabled=settings['landscape'],
+            anilist_banner=banner_map.get(mal_id) or banner_map.get(int(mal_id))
+        )
+        rows.append((mal_id, meta_ids, combined_art))
+    database.update_show_meta_batch(rows)
+    control.log(f'Artwork: {len(items)} shows, {len(results)} lookups for {len(items) * len(sources)} requested, '
+                f'{max(0, threading.active_count() - threads_before)} new threads, wall={time.perf_counter() - start:.2f}s')
 
 
 def merge_artwork(fanart_art, tmdb_art, tvdb_art, fanart_limit=1,
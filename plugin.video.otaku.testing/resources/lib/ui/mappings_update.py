@@ -0,0 +1,189 @@
+"""
+Conditional, streamed and atomic updates of mappings.db.
+
+The download is sent with the ETag/Last-Modified of the current file, so an unchanged database is
+not downloaded again. A new file is streamed to a temporary file next to mappings.db, checked
+with PRAGMA integrity_check and against the columns the addon reads, and only then swapped in with
+os.replace, so readers never see a partially written database. Optionally the changed rows are
+applied to the live database by mal_id instead of replacing the file.
+"""
+import os
+import sqlite3
+import urllib.error
+import urllib.request
+
+from resources.lib.ui import control
+
+URL = 'https://github.com/Goldenfreddy0703/Otaku-Mappings/raw/refs/heads/main/anime_mappings.db'
+CHUNK_SIZE = 256 * 1024
+TIMEOUT = 60
+REQUIRED_COLUMNS = {'mal_id', 'mal_dub_id', 'anilist_id', 'kitsu_id', 'anidb_id', 'simkl_id',
+                    'thetvdb_id', 'themoviedb_id', 'imdb_id', 'trakt_id'}
+
+UNCHANGED, REPLACED, PATCHED = 'unchanged', 'replaced', 'patched'
+
+
+class MappingsError(Exception):
+    pass
+
+
+def _connect(path):
+    return sqlite3.connect(path, timeout=60)
+
+
+def read_validators(path):
+    """(etag, last_modified) stored with a mappings database, or (None, None)"""
+    if not os.path.exists(path):
+        return None, None
+    conn = _connect(path)
+    try:
+        row = conn.execute('SELECT etag, modified FROM mappings_meta').fetchone()
+        return tuple(row) if row else (None, None)
+    except sqlite3.Error:
+        return None, None
+    finally:
+        conn.close()
+
+
+def write_validators(conn, etag, modified):
+    conn.execute('CREATE TABLE IF NOT EXISTS mappings_meta (etag TEXT, modified TEXT)')
+    conn.execute('DELETE FROM mappings_meta')
+    conn.execute('INSERT INTO mappings_meta (etag, modified) VALUES (?, ?)', (etag, modified))
+
+
+def table_sql(conn, table='anime'):
+    row = conn.execute("SELECT sql FROM sqlite_master WHERE type='table' AND name=?", (table,)).fetchone()
+    return row[0] if row else None
+
+
+def validate(path):
+    """Raise MappingsError unless path is an intact mappings database with the columns the addon reads"""
+    try:
+        conn = _connect(path)
+    except sqlite3.Error as e:
+        raise MappingsError(f'cannot open download: {e}')
+    try:
+        result = conn.execute('PRAGMA integrity_check').fetchone()[0]
+        if result != 'ok':
+            raise MappingsError(f'integrity_check: {result}')
+        columns = {row[1] for row in conn.execute('PRAGMA table_info(anime)')}
+        missing = REQUIRED_COLUMNS - columns
+        if missing:
+            raise MappingsError(f'anime table is missing {", ".join(sorted(missing))}')
+        if not conn.execute('SELECT 1 FROM anime LIMIT 1').fetchone():
+            raise MappingsError('anime table is empty')
+    except sqlite3.DatabaseError as e:
+        raise MappingsError(f'not a valid database: {e}')
+    finally:
+        conn.close()
+
+
+def download(url, dest, etag=None, modified=None):
+    """
+    Stream url to dest. Returns (etag, last_modified) of the response, or None if the server
+    answered 304 Not Modified.
+    """
+    headers = {'User-Agent': 'Otaku'}
+    if etag:
+        headers['If-None-Match'] = etag
+    if modified:
+        headers['If-Modified-Since'] = modified
+    try:
+        response = urllib.request.urlopen(urllib.request.Request(url, headers=headers), timeout=TIMEOUT)
+    except urllib.error.HTTPError as e:
+        if e.code == 304:
+            return None
+        raise
+    with response:
+        expected = response.headers.get('Content-Length')
+        written = 0
+        with open(dest, 'wb') as file:
+            while True:
+                chunk = response.read(CHUNK_SIZE)
+                if not chunk:
+                    break
+                file.write(chunk)
+                written += len(chunk)
+            file.flush()
+            os.fsync(file.fileno())
+        if expected and int(expected) != written:
+            raise MappingsError(f'short download: {written} of {expected} bytes')
+        return response.headers.get('ETag'), response.headers.get('Last-Modified')
+
+
+def apply_diff(new_path, live_path):
+    """
+    Bring the live anime table in line with new_path by mal_id in one transaction.
+    Returns (removed, added) row counts. Raises MappingsError if the table layouts differ.
+    """
+    conn = _connect(live_path)
+    try:
+        conn.execute('ATTACH DATABASE ? AS new', (new_path,))
+        new_sql = conn.execute("SELECT sql FROM new.sqlite_master WHERE type='table' AND name='anime'").fetchone()
+        if not new_sql or new_sql[0] != table_sql(conn):
+            raise MappingsError('anime table layout changed')
+        with conn:
+            # Every mal_id whose rows differ in any way is rewritten from the new database
+            conn.execute('CREATE TEMP TABLE changed AS '
+                         'SELECT mal_id FROM (SELECT * FROM main.anime EXCEPT SELECT * FROM new.anime) '
+                         'UNION SELECT mal_id FROM (SELECT * FROM new.anime EXCEPT SELECT * FROM main.anime)')
+            removed = conn.execute('DELETE FROM main.anime WHERE mal_id IN (SELECT mal_id FROM temp.changed) '
+                                   'OR (mal_id IS NULL AND EXISTS (SELECT 1 FROM temp.changed WHERE mal_id IS NULL))').rowcount
+            added = conn.execute('INSERT INTO main.anime SELECT * FROM new.anime WHERE mal_id IN (SELECT mal_id FROM temp.changed) '
+                                 'OR (mal_id IS NULL AND EXISTS (SELECT 1 FROM temp.changed WHERE mal_id IS NULL))').rowcount
+            write_validators(conn, *read_validators(new_path))
+            conn.execute('DROP TABLE temp.changed')
+        conn.execute('DETACH DATABASE new')
+        return removed, added
+    except sqlite3.Error as e:
+        raise MappingsError(f'diff failed: {e}')
+    finally:
+        conn.close()
+
+
+def update(url=URL, path=None, diff=None):
+    """
+    Update mappings.db from url. Returns UNCHANGED, REPLACED or PATCHED, or None if the update failed
+    and the current database was left in place.
+    """
+    path = path or control.mappingDB
+    diff = control.getBool('general.mappings.diff') if diff is None else diff
+    tmp = f'{path}.download'
+    live_ok = os.path.exists(path)
+    etag, modified = read_validators(path) if live_ok else (None, None)
+    try:
+        validators = download(url, tmp, etag, modified)
+        if validators is None:
+            return UNCHANGED
+        validate(tmp)
+        conn = _connect(tmp)
+        with conn:
+            write_validators(conn, *validators)
+        conn.close()
+
+        if diff and live_ok:
+            try:
+                removed, added = apply_diff(tmp, path)
+                control.log(f'### Mappings patched: {removed} rows removed, {added} rows added')
+                return PATCHED
+            except MappingsError as e:
+                control.log(f'### Mappings diff not applied ({e}), replacing the file', 'warning')
+        try:
+            os.replace(tmp, path)
+        except OSError as e:
+            # Windows refuses to replace a file that is open; patch in place instead
+            if not live_ok:
+                raise
+            control.log(f'### Mappings file busy ({e}), applying rows instead', 'warning')
+            apply_diff(tmp, path)
+            return PATCHED
+        return REPLACED
+    except (urllib.error.URLError, OSError, MappingsError) as e:
+        control.log(f'### Failed to update mappings: {e}', 'warning')
+        return None
+    finally:
+        if os.path.exists(tmp):
+            try:
+                os.remove(tmp)
+            except OSError:
+                pass
@@ -0,0 +1,123 @@
+"""
+Event scheduler for WatchlistPlayer.
+
+Instead of several loops polling the playback position, the player registers the media times it
+cares about (intro start, outro start, watched threshold, playing next, next episode prefetch).
+The scheduler works out from the current position and speed when the next one is due, sleeps
+until then and runs it. Seeks, speed changes and pause/resume wake it early to re-sync.
+
+The timing logic only needs a clock callable and a wait callable, so it can be driven by a fake
+player clock.
+"""
+import threading
+
+MAX_SLEEP = 10  # seconds; bounds clock drift and keeps the player's current_time fresh for the resume point
+MIN_SLEEP = 0.2  # a stalled clock (buffering) must not turn an almost-due event into a busy loop
+
+
+class Event:
+    __slots__ = ('name', 'start', 'end', 'action', 'done')
+
+    def __init__(self, name, start, action, end=None):
+        self.name = name
+        self.start = start
+        self.end = end
+        self.action = action
+        self.done = False
+
+    def __repr__(self):
+        return f'Event({self.name}, {self.start}-{self.end}{", done" if self.done else ""})'
+
+
+def plan(events, position, speed, max_sleep=MAX_SLEEP):
+    """
+    Split pending events at a playback position into (due, missed, delay).
+    due: events whose window contains position; missed: events whose window has already passed
+    (the user seeked beyond it); delay: wall-clock seconds until the next pending event starts.
+    """
+    due, missed = [], []
+    delay = max_sleep
+    for event in events:
+        if event.done:
+            continue
+        if event.end is not None and position >= event.end:
+            missed.append(event)
+        elif position >= event.start:
+            due.append(event)
+        elif speed > 0:
+            delay = min(delay, max(MIN_SLEEP, (event.start - position) / speed))
+    return due, missed, delay
+
+
+class PlaybackScheduler:
+    def __init__(self, clock, active, wait=None, max_sleep=MAX_SLEEP, log=None):
+        """
+        :param clock: callable returning the playback position in seconds (raise RuntimeError once stopped)
+        :param active: callable returning False once playback has ended
+        :param wait: callable(seconds) that sleeps and returns early when wake() is called; defaults to a threading.Event
+        """
+        self.clock = clock
+        self.active = active
+        self.max_sleep = max_sleep
+        self.log = log or (lambda msg: None)
+        self.speed = 1
+        self._events = {}
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._wait = wait or self._wait_event
+
+    def _wait_event(self, seconds):
+        self._wake.wait(seconds)
+        self._wake.clear()
+
+    def wake(self):
+        self._wake.set()
+
+    def set_speed(self, speed):
+        self.speed = speed
+        self.wake()
+
+    def set_events(self, events):
+        """
+        Replace the pending events with events ({name: (start, action, end)}). Events that already
+        ran or were missed keep their state, so recomputing the set never fires one twice.
+        """
+        with self._lock:
+            for name in [name for name, event in self._events.items() if not event.done and name not in events]:
+                del self._events[name]
+            for name, (start, action, end) in events.items():
+                event = self._events.get(name)
+                if event and event.done:
+                    continue
+                self._events[name] = Event(name, start, action, end)
+        self.wake()
+
+    def pending(self):
+        with self._lock:
+            return [event for event in self._events.values() if not event.done]
+
+    def step(self):
+        """Run due events at the current position and return the seconds to wait, or None once playback stopped"""
+        try:
+            position = self.clock()
+        except RuntimeError:
+            return None
+        with self._lock:
+            due, missed, delay = plan(list(self._events.values()), position, self.speed, self.max_sleep)
+            for event in due + missed:
+                event.done = True
+        for event in missed:
+            self.log(f'[Scheduler] {event.name} window passed at {position:.0f}s')
+        for event in due:
+            self.log(f'[Scheduler] {event.name} at {position:.0f}s')
+            event.action()
+        # Actions may seek or block in a dialog, so read the clock again before sleeping
+        return 0.0 if due else delay
+
+    def run(self):
+        while self.active():
+            delay = self.step()
+            if delay is None:
+                break
+            if delay > 0:
+                self._wait(delay)
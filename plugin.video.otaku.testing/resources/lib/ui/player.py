@@ -5,13 +5,14 @@ import pickle
 import service
 import json
 
-from resources.lib.ui import control, database
+from resources.lib.ui import control, database, playback_scheduler, prefetch, stream_select
 from resources.lib.endpoints import aniskip, anime_skip
 from resources.lib import WatchlistIntegration, indexers
 
 
 playList = control.playList
 player = xbmc.Player
+AV_STARTED_TIMEOUT = 3  # seconds keepAlive waits for onAVStarted before querying the streams itself
 
 # from resources.lib import MetaBrowser
 
@@ -33,6 +34,8 @@ class WatchlistPlayer(player):
         self.context = False
         self._monitor = None
         self._skip_processed = False
+        self._state_changed = threading.Event()
+        self._scheduler = playback_scheduler.PlaybackScheduler(self._position, self.isPlaying, log=control.log)
 
         self.total_time = None
         self.delay_time = control.getInt('skipintro.delay')
@@ -50,10 +53,18 @@ class WatchlistPlayer(player):
         self.skipintro_offset = control.getInt('skipintro.aniskip.offset')
         self.skipoutro_offset = control.getInt('skipoutro.aniskip.offset')
 
-        self.preferred_audio = control.getInt('general.audio')
-        self.preferred_subtitle_setting = control.getInt('general.subtitles')
-        self.preferred_subtitle_type = control.getInt('subtitles.types')
-        self.preferred_subtitle_keyword = control.getInt('subtitles.keywords')
+        self.stream_settings = {
+            'general.audio': control.getInt('general.audio'),
+            'general.subtitles': control.getInt('general.subtitles'),
+            'general.subtitles.type': control.getBool('general.subtitles.type'),
+            'subtitles.types': control.getInt('subtitles.types'),
+            'general.subtitles.keyword': control.getBool('general.subtitles.keyword'),
+            'subtitles.keywords': control.getInt('subtitles.keywords'),
+            'subtitles.customkeyword': control.getSetting('subtitles.customkeyword')
+        }
+        self._av_started = threading.Event()
+        self._streams_lock = threading.Lock()
+        self._streams_done = False
 
     def handle_player(self, mal_id, watchlist_update, episode, resume, path, type, provider, context, source_skip_data=None):
         self.mal_id = mal_id
@@ -88,13 +99,17 @@ class WatchlistPlayer(player):
                     self.process_embed('hianime')
 
                 # AniSkip APIs as fallback for torrents or missing embed data
-                self.process_aniskip()
-                self.process_animeskip()
+                # (started concurrently by the resolver before the player opened)
+                skip_times = prefetch.get_skip_times(self.mal_id, self.episode)
+                self.process_aniskip(skip_times)
+                self.process_animeskip(skip_times)
                 self._skip_processed = True
             except Exception as e:
                 control.log(f'Error processing skip times: {e}', 'error')
+            # Skip windows found after playback started still get scheduled
+            if self.total_time:
+                self._schedule_events()
 
-        import threading
         threading.Thread(target=_process, daemon=True).start()
 
     def process_source_skip_data(self):
@@ -120,7 +135,29 @@ class WatchlistPlayer(player):
                 self.skipoutro_aniskip = True
                 control.log(f'Source skip outro set: {self.skipoutro_start}-{self.skipoutro_end}', 'debug')
 
+    def onAVStarted(self):
+        # Streams are parsed by the time AV has started, so they can be queried without retries
+        self._av_started.set()
+        self._on_state_changed()
+        self._setup_streams_once()
+
+    def onPlayBackSeek(self, time, seekOffset):
+        self._scheduler.wake()
+
+    def onPlayBackSeekChapter(self, chapter):
+        self._scheduler.wake()
+
+    def onPlayBackSpeedChanged(self, speed):
+        self._scheduler.set_speed(speed)
+
+    def onPlayBackPaused(self):
+        self._scheduler.set_speed(0)
+
+    def onPlayBackResumed(self):
+        self._scheduler.set_speed(1)
+
     def onPlayBackStopped(self):
+        self._on_state_changed()
         control.closeAllDialogs()
         playList.clear()
         if self.context and self.path:
@@ -141,9 +178,11 @@ class WatchlistPlayer(player):
                 control.jsonrpc(query)
 
     def onPlayBackEnded(self):
+        self._on_state_changed()
         control.closeAllDialogs()
 
     def onPlayBackError(self):
+        self._on_state_changed()
         control.closeAllDialogs()
         playList.clear()
 
@@ -198,10 +237,10 @@ class WatchlistPlayer(player):
             control.log('[Player] User skipped or cancelled rating', 'info')
 
     def onWatchedPercent(self):
-        if not self._watchlist_update:
+        """Update the watchlist once playback passes watchlist.update.percent (run by the scheduler)"""
+        if not self._watchlist_update or self.updated:
             return
 
-        # Cache show data to avoid repeated database calls
         show = database.get_show(self.mal_id)
         if not show:
             return
@@ -210,53 +249,36 @@ class WatchlistPlayer(player):
         status = kodi_meta.get('status')
         episodes = kodi_meta.get('episodes')
 
-        while self.isPlaying() and not self.updated:
-            self.current_time = self.getTime()
-            watched_percentage = (self.current_time / self.total_time) * 100 if self.total_time != 0 else 0
-
-            if watched_percentage > self.update_percent:
-                self._watchlist_update(self.mal_id, self.episode)
-                self.updated = True
-
-                # Update watchlist status based on completion
-                control.log(f'[Player] Checking completion: episode={self.episode}, total_episodes={episodes}, status={status}', 'info')
-                if self.episode == episodes and status in ['Finished Airing', 'FINISHED']:
-                    control.log('[Player] Last episode of finished anime - marking completed', 'info')
-                    WatchlistIntegration.set_watchlist_status(self.mal_id, 'completed')
-                    WatchlistIntegration.set_watchlist_status(self.mal_id, 'COMPLETED')
-                    # Run sync in background to avoid blocking playback
-                    threading.Thread(target=lambda: (xbmc.sleep(3000), service.sync_watchlist(True)), daemon=True).start()
-                    # Prompt user to rate the anime if enabled
-                    rating_prompt_enabled = control.getBool('watchlist.rating.prompt')
-                    control.log(f'[Player] Rating prompt enabled: {rating_prompt_enabled}', 'info')
-                    if rating_prompt_enabled:
-                        title = kodi_meta.get('title_userPreferred', 'this anime')
-                        control.log(f'[Player] Launching rating prompt for {title}', 'info')
-                        threading.Thread(target=self._show_rating_prompt, args=(self.mal_id, title), daemon=True).start()
-                else:
-                    control.log('[Player] Not last episode or not finished - marking watching', 'info')
-                    WatchlistIntegration.set_watchlist_status(self.mal_id, 'watching')
-                    WatchlistIntegration.set_watchlist_status(self.mal_id, 'current')
-                    WatchlistIntegration.set_watchlist_status(self.mal_id, 'CURRENT')
-                break
-            xbmc.sleep(10000)  # Check every 10 seconds instead of 5
+        self._watchlist_update(self.mal_id, self.episode)
+        self.updated = True
+        from resources.lib import MetaBrowser
+        MetaBrowser.clear_episode_list(self.mal_id)
+
+        # Update watchlist status based on completion
+        control.log(f'[Player] Checking completion: episode={self.episode}, total_episodes={episodes}, status={status}', 'info')
+        if self.episode == episodes and status in ['Finished Airing', 'FINISHED']:
+            control.log('[Player] Last episode of finished anime - marking completed', 'info')
+            WatchlistIntegration.set_watchlist_status(self.mal_id, 'completed')
+            WatchlistIntegration.set_watchlist_status(self.mal_id, 'COMPLETED')
+            # Run sync in background to avoid blocking playback
+            threading.Thread(target=lambda: (xbmc.sleep(3000), service.sync_watchlist(True)), daemon=True).start()
+            # Prompt user to rate the anime if enabled
+            rating_prompt_enabled = control.getBool('watchlist.rating.prompt')
+            control.log(f'[Player] Rating prompt enabled: {rating_prompt_enabled}', 'info')
+            if rating_prompt_enabled:
+                title = kodi_meta.get('title_userPreferred', 'this anime')
+                control.log(f'[Player] Launching rating prompt for {title}', 'info')
+                threading.Thread(target=self._show_rating_prompt, args=(self.mal_id, title), daemon=True).start()
+        else:
+            control.log('[Player] Not last episode or not finished - marking watching', 'info')
+            WatchlistIntegration.set_watchlist_status(self.mal_id, 'watching')
+            WatchlistIntegration.set_watchlist_status(self.mal_id, 'current')
+            WatchlistIntegration.set_watchlist_status(self.mal_id, 'CURRENT')
 
     def keepAlive(self):
-        # Monitor the Playback with optimized wait
-        self._monitor = Monitor()
-        for i in range(40):  # Increased attempts but shorter waits
-            if self._monitor.playback_stopped:
-                del self._monitor
-                return control.log('playback_stopped', 'warning')
-            if self.isPlayingVideo() and self.getTotalTime() != 0:
-                break
-            self._monitor.waitForAbort(0.5)  # Check every 0.5 seconds
-
-        # Check if the player is playing a video
-        if not self.isPlayingVideo():
-            if self._monitor:
-                del self._monitor
-            control.log('Failed to start video playback', 'warning')
+        self._monitor = Monitor(self._on_state_changed)
+        if not self._wait_for_playback():
+            del self._monitor
             return
 
         # Grab the seek time if available
@@ -291,354 +313,152 @@ class WatchlistPlayer(player):
         else:
             control.log(f'Last watched unchanged ({current_mal_id}) - skipping updates')
 
-        # Continue with audio/subtitle setup
-        # For debrid sources, wait a moment for Kodi to parse embedded streams
-        if self.type not in ['embed', 'direct']:
-            # Wait for streams to be fully loaded for debrid/torrent sources
-            xbmc.sleep(300)  # Reduced from 500ms for faster playback start
-            self.setup_audio_and_subtitles()
-        elif self.provider in ['aniwave', 'h!anime']:
-            self.setup_audio_and_subtitles()
-
-        # Handle different media types
-        control.log(f'Media type handling: episodes={self.episodes}, media_type={self.media_type}', 'debug')
-        if self.episodes:
-            # Handle playlist building if needed
-            if self.media_type == 'episode' and playList.size() == 1:
-                self.build_playlist()
-
-            # Handle skip intro functionality
-            self._handle_skip_intro()
+        # The resolver's monitor usually sees OnAVStart before this player exists, so onAVStarted only
+        # fires here for slow starts; wait for it only while Kodi has not listed any streams yet
+        if self._wants_stream_setup():
+            if not self._av_started.is_set() and not self._streams_listed():
+                if not self._av_started.wait(AV_STARTED_TIMEOUT):
+                    control.log('onAVStarted not received, setting up streams anyway', 'debug')
+            self._setup_streams_once()
 
-            # Handle watchlist updates for episodes
-            self.onWatchedPercent()
+        if self.episodes and self.media_type == 'episode' and playList.size() == 1:
+            self.build_playlist()
 
-            # Handle outro/playing next functionality
-            self._handle_outro_and_playing_next()
-        else:
-            self.onWatchedPercent()
-
-        # Optimized playback monitoring with longer sleep intervals
-        while self.isPlaying():
-            self.current_time = int(self.getTime())
-            xbmc.sleep(10000)  # Reduced frequency from 5s to 10s
+        # One scheduler replaces the intro, watched, outro and prefetch polling loops
+        self.current_time = int(self.getTime())
+        self._schedule_events()
+        self._scheduler.run()
 
         # Cleanup
         if self._monitor:
             del self._monitor
 
-    def _handle_skip_intro(self):
-        """Handle skip intro functionality - only when real skip data exists"""
-        control.log(f'_handle_skip_intro: skipintrodialog={control.getBool("smartplay.skipintrodialog")}, auto={self.skipintro_aniskip_auto}', 'debug')
-        # Only proceed if skip intro dialog is enabled OR auto-skip is enabled
-        if not (control.getBool('smartplay.skipintrodialog') or self.skipintro_aniskip_auto):
-            return
+    def _on_state_changed(self):
+        self._state_changed.set()
+        self._scheduler.wake()
 
-        # Wait for skip times to be processed (with timeout)
-        timeout = 100  # 100 iterations = 10 seconds max
-        while not self._skip_processed and timeout > 0:
-            xbmc.sleep(100)
-            timeout -= 1
+    def _wait_for_playback(self, timeout=20):
+        """Wait for onAVStarted (or a stop) instead of polling; False if playback never started"""
+        for _ in range(timeout):
+            if self._monitor.playback_stopped or self._monitor.abortRequested():
+                control.log('playback_stopped', 'warning')
+                return False
+            if self.isPlayingVideo() and self.getTotalTime() != 0:
+                return True
+            # onAVStarted may have fired before this player existed, so re-check every second as well
+            self._state_changed.wait(1)
+            self._state_changed.clear()
+        if not self.isPlayingVideo():
+            control.log('Failed to start video playback', 'warning')
+            return False
+        return True
 
-        if not self._skip_processed:
-            control.log('Skip times processing timed out', 'warning')
+    def _position(self):
+        position = self.getTime()
+        self.current_time = int(position)
+        return position
 
-        # Only proceed if we have real skip data - don't use user defaults
-        if not self.skipintro_aniskip:
-            control.log('No skip intro data found, skipping intro dialog', 'debug')
-            return
+    def _schedule_events(self):
+        """(Re)compute the media times the scheduler wakes up for from the current skip data and settings"""
+        events = {}
+        if self._watchlist_update and not self.updated:
+            events['watched'] = (self.total_time * self.update_percent / 100, self.onWatchedPercent, None)
 
-        intro_start = self.skipintro_start
-        intro_end = self.skipintro_end
-
-        control.log(f'Intro monitoring: aniskip={self.skipintro_aniskip}, start={intro_start}, end={intro_end}', 'debug')
-
-        # Optimized monitoring - check less frequently
-        while self.isPlaying():
-            self.current_time = int(self.getTime())
-            if self.current_time > intro_end:
-                break
-            elif self.current_time > intro_start:
-                # Auto skip if enabled
-                if self.skipintro_aniskip_auto:
-                    self.seekTime(intro_end)
-                    control.log(f'Auto-skipped intro: {intro_start}-{intro_end}', 'debug')
+        if self.episodes:
+            if control.getBool('general.prefetch.next') and int(self.episode) < len(self.episodes):
+                events['prefetch'] = (self.total_time * prefetch.NEXT_EPISODE_FRACTION, self._prefetch_next_episode, None)
+
+            # Only real skip data shows the intro dialog - never the user defaults
+            if self.skipintro_aniskip and (control.getBool('smartplay.skipintrodialog') or self.skipintro_aniskip_auto):
+                events['intro'] = (self.skipintro_start, self._skip_intro, self.skipintro_end)
+
+            playnext_time = control.getInt('playingnext.time') if control.getBool('smartplay.playingnextdialog') else 0
+            if self.skipoutro_aniskip and self.skipoutro_start > 0:
+                outro_end = self.skipoutro_end if self.skipoutro_end > 0 else None
+                if self.skipoutro_aniskip_auto:
+                    events['outro'] = (self.skipoutro_start, self._skip_outro, outro_end)
                 else:
-                    # Show skip intro dialog
-                    PlayerDialogs().show_skip_intro(self.skipintro_aniskip, intro_end)
-                break
-            xbmc.sleep(2000)  # Check every 2 seconds
-
-    def _handle_outro_and_playing_next(self):
-        """Handle outro skip and playing next functionality with fallbacks - optimized"""
-        # Get user's playing next setting
-        playnext_enabled = control.getBool('smartplay.playingnextdialog')
-        playnext_time = control.getInt('playingnext.time') if playnext_enabled else 0
-
-        # Proceed if: playnext is enabled OR outro auto-skip is enabled
-        if not (playnext_time > 0 or self.skipoutro_aniskip_auto):
-            return
+                    events['outro'] = (self.skipoutro_start, lambda: PlayerDialogs().display_dialog(True, self.skipoutro_end), outro_end)
+            elif playnext_time > 0:
+                events['playnext'] = (self.total_time - playnext_time, lambda: PlayerDialogs().display_dialog(False, 0), None)
 
-        while self.isPlaying():
-            self.current_time = int(self.getTime())
-            time_remaining = self.total_time - self.current_time
-
-            # Handle auto skip outro (only if we have aniskip data)
-            if self.skipoutro_aniskip_auto and self.skipoutro_aniskip and self.current_time >= self.skipoutro_start and self.skipoutro_start > 0:
-                if self.skipoutro_end > 0:
-                    self.seekTime(self.skipoutro_end)
-                    control.log(f'Auto-skipped outro: {self.skipoutro_start}-{self.skipoutro_end}')
-                break
-
-            # Handle dialog display
-            elif self._should_show_dialog(time_remaining, playnext_time):
-                if self.skipoutro_aniskip and not self.skipoutro_aniskip_auto:
-                    # Show skip outro dialog
-                    PlayerDialogs().display_dialog(True, self.skipoutro_end)
-                elif not self.skipoutro_aniskip and playnext_time > 0:
-                    # Show regular playing next dialog
-                    PlayerDialogs().display_dialog(False, 0)
-                break
-
-            xbmc.sleep(5000)  # Check every 5 seconds
-
-    def _should_show_dialog(self, time_remaining, playnext_time):
-        """Determine if we should show a dialog - simplified"""
-        if self.skipoutro_aniskip and not self.skipoutro_aniskip_auto:
-            return self.current_time >= self.skipoutro_start and self.skipoutro_start > 0
-        elif not self.skipoutro_aniskip and playnext_time > 0:
-            return time_remaining <= playnext_time
-        return False
+        control.log(f'[Player] Scheduled: {", ".join(f"{name}@{event[0]:.0f}s" for name, event in events.items()) or "nothing"}', 'debug')
+        self._scheduler.set_events(events)
 
-    def setup_audio_and_subtitles(self):
-        """Handle audio and subtitle setup with retry logic for debrid sources"""
-        control.log('setup_audio_and_subtitles called', 'debug')
-        if not control.getBool('general.kodi_language'):
-            query = {
-                'jsonrpc': '2.0',
-                "method": "Player.GetProperties",
-                "params": {
-                    "playerid": 1,
-                    "properties": ["subtitles", "audiostreams", "currentaudiostream", "currentsubtitle"]
-                },
-                "id": 1
-            }
+    def _prefetch_next_episode(self):
+        """Warm sources for the next episode once playback is two-thirds of the way through"""
+        threading.Thread(target=prefetch.warm_next_episode, args=(self.mal_id, int(self.episode) + 1), daemon=True).start()
 
-            audios = ['jpn', 'eng']
+    def _skip_intro(self):
+        if self.skipintro_aniskip_auto:
+            self.seekTime(self.skipintro_end)
+            control.log(f'Auto-skipped intro: {self.skipintro_start}-{self.skipintro_end}', 'debug')
+        else:
+            PlayerDialogs().show_skip_intro(self.skipintro_aniskip, self.skipintro_end)
 
-            subtitles = [
-                "none", "eng", "jpn", "spa", "fre", "ger",
-                "ita", "dut", "rus", "por", "kor", "chi",
-                "ara", "hin", "tur", "pol", "swe", "nor",
-                "dan", "fin"
-            ]
+    def _skip_outro(self):
+        if self.skipoutro_end > 0:
+            self.seekTime(self.skipoutro_end)
+            control.log(f'Auto-skipped outro: {self.skipoutro_start}-{self.skipoutro_end}')
 
-            types = [
-                "isdefault", "isforced", "isimpaired"
-            ]
+    def _streams_listed(self):
+        """True once Kodi has parsed the streams of the playing video"""
+        return self.isPlayingVideo() and bool(self.getAvailableAudioStreams() or self.getAvailableSubtitleStreams())
 
-            keywords = {
-                1: 'dialogue',
-                2: ['signs', 'songs'],
-                3: control.getSetting('subtitles.customkeyword')
-            }
+    def _wants_stream_setup(self):
+        # Debrid/torrent files carry several embedded tracks; of the embeds only these do
+        return self.type not in ['embed', 'direct'] or self.provider in ['aniwave', 'h!anime']
 
-            # Retry logic for getting streams (debrid sources may need time to load)
-            audio_streams = []
-            subtitle_streams = []
-            current_audio_stream = {}
-            current_subtitle_stream = {}
-            for attempt in range(3):
-                response = control.jsonrpc(query)
-                if 'result' in response:
-                    player_properties = response['result']
-                    audio_streams = player_properties.get('audiostreams', [])
-                    subtitle_streams = player_properties.get('subtitles', [])
-                    current_audio_stream = player_properties.get('currentaudiostream', {})
-                    current_subtitle_stream = player_properties.get('currentsubtitle', {})
-                    # If we have streams, we're good
-                    if audio_streams or subtitle_streams:
-                        control.log(f'Found {len(audio_streams)} audio and {len(subtitle_streams)} subtitle streams', 'debug')
-                        control.log(f'Current audio: {current_audio_stream}, Current subtitle: {current_subtitle_stream}', 'debug')
-                        break
-                # Wait before retry (shorter delay)
-                if attempt < 2:
-                    xbmc.sleep(300)
-
-            if not audio_streams and not subtitle_streams:
-                control.log('No audio/subtitle streams found after retries', 'warning')
+    def _setup_streams_once(self):
+        """Run setup_audio_and_subtitles once per playback, from onAVStarted or keepAlive, whichever comes first"""
+        with self._streams_lock:
+            if self._streams_done or not self._wants_stream_setup():
                 return
+            self._streams_done = True
+        self.setup_audio_and_subtitles()
 
-            preferred_audio_streams = audios[self.preferred_audio]
-            preferred_subtitle_lang = subtitles[self.preferred_subtitle_setting]
-            preffeded_subtitle_type = types[self.preferred_subtitle_type]
-            preffeded_subtitle_keyword = keywords[self.preferred_subtitle_keyword]
-
-            # Find target audio stream
-            target_audio_index = None
-            for stream in audio_streams:
-                if stream['language'] == preferred_audio_streams:
-                    target_audio_index = stream['index']
-                    break
-
-            # If preferred not found, check if default or first stream matches what we'd select anyway
-            if target_audio_index is None:
-                for stream in audio_streams:
-                    if stream.get('isdefault', False):
-                        target_audio_index = stream['index']
-                        break
-                else:
-                    target_audio_index = audio_streams[0]['index'] if audio_streams else None
-
-            # Only switch if we found a preferred language stream AND it's different from current
-            # This avoids restarting audio when there's no benefit
-            preferred_found = any(s['language'] == preferred_audio_streams for s in audio_streams)
-            # Get current audio stream index from JSON-RPC response
-            current_audio = current_audio_stream.get('index')
-
-            if preferred_found and target_audio_index is not None and target_audio_index != current_audio:
-                self.setAudioStream(target_audio_index)
-                control.log(f'Audio stream set to {target_audio_index} ({preferred_audio_streams}), was {current_audio}', 'debug')
-            elif preferred_found:
-                control.log(f'Audio stream already at {current_audio} ({preferred_audio_streams}), skipping', 'debug')
-            else:
-                control.log(f'No preferred audio ({preferred_audio_streams}) found, keeping default', 'debug')
-
-            # Set preferred subtitle stream
-            subtitle_int = None
-
-            # Lowercase preferred keyword(s) like sub_name_lower
-            if isinstance(preffeded_subtitle_keyword, list):
-                preffeded_subtitle_keyword = [kw.lower() for kw in preffeded_subtitle_keyword if isinstance(kw, str)]
-            elif isinstance(preffeded_subtitle_keyword, str):
-                preffeded_subtitle_keyword = preffeded_subtitle_keyword.lower()
-
-            # Log available subtitle streams for debugging
-            control.log(f'Available subtitle streams: {[(s.get("index"), s.get("language"), s.get("name")) for s in subtitle_streams]}', 'debug')
-
-            # Helper to detect partial subs (signs/songs/forced - not full dialogue)
-            import re
-            partial_sub_pattern = re.compile(
-                r'[\(\[]?\s*(signs?|songs?|s&s|signs?\s*[/&]\s*songs?|forced)\s*[\)\]]?'
-                r'|signs?\s+only|songs?\s+only|^forced$',
-                re.IGNORECASE
-            )
-
-            def is_partial_sub(name):
-                """Check if subtitle is partial (signs/songs/forced - not full dialogue)"""
-                if not name:
-                    return False
-                if re.search(r'dialogue|full', name, re.IGNORECASE):
-                    return False
-                return bool(partial_sub_pattern.search(name))
-
-            # Type and Keyword filtering
-            control.log(f'Keyword filter: {control.getBool("general.subtitles.keyword")}, Type filter: {control.getBool("general.subtitles.type")}, Keyword: {preffeded_subtitle_keyword}', 'debug')
-            if control.getBool('general.subtitles.keyword') or control.getBool('general.subtitles.type'):
-                for sub in subtitle_streams:
-                    sub_name = sub.get('name', '')
-
-                    # Skip signs-only subs in type/keyword matching (unless explicitly looking for signs)
-                    if is_partial_sub(sub_name):
-                        looking_for_signs = isinstance(preffeded_subtitle_keyword, list) and any(kw in ['signs', 'songs'] for kw in preffeded_subtitle_keyword)
-                        if not looking_for_signs:
-                            continue
-
-                    # Check for type match
-                    if control.getBool('general.subtitles.type'):
-                        if sub['language'] == preferred_subtitle_lang:
-                            if sub[preffeded_subtitle_type]:
-                                subtitle_int = sub['index']
-                                control.log(f'Type matched: {sub_name}', 'debug')
-                                break
-
-                    # Check for keyword match
-                    if control.getBool('general.subtitles.keyword'):
-                        if sub['language'] == preferred_subtitle_lang:
-                            sub_name_lower = sub_name.lower()
-                            if isinstance(preffeded_subtitle_keyword, list):
-                                if any(kw in sub_name_lower for kw in preffeded_subtitle_keyword):
-                                    subtitle_int = sub['index']
-                                    control.log(f'Keyword matched: {sub_name}', 'debug')
-                                    break
-                            elif preffeded_subtitle_keyword and preffeded_subtitle_keyword in sub_name_lower:
-                                subtitle_int = sub['index']
-                                control.log(f'Keyword matched: {sub_name}', 'debug')
-                                break
-
-                # fallback to first of preferred language if no type or keyword match
-                # Skip signs-only subs
-                if subtitle_int is None:
-                    for sub in subtitle_streams:
-                        if sub['language'] == preferred_subtitle_lang:
-                            if not is_partial_sub(sub.get('name', '')):
-                                subtitle_int = sub['index']
-                                control.log(f'Selected full dialogue sub: {sub.get("name")}', 'debug')
-                                break
-                    # Final fallback - any matching language
-                    if subtitle_int is None:
-                        for sub in subtitle_streams:
-                            if sub['language'] == preferred_subtitle_lang:
-                                subtitle_int = sub['index']
-                                control.log(f'Fallback to sub: {sub.get("name")}', 'debug')
-                                break
-            else:
-                # No type filter or keyword filter - prefer full dialogue subs over signs/songs
-                # First pass: find preferred language, skip signs-only subs
-                for sub in subtitle_streams:
-                    if sub['language'] == preferred_subtitle_lang:
-                        sub_name = sub.get('name', '')
-                        if not is_partial_sub(sub_name):
-                            subtitle_int = sub['index']
-                            control.log(f'Selected full dialogue sub: {sub_name}', 'debug')
-                            break
-
-                # Second pass: if no full dialogue found, take any with preferred language
-                if subtitle_int is None:
-                    for sub in subtitle_streams:
-                        if sub['language'] == preferred_subtitle_lang:
-                            subtitle_int = sub['index']
-                            control.log(f'Fallback to sub: {sub.get("name")}', 'debug')
-                            break
-
-            if subtitle_int is None:
-                # default-subtitle fallback
-                for sub in subtitle_streams:
-                    if sub.get('isdefault', False):
-                        subtitle_int = sub['index']
-                        break
-                else:
-                    # If no default subtitle stream is found, set to the first available subtitle stream
-                    subtitle_int = subtitle_streams[0]['index'] if subtitle_streams else None
-
-            # Get current subtitle stream index from JSON-RPC response (already fetched above)
-            current_sub_index = current_subtitle_stream.get('index') if current_subtitle_stream else None
+    def setup_audio_and_subtitles(self):
+        """Switch to the preferred audio and subtitle streams once Kodi has parsed them"""
+        control.log('setup_audio_and_subtitles called', 'debug')
+        if control.getBool('general.kodi_language'):
+            return
+        query = {
+            'jsonrpc': '2.0',
+            "method": "Player.GetProperties",
+            "params": {
+                "playerid": 1,
+                "properties": ["subtitles", "audiostreams", "currentaudiostream", "currentsubtitle"]
+            },
+            "id": 1
+        }
+        player_properties = control.jsonrpc(query).get('result', {})
+        audio_streams = player_properties.get('audiostreams', [])
+        subtitle_streams = player_properties.get('subtitles', [])
+        if not audio_streams and not subtitle_streams:
+            control.log('No audio/subtitle streams found', 'warning')
+            return
+        current_audio = (player_properties.get('currentaudiostream') or {}).get('index')
+        current_subtitle = (player_properties.get('currentsubtitle') or {}).get('index')
+        control.log(f'Available subtitle streams: {[(s.get("index"), s.get("language"), s.get("name")) for s in subtitle_streams]}', 'debug')
 
-            if subtitle_int is not None:
-                if subtitle_int != current_sub_index:
-                    control.log(f'Setting subtitle stream to index {subtitle_int} (was {current_sub_index})', 'debug')
-                    self.setSubtitleStream(subtitle_int)
-                else:
-                    control.log(f'Subtitle stream already set to {subtitle_int}, skipping', 'debug')
-            else:
-                control.log('No subtitle stream selected (subtitle_int is None)', 'debug')
+        prefs = stream_select.preferences_from_settings(self.stream_settings)
+        selection = stream_select.select(audio_streams, subtitle_streams, prefs)
+        control.log(f'{prefs} -> {selection}', 'debug')
 
-            # Get list of available audio languages
-            audio_langs = [s.get('language', '') for s in audio_streams]
+        # Only switch audio when the preferred language exists; restarting audio otherwise gains nothing
+        if selection.audio is not None and selection.audio != current_audio:
+            self.setAudioStream(selection.audio)
+            control.log(f'Audio stream set to {selection.audio} ({prefs.audio}), was {current_audio}', 'debug')
 
-            # Simple subtitle visibility: show subs if user wants them
-            if preferred_subtitle_lang == "none":
-                self.showSubtitles(False)
-                control.log('Subtitles hidden (preference is none)', 'debug')
-            else:
-                self.showSubtitles(True)
-                control.log('Subtitles enabled', 'debug')
+        if selection.subtitle is not None and selection.subtitle != current_subtitle:
+            self.setSubtitleStream(selection.subtitle)
+            control.log(f'Subtitle stream set to {selection.subtitle} ({selection.subtitle_rule}), was {current_subtitle}', 'debug')
 
-            control.log(f'Subtitle setup complete: stream={subtitle_int}, audio_langs={audio_langs}, pref_audio={preferred_audio_streams}, pref_sub={preferred_subtitle_lang}', 'debug')
+        self.showSubtitles(selection.show_subtitles)
 
-    def process_aniskip(self):
+    def process_aniskip(self, prefetched=None):
         if self.skipintro_aniskip_enable and not self.skipintro_aniskip:
-            skipintro_aniskip_res = aniskip.get_skip_times(self.mal_id, self.episode, 'op')
+            skipintro_aniskip_res = prefetched['op'] if prefetched else aniskip.get_skip_times(self.mal_id, self.episode, 'op')
             control.log(f'process_aniskip: mal_id={self.mal_id}, episode={self.episode}, result={skipintro_aniskip_res is not None}', 'debug')
             if skipintro_aniskip_res:
                 skip_times = skipintro_aniskip_res['results'][0]['interval']
@@ -648,19 +468,21 @@ class WatchlistPlayer(player):
                 control.log(f'AniSkip intro times: {self.skipintro_start}-{self.skipintro_end}', 'debug')
 
         if self.skipoutro_aniskip_enable and not self.skipoutro_aniskip:
-            skipoutro_aniskip_res = aniskip.get_skip_times(self.mal_id, self.episode, 'ed')
+            skipoutro_aniskip_res = prefetched['ed'] if prefetched else aniskip.get_skip_times(self.mal_id, self.episode, 'ed')
             if skipoutro_aniskip_res:
                 skip_times = skipoutro_aniskip_res['results'][0]['interval']
                 self.skipoutro_start = int(skip_times['startTime']) + self.skipoutro_offset
                 self.skipoutro_end = int(skip_times['endTime']) + self.skipoutro_offset
                 self.skipoutro_aniskip = True
 
-    def process_animeskip(self):
-        show_meta = database.get_show_meta(self.mal_id)
-        anilist_id = pickle.loads(show_meta['meta_ids'])['anilist_id']
-
+    def process_animeskip(self, prefetched=None):
         if (self.skipintro_aniskip_enable and not self.skipintro_aniskip) or (self.skipoutro_aniskip_enable and not self.skipoutro_aniskip):
-            skip_times = anime_skip.get_time_stamps(anime_skip.get_episode_ids(str(anilist_id), int(self.episode)))
+            if prefetched:
+                skip_times = prefetched['animeskip']
+            else:
+                show_meta = database.get_show_meta(self.mal_id)
+                anilist_id = pickle.loads(show_meta['meta_ids'])['anilist_id']
+                skip_times = anime_skip.get_time_stamps(anime_skip.get_episode_ids(str(anilist_id), int(self.episode)))
             intro_start = None
             intro_end = None
             outro_start = None
@@ -799,10 +621,13 @@ class PlayerDialogs(xbmc.Player):
 
 
 class Monitor(xbmc.Monitor):
-    def __init__(self):
+    def __init__(self, on_stop=None):
         super().__init__()
         self.playback_stopped = False
+        self.on_stop = on_stop
 
     def onNotification(self, sender, method, data):
         if method == 'Player.OnStop':
             self.playback_stopped = True
+            if self.on_stop:
+                self.on_stop()
@@ -0,0 +1,126 @@
+import concurrent.futures
+import pickle
+import threading
+
+from resources.lib.ui import control, database
+
+# Skip time lookups started before the player opens, keyed by (mal_id, episode)
+_skip_futures = {}
+_skip_lock = threading.Lock()
+_executor = None
+
+RESOLVED_LINK_DURATION = 1  # hours a prefetched debrid link is trusted for
+NEXT_EPISODE_FRACTION = 2 / 3.0
+
+
+def _get_executor():
+    global _executor
+    if _executor is None:
+        _executor = concurrent.futures.ThreadPoolExecutor(max_workers=4)
+    return _executor
+
+
+def _fetch_aniskip(mal_id, episode, skip_type):
+    from resources.lib.endpoints import aniskip
+    return aniskip.get_skip_times(mal_id, episode, skip_type)
+
+
+def _fetch_animeskip(mal_id, episode):
+    from resources.lib.endpoints import anime_skip
+    show_meta = database.get_show_meta(mal_id)
+    if not show_meta:
+        return None
+    anilist_id = pickle.loads(show_meta['meta_ids']).get('anilist_id')
+    if not anilist_id:
+        return None
+    return anime_skip.get_time_stamps(anime_skip.get_episode_ids(str(anilist_id), int(episode)))
+
+
+def start_skip_times(mal_id, episode):
+    """
+    Start the AniSkip intro/outro and Anime-Skip lookups concurrently in the background.
+    Safe to call more than once; later calls reuse the running lookups.
+    """
+    intro = control.getBool('skipintro.aniskip.enable')
+    outro = control.getBool('skipoutro.aniskip.enable')
+    if not (intro or outro):
+        return
+    key = (str(mal_id), int(episode))
+    with _skip_lock:
+        if key in _skip_futures:
+            return
+        executor = _get_executor()
+        _skip_futures[key] = {
+            'op': executor.submit(_fetch_aniskip, mal_id, int(episode), 'op') if intro else None,
+            'ed': executor.submit(_fetch_aniskip, mal_id, int(episode), 'ed') if outro else None,
+            'animeskip': executor.submit(_fetch_animeskip, mal_id, episode)
+        }
+
+
+def get_skip_times(mal_id, episode, timeout=15):
+    """
+    Collect the skip time lookups for an episode, starting them if they were not prefetched.
+
+    :return: dict with 'op' and 'ed' AniSkip responses and 'animeskip' timestamps (values may be None)
+    """
+    start_skip_times(mal_id, episode)
+    with _skip_lock:
+        futures = _skip_futures.pop((str(mal_id), int(episode)), {})
+
+    results = {'op': None, 'ed': None, 'animeskip': None}
+    for name, future in futures.items():
+        if future is None:
+            continue
+        try:
+            results[name] = future.result(timeout=timeout)
+        except Exception as e:
+            control.log(f'Skip time prefetch {name} failed: {e}', 'warning')
+    return results
+
+
+def _resolved_link_key(mal_id, episode, source):
+    return 'prefetch_resolved_link' + database.generate_md5(str(mal_id), str(episode), source.get('hash'), source.get('debrid_provider'))
+
+
+def get_resolved_link(mal_id, episode, source):
+    """Return a debrid link resolved ahead of time for this source, if still fresh"""
+    if source.get('type') not in ['torrent', 'cloud']:
+        return None
+    cache_result = database.cache_get(_resolved_link_key(mal_id, episode, source))
+    if cache_result and database.is_cache_valid(cache_result['date'], RESOLVED_LINK_DURATION):
+        return cache_result['value'] or None
+    return None
+
+
+def store_resolved_link(mal_id, episode, source, link):
+    database.cache_insert(_resolved_link_key(mal_id, episode, source), link)
+
+
+def warm_next_episode(mal_id, episode):
+    """
+    Warm the source scrape, debrid availability and resolved link for an upcoming episode.
+    Runs in the background while the current episode plays.
+    """
+    from resources.lib import MetaBrowser
+    control.log(f'Prefetching sources for mal_id={mal_id} episode={episode}', 'info')
+    try:
+        sources = MetaBrowser.warm_sources(str(mal_id), str(episode))
+    except Exception as e:
+        control.log(f'Next episode source prefetch failed: {e}', 'warning')
+        return
+
+    control.log(f'Prefetched {len(sources)} sources for episode {episode}', 'info')
+    if not sources or control.getInt('general.playstyle.episode') != 0:
+        return
+
+    top = sources[0]
+    if top.get('type') not in ['torrent', 'cloud'] or (top['type'] == 'cloud' and top.get('debrid_provider') == 'Alldebrid'):
+        return
+    if get_resolved_link(mal_id, episode, top):
+        return
+
+    from resources.lib.windows import resolver
+    link = resolver.resolve_debrid_source(resolver.RESOLVERS[top['debrid_provider']], top)
+    if link and isinstance(link, str):
+        store_resolved_link(mal_id, episode, top, link)
+        control.log(f'Prefetched resolved link for episode {episode}: {top["release_title"]}', 'info')
@@ -0,0 +1,111 @@
+"""
+Scrape latency history per source provider.
+
+Every provider run is recorded in cache.db. Sources.getSources uses the recent p95 of each
+provider to give it its own deadline instead of the global timeout, and stops waiting once
+only providers that rarely return anything are left.
+"""
+import time
+
+from resources.lib.ui import control, database
+
+SAMPLES = 50  # recent runs kept per provider
+MIN_SAMPLES = 5  # below this the global timeout is used
+MIN_DEADLINE = 3  # seconds, never cut a provider off sooner than this
+DEADLINE_FACTOR = 1.5  # deadline = p95 * factor + 1s
+LIKELY_SUCCESS = 0.25  # providers finishing fewer runs than this are not waited for
+CACHE_HIT_SECONDS = 0.1  # faster runs were served by database.get and say nothing about the provider
+HISTOGRAM_BUCKETS = [0.5, 1, 2, 4, 8, 16]
+
+
+def _create_table(cursor):
+    cursor.execute('CREATE TABLE IF NOT EXISTS provider_latency (provider TEXT, duration REAL, success INTEGER, date INTEGER)')
+    cursor.execute('CREATE INDEX IF NOT EXISTS ix_provider_latency ON provider_latency (provider, date)')
+
+
+def record(provider, duration, success):
+    if success and duration < CACHE_HIT_SECONDS:
+        return
+    with database.SQL(control.cacheFile) as cursor:
+        _create_table(cursor)
+        cursor.execute('INSERT INTO provider_latency (provider, duration, success, date) VALUES (?, ?, ?, ?)',
+                       (provider, round(duration, 3), int(success), int(time.time())))
+        cursor.execute('DELETE FROM provider_latency WHERE provider=? AND rowid NOT IN '
+                       '(SELECT rowid FROM provider_latency WHERE provider=? ORDER BY date DESC, rowid DESC LIMIT ?)',
+                       (provider, provider, SAMPLES))
+        cursor.connection.commit()
+
+
+def _percentile(values, pct):
+    if not values:
+        return None
+    values = sorted(values)
+    return values[min(len(values) - 1, int(round(pct / 100 * (len(values) - 1))))]
+
+
+def stats():
+    """{provider: {'samples', 'success_rate', 'p50', 'p95', 'histogram'}} over the recent runs"""
+    with database.SQL(control.cacheFile) as cursor:
+        _create_table(cursor)
+        cursor.execute('SELECT provider, duration, success FROM provider_latency')
+        rows = cursor.fetchall()
+    runs = {}
+    for row in rows:
+        runs.setdefault(row['provider'], []).append(row)
+    result = {}
+    for provider, provider_runs in runs.items():
+        durations = [r['duration'] for r in provider_runs if r['success']]
+        histogram = [0] * (len(HISTOGRAM_BUCKETS) + 1)
+        for duration in durations:
+            histogram[next((i for i, limit in enumerate(HISTOGRAM_BUCKETS) if duration < limit), len(HISTOGRAM_BUCKETS))] += 1
+        result[provider] = {
+            'samples': len(provider_runs),
+            'success_rate': len(durations) / len(provider_runs),
+            'p50': _percentile(durations, 50),
+            'p95': _percentile(durations, 95),
+            'histogram': histogram
+        }
+    return result
+
+
+def deadlines(providers, timeout):
+    """
+    Return ({provider: seconds}, unlikely) where seconds is the adaptive deadline for each provider
+    (never above timeout) and unlikely is the set of providers that rarely finish in time.
+    """
+    provider_stats = stats()
+    result = {}
+    unlikely = set()
+    for provider in providers:
+        entry = provider_stats.get(provider)
+        if not entry or entry['samples'] < MIN_SAMPLES:
+            result[provider] = timeout
+            continue
+        if entry['success_rate'] < LIKELY_SUCCESS:
+            unlikely.add(provider)
+        if entry['p95'] is None:
+            result[provider] = timeout
+        else:
+            result[provider] = min(timeout, max(MIN_DEADLINE, entry['p95'] * DEADLINE_FACTOR + 1))
+    return result, unlikely
+
+
+def format_stats():
+    labels = [f'<{limit}s' for limit in HISTOGRAM_BUCKETS] + [f'>={HISTOGRAM_BUCKETS[-1]}s']
+    lines = []
+    for provider, entry in sorted(stats().items()):
+        p50 = f"{entry['p50']:.2f}s" if entry['p50'] is not None else '-'
+        p95 = f"{entry['p95']:.2f}s" if entry['p95'] is not None else '-'
+        lines.append(f"[B]{provider}[/B]  runs {entry['samples']}  finished {entry['success_rate']:.0%}  p50 {p50}  p95 {p95}")
+        peak = max(entry['histogram']) or 1
+        for label, count in zip(labels, entry['histogram']):
+            lines.append(f"  {label:>6} {'#' * int(round(count / peak * 30)):<30} {count}")
+        lines.append('')
+    return '\n'.join(lines) or 'No scrapes recorded yet.'
+
+
+def clear():
+    with database.SQL(control.cacheFile) as cursor:
+        _create_table(cursor)
+        cursor.execute('DELETE FROM provider_latency')
+        cursor.connection.commit()
@@ -0,0 +1,143 @@
+"""
+Per-host token-bucket rate limiting for client.request.
+
+Each host in LIMITS gets a bucket that refills at its rate up to its burst size. A request takes a
+token, or reserves the next one and sleeps until it is due, so concurrent callers queue up
+instead of all hitting the API at once and collecting 429s. Buckets live in cache.db, so plugin
+invocations and the service draw from the same budget. A Retry-After answer holds all requests
+to the host until the time the server asked for.
+"""
+import email.utils
+import threading
+import time
+
+from resources.lib.ui import control, database
+
+# host: (requests per second, burst)
+LIMITS = {
+    'api.jikan.moe': (1, 3),  # 3/s and 60/min
+    'graphql.anilist.co': (0.5, 3),  # 30/min while AniList runs in degraded mode
+    'api.anidb.net': (0.25, 1),  # one request every 4 s or the client gets banned
+}
+MAX_WAIT = 30  # seconds; a request that would have to wait longer is dropped instead
+LOCK_TIMEOUT = 0.25  # seconds to wait for another writer on cache.db before failing open
+
+
+class Bucket:
+    """
+    tokens is the fill level at time updated. It goes negative when callers reserve tokens that
+    have not refilled yet, and updated lies in the future while the host is blocked.
+    """
+    __slots__ = ('rate', 'burst', 'tokens', 'updated')
+
+    def __init__(self, rate, burst, tokens=None, updated=0.0):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst if tokens is None else tokens
+        self.updated = updated
+
+    def refill(self, now):
+        if now > self.updated:
+            self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+
+    def reserve(self, now, max_wait=MAX_WAIT):
+        """Take a token, returning the seconds to wait before using it, or None (nothing taken) if above max_wait"""
+        self.refill(now)
+        wait = max(0.0, self.updated - now) + max(0.0, (1 - self.tokens) / self.rate)
+        if wait > max_wait:
+            return None
+        self.tokens -= 1
+        return wait
+
+    def block(self, now, seconds):
+        """Hold every request until now + seconds, then let one through and refill from there"""
+        until = now + seconds
+        if until > self.updated:
+            self.tokens = 1.0
+            self.updated = until
+
+
+def parse_retry_after(value, now=None):
+    """Seconds from a Retry-After header (delta-seconds or HTTP-date), or None"""
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        date = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if date is None:
+        return None
+    return max(0.0, date.timestamp() - (time.time() if now is None else now))
+
+
+_lock = threading.Lock()
+# Retry-After deadlines of hosts without a configured limit, kept in-process only
+_blocked = {}
+
+
+def _create_table(cursor):
+    cursor.execute('CREATE TABLE IF NOT EXISTS rate_limit (host TEXT PRIMARY KEY, tokens REAL, updated REAL)')
+
+
+def _update(host, change, clock=time.time, default=None):
+    """
+    Load host's bucket, apply change(bucket, now) and store it, all in one write transaction.
+    Returns default if cache.db could not be read (database.SQL swallows the OperationalError),
+    which with LOCK_TIMEOUT happens quickly while another writer such as a VACUUM holds it.
+    """
+    rate, burst = LIMITS[host]
+    result = default
+    with _lock, database.SQL(control.cacheFile, timeout=LOCK_TIMEOUT) as cursor:
+        _create_table(cursor)
+        # BEGIN IMMEDIATE makes other processes wait rather than reserve the same token
+        cursor.execute('BEGIN IMMEDIATE')
+        cursor.execute('SELECT tokens, updated FROM rate_limit WHERE host=?', (host,))
+        row = cursor.fetchone()
+        bucket = Bucket(rate, burst, **row) if row else Bucket(rate, burst)
+        result = change(bucket, clock())
+        cursor.execute('REPLACE INTO rate_limit (host, tokens, updated) VALUES (?, ?, ?)', (host, bucket.tokens, bucket.updated))
+        cursor.connection.commit()
+    return result
+
+
+def _hostname(host):
+    return host.rsplit(':', 1)[0].lower() if ']' not in host else host.lower()
+
+
+def acquire(host, max_wait=MAX_WAIT, clock=time.time, sleep=time.sleep):
+    """Wait for host's budget. Returns False, without waiting, if that would take longer than max_wait"""
+    host = _hostname(host)
+    if host not in LIMITS:
+        wait = _blocked.get(host, 0) - clock()
+        if wait > max_wait:
+            return False
+        if wait > 0:
+            sleep(wait)
+        return True
+    # A locked cache.db fails open: the request goes ahead without waiting
+    wait = _update(host, lambda bucket, now: bucket.reserve(now, max_wait), clock, default=0.0)
+    if wait is None:
+        control.log(f'Rate limit: {host} is over budget for more than {max_wait}s, skipping request', 'warning')
+        return False
+    if wait > 0:
+        control.log(f'Rate limit: waiting {wait:.2f}s for {host}', 'debug')
+        sleep(wait)
+    return True
+
+
+def block(host, retry_after, clock=time.time):
+    """Apply a Retry-After header value received from host"""
+    host = _hostname(host)
+    now = clock()
+    seconds = parse_retry_after(retry_after, now)
+    if seconds is None:
+        return
+    control.log(f'Rate limit: {host} asked to retry after {seconds:.0f}s')
+    if host not in LIMITS:
+        _blocked[host] = max(_blocked.get(host, 0), now + seconds)
+        return
+    _update(host, lambda bucket, now: bucket.block(now, seconds), clock)
@@ -0,0 +1,129 @@
+"""
+Resolve outcome history for source ranking.
+
+Resolver.resolve records whether each source it tries yields a playable link and how long that
+took. Outcomes are kept per provider, embed host, debrid service and release group as decayed
+counts, so old failures fade out. Sources.sortSources can then push sources from an embed host or
+release group that keeps failing below the others without otherwise changing the user's sort
+order. Provider and debrid counts are per attempt, so an autoplay walk through a few dead
+releases would sink every source of that provider; they are kept for statistics only.
+"""
+import re
+import time
+import urllib.parse
+
+from resources.lib.ui import control, database
+
+HALF_LIFE_DAYS = 14  # weight of an outcome halves after this long
+MIN_ATTEMPTS = 3  # decayed attempts needed before a key can count as failing
+FAILING_RATE = 0.3  # success rate below which a key counts as failing
+TTFB_WEIGHT = 0.3  # weight of the newest sample in the time-to-link average
+PENALTY_DIMENSIONS = ('host', 'group')  # keys specific enough to demote a source
+
+_group_re = re.compile(r'^\s*\[([^\]]+)\]')
+
+
+def _create_table(cursor):
+    cursor.execute('CREATE TABLE IF NOT EXISTS resolve_outcome (dimension TEXT, value TEXT, attempts REAL, successes REAL, '
+                   'ttfb REAL, date INTEGER, PRIMARY KEY (dimension, value))')
+
+
+def release_group(title):
+    match = _group_re.match(str(title or ''))
+    return match.group(1).strip().lower() if match else None
+
+
+def source_keys(source):
+    """[(dimension, value)] a source's outcome is recorded under"""
+    keys = []
+    if source.get('provider'):
+        keys.append(('provider', source['provider']))
+    if source.get('type') in ('embed', 'direct'):
+        host = urllib.parse.urlparse(str(source.get('hash', ''))).netloc.lower()
+        if host:
+            keys.append(('host', host))
+    if source.get('debrid_provider'):
+        keys.append(('debrid', source['debrid_provider']))
+    if source.get('type') in ('torrent', 'cloud', 'hoster'):
+        group = release_group(source.get('release_title'))
+        if group:
+            keys.append(('group', group))
+    return keys
+
+
+def penalty_keys(source):
+    return [key for key in source_keys(source) if key[0] in PENALTY_DIMENSIONS]
+
+
+def _decay(now, date):
+    return 0.5 ** (max(0, now - date) / (HALF_LIFE_DAYS * 86400))
+
+
+def update(row, success, ttfb, now):
+    """Fold one outcome into a stored row (or None), returning (attempts, successes, ttfb)"""
+    if not row:
+        return 1.0, float(success), ttfb
+    decay = _decay(now, row['date'])
+    if ttfb is not None and row['ttfb'] is not None:
+        ttfb = row['ttfb'] * (1 - TTFB_WEIGHT) + ttfb * TTFB_WEIGHT
+    elif ttfb is None:
+        ttfb = row['ttfb']
+    return row['attempts'] * decay + 1, row['successes'] * decay + success, ttfb
+
+
+def record(source, success, ttfb=None):
+    """Record one resolve attempt; ttfb is the seconds it took to get a link, for successes"""
+    keys = source_keys(source)
+    if not keys:
+        return
+    now = int(time.time())
+    with database.SQL(control.cacheFile) as cursor:
+        _create_table(cursor)
+        for dimension, value in keys:
+            cursor.execute('SELECT attempts, successes, ttfb, date FROM resolve_outcome WHERE dimension=? AND value=?', (dimension, value))
+            attempts, successes, avg_ttfb = update(cursor.fetchone(), bool(success), ttfb if success else None, now)
+            cursor.execute('REPLACE INTO resolve_outcome (dimension, value, attempts, successes, ttfb, date) VALUES (?, ?, ?, ?, ?, ?)',
+                           (dimension, value, attempts, successes, avg_ttfb, now))
+        cursor.connection.commit()
+
+
+def load(keys):
+    """{(dimension, value): {'attempts', 'successes', 'ttfb'}} with counts decayed to now"""
+    keys = list(set(keys))
+    now = int(time.time())
+    result = {}
+    with database.SQL(control.cacheFile) as cursor:
+        _create_table(cursor)
+        cursor.execute('SELECT * FROM resolve_outcome')
+        wanted = set(keys)
+        for row in cursor.fetchall():
+            key = (row['dimension'], row['value'])
+            if key in wanted:
+                decay = _decay(now, row['date'])
+                result[key] = {'attempts': row['attempts'] * decay, 'successes': row['successes'] * decay, 'ttfb': row['ttfb']}
+    return result
+
+
+def failing(stats):
+    return stats['attempts'] >= MIN_ATTEMPTS and stats['successes'] / stats['attempts'] < FAILING_RATE
+
+
+def penalty_function(sources, stats=None):
+    """
+    Return a callable giving 1 for sources with a persistently failing host or release group and
+    0 otherwise, for use as the leading term of sort_select.compile_sort_key.
+    """
+    keys_by_source = {id(source): penalty_keys(source) for source in sources}
+    if stats is None:
+        stats = load(key for keys in keys_by_source.values() for key in keys)
+    bad = {key for key, entry in stats.items() if key[0] in PENALTY_DIMENSIONS and failing(entry)}
+    if bad:
+        control.log(f'Resolve history: demoting sources from {", ".join(f"{d} {v}" for d, v in sorted(bad))}')
+
+    def penalty(source):
+        keys = keys_by_source.get(id(source))
+        if keys is None:
+            keys = penalty_keys(source)
+        return 1 if any(key in bad for key in keys) else 0
+
+    return penalty
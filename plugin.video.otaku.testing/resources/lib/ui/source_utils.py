@@ -1,7 +1,10 @@
 import re
 import string
+import threading
 import xbmc
 
+from collections import Counter, OrderedDict
+
 
 from resources.lib.ui import control
 
@@ -236,101 +239,183 @@ def get_size(size=0):
     return '{0:.2f} {1}'.format(size, power_labels[n])
 
 
-def get_fuzzy_match(query, filenames):
-    """
-    Multi-stage fuzzy matching for torrent/file selection.
-    Uses local algorithms for accuracy and speed (no external API dependency).
+FUZZY_TOP_K = 64  # candidates kept by trigram overlap before any SequenceMatcher scoring
+FUZZY_INDEX_CACHE_SIZE = 8
 
-    Returns: List of indices that match the query, sorted by best match first
-    """
-    from difflib import SequenceMatcher
-
-    if not query or not filenames:
-        return []
+_fuzzy_index_cache = OrderedDict()
+_fuzzy_index_lock = threading.Lock()
 
-    # Normalize query for matching
-    query_clean = cleanTitle(query)
-    query_lower = query.lower()
 
-    # Stage 1: Exact match (case-insensitive)
-    exact_matches = []
-    for i, filename in enumerate(filenames):
-        if query_lower in filename.lower():
-            exact_matches.append((i, 1.0))  # Perfect score
+def _trigrams(text):
+    padded = f' {text} '
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
 
-    if exact_matches:
-        control.log(f"Fuzzy Match: Found {len(exact_matches)} exact matches for '{query}'")
-        return [i for i, _ in exact_matches]
 
-    # Stage 2: Token-based matching (handles reordered words)
-    query_tokens = set(query_clean.split())
-    token_matches = []
-
-    for i, filename in enumerate(filenames):
-        filename_clean = cleanTitle(filename)
-        filename_tokens = set(filename_clean.split())
-
-        # Calculate token overlap
-        common_tokens = query_tokens & filename_tokens
-        if common_tokens:
+class FuzzyIndex:
+    """
+    Token and trigram index over a snapshot of filenames (e.g. one cloud listing).
+    Cleaned titles are computed once per snapshot; matching only scores posting-list candidates.
+    """
+    def __init__(self, filenames):
+        self.filenames = list(filenames)
+        self.lower = [f.lower() for f in self.filenames]
+        self.clean = [cleanTitle(f) for f in self.filenames]
+        self.tokens = [set(c.split()) for c in self.clean]
+        self.token_postings = {}
+        self.trigram_postings = {}
+        for i, clean in enumerate(self.clean):
+            for token in self.tokens[i]:
+                self.token_postings.setdefault(token, []).append(i)
+            for gram in _trigrams(clean):
+                self.trigram_postings.setdefault(gram, []).append(i)
+        self._clean_cache = {}
+
+    def clean_title(self, title):
+        """Memoized cleanTitle for text seen while filtering this snapshot"""
+        if title not in self._clean_cache:
+            self._clean_cache[title] = cleanTitle(title)
+        return self._clean_cache[title]
+
+    def _top_k(self, query_clean, positions, k=FUZZY_TOP_K):
+        counts = Counter()
+        for gram in _trigrams(query_clean):
+            counts.update(self.trigram_postings.get(gram, ()))
+        ranked = [i for i, _ in counts.most_common() if positions is None or i in positions]
+        return sorted(ranked[:k])
+
+    def match(self, query, positions=None):
+        """
+        Multi-stage fuzzy matching for torrent/file selection.
+        Uses local algorithms for accuracy and speed (no external API dependency).
+
+        :param positions: optional subset of indexes to match against (e.g. entries kept by filter_sources)
+        Returns: List of indices that match the query, sorted by best match first
+        """
+        from difflib import SequenceMatcher
+
+        if not query or not self.filenames:
+            return []
+        candidates = range(len(self.filenames)) if positions is None else sorted(positions)
+        positions = None if positions is None else set(positions)
+
+        # Normalize query for matching
+        query_clean = cleanTitle(query)
+        query_lower = query.lower()
+
+        # Stage 1: Exact match (case-insensitive)
+        exact_matches = [i for i in candidates if query_lower in self.lower[i]]
+        if exact_matches:
+            control.log(f"Fuzzy Match: Found {len(exact_matches)} exact matches for '{query}'")
+            return exact_matches
+
+        # Stage 2: Token-based matching (handles reordered words), only files sharing a token are scored
+        query_tokens = set(query_clean.split())
+        token_candidates = set()
+        for token in query_tokens:
+            token_candidates.update(self.token_postings.get(token, ()))
+        token_matches = []
+        for i in sorted(token_candidates):
+            if positions is not None and i not in positions:
+                continue
+            filename_tokens = self.tokens[i]
+            common_tokens = query_tokens & filename_tokens
             # Jaccard similarity: intersection / union
             jaccard = len(common_tokens) / len(query_tokens | filename_tokens)
-
             # Token coverage: what % of query tokens are present
-            coverage = len(common_tokens) / len(query_tokens) if query_tokens else 0
-
+            coverage = len(common_tokens) / len(query_tokens)
             # Combined score (weighted average)
             score = (jaccard * 0.4) + (coverage * 0.6)
-
             if score >= 0.5:  # Threshold: at least 50% match
                 token_matches.append((i, score))
 
-    if token_matches:
-        token_matches.sort(key=lambda x: x[1], reverse=True)
-        control.log(f"Fuzzy Match: Found {len(token_matches)} token matches for '{query}' (best: {token_matches[0][1]:.2f})")
-        return [i for i, _ in token_matches]
-
-    # Stage 3: Sequence matching with difflib (handles typos, partial matches)
-    sequence_matches = []
-    threshold = control.getInt('general.fuzzy') / 100.0 if control.getInt('general.fuzzy') > 0 else 0.6
-
-    for i, filename in enumerate(filenames):
-        filename_clean = cleanTitle(filename)
-
-        # Use SequenceMatcher for similarity ratio
-        ratio = SequenceMatcher(None, query_clean, filename_clean).ratio()
-
-        if ratio >= threshold:
-            sequence_matches.append((i, ratio))
-
-    if sequence_matches:
-        sequence_matches.sort(key=lambda x: x[1], reverse=True)
-        control.log(f"Fuzzy Match: Found {len(sequence_matches)} sequence matches for '{query}' (best: {sequence_matches[0][1]:.2f})")
-        return [i for i, _ in sequence_matches]
+        if token_matches:
+            token_matches.sort(key=lambda x: x[1], reverse=True)
+            control.log(f"Fuzzy Match: Found {len(token_matches)} token matches for '{query}' (best: {token_matches[0][1]:.2f})")
+            return [i for i, _ in token_matches]
+
+        # Stages 3 and 4 only score the top-k files by trigram overlap
+        top_k = self._top_k(query_clean, positions)
+
+        # Stage 3: Sequence matching with difflib (handles typos, partial matches)
+        sequence_matches = []
+        threshold = control.getInt('general.fuzzy') / 100.0 if control.getInt('general.fuzzy') > 0 else 0.6
+        matcher = SequenceMatcher(None, query_clean)
+        for i in top_k:
+            matcher.set_seq2(self.clean[i])
+            # quick_ratio is an upper bound on ratio, so it safely skips hopeless pairs
+            if matcher.quick_ratio() < threshold:
+                continue
+            ratio = matcher.ratio()
+            if ratio >= threshold:
+                sequence_matches.append((i, ratio))
+
+        if sequence_matches:
+            sequence_matches.sort(key=lambda x: x[1], reverse=True)
+            control.log(f"Fuzzy Match: Found {len(sequence_matches)} sequence matches for '{query}' (best: {sequence_matches[0][1]:.2f})")
+            return [i for i, _ in sequence_matches]
+
+        # Stage 4: Fallback - Close matches with lower threshold
+        fallback_matches = []
+        lower_matcher = SequenceMatcher(None, query_lower)
+        for i in top_k:
+            # Try both ways (cleaned and raw lowercase)
+            matcher.set_seq2(self.clean[i])
+            lower_matcher.set_seq2(self.lower[i])
+            ratio1 = matcher.ratio() if matcher.quick_ratio() >= 0.4 else 0
+            ratio2 = lower_matcher.ratio() if lower_matcher.quick_ratio() >= 0.4 else 0
+            max_ratio = max(ratio1, ratio2)
+            if max_ratio >= 0.4:  # Lower threshold for fallback
+                fallback_matches.append((i, max_ratio))
+
+        if fallback_matches:
+            fallback_matches.sort(key=lambda x: x[1], reverse=True)
+            control.log(f"Fuzzy Match: Found {len(fallback_matches)} fallback matches for '{query}' (best: {fallback_matches[0][1]:.2f})")
+            return [i for i, _ in fallback_matches[:10]]  # Limit to top 10
+
+        # No matches found
+        control.log(f"Fuzzy Match: No matches found for '{query}'")
+        return []
 
-    # Stage 4: Fallback - Close matches with lower threshold
-    fallback_matches = []
 
-    for i, filename in enumerate(filenames):
-        filename_clean = cleanTitle(filename)
+def get_fuzzy_index(filenames):
+    """Return the FuzzyIndex for this filename snapshot, building it only when the listing changed"""
+    key = tuple(filenames)
+    with _fuzzy_index_lock:
+        index = _fuzzy_index_cache.get(key)
+        if index is not None:
+            _fuzzy_index_cache.move_to_end(key)
+            return index
+    index = FuzzyIndex(key)
+    with _fuzzy_index_lock:
+        _fuzzy_index_cache[key] = index
+        while len(_fuzzy_index_cache) > FUZZY_INDEX_CACHE_SIZE:
+            _fuzzy_index_cache.popitem(last=False)
+    return index
 
-        # Try both ways (query in filename, filename in query)
-        ratio1 = SequenceMatcher(None, query_clean, filename_clean).ratio()
-        ratio2 = SequenceMatcher(None, query_lower, filename.lower()).ratio()
 
-        max_ratio = max(ratio1, ratio2)
+def get_fuzzy_match(query, filenames):
+    """
+    Multi-stage fuzzy matching for torrent/file selection.
 
-        if max_ratio >= 0.4:  # Lower threshold for fallback
-            fallback_matches.append((i, max_ratio))
+    Returns: List of indices that match the query, sorted by best match first
+    """
+    if not query or not filenames:
+        return []
+    return get_fuzzy_index(filenames).match(query)
 
-    if fallback_matches:
-        fallback_matches.sort(key=lambda x: x[1], reverse=True)
-        control.log(f"Fuzzy Match: Found {len(fallback_matches)} fallback matches for '{query}' (best: {fallback_matches[0][1]:.2f})")
-        return [i for i, _ in fallback_matches[:10]]  # Limit to top 10
 
-    # No matches found
-    control.log(f"Fuzzy Match: No matches found for '{query}'")
-    return []
+def match_listing(provider, items, name_key, query, mal_id, season=None, episode=None):
+    """
+    Filter a cloud/local listing with filter_sources and fuzzy match the survivors against the query.
+    One FuzzyIndex per listing snapshot serves both steps. Returns the matched items, best match first.
+    """
+    names = [re.sub(r'\[.*?]\s*', '', i[name_key].replace(',', '')) for i in items]
+    index = get_fuzzy_index(names)
+    kept = {id(i) for i in filter_sources(provider, items, mal_id, season, episode, fuzzy_index=index)}
+    positions = [pos for pos, item in enumerate(items) if id(item) in kept]
+    if not positions:
+        return []
+    return [items[pos] for pos in index.match(query, positions)]
 
 
 def get_best_match(dict_key, dictionary_list, episode, pack_select=False):
@@ -512,7 +597,7 @@ def get_best_match(dict_key, dictionary_list, episode, pack_select=False):
     return files[0]
 
 
-def filter_sources(provider, torrent_list, mal_id, season=None, episode=None, part=None, anidb_id=True):
+def filter_sources(provider, torrent_list, mal_id, season=None, episode=None, part=None, anidb_id=True, fuzzy_index=None):
     from resources.lib.ui import database
     """
     Filter torrents based on season, episode, and part information.
@@ -536,8 +621,9 @@ def filter_sources(provider, torrent_list, mal_id, season=None, episode=None, pa
         if kodi_meta.get('title_romaji'):
             anime_titles.append(kodi_meta['title_romaji'].lower())
 
-    # Clean titles for matching
-    anime_titles_clean = [cleanTitle(t) for t in anime_titles if t]
+    # Clean titles for matching; a FuzzyIndex for the listing memoizes cleaning across calls
+    clean = fuzzy_index.clean_title if fuzzy_index is not None else cleanTitle
+    anime_titles_clean = [clean(t) for t in anime_titles if t]
 
     # Check for Large Animes or Tvdb Animes with season 0
     if season == 1:
@@ -603,9 +689,9 @@ def filter_sources(provider, torrent_list, mal_id, season=None, episode=None, pa
         stop_words = {'the', 'a', 'an', 'of', 'in', 'to', 'and', 'or', 'no', 'wa', 'ga', 'wo', 'ni', 'de', 'e', 'ka'}
         title_has_extra_subtitle = False
         if anime_titles_clean:
-            title_clean_for_match = cleanTitle(title)
+            title_clean_for_match = clean(title)
             # Also clean out codec/quality/group info for title comparison
-            title_clean_stripped = cleanTitle(clean_text(title))
+            title_clean_stripped = clean(clean_text(title))
             title_matches = False
             min_extra_words = float('inf')
             for anime_title in anime_titles_clean:
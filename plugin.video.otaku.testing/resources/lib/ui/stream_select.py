@@ -0,0 +1,155 @@
+"""
+Audio and subtitle stream selection.
+
+Takes the stream lists returned by Player.GetProperties plus the user's preferences and picks the
+stream indexes to switch to. Selection is a table of ranked rules; a stream's rank is the first
+rule it satisfies and the best ranked stream wins, earlier streams winning ties. Nothing here talks
+to Kodi, so any stream layout can be fed through it directly.
+"""
+import re
+
+AUDIO_LANGUAGES = ['jpn', 'eng']
+SUBTITLE_LANGUAGES = [
+    'none', 'eng', 'jpn', 'spa', 'fre', 'ger',
+    'ita', 'dut', 'rus', 'por', 'kor', 'chi',
+    'ara', 'hin', 'tur', 'pol', 'swe', 'nor',
+    'dan', 'fin'
+]
+SUBTITLE_TYPES = ['isdefault', 'isforced', 'isimpaired']
+SIGNS_KEYWORDS = ['signs', 'songs']
+
+_partial_re = re.compile(r'[\(\[]?\s*(signs?|songs?|s&s|signs?\s*[/&]\s*songs?|forced)\s*[\)\]]?'
+                         r'|signs?\s+only|songs?\s+only|^forced$', re.IGNORECASE)
+_full_re = re.compile(r'dialogue|full', re.IGNORECASE)
+
+
+def is_partial_sub(name):
+    """True for signs/songs/forced tracks that do not carry the full dialogue"""
+    if not name or _full_re.search(name):
+        return False
+    return bool(_partial_re.search(name))
+
+
+class Preferences:
+    __slots__ = ('audio', 'subtitle', 'subtitle_type', 'keywords')
+
+    def __init__(self, audio, subtitle, subtitle_type=None, keywords=None):
+        """
+        :param audio: preferred audio language code
+        :param subtitle: preferred subtitle language code, 'none' to hide subtitles
+        :param subtitle_type: stream flag to prefer ('isdefault', 'isforced', 'isimpaired') or None
+        :param keywords: lowercase name keywords to prefer, or None
+        """
+        self.audio = audio
+        self.subtitle = subtitle
+        self.subtitle_type = subtitle_type
+        self.keywords = keywords
+
+    @property
+    def wants_partial(self):
+        return bool(self.keywords) and any(kw in SIGNS_KEYWORDS for kw in self.keywords)
+
+    def __repr__(self):
+        return f'Preferences(audio={self.audio}, subtitle={self.subtitle}, type={self.subtitle_type}, keywords={self.keywords})'
+
+
+def preferences_from_settings(settings):
+    """
+    Build Preferences from the addon settings. settings maps setting ids to values
+    (general.audio, general.subtitles, general.subtitles.type, subtitles.types,
+    general.subtitles.keyword, subtitles.keywords, subtitles.customkeyword).
+    """
+    def pick(values, index, default):
+        return values[index] if 0 <= index < len(values) else default
+
+    subtitle_type = pick(SUBTITLE_TYPES, settings.get('subtitles.types', 0), None) if settings.get('general.subtitles.type') else None
+    keywords = None
+    if settings.get('general.subtitles.keyword'):
+        keyword_setting = settings.get('subtitles.keywords')
+        if keyword_setting == 1:
+            keywords = ['dialogue']
+        elif keyword_setting == 2:
+            keywords = list(SIGNS_KEYWORDS)
+        elif keyword_setting == 3 and settings.get('subtitles.customkeyword'):
+            keywords = [settings['subtitles.customkeyword'].lower()]
+    return Preferences(pick(AUDIO_LANGUAGES, settings.get('general.audio', 0), AUDIO_LANGUAGES[0]),
+                       pick(SUBTITLE_LANGUAGES, settings.get('general.subtitles', 0), 'none'),
+                       subtitle_type, keywords)
+
+
+def _language(stream, prefs):
+    return stream.get('language') == prefs.subtitle
+
+
+def _preferred(stream, prefs):
+    """Preferred language matching the chosen type flag or name keyword"""
+    if not _language(stream, prefs):
+        return False
+    if is_partial_sub(stream.get('name')) and not prefs.wants_partial:
+        return False
+    if prefs.subtitle_type and stream.get(prefs.subtitle_type):
+        return True
+    name = (stream.get('name') or '').lower()
+    return bool(prefs.keywords) and any(kw in name for kw in prefs.keywords)
+
+
+# (rule, predicate) from best to worst; a stream matching none of them is never picked
+SUBTITLE_RULES = [
+    ('preferred', _preferred),
+    ('full dialogue', lambda stream, prefs: _language(stream, prefs) and not is_partial_sub(stream.get('name'))),
+    ('language', _language),
+    ('default', lambda stream, prefs: bool(stream.get('isdefault'))),
+    ('first', lambda stream, prefs: True),
+]
+
+AUDIO_RULES = [
+    ('language', lambda stream, prefs: stream.get('language') == prefs.audio),
+]
+
+
+def rank(stream, prefs, rules):
+    """(position of the first rule the stream satisfies, rule name), or None"""
+    for position, (name, predicate) in enumerate(rules):
+        if predicate(stream, prefs):
+            return position, name
+    return None
+
+
+def best(streams, prefs, rules):
+    """(stream, rule name) of the best ranked stream, or (None, None)"""
+    chosen, chosen_rank = None, None
+    for stream in streams:
+        stream_rank = rank(stream, prefs, rules)
+        if stream_rank is not None and (chosen_rank is None or stream_rank[0] < chosen_rank[0]):
+            chosen, chosen_rank = stream, stream_rank
+            if stream_rank[0] == 0:
+                break
+    return chosen, chosen_rank[1] if chosen_rank else None
+
+
+class Selection:
+    __slots__ = ('audio', 'audio_rule', 'subtitle', 'subtitle_rule', 'show_subtitles')
+
+    def __init__(self, audio, audio_rule, subtitle, subtitle_rule, show_subtitles):
+        self.audio = audio
+        self.audio_rule = audio_rule
+        self.subtitle = subtitle
+        self.subtitle_rule = subtitle_rule
+        self.show_subtitles = show_subtitles
+
+    def __repr__(self):
+        return (f'Selection(audio={self.audio} ({self.audio_rule}), subtitle={self.subtitle} ({self.subtitle_rule}), '
+                f'show={self.show_subtitles})')
+
+
+def select(audio_streams, subtitle_streams, prefs):
+    """
+    Pick the streams for prefs. audio is None when no stream has the preferred language, so the
+    player keeps its default instead of restarting audio for no gain; subtitle is None only when
+    there are no subtitle streams.
+    """
+    audio, audio_rule = best(audio_streams, prefs, AUDIO_RULES)
+    subtitle, subtitle_rule = best(subtitle_streams, prefs, SUBTITLE_RULES)
+    return Selection(audio['index'] if audio else None, audio_rule,
+                     subtitle['index'] if subtitle else None, subtitle_rule,
+                     prefs.subtitle != 'none')
@@ -0,0 +1,137 @@
+"""
+Shared bearer-token handling for API endpoints.
+
+A TokenManager keeps one access token per service, refreshes it under a lock only when it is
+near expiry (or after a 401), and persists it so other threads and later plugin invocations
+reuse it instead of logging in again.
+"""
+import base64
+import json
+import threading
+import time
+
+from resources.lib.ui import client, control, database
+
+REFRESH_MARGIN = 600  # seconds before expiry at which a token is refreshed
+DEFAULT_LIFETIME = 24 * 3600  # used when neither the service nor the JWT says when a token expires
+
+
+def jwt_expiry(token, default=DEFAULT_LIFETIME):
+    """Read the exp claim from a JWT, falling back to now + default"""
+    try:
+        payload = token.split('.')[1]
+        payload += '=' * (-len(payload) % 4)
+        return int(json.loads(base64.urlsafe_b64decode(payload))['exp'])
+    except (IndexError, KeyError, ValueError, TypeError):
+        return int(time.time()) + default
+
+
+class SQLiteStore:
+    """Persists tokens in cache.db for services whose token is not kept in the addon settings"""
+    def __init__(self, name):
+        self.name = name
+
+    def load(self):
+        result = None  # stays None if database.SQL swallows an OperationalError
+        with database.SQL(control.cacheFile) as cursor:
+            cursor.execute('CREATE TABLE IF NOT EXISTS auth_tokens (name TEXT PRIMARY KEY, token TEXT, expires INTEGER)')
+            cursor.execute('SELECT token, expires FROM auth_tokens WHERE name=?', (self.name,))
+            result = cursor.fetchone()
+        return (result['token'], result['expires']) if result else (None, 0)
+
+    def save(self, token, expires):
+        with database.SQL(control.cacheFile) as cursor:
+            cursor.execute('CREATE TABLE IF NOT EXISTS auth_tokens (name TEXT PRIMARY KEY, token TEXT, expires INTEGER)')
+            cursor.execute('REPLACE INTO auth_tokens (name, token, expires) VALUES (?, ?, ?)', (self.name, token, expires))
+            cursor.connection.commit()
+
+
+class SettingsStore:
+    """Reads and writes the <prefix>.token / <prefix>.expiry settings used by the OAuth logins"""
+    def __init__(self, prefix):
+        self.prefix = prefix
+
+    def load(self):
+        return control.getSetting(f'{self.prefix}.token') or None, control.getInt(f'{self.prefix}.expiry')
+
+    def save(self, token, expires):
+        control.setSetting(f'{self.prefix}.token', token)
+        control.setInt(f'{self.prefix}.expiry', int(expires))
+
+
+class TokenManager:
+    def __init__(self, name, fetch, store=None, margin=REFRESH_MARGIN):
+        """
+        :param fetch: callable returning (token, expires_at) for a fresh token, or None on failure
+        :param store: SQLiteStore (default) or SettingsStore
+        """
+        self.name = name
+        self.fetch = fetch
+        self.store = store or SQLiteStore(name)
+        self.margin = margin
+        self._lock = threading.RLock()
+        self._token = None
+        self._expires = 0
+
+    def _valid(self):
+        return self._token and time.time() < self._expires - self.margin
+
+    def get(self):
+        """Return a valid token, refreshing it if it is missing or about to expire"""
+        if self._valid():
+            return self._token
+        with self._lock:
+            # Another thread or process may have refreshed while we waited
+            self._token, self._expires = self.store.load()
+            if self._valid():
+                return self._token
+            result = self.fetch()
+            if not result:
+                control.log(f'{self.name}: token refresh failed', 'warning')
+                return self._token
+            self._token, self._expires = result
+            self.store.save(self._token, self._expires)
+            control.log(f'{self.name}: token refreshed')
+            return self._token
+
+    def invalidate(self, token):
+        """Mark a token rejected by the server as expired, unless it was already replaced"""
+        with self._lock:
+            if token and token == self._token:
+                self._expires = 0
+                self.store.save(self._token, 0)
+
+    def headers(self, headers=None):
+        headers = dict(headers or {})
+        token = self.get()
+        if token:
+            headers['Authorization'] = f'Bearer {token}'
+        return headers
+
+    def request(self, func, url, headers=None, **kwargs):
+        """
+        Call a client function (client.get / client.post) with the bearer token,
+        retrying once with a fresh token if the server answers 401.
+        """
+        token = self.get()
+        if not token:
+            return None
+        response = func(url, headers=self.headers(headers), **kwargs)
+        if not response and client.last_status() == 401:
+            control.log(f'{self.name}: 401 received, refreshing token')
+            self.invalidate(token)
+            if self.get():
+                response = func(url, headers=self.headers(headers), **kwargs)
+        return response
+
+
+_managers = {}
+_managers_lock = threading.Lock()
+
+
+def get_manager(name, fetch, store=None, margin=REFRESH_MARGIN):
+    """Return the process-wide TokenManager for a service, creating it on first use"""
+    with _managers_lock:
+        if name not in _managers:
+            _managers[name] = TokenManager(name, fetch, store, margin)
+        return _managers[name]
@@ -0,0 +1,242 @@
+"""
+Fast row extractors for the Nyaa and AnimeTosho result tables.
+
+Both extractors are generators that yield the same torrent dicts the old BeautifulSoup
+code built, without materialising a full document tree. lxml is used when it is
+installed, otherwise a single pass of the stdlib html.parser event API is used.
+"""
+import base64
+import re
+
+from html.parser import HTMLParser
+
+try:
+    from lxml import html as lxml_html
+except ImportError:
+    lxml_html = None
+
+NYAA_ROW_CLASSES = {'danger', 'default', 'success'}
+
+_nyaa_hash_re = re.compile(r'btih:(.*?)(?:&|$)')
+_tosho_seeders_re = re.compile(r'Seeders: (\d+)')
+_tosho_storage_re = re.compile(r'https://animetosho.org/storage/torrent/([^/]+)')
+_tosho_btih_re = re.compile(r'btih:(\w+)&tr=http')
+
+
+def _classes(value):
+    return value.split() if value else []
+
+
+def _nyaa_record(anchors, cells):
+    """
+    Build a Nyaa torrent dict from a row's anchors [(href, class, title)] and text-center cell texts.
+    Mirrors the indexes the BeautifulSoup parser used, so rows without a magnet or name are skipped.
+    """
+    magnet = next((href for href, _, _ in anchors if href and 'magnet:' in href), None)
+    names = [title for _, cls, title in anchors if cls is None]
+    if not magnet or len(names) < 2 or len(cells) < 3:
+        return None
+    hashes = _nyaa_hash_re.findall(magnet)
+    if not hashes:
+        return None
+    try:
+        downloads, seeders = int(cells[-1]), int(cells[-3])
+    except ValueError:
+        return None
+    return {
+        'magnet': magnet,
+        'name': names[1],
+        'size': cells[1].replace('i', ''),
+        'downloads': downloads,
+        'seeders': seeders,
+        'hash': hashes[0]
+    }
+
+
+def _tosho_hash(torrent, magnet):
+    match = _tosho_storage_re.match(torrent or '')
+    if match:
+        return match.group(1)
+    match = _tosho_btih_re.search(magnet or '')
+    if match:
+        return base64.b16encode(base64.b32decode(match.group(1))).decode().lower()
+    return None
+
+
+def _tosho_record(name, magnet, size, torrent, seeders_title):
+    if name is None or magnet is None or size is None or torrent is None:
+        return None
+    torrent_hash = _tosho_hash(torrent, magnet)
+    if not torrent_hash:
+        return None
+    seeders = _tosho_seeders_re.match(seeders_title or '')
+    return {
+        'name': name,
+        'magnet': magnet,
+        'size': size,
+        'downloads': 0,
+        'torrent': torrent,
+        'seeders': int(seeders.group(1)) if seeders else -1,
+        'hash': torrent_hash
+    }
+
+
+class _NyaaRowParser(HTMLParser):
+    def __init__(self):
+        super().__init__()
+        self.rows = []
+        self._in_row = False
+        self._anchors = []
+        self._cells = []
+        self._cell = None
+
+    def handle_starttag(self, tag, attrs):
+        if tag == 'tr':
+            self._in_row = bool(NYAA_ROW_CLASSES.intersection(_classes(dict(attrs).get('class'))))
+            self._anchors, self._cells, self._cell = [], [], None
+        elif not self._in_row:
+            return
+        elif tag == 'td':
+            self._cell = [] if 'text-center' in _classes(dict(attrs).get('class')) else None
+        elif tag == 'a':
+            attrs = dict(attrs)
+            self._anchors.append((attrs.get('href'), attrs.get('class'), attrs.get('title')))
+
+    def handle_endtag(self, tag):
+        if not self._in_row:
+            return
+        if tag == 'td' and self._cell is not None:
+            self._cells.append(''.join(self._cell))
+            self._cell = None
+        elif tag == 'tr':
+            self._in_row = False
+            self.rows.append((self._anchors, self._cells))
+
+    def handle_data(self, data):
+        if self._cell is not None:
+            self._cell.append(data)
+
+
+class _ToshoRowParser(HTMLParser):
+    def __init__(self):
+        super().__init__()
+        self.rows = []
+        self._depth = 0
+        self._entry_depth = None
+        self._entry = None
+        self._capture = None
+        self._capture_depth = None
+
+    def handle_starttag(self, tag, attrs):
+        attrs = dict(attrs)
+        cls = _classes(attrs.get('class'))
+        if tag == 'div':
+            self._depth += 1
+            if self._entry is None and 'home_list_entry' in cls:
+                self._entry_depth = self._depth
+                self._entry = {'name': None, 'magnet': None, 'size': None, 'torrent': None, 'seeders': None, 'in_link': False}
+                return
+        if self._entry is None:
+            return
+        entry = self._entry
+        if tag == 'div':
+            if 'link' in cls and entry['name'] is None:
+                entry['in_link'] = True
+            elif 'size' in cls and entry['size'] is None:
+                self._capture, self._capture_depth = ['size'], self._depth
+        elif tag == 'a':
+            href = attrs.get('href')
+            if entry['in_link'] and entry['name'] is None:
+                self._capture = ['name']
+                entry['in_link'] = False
+            if entry['magnet'] is None and href and 'magnet:' in href:
+                entry['magnet'] = href
+            if entry['torrent'] is None and 'dllink' in cls:
+                entry['torrent'] = href
+        elif tag == 'span' and entry['seeders'] is None and 'Seeders' in (attrs.get('title') or ''):
+            entry['seeders'] = attrs['title']
+
+    def handle_endtag(self, tag):
+        if tag == 'a' and self._capture and self._capture[0] == 'name':
+            self._entry['name'] = ''.join(self._capture[1:])
+            self._capture = None
+        elif tag == 'div':
+            if self._capture and self._capture[0] == 'size' and self._depth == self._capture_depth:
+                self._entry['size'] = ''.join(self._capture[1:])
+                self._capture = None
+            if self._entry is not None and self._depth == self._entry_depth:
+                self.rows.append(self._entry)
+                self._entry = self._entry_depth = None
+            self._depth -= 1
+
+    def handle_data(self, data):
+        if self._capture is not None:
+            self._capture.append(data)
+
+
+def _parse_events(parser, html):
+    """Feed html in chunks, yielding rows as soon as the parser completes them"""
+    for start in range(0, len(html), 65536):
+        parser.feed(html[start:start + 65536])
+        while parser.rows:
+            yield parser.rows.pop(0)
+    parser.close()
+    while parser.rows:
+        yield parser.rows.pop(0)
+
+
+def _iter_nyaa_lxml(html):
+    doc = lxml_html.fromstring(html)
+    for row in doc.iter('tr'):
+        if not NYAA_ROW_CLASSES.intersection(_classes(row.get('class'))):
+            continue
+        anchors = [(a.get('href'), a.get('class'), a.get('title')) for a in row.iter('a')]
+        cells = [td.text_content() for td in row.iter('td') if 'text-center' in _classes(td.get('class'))]
+        record = _nyaa_record(anchors, cells)
+        if record:
+            yield record
+
+
+def _iter_tosho_lxml(html):
+    doc = lxml_html.fromstring(html)
+    for entry in doc.iter('div'):
+        if 'home_list_entry' not in _classes(entry.get('class')):
+            continue
+        link = next((d for d in entry.iter('div') if 'link' in _classes(d.get('class'))), None)
+        link_a = next(link.iter('a'), None) if link is not None else None
+        size = next((d for d in entry.iter('div') if 'size' in _classes(d.get('class'))), None)
+        anchors = list(entry.iter('a'))
+        magnet = next((a.get('href') for a in anchors if 'magnet:' in (a.get('href') or '')), None)
+        torrent = next((a.get('href') for a in anchors if 'dllink' in _classes(a.get('class'))), None)
+        seeders = next((s.get('title') for s in entry.iter('span') if 'Seeders' in (s.get('title') or '')), None)
+        record = _tosho_record(
+            link_a.text_content() if link_a is not None else None,
+            magnet,
+            size.text_content() if size is not None else None,
+            torrent,
+            seeders
+        )
+        if record:
+            yield record
+
+
+def iter_nyaa_rows(html):
+    """Yield torrent dicts (magnet, name, size, downloads, seeders, hash) from a Nyaa result page"""
+    if lxml_html is not None:
+        yield from _iter_nyaa_lxml(html)
+        return
+    for anchors, cells in _parse_events(_NyaaRowParser(), html):
+        record = _nyaa_record(anchors, cells)
+        if record:
+            yield record
+
+
+def iter_animetosho_rows(html):
+    """Yield torrent dicts (name, magnet, size, downloads, torrent, seeders, hash) from an AnimeTosho result page"""
+    if lxml_html is not None:
+        yield from _iter_tosho_lxml(html)
+        return
+    for entry in _parse_events(_ToshoRowParser(), html):
+        record = _tosho_record(entry['name'], entry['magnet'], entry['size'], entry['torrent'], entry['seeders'])
+        if record:
+            yield record
@@ -1,3 +1,4 @@
+import time
 import xbmcgui
 import xbmcplugin
 import xbmc
@@ -5,11 +6,46 @@ import urllib.parse
 
 from resources.lib.WatchlistIntegration import watchlist_update_episode
 from resources.lib.debrid import all_debrid, debrid_link, premiumize, real_debrid, torbox, easydebrid
-from resources.lib.ui import client, control, source_utils, player
+from resources.lib.ui import client, control, source_utils, player, prefetch, resolve_outcomes
 from resources.lib.windows.base_window import BaseWindow
 
 control.sys.path.append(control.dataPath)
 
+RESOLVERS = {
+    'Alldebrid': all_debrid.AllDebrid,
+    'Debrid-Link': debrid_link.DebridLink,
+    'Premiumize': premiumize.Premiumize,
+    'Real-Debrid': real_debrid.RealDebrid,
+    'TorBox': torbox.TorBox,
+    'EasyDebrid': easydebrid.EasyDebrid
+}
+
+
+def resolve_debrid_source(api, source, pack_select=False):
+    """Resolve a torrent, cloud or hoster source through its debrid service"""
+    try:
+        api = api()
+        hash_ = source['hash']
+        magnet = f"magnet:?xt=urn:btih:{hash_}"
+        stream_link = {}
+
+        if source['type'] == 'torrent':
+            stream_link = api.resolve_single_magnet(hash_, magnet, source['episode_re'], pack_select, source.get('torrent_id'))
+        elif source['type'] == 'cloud':
+            hash_ = api.resolve_cloud(source, pack_select)
+            if hash_:
+                stream_link = api.resolve_hoster(hash_)
+        elif source['type'] == 'hoster':
+            # Get the hoster links from EasyDebrid
+            hoster_response = api.resolve_hoster(magnet, source['episode_re'], pack_select)
+            if hoster_response:
+                stream_link = hoster_response
+
+        return stream_link
+    except Exception as e:
+        control.log(f"Error resolving source with {source.get('debrid_provider', 'Unknown')}: {str(e)}", 'error')
+        return None
+
 
 class hook_mimetype:
     __MIME_HOOKS = {}
@@ -41,14 +77,7 @@ class Resolver(BaseWindow):
         self.sources = None
         self.args = None
         self.image = {}
-        self.resolvers = {
-            'Alldebrid': all_debrid.AllDebrid,
-            'Debrid-Link': debrid_link.DebridLink,
-            'Premiumize': premiumize.Premiumize,
-            'Real-Debrid': real_debrid.RealDebrid,
-            'TorBox': torbox.TorBox,
-            'EasyDebrid': easydebrid.EasyDebrid
-        }
+        self.resolvers = RESOLVERS
         self.source_select = source_select
         self.pack_select = False
         self.mal_id = actionArgs['mal_id']
@@ -64,6 +93,7 @@ class Resolver(BaseWindow):
         self.autoruninforground = control.getBool('uncached.autoruninforground')
         self.autoskipuncached = control.getBool('uncached.autoskipuncached')
         self.abort = False
+        self.pending_outcome = None
 
         # if self.season:
         #     control.setStr('resolve_season', str(self.season))
@@ -136,6 +166,7 @@ class Resolver(BaseWindow):
 
             # Batch property updates
             self._update_source_properties(i)
+            attempt_start = time.perf_counter()
 
             if 'uncached' in i['type']:
                 if not self.autoskipuncached:
@@ -151,12 +182,14 @@ class Resolver(BaseWindow):
                     stream_link = i['hash']
                 else:
                     stream_link = self.resolve_source(self.resolvers[i['debrid_provider']], i)
+                self.record_outcome(i, stream_link, attempt_start)
                 if stream_link:
                     self.return_data['link'] = stream_link
                     break
 
             elif i['type'] == 'direct':
                 stream_link = i['hash']
+                self.record_outcome(i, stream_link, attempt_start)
                 if stream_link:
                     self.return_data['link'] = stream_link
                     if i.get('subs'):
@@ -166,6 +199,7 @@ class Resolver(BaseWindow):
             elif i['type'] == 'embed':
                 from resources.lib.ui import embed_extractor
                 stream_link = embed_extractor.load_video_from_url(i['hash'])
+                self.record_outcome(i, stream_link, attempt_start)
                 if stream_link:
                     self.return_data['link'] = stream_link
                     break
@@ -190,8 +224,13 @@ class Resolver(BaseWindow):
                 'headers': {}  # Let Kodi determine content-type
             }
         else:
-            self.return_data['linkinfo'] = self.prefetch_play_link(self.return_data['link'])
+            try:
+                self.return_data['linkinfo'] = self.prefetch_play_link(self.return_data['link'])
+            except Exception:
+                self.finish_outcome(False)
+                raise
 
+        self.finish_outcome(bool(self.return_data['linkinfo']))
         if not self.return_data['linkinfo']:
             self.return_data = False
 
@@ -200,6 +239,19 @@ class Resolver(BaseWindow):
         else:
             self.close()
 
+    def record_outcome(self, source, stream_link, start):
+        """Record a failed attempt now; a found link is recorded once it is known to be playable"""
+        if stream_link:
+            self.pending_outcome = (source, time.perf_counter() - start)
+        else:
+            resolve_outcomes.record(source, False)
+
+    def finish_outcome(self, success):
+        if self.pending_outcome:
+            source, ttfb = self.pending_outcome
+            self.pending_outcome = None
+            resolve_outcomes.record(source, success, ttfb)
+
     def _update_source_properties(self, source):
         """Batch update source properties to reduce overhead"""
         debrid_provider = source.get('debrid_provider', 'None').replace('_', ' ')
@@ -314,29 +366,10 @@ class Resolver(BaseWindow):
             }
 
     def resolve_source(self, api, source):
-        """Improved resolve_source with better error handling for Premiumize"""
-        try:
-            api = api()
-            hash_ = source['hash']
-            magnet = f"magnet:?xt=urn:btih:{hash_}"
-            stream_link = {}
-
-            if source['type'] == 'torrent':
-                stream_link = api.resolve_single_magnet(hash_, magnet, source['episode_re'], self.pack_select, source.get('torrent_id'))
-            elif source['type'] == 'cloud':
-                hash_ = api.resolve_cloud(source, self.pack_select)
-                if hash_:
-                    stream_link = api.resolve_hoster(hash_)
-            elif source['type'] == 'hoster':
-                # Get the hoster links from EasyDebrid
-                hoster_response = api.resolve_hoster(magnet, source['episode_re'], self.pack_select)
-                if hoster_response:
-                    stream_link = hoster_response
-
+        if not self.pack_select and (stream_link := prefetch.get_resolved_link(self.mal_id, self.episode, source)):
+            control.log(f"Using prefetched link for {source['release_title']}", 'info')
             return stream_link
-        except Exception as e:
-            control.log(f"Error resolving source with {source.get('debrid_provider', 'Unknown')}: {str(e)}", 'error')
-            return None
+        return resolve_debrid_source(api, source, self.pack_select)
 
     @staticmethod
     def prefetch_play_link(link):
@@ -448,6 +481,8 @@ class Resolver(BaseWindow):
 
     def doModal(self, sources, args, pack_select):
         if sources:
+            if self.play:
+                prefetch.start_skip_times(self.mal_id, self.episode)
             # Reorder sources first.
             self.sources = self.reorder_sources(sources)
             self.args = args
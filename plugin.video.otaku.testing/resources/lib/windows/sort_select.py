@@ -3,7 +3,6 @@ import json
 
 from resources.lib.windows.base_window import BaseWindow
 from resources.lib.ui import control
-from operator import itemgetter
 
 # Define available sort methods
 SORT_METHODS = ['none', 'source type', 'debrid provider', 'audio', 'subtitles', 'resolution', 'size', 'seeders', 'audio channels']
@@ -402,53 +401,66 @@ class SortSelect(BaseWindow):
             json.dump(self.sort_options, file)
 
 
-def sort_by_none(list_, reverse):
-    return list_
-
-
-def sort_by_resolution(list_, reverse):
-    list_.sort(key=itemgetter('quality'), reverse=reverse)
-    return list_
-
-
-def sort_by_size(list_, reverse):
-    list_.sort(key=itemgetter('byte_size'), reverse=reverse)
-    return list_
-
-
-def sort_by_seeders(list_, reverse):
-    list_.sort(key=itemgetter('seeders'), reverse=reverse)
-    return list_
-
-
-def sort_by_audio_channels(list_, reverse):
-    list_.sort(key=itemgetter('channel'), reverse=reverse)
-    return list_
-
-
-def sort_by_debrid_provider(list_, reverse):
-    # debrid_order = {provider: index for index, provider in enumerate(SORT_OPTIONS['debrid provider'])}
-    # list_.sort(key=lambda x: debrid_order.get(x['debrid_provider'], float('inf')), reverse=reverse)
-    for i in range(len(SORT_OPTIONS['debrid provider']), 0, -1):
-        list_.sort(key=lambda x: x['debrid_provider'] in debrid_provider[int(sort_options[f'debrid provider.{i}'])], reverse=reverse)
-    return list_
+# Sort methods that order by a numeric source field
+VALUE_FIELDS = {
+    'resolution': 'quality',
+    'size': 'byte_size',
+    'seeders': 'seeders',
+    'audio channels': 'channel'
+}
 
+# Sort methods that order by the user's ranking of a source field's values
+RANKED_FIELDS = {
+    'source type': ('type', source_type),
+    'debrid provider': ('debrid_provider', debrid_provider),
+    'audio': ('lang', [[i] for i in audio]),
+    'subtitles': ('sub', [[i] for i in subtitles])
+}
 
-def sort_by_source_type(list_, reverse):
-    # Sort by source type categories only (no cached vs uncached distinction)
-    # This allows resolution to be the deciding factor within torrent sources
-    for i in range(len(SORT_OPTIONS['source type']), 0, -1):
-        list_.sort(key=lambda x: x['type'] in source_type[int(sort_options[f'source type.{i}'])], reverse=reverse)
-    return list_
 
+def _rank_map(method, options):
+    """Map each field value to the first option slot that selects it (lower ranks sort first)"""
+    ranks = {}
+    groups = RANKED_FIELDS[method][1]
+    for i in range(1, len(SORT_OPTIONS[method]) + 1):
+        for value in groups[int(options[f'{method}.{i}'])]:
+            ranks.setdefault(value, i)
+    return ranks
+
+
+def compile_sort_key(options=None, penalty=None):
+    """
+    Compile the sort configuration into one tuple key, so a single stable sort yields the same order as
+    applying every sort level (and every option slot within a level) as its own pass.
+    penalty, if given, maps a source to a number that is sorted on ahead of every level (lower first).
+    """
+    options = options or sort_options
+    levels = []
+    for x in range(1, len(SORT_METHODS) + 1):
+        method = SORT_METHODS[int(options[f'sortmethod.{x}'])]
+        # Levels are sorted descending unless the user reversed them
+        descending = not options[f'sortmethod.{x}.reverse']
+        if method in VALUE_FIELDS:
+            levels.append((VALUE_FIELDS[method], None, 0, descending))
+        elif method in RANKED_FIELDS:
+            # Unranked values lose every slot comparison, so they rank after all slots
+            levels.append((RANKED_FIELDS[method][0], _rank_map(method, options), len(SORT_OPTIONS[method]) + 1, descending))
+
+    def sort_key(source):
+        key = [penalty(source)] if penalty else []
+        for field, ranks, unranked, descending in levels:
+            if ranks is None:
+                value = source[field]
+                key.append(-value if descending else value)
+            else:
+                rank = ranks.get(source[field], unranked)
+                # A descending pass over "matches slot i" booleans puts matching sources first
+                key.append(rank if descending else -rank)
+        return tuple(key)
 
-def sort_by_audio(list_, reverse):
-    for i in range(len(SORT_OPTIONS['audio']), 0, -1):
-        list_.sort(key=lambda x: x['lang'] == audio[int(sort_options[f'audio.{i}'])], reverse=reverse)
-    return list_
+    return sort_key
 
 
-def sort_by_subtitles(list_, reverse):
-    for i in range(len(SORT_OPTIONS['subtitles']), 0, -1):
-        list_.sort(key=lambda x: x['sub'] == subtitles[int(sort_options[f'subtitles.{i}'])], reverse=reverse)
+def sort_sources(list_, options=None, penalty=None):
+    list_.sort(key=compile_sort_key(options, penalty))
     return list_
@@ -1,8 +1,6 @@
 import time
 import os
 import json
-import urllib.request
-import urllib.error
 import threading
 
 from resources.lib.ui import control, client, database_sync
@@ -16,17 +14,14 @@ def refresh_apis():
     kitsu_token = control.getSetting('kitsu.token')
     mal_token = control.getSetting('mal.token')
 
+    # Debrid tokens go through the shared token managers so the service never races a scrape refreshing them
     if rd_token != '':
-        rd_expiry = control.getInt('realdebrid.expiry')
-        if time.time() > (rd_expiry - 600):
-            from resources.lib.debrid import real_debrid
-            real_debrid.RealDebrid().refreshToken()
+        from resources.lib.debrid import real_debrid
+        real_debrid.RealDebrid().headers()
 
     if dl_token != '':
-        dl_expiry = control.getInt('debridlink.expiry')
-        if time.time() > (dl_expiry - 600):
-            from resources.lib.debrid import debrid_link
-            debrid_link.DebridLink().refreshToken()
+        from resources.lib.debrid import debrid_link
+        debrid_link.DebridLink().headers()
 
     if kitsu_token != '':
         kitsu_expiry = control.getInt('kitsu.expiry')
@@ -34,11 +29,9 @@ def refresh_apis():
             from resources.lib.WatchlistFlavor import Kitsu
             Kitsu.KitsuWLF().refresh_token()
 
-    if mal_token != '':
-        mal_expiry = control.getInt('mal.expiry')
-        if time.time() > (mal_expiry - 600):
-            from resources.lib.WatchlistFlavor import MyAnimeList
-            MyAnimeList.MyAnimeListWLF().refresh_token()
+    if mal_token != '' and control.getSetting('mal.refresh'):
+        from resources.lib.WatchlistFlavor import MyAnimeList
+        MyAnimeList.MyAnimeListWLF.token_manager().get()
 
 
 def update_calendars():
@@ -52,14 +45,12 @@ def update_calendars():
 
 def update_mappings_db():
     control.log("### Updating Mappings")
-    url = 'https://github.com/Goldenfreddy0703/Otaku-Mappings/raw/refs/heads/main/anime_mappings.db'
-    try:
-        response = urllib.request.urlopen(url)
-        with open(os.path.join(control.dataPath, 'mappings.db'), 'wb') as file:
-            file.write(response.read())
-        control.log("### Mappings updated successfully")
-    except urllib.error.URLError as e:
-        control.log(f"### Failed to update mappings: {e}")
+    from resources.lib.ui import mappings_update
+    result = mappings_update.update()
+    if result == mappings_update.UNCHANGED:
+        control.log("### Mappings unchanged")
+    elif result:
+        control.log(f"### Mappings {result} successfully")
 
 
 def sync_watchlist(silent=False):
@@ -134,6 +125,109 @@ def prefetch_watchlist():
         control.log(f'### Watchlist prefetch failed: {e}', 'warning')
 
 
+WARMER_INTERVAL = 6 * 3600  # seconds between warm-up rounds
+WARMER_RETRY = 300  # seconds to wait before retrying a round that was interrupted
+WARMER_IDLE = 120  # seconds without user input before the warmer starts fetching
+WARMER_WORKERS = 2  # lists warmed at once, each list fetches its own artwork
+WARMER_MIN_BATTERY = 30
+WARMER_SUBMENUS = ['trending', 'popular', 'voted', 'favourites']
+
+
+def warmer_lists():
+    """First-page lists of the configured main menu, in menu order"""
+    main_ids = control.getStringList('menu.mainmenu.config')
+    sub_ids = control.getStringList('menu.submenu.config')
+    lists = []
+    for menu_id in main_ids:
+        if menu_id in WARMER_SUBMENUS:
+            lists += [sub_id for sub_id in sub_ids if sub_id.endswith(f'_{menu_id}') or sub_id.startswith(f'{menu_id}_')]
+        elif (menu_id.startswith('airing_') and menu_id != 'airing_calendar') or menu_id == 'top_100':
+            lists.append(menu_id)
+    return lists
+
+
+def warmer_can_run():
+    if control.xbmc.Player().isPlaying():
+        return False
+    if control.xbmc.getGlobalIdleTime() < WARMER_IDLE:
+        return False
+    battery = control.xbmc.getInfoLabel('System.BatteryLevel').rstrip('%')
+    if battery.isdigit() and 0 < int(battery) < WARMER_MIN_BATTERY:
+        return False
+    return True
+
+
+def warm_metadata():
+    """
+    Fetch the first page of each configured main-menu list so the function cache and shows_meta
+    are already populated when the user opens them. Returns False if the round was interrupted.
+    """
+    import concurrent.futures
+    from resources.lib.MetaBrowser import BROWSER
+
+    stats = {}
+    interrupted = threading.Event()
+
+    def warm(list_id):
+        if interrupted.is_set() or control.abort_requested() or not warmer_can_run():
+            interrupted.set()
+            return
+        getter = getattr(BROWSER, f'get_{list_id}', None)
+        if not getter:
+            return
+        start = time.perf_counter()
+        try:
+            getter(1, None)
+            stats[list_id] = time.perf_counter() - start
+        except Exception as e:
+            control.log(f'### Warmer: {list_id} failed: {e}', 'warning')
+
+    start = time.perf_counter()
+    with concurrent.futures.ThreadPoolExecutor(max_workers=WARMER_WORKERS) as executor:
+        list(executor.map(warm, warmer_lists()))
+    if stats:
+        slowest = max(stats, key=stats.get)
+        control.log(f'### Warmer: {len(stats)} lists in {time.perf_counter() - start:.1f}s '
+                    f'(avg {sum(stats.values()) / len(stats):.2f}s, slowest {slowest} {stats[slowest]:.2f}s)')
+    if interrupted.is_set():
+        control.log('### Warmer: interrupted by playback or user activity')
+    return not interrupted.is_set()
+
+
+REFRESH_QUEUE_POLL = 30  # seconds between checks of the stale-while-revalidate refresh queue
+
+
+def run_refresh_queue():
+    """Finish background cache refreshes that plugin invocations queued but did not complete"""
+    from resources.lib.ui import database
+    while not control.wait_for_abort(REFRESH_QUEUE_POLL):
+        try:
+            count = database.process_refresh_queue()
+            if count:
+                control.log(f'### Refreshed {count} queued cache entries')
+        except Exception as e:
+            control.log(f'### Refresh queue failed: {e}', 'warning')
+
+
+def run_idle_tasks():
+    """Service loop that trims the cache and warms the menu lists while Kodi is idle"""
+    from resources.lib.ui import cache_maintenance
+
+    wait = WARMER_RETRY
+    while not control.wait_for_abort(wait):
+        if not warmer_can_run():
+            wait = WARMER_RETRY
+            continue
+        try:
+            cache_maintenance.run()
+        except Exception as e:
+            control.log(f'### Cache maintenance failed: {e}', 'warning')
+        if not control.getBool('general.warmer'):
+            wait = WARMER_INTERVAL
+            continue
+        wait = WARMER_INTERVAL if warm_metadata() else WARMER_RETRY
+
+
 def update_dub_json():
     control.log("### Updating Dub json")
     with open(control.maldubFile, 'w') as file:
@@ -314,3 +408,5 @@ if __name__ == "__main__":
     # Prefetch watchlist in background thread (non-blocking)
     threading.Thread(target=prefetch_watchlist, daemon=True).start()
     control.log('##################  MAINTENANCE COMPLETE ######################')
+    threading.Thread(target=run_refresh_queue, daemon=True).start()
+    run_idle_tasks()
@@ -0,0 +1,90 @@
+"""
+Benchmark: the nested thread pools scraping used to run on versus the shared async engine.
+
+Both sides make the same 120 requests to a local server that answers after DELAY seconds, shaped
+like one Nyaa scrape: 4 search pages, 5 results parsed per page, 6 debrid checks per result. The
+nested side gives every level its own utils.parallel_process pool; the engine side runs every
+request through async_client.AsyncEngine. Reports wall time, peak thread count and peak traced
+memory. Run with: python tests/bench_async_engine.py
+"""
+import os
+import sys
+import threading
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+import conftest  # noqa: E402,F401  installs the Kodi stand-ins
+
+from resources.lib.ui import async_client, client, control, utils  # noqa: E402
+
+SEARCHES, PARSES, CHECKS = 4, 5, 6
+DELAY = 0.05
+
+
+class PeakThreads:
+    def __init__(self):
+        self.peak = threading.active_count()
+        self.running = True
+        self.thread = threading.Thread(target=self._sample, daemon=True)
+
+    def _sample(self):
+        while self.running:
+            self.peak = max(self.peak, threading.active_count())
+            time.sleep(0.002)
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.running = False
+        self.thread.join()
+
+
+def nested(url):
+    def check(_):
+        return client.request(url, retry=False)
+
+    def parse(_):
+        return utils.parallel_process(range(CHECKS), check, max_workers=CHECKS)
+
+    def search(_):
+        return utils.parallel_process(range(PARSES), parse, max_workers=PARSES)
+
+    return utils.parallel_process(range(SEARCHES), search, max_workers=SEARCHES)
+
+
+def engine(url):
+    engine = async_client.AsyncEngine()
+    return engine.gather([engine.call(client.request, url, retry=False, host='bench')
+                          for _ in range(SEARCHES * PARSES * CHECKS)])
+
+
+def measure(label, func, url):
+    tracemalloc.start()
+    with PeakThreads() as threads:
+        start = time.perf_counter()
+        func(url)
+        wall = time.perf_counter() - start
+    _, peak_memory = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f'{label:<8} wall {wall:6.2f}s  peak threads {threads.peak:4d}  peak memory {peak_memory / 1024:8.0f} KiB')
+
+
+def main():
+    import tempfile
+    control.cacheFile = os.path.join(tempfile.mkdtemp(), 'cache.db')
+    control.log = lambda *args, **kwargs: None
+    server = conftest.LocalServer()
+    server.route('/item', body=b'{"cached": true}', delay=DELAY)
+    url = server.url + '/item'
+    client.request(url, retry=False)  # create cache.db tables outside the measurements
+    print(f'{SEARCHES * PARSES * CHECKS} requests, {DELAY * 1000:.0f} ms each')
+    measure('nested', nested, url)
+    measure('engine', engine, url)
+    server.httpd.shutdown()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,67 @@
+"""
+Benchmark: crypto's AES against the pyaes block feeder the extractors used before.
+
+Decrypts SIZE bytes of CBC ciphertext (an m3u8 playlist is a few KiB, a key-wrapped segment list
+can reach a few hundred) and CTR-encrypts the same amount with every available implementation.
+Run with: python tests/bench_crypto.py
+"""
+import importlib.util
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+import conftest  # noqa: E402,F401  installs the Kodi stand-ins
+
+from resources.lib.ui import crypto, pyaes  # noqa: E402
+
+SIZE = 256 * 1024
+KEY = bytes(range(32))
+IV = bytes(range(16))
+
+
+def best_of(func, runs=3):
+    times = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def pyaes_cbc_decrypt(data):
+    decrypter = pyaes.Decrypter(pyaes.AESModeOfOperationCBC(KEY, IV))
+    return decrypter.feed(data) + decrypter.feed()
+
+
+def pyaes_ctr(data):
+    counter = pyaes.Counter(int.from_bytes(IV, 'big'))
+    return pyaes.AESModeOfOperationCTR(KEY, counter).encrypt(data)
+
+
+def main():
+    plain = os.urandom(SIZE)
+    crypto.set_backend('python')
+    encrypted = crypto.cbc_encrypt(KEY, IV, plain)
+    assert pyaes_cbc_decrypt(encrypted) == plain
+    assert pyaes_ctr(plain) == crypto.ctr(KEY, IV, plain)
+
+    print(f'{SIZE // 1024} KiB, AES-256')
+    rows = [('pyaes', lambda: pyaes_cbc_decrypt(encrypted), lambda: pyaes_ctr(plain))]
+    for name, module in (('python', None), ('cryptography', 'cryptography'), ('cryptodome', 'Cryptodome')):
+        if module and importlib.util.find_spec(module) is None:
+            continue
+        rows.append((f'crypto/{name}',
+                     lambda name=name: crypto.set_backend(name) or crypto.cbc_decrypt(KEY, IV, encrypted),
+                     lambda name=name: crypto.set_backend(name) or crypto.ctr(KEY, IV, plain)))
+    baseline = None
+    for label, cbc, ctr in rows:
+        cbc_time, ctr_time = best_of(cbc), best_of(ctr)
+        baseline = baseline or cbc_time
+        print(f'{label:<20} cbc decrypt {SIZE / cbc_time / 1048576:7.2f} MB/s  '
+              f'ctr {SIZE / ctr_time / 1048576:7.2f} MB/s  ({baseline / cbc_time:5.1f}x pyaes)')
+    crypto.set_backend(None)
+
+
+if __name__ == '__main__':
+    main()
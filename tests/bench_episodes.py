@@ -0,0 +1,79 @@
+"""
+Benchmark: an 1100-episode list stored as pickled ListItem blobs (the layout before schema
+version 1) versus episode columns plus one shared episode_show row.
+
+Both sides write the list and then load and rebuild every item, as opening the episode list
+does. Each episode carries a 30-member cast, which the blob layout repeats in every row.
+Run with: python tests/bench_episodes.py
+"""
+import os
+import pickle
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+import conftest  # noqa: E402,F401  installs the Kodi stand-ins
+
+from resources.lib.ui import control, database  # noqa: E402
+from resources.lib.ui.database_sync import SyncDatabase  # noqa: E402
+from test_episodes import MAL_ID, fixture_items, store  # noqa: E402
+
+
+def best_of(func, runs=5):
+    times = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def blob_write(items):
+    # One connection and commit per episode, as update_database did
+    for number, item in enumerate(items, 1):
+        with database.SQL(control.malSyncDB) as cursor:
+            cursor.execute('REPLACE INTO episodes_v0 (mal_id, season, kodi_meta, last_updated, number) VALUES (?, 1, ?, ?, ?)',
+                           (MAL_ID, pickle.dumps(item), '2026-01-01', number))
+            cursor.connection.commit()
+
+
+def blob_read():
+    with database.SQL(control.malSyncDB) as cursor:
+        cursor.execute('SELECT * FROM episodes_v0 WHERE mal_id=? ORDER BY season, number', (MAL_ID,))
+        return [pickle.loads(row['kodi_meta']) for row in cursor.fetchall()]
+
+
+def column_read():
+    database._show_parts.clear()
+    return [database.episode_item(row) for row in database.get_episode_list(MAL_ID)]
+
+
+def main():
+    control.malSyncDB = os.path.join(tempfile.mkdtemp(), 'malSync.db')
+    SyncDatabase.build_show_table()
+    SyncDatabase.build_episode_table()
+    with database.SQL(control.malSyncDB) as cursor:
+        cursor.execute("INSERT INTO shows (mal_id, kodi_meta, anime_schedule_route) VALUES (?, ?, '')", (MAL_ID, pickle.dumps({})))
+        cursor.execute('CREATE TABLE episodes_v0 (mal_id INTEGER NOT NULL, season INTEGER NOT NULL, kodi_meta BLOB NOT NULL, '
+                       'last_updated TEXT NOT NULL, number INTEGER NOT NULL, UNIQUE(mal_id, season, number))')
+        cursor.connection.commit()
+
+    items = fixture_items()
+    blob_write_time = best_of(lambda: blob_write(items), runs=1)
+    column_write_time = best_of(lambda: store(items), runs=3)
+    assert blob_read() == items and column_read() == items
+    blob_read_time, column_read_time = best_of(blob_read), best_of(column_read)
+    with database.SQL(control.malSyncDB) as cursor:
+        blob_bytes = cursor.execute('SELECT SUM(LENGTH(kodi_meta)) AS n FROM episodes_v0').fetchone()['n']
+        column_bytes = cursor.execute('SELECT SUM(LENGTH(info) + LENGTH(image)) AS n FROM episode_show').fetchone()['n'] + sum(
+            sum(len(str(value)) for value in row.values() if value is not None)
+            for row in cursor.execute('SELECT * FROM episodes').fetchall())
+
+    print(f'{len(items)} episodes')
+    print(f'blobs    write {blob_write_time * 1000:8.1f} ms  load {blob_read_time * 1000:6.1f} ms  {blob_bytes / 1024:8.0f} KiB')
+    print(f'columns  write {column_write_time * 1000:8.1f} ms  load {column_read_time * 1000:6.1f} ms  {column_bytes / 1024:8.0f} KiB')
+
+
+if __name__ == '__main__':
+    main()
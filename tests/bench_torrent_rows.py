@@ -0,0 +1,59 @@
+"""
+Benchmark: the BeautifulSoup parsers Nyaa and AnimeTosho used versus torrent_rows, on the saved
+result pages in tests/fixtures.
+
+Each side turns the page into the list of torrent dicts the scrapers filter. torrent_rows is
+timed on both of its paths, lxml and the stdlib html.parser fallback, when lxml is installed.
+Reports the best of several runs and peak traced memory per page.
+Run with: python tests/bench_torrent_rows.py (needs beautifulsoup4)
+"""
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+import conftest  # noqa: E402,F401  installs the Kodi stand-ins
+
+from resources.lib.ui import torrent_rows  # noqa: E402
+from test_torrent_rows import fixture, soup_animetosho_rows, soup_nyaa_rows  # noqa: E402
+
+RUNS = 20
+
+
+def measure(func, html):
+    times = []
+    for _ in range(RUNS):
+        start = time.perf_counter()
+        func(html)
+        times.append(time.perf_counter() - start)
+    tracemalloc.start()
+    func(html)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return min(times), peak
+
+
+def main():
+    lxml_html = torrent_rows.lxml_html
+    pages = [
+        ('nyaa', fixture('nyaa_search.html'), soup_nyaa_rows, torrent_rows.iter_nyaa_rows),
+        ('animetosho', fixture('animetosho_search.html'), soup_animetosho_rows, torrent_rows.iter_animetosho_rows),
+    ]
+    for name, html, soup_rows, extract in pages:
+        expected = soup_rows(html)
+        sides = [('beautifulsoup', soup_rows)]
+        if lxml_html is not None:
+            sides.append(('torrent_rows lxml', lambda page: list(extract(page))))
+        sides.append(('torrent_rows stdlib', lambda page: list(extract(page))))
+        print(f'{name}: {len(html) / 1024:.0f} KiB, {len(expected)} rows')
+        for label, func in sides:
+            torrent_rows.lxml_html = lxml_html if label != 'torrent_rows stdlib' else None
+            assert func(html) == expected
+            best, peak = measure(func, html)
+            print(f'  {label:20} {best * 1000:7.2f} ms  peak {peak / 1024:7.0f} KiB')
+        torrent_rows.lxml_html = lxml_html
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,151 @@
+"""
+Test setup for plugin.video.otaku.testing.
+
+The addon imports Kodi's xbmc* modules, which only exist inside Kodi. MagicMock stand-ins are
+installed before any addon module is imported, with the addon profile pointing at a temporary
+directory, so the cache and metadata databases the tests create never touch a real profile.
+"""
+import http.server
+import os
+import sys
+import tempfile
+import threading
+import time
+from unittest import mock
+
+import pytest
+
+ADDON_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'plugin.video.otaku.testing')
+PROFILE_DIR = tempfile.mkdtemp(prefix='otaku-tests-')
+
+for _name in ('xbmc', 'xbmcgui', 'xbmcaddon', 'xbmcvfs', 'xbmcplugin'):
+    _module = mock.MagicMock()
+    _module.__name__ = _name
+    sys.modules.setdefault(_name, _module)
+sys.modules['xbmcvfs'].translatePath = lambda path: PROFILE_DIR + os.sep
+sys.modules['xbmcvfs'].exists = os.path.exists
+sys.modules['xbmcaddon'].Addon.return_value.getAddonInfo.side_effect = lambda key: '21.0' if key == 'version' else PROFILE_DIR
+sys.modules['xbmcaddon'].Addon.return_value.getSetting.return_value = ''
+sys.argv = ['plugin://plugin.video.otaku.testing/', '0', '']
+sys.path.insert(0, ADDON_DIR)
+
+from resources.lib.ui import control  # noqa: E402
+
+control.pathExists = os.path.exists
+
+
+@pytest.fixture
+def cache_db(tmp_path, monkeypatch):
+    """A fresh cache.db for the test, with the once-per-process schema flags cleared"""
+    from resources.lib.ui import circuit_breaker, database
+    path = str(tmp_path / 'cache.db')
+    monkeypatch.setattr(control, 'cacheFile', path)
+    monkeypatch.setattr(database, '_cache_schema_ready', False)
+    monkeypatch.setattr(circuit_breaker, '_tables_ready', False)
+    monkeypatch.setattr(circuit_breaker, '_open_until', {})
+    monkeypatch.setattr(circuit_breaker, '_rows', {})
+    monkeypatch.setattr(circuit_breaker, '_negative', {})
+    monkeypatch.setattr(circuit_breaker, '_negative_loaded', 0)
+    return path
+
+
+@pytest.fixture
+def locked_db(monkeypatch):
+    """Make every statement run through database.SQL fail with 'database is locked'"""
+    from sqlite3 import OperationalError
+    from resources.lib.ui import database, database_sync
+
+    class LockedCursor:
+        def execute(self, *args):
+            raise OperationalError('database is locked')
+
+        def close(self):
+            pass
+
+    class LockedSQL(database.SQL):
+        def __enter__(self):
+            self.lock.acquire()
+            self.cursor = LockedCursor()
+            return self.cursor
+
+    monkeypatch.setattr(database, 'SQL', LockedSQL)
+    monkeypatch.setattr(database_sync, 'SQL', LockedSQL)
+
+
+@pytest.fixture
+def settings(monkeypatch):
+    """Dict backing control.getSetting/getBool/getInt for the test"""
+    values = {}
+    monkeypatch.setattr(control, 'getSetting', lambda key: str(values.get(key, '')))
+    monkeypatch.setattr(control, 'getStr', lambda key: str(values.get(key, '')))
+    monkeypatch.setattr(control, 'getBool', lambda key: bool(values.get(key, False)))
+    monkeypatch.setattr(control, 'getInt', lambda key: int(values.get(key, 0)))
+    return values
+
+
+class Route:
+    """Canned answer of the local server: status, body, headers, an optional delay, and the hits"""
+    def __init__(self, status=200, body=b'', headers=None, delay=0):
+        self.status = status
+        self.body = body
+        self.headers = headers or {}
+        self.delay = delay
+        self.requests = []
+
+
+class LocalServer:
+    def __init__(self):
+        self.routes = {}
+        server = self
+
+        class Handler(http.server.BaseHTTPRequestHandler):
+            def _answer(self, send_body=True):
+                route = server.routes.get(self.path.split('?', 1)[0])
+                if route is None:
+                    self.send_error(404)
+                    return
+                route.requests.append(dict(self.headers))
+                answer = route.status
+                if callable(answer):
+                    answer = answer(self, len(route.requests))
+                status, body, headers = answer if isinstance(answer, tuple) else (answer, route.body, route.headers)
+                if route.delay:
+                    time.sleep(route.delay)
+                self.send_response(status)
+                for key, value in headers.items():
+                    self.send_header(key, value)
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                if send_body:
+                    self.wfile.write(body)
+
+            def do_GET(self):
+                self._answer()
+
+            def do_HEAD(self):
+                self._answer(False)
+
+            def do_POST(self):
+                self.rfile.read(int(self.headers.get('Content-Length') or 0))
+                self._answer()
+
+            def log_message(self, *args):
+                pass
+
+        self.httpd = http.server.ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.httpd.daemon_threads = True
+        self.url = f'http://127.0.0.1:{self.httpd.server_port}'
+        threading.Thread(target=self.httpd.serve_forever, daemon=True).start()
+
+    def route(self, path, *args, **kwargs):
+        self.routes[path] = Route(*args, **kwargs)
+        return self.routes[path]
+
+
+@pytest.fixture
+def http_server():
+    """A local HTTP server answering the Routes registered with http_server.route(path, ...)"""
+    server = LocalServer()
+    yield server
+    server.httpd.shutdown()
+    server.httpd.server_close()
@@ -0,0 +1,36 @@
+"""AsyncEngine.run refuses to block the threads the engine itself depends on"""
+import asyncio
+import threading
+
+import pytest
+
+from resources.lib.ui import async_client
+
+
+@pytest.fixture
+def engine():
+    return async_client.AsyncEngine()
+
+
+def test_run_from_the_loop_is_refused(engine):
+    async def nested():
+        inner = asyncio.sleep(0)
+        with pytest.raises(RuntimeError):
+            engine.run(inner)
+
+    engine.run(nested())
+
+
+def test_run_from_an_engine_worker_is_refused(engine):
+    def worker():
+        with pytest.raises(RuntimeError):
+            engine.run(asyncio.sleep(0))
+        return threading.current_thread().name
+
+    async def job():
+        return await engine.call(worker)
+
+    assert engine.run(job()).startswith('otaku-io')
+    # The flag is cleared once the call returns, so plain threads may still run coroutines
+    assert engine.run(asyncio.sleep(0, 'done')) == 'done'
+
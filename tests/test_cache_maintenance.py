@@ -0,0 +1,41 @@
+"""cache_maintenance.evict trims the function cache to its budget"""
+import time
+
+from resources.lib.ui import cache_maintenance, control, database
+
+
+def fill(rows, size):
+    now = int(time.time())
+    with database.SQL(control.cacheFile) as cursor:
+        database.create_cache_table(cursor)
+        for i in range(rows):
+            cursor.execute('REPLACE INTO cache (key, value, date, expires, accessed) VALUES (?, ?, ?, ?, ?)',
+                           (f'k{i:03d}', 'x' * size, now, now + 3600, now + i))
+        cursor.connection.commit()
+
+
+def cache_size():
+    with database.SQL(control.cacheFile) as cursor:
+        return cache_maintenance.cache_size(cursor)
+
+
+def test_evict_stops_at_the_budget_of_the_cache_table(cache_db):
+    fill(100, 1000)
+    # Other tables in cache.db must not count against the function cache budget
+    with database.SQL(control.cacheFile) as cursor:
+        cursor.execute('CREATE TABLE other (value TEXT)')
+        cursor.executemany('INSERT INTO other VALUES (?)', [('y' * 1000,)] * 200)
+        cursor.connection.commit()
+    budget = 50 * 1004
+    expired, evicted = cache_maintenance.evict(budget)
+    assert (expired, evicted) == (0, 50)
+    assert cache_size() <= budget
+    with database.SQL(control.cacheFile) as cursor:
+        keys = [row['key'] for row in cursor.execute('SELECT key FROM cache ORDER BY key').fetchall()]
+    assert keys == [f'k{i:03d}' for i in range(50, 100)]
+
+
+def test_evict_within_budget_keeps_everything(cache_db):
+    fill(10, 100)
+    assert cache_maintenance.evict(10 * 1024) == (0, 0)
+    assert cache_size() == 10 * 104
@@ -0,0 +1,99 @@
+"""client.request retries against a flaky local server"""
+import time
+
+import pytest
+
+from resources.lib.ui import circuit_breaker, client
+
+FAST = client.RetryPolicy(attempts=3, backoff=0.01, deadline=5)
+
+
+def flaky(failures, status=503):
+    """Route answer failing the first failures hits with status, then 200 ok"""
+    def answer(handler, hits):
+        return (status, b'busy', {}) if hits <= failures else (200, b'ok', {})
+    return answer
+
+
+def host(http_server):
+    return http_server.url.split('//', 1)[1]
+
+
+def breaker_failures(http_server):
+    row = circuit_breaker._load(host(http_server), fresh=True)
+    return row['failures'] if row else 0
+
+
+def test_transient_failures_are_retried(cache_db, http_server):
+    route = http_server.route('/flaky', status=flaky(2))
+    assert client.request(http_server.url + '/flaky', retry=FAST) in ('ok', b'ok')
+    assert [outcome for _, outcome, _ in client.last_trace()] == ['status 503', 'status 503', 'ok']
+    assert len(route.requests) == 3
+    # The call succeeded, so the breaker saw one success and no failures
+    assert breaker_failures(http_server) == 0
+
+
+def test_one_breaker_failure_per_logical_call(cache_db, http_server):
+    route = http_server.route('/down', status=503)
+    for call in range(1, circuit_breaker.FAILURE_THRESHOLD):
+        assert client.request(http_server.url + '/down', retry=FAST) is None
+        assert breaker_failures(http_server) == call
+        assert circuit_breaker.state(host(http_server)) == circuit_breaker.CLOSED
+    assert len(route.requests) == FAST.attempts * (circuit_breaker.FAILURE_THRESHOLD - 1)
+    client.request(http_server.url + '/down', retry=FAST)
+    assert circuit_breaker.state(host(http_server)) == circuit_breaker.OPEN
+    # Open circuit: the next call does not reach the server
+    assert client.request(http_server.url + '/down', retry=FAST) is None
+    assert len(route.requests) == FAST.attempts * circuit_breaker.FAILURE_THRESHOLD
+
+
+def test_client_errors_are_not_retried(cache_db, http_server):
+    route = http_server.route('/missing', status=403)
+    assert client.request(http_server.url + '/missing', retry=FAST) is None
+    assert len(route.requests) == 1
+
+
+def test_posts_are_not_retried(cache_db, http_server):
+    route = http_server.route('/post', status=503)
+    client.request(http_server.url + '/post', post={'a': 1}, retry=FAST)
+    assert len(route.requests) == 1
+
+
+def test_retries_stay_within_the_deadline(cache_db, http_server):
+    http_server.route('/slow', body=b'late', delay=2)
+    policy = client.RetryPolicy(attempts=5, backoff=0.01, deadline=1.5)
+    start = time.perf_counter()
+    assert client.request(http_server.url + '/slow', retry=policy, timeout=0.5) is None
+    assert time.perf_counter() - start < 2
+    assert all(outcome in ('timeout', 'deadline') for _, outcome, _ in client.last_trace())
+
+
+def test_default_worst_case_is_one_socket_timeout():
+    assert client.RETRY_POLICY.deadline <= 20
+
+
+@pytest.mark.parametrize('attempt', [1, 2, 5, 10])
+def test_backoff_is_full_jitter_and_capped(attempt):
+    policy = client.RetryPolicy(backoff=0.5, max_backoff=8)
+    assert policy.delay(attempt, rand=lambda: 1.0) == min(8, 0.5 * 2 ** (attempt - 1))
+    assert policy.delay(attempt, rand=lambda: 0.0) == 0
+
+
+def test_graphql_mutations_are_not_retried(cache_db, http_server):
+    route = http_server.route('/graphql', status=503)
+    policy = client.RetryPolicy(attempts=3, backoff=0.01, methods=('GET', 'HEAD', 'POST'))
+    mutation = {'query': '\n        mutation ($id: Int) { DeleteMediaListEntry (id: $id) { deleted } }', 'variables': {'id': 1}}
+    client.request(http_server.url + '/graphql', post=mutation, jpost=True, retry=policy)
+    assert len(route.requests) == 1
+    client.request(http_server.url + '/graphql', post={'query': 'query { Viewer { id } }'}, jpost=True, retry=policy)
+    assert len(route.requests) == 4
+
+
+def test_timeouts_cut_by_the_callers_deadline_do_not_open_the_circuit(cache_db, http_server):
+    http_server.route('/slow', body=b'late', delay=1)
+    host = http_server.url.split('//', 1)[1]
+    for _ in range(circuit_breaker.FAILURE_THRESHOLD + 1):
+        with client.deadline(0.5):
+            assert client.request(http_server.url + '/slow', retry=False) is None
+    assert circuit_breaker.state(host) == circuit_breaker.CLOSED
+    assert circuit_breaker.allow(host)
@@ -0,0 +1,19 @@
+"""cloud_catalog keeps the stored listing when a provider refresh fails"""
+from resources.lib.debrid import cloud_catalog, real_debrid
+from resources.lib.ui import client
+
+TORRENTS = [{'id': 'B', 'added': '2024-02-01'}, {'id': 'A', 'added': '2024-01-01'}]
+
+
+def test_failed_full_refresh_serves_the_stored_catalog(cache_db, monkeypatch):
+    assert cloud_catalog.get_catalog('realdebrid', lambda: TORRENTS, 'id') == TORRENTS
+    monkeypatch.setattr(cloud_catalog, 'REFRESH_MINUTES', 0)
+    assert cloud_catalog.get_catalog('realdebrid', lambda: None, 'id') == TORRENTS
+
+
+def test_real_debrid_listing_failure_is_none(monkeypatch):
+    api = real_debrid.RealDebrid.__new__(real_debrid.RealDebrid)
+    api.BaseUrl = 'https://api.real-debrid.com/rest/1.0'
+    monkeypatch.setattr(api, 'headers', lambda: {}, raising=False)
+    monkeypatch.setattr(client, 'get', lambda *args, **kwargs: None)
+    assert api.list_torrents() is None
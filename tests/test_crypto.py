@@ -0,0 +1,110 @@
+"""crypto against the NIST SP 800-38A known-answer vectors, on every importable backend"""
+import base64
+import hashlib
+import importlib
+
+import pytest
+
+from resources.lib.ui import crypto
+
+PLAINTEXT = bytes.fromhex(
+    '6bc1bee22e409f96e93d7e117393172a'
+    'ae2d8a571e03ac9c9eb76fac45af8e51'
+    '30c81c46a35ce411e5fbc1191a0a52ef'
+    'f69f2445df4f9b17ad2b417be66c3710')
+
+KEYS = {
+    128: bytes.fromhex('2b7e151628aed2a6abf7158809cf4f3c'),
+    192: bytes.fromhex('8e73b0f7da0e6452c810f32b809079e562f8ead2522c6b7b'),
+    256: bytes.fromhex('603deb1015ca71be2b73aef0857d77811f352c073b6108d72d9810a30914dff4'),
+}
+CBC_IV = bytes.fromhex('000102030405060708090a0b0c0d0e0f')
+CTR_COUNTER = bytes.fromhex('f0f1f2f3f4f5f6f7f8f9fafbfcfdfeff')
+
+# SP 800-38A appendix F.1 (ECB), F.2 (CBC) and F.5 (CTR)
+VECTORS = {
+    ('ecb', 128): '3ad77bb40d7a3660a89ecaf32466ef97f5d3d58503b9699de785895a96fdbaaf'
+                  '43b1cd7f598ece23881b00e3ed0306887b0c785e27e8ad3f8223207104725dd4',
+    ('ecb', 192): 'bd334f1d6e45f25ff712a214571fa5cc974104846d0ad3ad7734ecb3ecee4eef'
+                  'ef7afd2270e2e60adce0ba2face6444e9a4b41ba738d6c72fb16691603c18e0e',
+    ('ecb', 256): 'f3eed1bdb5d2a03c064b5a7e3db181f8591ccb10d410ed26dc5ba74a31362870'
+                  'b6ed21b99ca6f4f9f153e7b1beafed1d23304b7a39f9f3ff067d8d8f9e24ecc7',
+    ('cbc', 128): '7649abac8119b246cee98e9b12e9197d5086cb9b507219ee95db113a917678b2'
+                  '73bed6b8e3c1743b7116e69e222295163ff1caa1681fac09120eca307586e1a7',
+    ('cbc', 192): '4f021db243bc633d7178183a9fa071e8b4d9ada9ad7dedf4e5e738763f69145a'
+                  '571b242012fb7ae07fa9baac3df102e008b0e27988598881d920a9e64f5615cd',
+    ('cbc', 256): 'f58c4c04d6e5f1ba779eabfb5f7bfbd69cfc4e967edb808d679f777bc6702c7d'
+                  '39f23369a9d9bacfa530e26304231461b2eb05e2c39be9fcda6c19078c6a9d1b',
+    ('ctr', 128): '874d6191b620e3261bef6864990db6ce9806f66b7970fdff8617187bb9fffdff'
+                  '5ae4df3edbd5d35e5b4f09020db03eab1e031dda2fbe03d1792170a0f3009cee',
+    ('ctr', 192): '1abc932417521ca24f2b0459fe7e6e0b090339ec0aa6faefd5ccc2c6f4ce8e94'
+                  '1e36b26bd1ebc670d1bd1d665620abf74f78a7f6d29809585a97daec58c6b050',
+    ('ctr', 256): '601ec313775789a5b7a7f504bbf3d228f443e3ca4d62b59aca84e990cacaf5c5'
+                  '2b0930daa23de94ce87017ba2d84988ddfc9c58db67aada613c2dd08457941a6',
+}
+
+BACKEND_MODULES = {'python': None, 'cryptography': 'cryptography', 'cryptodome': 'Cryptodome'}
+
+
+@pytest.fixture(params=sorted(BACKEND_MODULES))
+def backend(request):
+    module = BACKEND_MODULES[request.param]
+    if module:
+        try:
+            importlib.import_module(module)
+        except ImportError:
+            pytest.skip(f'{module} is not installed')
+    crypto.set_backend(request.param)
+    yield request.param
+    crypto.set_backend(None)
+
+
+@pytest.mark.parametrize('mode,bits', sorted(VECTORS))
+def test_known_answers(backend, mode, bits):
+    key, expected = KEYS[bits], bytes.fromhex(VECTORS[mode, bits])
+    if mode == 'ecb':
+        assert crypto.ecb_encrypt(key, PLAINTEXT, pad=False) == expected
+        assert crypto.ecb_decrypt(key, expected, unpad=False) == PLAINTEXT
+    elif mode == 'cbc':
+        assert crypto.cbc_encrypt(key, CBC_IV, PLAINTEXT, pad=False) == expected
+        assert crypto.cbc_decrypt(key, CBC_IV, expected, unpad=False) == PLAINTEXT
+    else:
+        assert crypto.ctr(key, CTR_COUNTER, PLAINTEXT) == expected
+        assert crypto.ctr(key, CTR_COUNTER, expected) == PLAINTEXT
+        # A partial last block uses only the start of the keystream
+        assert crypto.ctr(key, CTR_COUNTER, PLAINTEXT[:37]) == expected[:37]
+
+
+def test_padding_round_trip(backend):
+    key = KEYS[128]
+    for length in (0, 1, 15, 16, 17, 100):
+        data = bytes(range(length))
+        encrypted = crypto.cbc_encrypt(key, CBC_IV, data)
+        assert len(encrypted) == (length // 16 + 1) * 16
+        assert crypto.cbc_decrypt(key, CBC_IV, encrypted) == data
+        assert crypto.ecb_decrypt(key, crypto.ecb_encrypt(key, data)) == data
+
+
+def test_cryptojs_passphrase_round_trip(backend):
+    encrypted = crypto.cryptojs_encrypt('{"file": "https://example.org/a.m3u8"}', 'secret', salt=b'saltsalt')
+    assert base64.b64decode(encrypted)[:16] == b'Salted__saltsalt'
+    assert crypto.cryptojs_decrypt(encrypted, 'secret') == b'{"file": "https://example.org/a.m3u8"}'
+
+
+def test_evp_kdf_chains_md5_digests():
+    # EVP_BytesToKey: D1 = md5(password + salt), Dn = md5(Dn-1 + password + salt)
+    password, salt = b'password', bytes(range(8))
+    d1 = hashlib.md5(password + salt).digest()
+    d2 = hashlib.md5(d1 + password + salt).digest()
+    d3 = hashlib.md5(d2 + password + salt).digest()
+    assert crypto.evp_kdf(password, salt) == (d1 + d2, d3)
+    assert crypto.evp_kdf(password, salt, 16, 16) == (d1, d2)
+
+
+def test_invalid_input_is_rejected():
+    with pytest.raises(ValueError):
+        crypto.cbc_encrypt(b'short', CBC_IV, b'data')
+    with pytest.raises(ValueError):
+        crypto.cbc_decrypt(KEYS[128], CBC_IV, b'x' * 15)
+    with pytest.raises(ValueError):
+        crypto.pkcs7_unpad(b'\x00' * 16)
@@ -0,0 +1,44 @@
+"""client.deadline and the debrid cache checks that run under it"""
+import time
+
+from resources.lib import debrid
+from resources.lib.ui import async_client, client
+
+
+def test_deadline_cuts_a_slow_request(cache_db, http_server):
+    http_server.route('/slow', body=b'late', delay=3)
+    start = time.perf_counter()
+    with client.deadline(0.5):
+        assert client.request(http_server.url + '/slow', retry=False) is None
+    assert time.perf_counter() - start < 2
+    assert client.deadline.remaining() is None
+
+
+def test_no_request_starts_after_the_deadline(cache_db, http_server):
+    route = http_server.route('/fast', body=b'ok')
+    with client.deadline(0):
+        assert client.request(http_server.url + '/fast') is None
+    assert client.last_trace() == [(1, 'deadline', 0.0)]
+    assert route.requests == []
+
+
+def test_nested_deadline_keeps_the_earlier_one():
+    with client.deadline(0.2):
+        with client.deadline(60):
+            assert client.deadline.remaining() <= 0.2
+        assert client.deadline.remaining() <= 0.2
+
+
+def test_timed_out_cache_check_frees_its_engine_worker(cache_db, http_server, monkeypatch):
+    http_server.route('/slow', body=b'{}', delay=3)
+    monkeypatch.setattr(debrid, 'CHECK_TIMEOUT', 0.5)
+    engine = async_client.AsyncEngine(max_concurrency=1)
+
+    def slow_check(torrent_list):
+        client.request(http_server.url + '/slow', retry=False)
+
+    start = time.perf_counter()
+    engine.run(engine.call(debrid.Debrid._timed_worker, 'slow', slow_check, []))
+    # The only worker thread must be free again for the next call well before the server answers
+    assert engine.run(engine.call(lambda: 'next')) == 'next'
+    assert time.perf_counter() - start < 2
@@ -0,0 +1,75 @@
+"""Episode paging: page ranges and the episode list kept across page navigations"""
+import pytest
+
+from resources.lib import MetaBrowser
+from resources.lib.ui import episode_pages
+
+
+def items(count, watched=0):
+    return [{'name': f'Episode {n}', 'url': f'play/1/{n}', 'image': {'thumb': None},
+             'info': dict({'episode': n, 'title': f'Episode {n}'}, **({'playcount': 1} if n <= watched else {}))}
+            for n in range(1, count + 1)]
+
+
+@pytest.fixture
+def indexer(cache_db, settings, monkeypatch):
+    settings.update({'interface.episode.paging': True, 'interface.perpage.episodes': 100})
+    calls = []
+
+    def get_anime_init(mal_id):
+        calls.append(mal_id)
+        return items(1100, watched=len(calls)), 'episodes'
+
+    monkeypatch.setattr(MetaBrowser, 'get_anime_init', get_anime_init)
+    return calls
+
+
+def test_pages_reuse_the_list_parsed_for_the_index(indexer):
+    index, _ = MetaBrowser.get_anime_episodes(21)
+    for page in ('2', '3', '11'):
+        assert MetaBrowser.get_anime_episodes(21, page) == (index, 'episodes')
+    assert indexer == [21]
+
+
+def test_opening_the_index_parses_the_list_again(indexer):
+    MetaBrowser.get_anime_episodes(21)
+    MetaBrowser.get_anime_episodes(21)
+    assert indexer == [21, 21]
+
+
+def test_watched_episode_clears_the_kept_list(indexer):
+    MetaBrowser.get_anime_episodes(21)
+    MetaBrowser.clear_episode_list(21)
+    data, _ = MetaBrowser.get_anime_episodes(21, '2')
+    assert indexer == [21, 21]
+    assert data[1]['info'].get('playcount') == 1
+
+
+def test_expired_list_is_parsed_again(indexer, monkeypatch):
+    MetaBrowser.get_anime_episodes(21)
+    monkeypatch.setattr(MetaBrowser, 'EPISODE_LIST_CACHE_HOURS', 0)
+    MetaBrowser.get_anime_episodes(21, '2')
+    assert indexer == [21, 21]
+
+
+def test_short_lists_are_not_kept(cache_db, settings, monkeypatch):
+    settings.update({'interface.episode.paging': True, 'interface.perpage.episodes': 100})
+    calls = []
+    monkeypatch.setattr(MetaBrowser, 'get_anime_init', lambda mal_id: calls.append(mal_id) or (items(12), 'episodes'))
+    MetaBrowser.get_anime_episodes(5)
+    MetaBrowser.get_anime_episodes(5, '1')
+    assert calls == [5, 5]
+
+
+def test_page_ranges_follow_seasons_and_page_size():
+    seasons = {n: 1 if n <= 61 else 2 for n in range(1, 251)}
+    ranges = episode_pages.page_ranges(list(range(1, 251)), 100, seasons)
+    assert ranges == [(1, 1, 61), (2, 62, 161), (2, 162, 250)]
+    assert episode_pages.page_of(ranges, 162) == 3
+    assert episode_pages.page_of(ranges, 999) is None
+    assert episode_pages.page_ranges([1, 2, 3], 2) == [(None, 1, 2), (None, 3, 3)]
+
+
+def test_next_unwatched():
+    assert episode_pages.next_unwatched(items(5, watched=3))['info']['episode'] == 4
+    assert episode_pages.next_unwatched(items(5, watched=5)) is None
@@ -0,0 +1,154 @@
+"""Episode rows in columns: episode_row/episode_item round trip, bulk writes and the v0 migration"""
+import pickle
+import sqlite3
+
+import pytest
+
+from resources.lib.ui import control, database
+from resources.lib.ui.database_sync import SyncDatabase
+
+MAL_ID = 21
+EPISODES = 1100
+
+
+def show_info():
+    return {
+        'tvshowtitle': 'One Piece', 'mediatype': 'episode', 'status': 'Airing', 'mpaa': 'PG-13',
+        'genre': ['Action', 'Adventure', 'Fantasy'], 'studio': ['Toei Animation'], 'country': ['JP'],
+        'duration': 1440, 'trailer': 'plugin://plugin.video.youtube/play/?video_id=xyz',
+        'UniqueIDs': {'mal_id': str(MAL_ID), 'anilist_id': '21', 'kitsu_id': '12'},
+        'cast': [{'name': f'Actor {i}', 'role': f'Role {i}', 'thumbnail': f'https://img.example/cast/{i}.jpg', 'index': i}
+                 for i in range(30)],
+    }
+
+
+def make_item(number):
+    """An episode ListItem dict shaped like the ones indexers.update_database builds"""
+    info = show_info()
+    info.update({
+        'title': f'Episode title {number}', 'plot': f'Plot of episode {number}. ' * 10,
+        'season': 1, 'episode': number, 'aired': f'2{number:03d}-01-01',
+        'rating': {'score': 7.5 + number % 10 / 10, 'votes': number * 3}, 'code': f'S01E{number:04d}',
+    })
+    if number % 3 == 0:
+        info['playcount'] = 1
+    image = {'poster': 'https://img.example/poster.jpg', 'icon': f'https://img.example/{number}.jpg',
+             'thumb': f'https://img.example/{number}.jpg', 'fanart': ['https://img.example/fanart.jpg'],
+             'landscape': None, 'banner': None, 'clearart': 'https://img.example/clearart.png',
+             'clearlogo': 'https://img.example/clearlogo.png'}
+    return {'isfolder': False, 'isplayable': True, 'name': info['title'],
+            'url': f'play/{MAL_ID}/{number}', 'info': info, 'cm': [], 'image': image}
+
+
+def fixture_items(count=EPISODES):
+    return [make_item(number) for number in range(1, count + 1)]
+
+
+def store(items):
+    rows, shows = [], {}
+    for number, item in enumerate(items, 1):
+        row, info, image = database.episode_row(MAL_ID, 1, number, '2026-01-01', None, None, item)
+        rows.append(row)
+        shows[MAL_ID] = (info, image)
+    database.update_episodes(rows, shows)
+
+
+@pytest.fixture
+def sync_db(tmp_path, monkeypatch):
+    monkeypatch.setattr(control, 'malSyncDB', str(tmp_path / 'malSync.db'))
+    monkeypatch.setattr(database, '_show_parts', {})
+    SyncDatabase.build_show_table()
+    SyncDatabase.build_episode_table()
+    with database.SQL(control.malSyncDB) as cursor:
+        cursor.execute("INSERT INTO shows (mal_id, kodi_meta, anime_schedule_route) VALUES (?, ?, '')",
+                       (MAL_ID, pickle.dumps({})))
+        cursor.connection.commit()
+    return control.malSyncDB
+
+
+def test_row_and_item_round_trip():
+    for number in (1, 2, 3, 1000):
+        item = make_item(number)
+        row, info, image = database.episode_row(MAL_ID, 1, number, '2026-01-01', None, None, item)
+        stored = dict(zip(database.EPISODE_COLUMNS, row), show_info=pickle.dumps(info), show_image=pickle.dumps(image))
+        assert database.episode_item(stored) == item
+
+
+def test_optional_columns_are_left_out():
+    item = make_item(1)
+    del item['info']['aired'], item['info']['rating']
+    row, info, image = database.episode_row(MAL_ID, 1, 1, '2026-01-01', None, None, item)
+    rebuilt = database.episode_item(dict(zip(database.EPISODE_COLUMNS, row), show_info=pickle.dumps(info), show_image=None))
+    assert 'aired' not in rebuilt['info'] and 'rating' not in rebuilt['info']
+
+
+def test_bulk_store_and_read_back(sync_db):
+    items = fixture_items()
+    store(items)
+    rows = database.get_episode_list(MAL_ID)
+    assert [row['number'] for row in rows] == list(range(1, EPISODES + 1))
+    assert [database.episode_item(row) for row in rows] == items
+    assert database.episode_item(database.get_episode(MAL_ID, 500)) == items[499]
+    # The shared show part is stored once, not per episode
+    with sqlite3.connect(sync_db) as conn:
+        assert conn.execute('SELECT COUNT(*) FROM episode_show').fetchone()[0] == 1
+
+
+def test_episode_changed_ignores_last_updated(sync_db):
+    store(fixture_items(3))
+    stored = database.get_episode(MAL_ID, 2)
+    row, _, _ = database.episode_row(MAL_ID, 1, 2, '2027-01-01', None, None, make_item(2))
+    assert not database.episode_changed(stored, row)
+    changed = make_item(2)
+    changed['info']['title'] = 'New title'
+    row, _, _ = database.episode_row(MAL_ID, 1, 2, '2027-01-01', None, None, changed)
+    assert database.episode_changed(stored, row)
+
+
+def create_v0_episodes(items):
+    """The episodes layout before schema version 1, filled with pickled items"""
+    with database.SQL(control.malSyncDB) as cursor:
+        cursor.execute('DROP TABLE episodes')
+        cursor.execute('DROP TABLE episode_show')
+        cursor.execute('CREATE TABLE episodes (mal_id INTEGER NOT NULL, season INTEGER NOT NULL, kodi_meta BLOB NOT NULL, '
+                       'last_updated TEXT NOT NULL, number INTEGER NOT NULL, filler TEXT, anidb_ep_id INTEGER, '
+                       'FOREIGN KEY(mal_id) REFERENCES shows(mal_id) ON DELETE CASCADE)')
+        cursor.execute('CREATE UNIQUE INDEX ix_episodes ON episodes (mal_id ASC, season ASC, number ASC)')
+        cursor.executemany('INSERT INTO episodes (mal_id, season, number, kodi_meta, last_updated, filler) VALUES (?, 1, ?, ?, ?, ?)',
+                           [(MAL_ID, number, pickle.dumps(item), '2026-01-01', None) for number, item in enumerate(items, 1)])
+        cursor.connection.commit()
+
+
+def test_migration_moves_pickled_episodes_into_columns(sync_db):
+    items = fixture_items(50)
+    create_v0_episodes(items)
+    assert SyncDatabase._migrate_1()
+    assert [database.episode_item(row) for row in database.get_episode_list(MAL_ID)] == items
+
+
+def test_interrupted_migration_keeps_the_version_and_resumes(sync_db, monkeypatch):
+    items = fixture_items(20)
+    create_v0_episodes(items)
+    SyncDatabase.set_schema_version(0)
+    update_episodes = database.update_episodes
+
+    def locked(*args):
+        raise sqlite3.OperationalError('database is locked')
+
+    monkeypatch.setattr(database, 'update_episodes', locked)
+    sync = SyncDatabase.__new__(SyncDatabase)
+    sync.migrate_schema()
+    assert SyncDatabase.schema_version() == 0
+    assert SyncDatabase._episode_layout()[1]  # the rows wait in episodes_v0
+
+    monkeypatch.setattr(database, 'update_episodes', update_episodes)
+    sync.migrate_schema()
+    assert SyncDatabase.schema_version() == 1
+    assert not SyncDatabase._episode_layout()[1]
+    assert [database.episode_item(row) for row in database.get_episode_list(MAL_ID)] == items
+
+
+def test_locked_database_is_left_for_the_next_start(sync_db, locked_db):
+    SyncDatabase.__new__(SyncDatabase).migrate_schema()
+    assert SyncDatabase.schema_version() is None
+    assert not SyncDatabase._migrate_1()
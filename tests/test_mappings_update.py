@@ -0,0 +1,92 @@
+"""mappings_update.update against a local server serving mappings databases"""
+import sqlite3
+
+import pytest
+
+from resources.lib.ui import mappings_update
+
+COLUMNS = sorted(mappings_update.REQUIRED_COLUMNS)
+
+
+def make_db(path, rows, columns=COLUMNS):
+    conn = sqlite3.connect(path)
+    conn.execute(f'CREATE TABLE anime ({", ".join(f"{c} INTEGER" if c == "mal_id" else f"{c} TEXT" for c in columns)})')
+    for mal_id, anilist_id in rows:
+        values = {c: None for c in columns}
+        values.update(mal_id=mal_id, anilist_id=anilist_id)
+        conn.execute(f'INSERT INTO anime ({", ".join(columns)}) VALUES ({", ".join("?" * len(columns))})',
+                     [values[c] for c in columns])
+    conn.commit()
+    conn.close()
+    with open(path, 'rb') as file:
+        return file.read()
+
+
+def rows(path):
+    conn = sqlite3.connect(path)
+    try:
+        return conn.execute('SELECT mal_id, anilist_id FROM anime ORDER BY mal_id').fetchall()
+    finally:
+        conn.close()
+
+
+def serve(http_server, body, etag):
+    def answer(handler, hits):
+        if handler.headers.get('If-None-Match') == etag:
+            return 304, b'', {}
+        return 200, body, {'ETag': etag}
+    return http_server.route('/mappings.db', status=answer)
+
+
+@pytest.fixture
+def live(tmp_path):
+    return str(tmp_path / 'mappings.db')
+
+
+def test_download_then_not_modified(http_server, live, tmp_path):
+    route = serve(http_server, make_db(str(tmp_path / 'v1.db'), [(1, '10'), (2, '20')]), '"v1"')
+    url = http_server.url + '/mappings.db'
+    assert mappings_update.update(url, live, diff=False) == mappings_update.REPLACED
+    assert rows(live) == [(1, '10'), (2, '20')]
+    assert mappings_update.read_validators(live) == ('"v1"', None)
+
+    assert mappings_update.update(url, live, diff=False) == mappings_update.UNCHANGED
+    assert route.requests[-1].get('If-None-Match') == '"v1"'
+    assert not (tmp_path / 'mappings.db.download').exists()
+
+
+def test_changed_rows_are_patched_in_place(http_server, live, tmp_path):
+    make_db(live, [(1, '10'), (2, '20'), (3, '30')])
+    serve(http_server, make_db(str(tmp_path / 'v2.db'), [(1, '10'), (2, '21'), (4, '40')]), '"v2"')
+    assert mappings_update.update(http_server.url + '/mappings.db', live, diff=True) == mappings_update.PATCHED
+    assert rows(live) == [(1, '10'), (2, '21'), (4, '40')]
+    assert mappings_update.read_validators(live) == ('"v2"', None)
+
+
+def test_changed_layout_falls_back_to_replacing(http_server, live, tmp_path):
+    make_db(live, [(1, '10')])
+    serve(http_server, make_db(str(tmp_path / 'v2.db'), [(1, '11')], COLUMNS + ['extra_id']), '"v2"')
+    assert mappings_update.update(http_server.url + '/mappings.db', live, diff=True) == mappings_update.REPLACED
+    assert rows(live) == [(1, '11')]
+
+
+@pytest.mark.parametrize('body', [b'not a database' * 100, b''])
+def test_invalid_download_keeps_the_live_database(http_server, live, body):
+    make_db(live, [(1, '10')])
+    http_server.route('/mappings.db', body=body, headers={'ETag': '"bad"'})
+    assert mappings_update.update(http_server.url + '/mappings.db', live, diff=False) is None
+    assert rows(live) == [(1, '10')]
+
+
+def test_missing_columns_are_rejected(http_server, live, tmp_path):
+    make_db(live, [(1, '10')])
+    serve(http_server, make_db(str(tmp_path / 'v2.db'), [(1, '11')], [c for c in COLUMNS if c != 'kitsu_id']), '"v2"')
+    assert mappings_update.update(http_server.url + '/mappings.db', live, diff=False) is None
+    assert rows(live) == [(1, '10')]
+
+
+def test_server_error_keeps_the_live_database(http_server, live):
+    make_db(live, [(1, '10')])
+    http_server.route('/mappings.db', status=500)
+    assert mappings_update.update(http_server.url + '/mappings.db', live, diff=False) is None
+    assert rows(live) == [(1, '10')]
@@ -0,0 +1,93 @@
+"""client.request replays remembered 404/410 answers and nothing else"""
+import pytest
+
+from resources.lib.ui import circuit_breaker, client, control, database
+
+
+@pytest.mark.parametrize('status', [404, 410])
+def test_missing_resources_are_fetched_once(cache_db, http_server, status):
+    route = http_server.route('/episode', status=status)
+    for _ in range(3):
+        assert client.request(http_server.url + '/episode', retry=False) is None
+        assert client.last_status() == status
+    assert len(route.requests) == 1
+
+
+def test_params_are_part_of_the_key(cache_db, http_server):
+    route = http_server.route('/search', status=404)
+    client.request(http_server.url + '/search', params={'q': 'a'}, retry=False)
+    client.request(http_server.url + '/search', params={'q': 'b'}, retry=False)
+    client.request(http_server.url + '/search', params={'q': 'a'}, retry=False)
+    assert len(route.requests) == 2
+
+
+def test_empty_ok_answers_are_not_remembered(cache_db, http_server):
+    route = http_server.route('/empty', status=200, body=b'')
+    for _ in range(3):
+        assert client.request(http_server.url + '/empty', retry=False) in ('', b'')
+    assert len(route.requests) == 3
+
+
+def test_server_errors_and_posts_are_not_remembered(cache_db, http_server):
+    error = http_server.route('/error', status=500)
+    post = http_server.route('/post', status=404)
+    for _ in range(2):
+        client.request(http_server.url + '/error', retry=False)
+        client.request(http_server.url + '/post', post={'a': 1}, retry=False)
+    assert len(error.requests) == 2
+    assert len(post.requests) == 2
+
+
+def test_tables_are_created_once_per_process(cache_db, http_server, monkeypatch):
+    http_server.route('/episode', status=404)
+    client.request(http_server.url + '/episode', retry=False)
+    statements = []
+
+    class CountingCursor:
+        def __init__(self, cursor):
+            self.cursor = cursor
+
+        def execute(self, sql, *args):
+            statements.append(sql)
+            return self.cursor.execute(sql, *args)
+
+        def __getattr__(self, name):
+            return getattr(self.cursor, name)
+
+    class CountingSQL(database.SQL):
+        def __enter__(self):
+            return CountingCursor(super().__enter__())
+
+    monkeypatch.setattr(database, 'SQL', CountingSQL)
+    circuit_breaker.negative_get(http_server.url + '/episode')
+    circuit_breaker.negative_put(http_server.url + '/other', 404)
+    assert not [sql for sql in statements if sql.startswith('CREATE')]
+    with database.SQL(control.cacheFile) as cursor:
+        assert cursor.execute('SELECT COUNT(*) AS n FROM negative_cache').fetchone()['n'] == 2
+
+
+def test_lookups_read_the_in_process_copy(cache_db, http_server, monkeypatch):
+    http_server.route('/episode', status=404)
+    client.request(http_server.url + '/episode', retry=False)
+    opened = []
+
+    class CountingSQL(database.SQL):
+        def __enter__(self):
+            opened.append(1)
+            return super().__enter__()
+
+    monkeypatch.setattr(database, 'SQL', CountingSQL)
+    for i in range(20):
+        assert circuit_breaker.negative_get(http_server.url + '/episode') == 404
+        assert circuit_breaker.negative_get(f'{http_server.url}/other/{i}') is None
+    assert opened == []
+
+
+def test_rows_written_by_another_process_show_up_after_a_refresh(cache_db, monkeypatch):
+    assert circuit_breaker.negative_get('https://example.org/missing') is None
+    with database.SQL(control.cacheFile) as cursor:
+        cursor.execute('REPLACE INTO negative_cache (url, status, expires) VALUES (?, ?, ?)', ('https://example.org/missing', 410, 2 ** 31))
+        cursor.connection.commit()
+    assert circuit_breaker.negative_get('https://example.org/missing') is None
+    monkeypatch.setattr(circuit_breaker, '_negative_loaded', 0)
+    assert circuit_breaker.negative_get('https://example.org/missing') == 410
@@ -0,0 +1,74 @@
+"""opensubtitles.compute_hash against reference vectors and the published reference algorithm"""
+import os
+import random
+import re
+import struct
+
+import pytest
+
+from resources.lib.endpoints import opensubtitles
+
+BLOCK = opensubtitles.HASH_BLOCK_SIZE
+
+
+def reference_hash(data):
+    """The per-word loop from the OpenSubtitles hash documentation"""
+    value = len(data)
+    for chunk in (data[:BLOCK], data[-BLOCK:]):
+        for (word,) in struct.iter_unpack('<q', chunk):
+            value = (value + word) & 0xFFFFFFFFFFFFFFFF
+    return '%016x' % value
+
+
+def hash_of(data):
+    return opensubtitles.compute_hash(data[:BLOCK], data[-BLOCK:], len(data))
+
+
+@pytest.mark.parametrize('data,expected', [
+    # Zero bytes add nothing: the hash is the size
+    (bytes(2 * BLOCK), '0000000000020000'),
+    # Every all-ones word is -1 modulo 2**64
+    (b'\xff' * (2 * BLOCK), '%016x' % (2 * BLOCK - 2 * BLOCK // 8)),
+    # A single 1 in the first byte of each block
+    (b'\x01' + bytes(BLOCK - 1) + b'\x01' + bytes(BLOCK - 1), '0000000000020002'),
+    # Byte order: the last byte of a word is the most significant
+    (bytes(7) + b'\x01' + bytes(2 * BLOCK - 8), '0100000000020000'),
+])
+def test_reference_vectors(data, expected):
+    assert hash_of(data) == expected
+    assert reference_hash(data) == expected
+
+
+def test_matches_reference_on_random_files():
+    rng = random.Random(44)
+    for size in (2 * BLOCK, 2 * BLOCK + 1, 3 * BLOCK + 7, 10 * BLOCK):
+        data = bytes(rng.getrandbits(8) for _ in range(size))
+        assert hash_of(data) == reference_hash(data)
+
+
+def test_file_and_url_hashes_agree(tmp_path, cache_db, http_server):
+    data = os.urandom(3 * BLOCK + 123)
+    path = tmp_path / 'episode.mkv'
+    path.write_bytes(data)
+    expected = (reference_hash(data), len(data))
+    assert opensubtitles.calculate_hash_from_file(str(path)) == expected
+
+    def ranged(handler, hits):
+        start, end = re.match(r'bytes=(\d*)-(\d*)', handler.headers['Range']).groups()
+        if not start:
+            start, end = len(data) - int(end), len(data) - 1
+        start, end = int(start), min(int(end or len(data) - 1), len(data) - 1)
+        return 206, data[start:end + 1], {'Content-Range': f'bytes {start}-{end}/{len(data)}'}
+
+    route = http_server.route('/episode.mkv', status=ranged)
+    url = http_server.url + '/episode.mkv'
+    assert opensubtitles.calculate_hash_from_url(url) == expected
+    # Served from the cache the second time
+    assert opensubtitles.calculate_hash_from_url(url) == expected
+    assert len(route.requests) == 2
+
+
+def test_small_files_have_no_hash(tmp_path):
+    path = tmp_path / 'small.mkv'
+    path.write_bytes(bytes(BLOCK))
+    assert opensubtitles.calculate_hash_from_file(str(path)) == (None, None)
@@ -0,0 +1,116 @@
+"""playback_scheduler timing driven by a fake player clock"""
+import pytest
+
+from resources.lib.ui import playback_scheduler
+from resources.lib.ui.playback_scheduler import Event, PlaybackScheduler, plan
+
+
+class FakePlayer:
+    """Playback position that only moves when the scheduler waits; seeks are queued by wall time"""
+    def __init__(self, duration=1440, speed=1):
+        self.position = 0.0
+        self.duration = duration
+        self.speed = speed
+        self.wall = 0.0
+        self.waits = []
+        self.seeks = {}  # wall time -> position
+
+    def clock(self):
+        if self.position >= self.duration:
+            raise RuntimeError('stopped')
+        return self.position
+
+    def active(self):
+        return self.position < self.duration
+
+    def wait(self, seconds):
+        self.waits.append(seconds)
+        for at in sorted(self.seeks):
+            if self.wall < at <= self.wall + seconds:
+                # A seek wakes the scheduler early
+                self.position = self.seeks.pop(at)
+                self.wall = at
+                return
+        self.wall += seconds
+        self.position += seconds * self.speed
+
+
+def scheduler(player, events):
+    fired = []
+    sched = PlaybackScheduler(player.clock, player.active, wait=player.wait)
+    sched.speed = player.speed
+    sched.set_events({name: (start, lambda name=name: fired.append((name, player.position)), end)
+                      for name, (start, end) in events.items()})
+    return sched, fired
+
+
+def test_plan_splits_due_missed_and_pending():
+    events = [Event('intro', 60, None, 150), Event('outro', 1300, None, 1400), Event('watched', 1200, None)]
+    due, missed, delay = plan(events, 100, 1)
+    assert due == [events[0]] and missed == []
+    assert delay == playback_scheduler.MAX_SLEEP
+    due, missed, delay = plan(events, 1195, 1)
+    assert due == [] and missed == [events[0]]
+    assert delay == 5
+
+
+def test_plan_delay_follows_speed_and_never_busy_loops():
+    events = [Event('watched', 100, None)]
+    assert plan(events, 90, 2)[2] == 5
+    assert plan(events, 99.99, 1)[2] == playback_scheduler.MIN_SLEEP
+    # Paused: nothing can become due, sleep the maximum
+    assert plan(events, 90, 0)[2] == playback_scheduler.MAX_SLEEP
+
+
+def test_events_fire_once_at_their_start():
+    player = FakePlayer()
+    sched, fired = scheduler(player, {'intro': (95, 180), 'watched': (1200, None), 'outro': (1320, 1420)})
+    sched.run()
+    assert [name for name, _ in fired] == ['intro', 'watched', 'outro']
+    for (name, position), start in zip(fired, (95, 1200, 1320)):
+        assert start <= position < start + playback_scheduler.MIN_SLEEP + 1e-9
+    # Ten second sleeps, not a sub-second poll
+    assert len(player.waits) < player.duration / playback_scheduler.MAX_SLEEP + 10
+
+
+def test_double_speed_reaches_events_in_half_the_wall_time():
+    player = FakePlayer(speed=2)
+    sched, fired = scheduler(player, {'watched': (1200, None)})
+    sched.run()
+    assert fired[0][1] == pytest.approx(1200)
+    assert player.wall == pytest.approx(player.duration / 2)
+
+
+def test_seeking_past_a_window_marks_it_missed():
+    player = FakePlayer()
+    player.seeks = {30: 500}
+    sched, fired = scheduler(player, {'intro': (95, 180), 'watched': (1200, None)})
+    sched.run()
+    assert [name for name, _ in fired] == ['watched']
+
+
+def test_seeking_into_a_window_fires_it_immediately():
+    player = FakePlayer()
+    player.seeks = {5: 120}
+    sched, fired = scheduler(player, {'intro': (95, 180)})
+    sched.run()
+    assert fired == [('intro', 120)]
+
+
+def test_recomputed_events_never_fire_twice():
+    player = FakePlayer(duration=300)
+    sched, fired = scheduler(player, {'intro': (10, 50)})
+    sched.step()
+    player.position = 20
+    sched.step()
+    sched.set_events({'intro': (10, lambda: fired.append(('again', player.position)), 50)})
+    sched.step()
+    assert fired == [('intro', 20)]
+    assert sched.pending() == []
+
+
+def test_stopped_clock_ends_the_loop():
+    player = FakePlayer(duration=0)
+    sched, fired = scheduler(player, {'watched': (0, None)})
+    assert sched.step() is None
+    assert fired == []
@@ -0,0 +1,110 @@
+"""rate_limit buckets driven by a fake clock"""
+import sqlite3
+import time
+
+import pytest
+
+from resources.lib.ui import rate_limit
+
+HOST = 'api.jikan.moe'
+
+
+class FakeClock:
+    def __init__(self, now=1000.0):
+        self.now = now
+        self.sleeps = []
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(round(seconds, 6))
+        self.now += seconds
+
+
+@pytest.fixture
+def clock(cache_db):
+    return FakeClock()
+
+
+def acquire(clock, host=HOST, max_wait=rate_limit.MAX_WAIT):
+    return rate_limit.acquire(host, max_wait, clock=clock, sleep=clock.sleep)
+
+
+def test_burst_then_steady_rate(clock):
+    rate, burst = rate_limit.LIMITS[HOST]
+    for _ in range(burst + 3):
+        assert acquire(clock)
+    assert clock.sleeps == [1 / rate] * 3
+
+
+def test_bucket_refills_while_idle(clock):
+    for _ in range(5):
+        acquire(clock)
+    clock.sleeps.clear()
+    clock.now += 60
+    for _ in range(rate_limit.LIMITS[HOST][1]):
+        assert acquire(clock)
+    assert clock.sleeps == []
+
+
+def test_request_over_max_wait_is_dropped_without_taking_a_token(clock):
+    for _ in range(3):
+        acquire(clock)
+    assert not acquire(clock, max_wait=0.5)
+    assert clock.sleeps == []
+    assert acquire(clock)
+    assert clock.sleeps == [1.0]
+
+
+def test_port_and_case_share_a_bucket(clock):
+    for host in ('api.jikan.moe', 'API.jikan.moe:443', 'api.jikan.moe'):
+        acquire(clock, host)
+    assert acquire(clock, 'Api.Jikan.Moe')
+    assert clock.sleeps == [1.0]
+
+
+def test_retry_after_holds_the_host(clock):
+    rate_limit.block(HOST, '120', clock=clock)
+    assert not acquire(clock)
+    assert acquire(clock, max_wait=200)
+    assert clock.sleeps == [120.0]
+
+
+def test_retry_after_for_unlimited_hosts_is_kept_in_process(clock, monkeypatch):
+    monkeypatch.setattr(rate_limit, '_blocked', {})
+    rate_limit.block('example.org', '5', clock=clock)
+    assert acquire(clock, 'example.org')
+    assert clock.sleeps == [5.0]
+
+
+@pytest.mark.parametrize('value,expected', [
+    ('30', 30.0), (' 7 ', 7.0), ('Thu, 01 Jan 1970 00:20:00 GMT', 200.0), ('Thu, 01 Jan 1970 00:00:00 GMT', 0.0),
+    ('soon', None), ('', None), (None, None),
+])
+def test_parse_retry_after(value, expected):
+    assert rate_limit.parse_retry_after(value, now=1000.0) == expected
+
+
+def test_locked_database_fails_open(cache_db, locked_db):
+    clock = FakeClock()
+    for _ in range(10):
+        assert acquire(clock)
+    assert clock.sleeps == []
+    rate_limit.block(HOST, '60', clock=clock)
+
+
+def test_writer_holding_cache_db_fails_open_quickly(cache_db):
+    acquire(FakeClock())  # create the table
+    writer = sqlite3.connect(cache_db)
+    writer.execute('BEGIN IMMEDIATE')
+    try:
+        clock = FakeClock()
+        start = time.perf_counter()
+        for _ in range(3):
+            assert acquire(clock)
+        assert time.perf_counter() - start < 3 * rate_limit.LOCK_TIMEOUT + 1
+        assert clock.sleeps == []
+    finally:
+        writer.rollback()
+        writer.close()
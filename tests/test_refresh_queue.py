@@ -0,0 +1,116 @@
+"""database.get with max_stale: stale hits, the staleness cutoff and the service's refresh queue"""
+import threading
+import time
+
+import pytest
+
+from resources.lib.ui import control, database
+
+FETCHES = []
+
+
+def fetch(item):
+    FETCHES.append(item)
+    time.sleep(0.3)
+    return {'item': item, 'fetch': len(FETCHES)}
+
+
+class Browser:
+    """Shaped like AniListBrowser: state built from settings, results from a bound method"""
+    instances = 0
+
+    def __init__(self):
+        Browser.instances += 1
+        self.perpage = control.getInt('interface.perpage.general.anilist')
+
+    def get_base_res(self, variables):
+        FETCHES.append(variables)
+        return {'page': variables['page'], 'perpage': self.perpage, 'fetch': len(FETCHES)}
+
+
+@pytest.fixture(autouse=True)
+def reset(cache_db, settings):
+    FETCHES.clear()
+    Browser.instances = 0
+    settings['interface.perpage.general.anilist'] = 25
+
+
+def age(key_prefix, hours):
+    with database.SQL(control.cacheFile) as cursor:
+        cursor.execute('UPDATE cache SET date=date-? WHERE key LIKE ?', (int(hours * 3600), key_prefix + '%'))
+        cursor.connection.commit()
+
+
+def queued():
+    with database.SQL(control.cacheFile) as cursor:
+        cursor.execute('CREATE TABLE IF NOT EXISTS refresh_queue (key TEXT PRIMARY KEY, data BLOB, duration REAL, queued INTEGER)')
+        cursor.execute('SELECT key FROM refresh_queue')
+        return [row['key'] for row in cursor.fetchall()]
+
+
+def wait_for(condition, timeout=5):
+    end = time.time() + timeout
+    while time.time() < end:
+        if condition():
+            return True
+        time.sleep(0.02)
+    return False
+
+
+def test_stale_hit_returns_at_once_and_is_refreshed():
+    assert database.get(fetch, 1, 'show', max_stale=4) == {'item': 'show', 'fetch': 1}
+    key = database.hash_function(fetch, ('show',), {})
+    age(key, 2)
+
+    start = time.perf_counter()
+    assert database.get(fetch, 1, 'show', max_stale=4) == {'item': 'show', 'fetch': 1}
+    assert time.perf_counter() - start < 0.2
+    assert queued() == [key]
+
+    # Polled on the row itself: another stale get would queue another refresh
+    assert wait_for(lambda: database.cache_get(key)['value'] == repr({'item': 'show', 'fetch': 2}))
+    assert wait_for(lambda: queued() == [])
+    assert FETCHES == ['show', 'show']
+
+
+def test_row_older_than_the_cutoff_blocks_on_the_network():
+    database.get(fetch, 1, 'show', max_stale=4)
+    age(database.hash_function(fetch, ('show',), {}), 4.5)
+
+    start = time.perf_counter()
+    assert database.get(fetch, 1, 'show', max_stale=4) == {'item': 'show', 'fetch': 2}
+    assert time.perf_counter() - start >= 0.3
+    assert queued() == []
+
+
+def test_service_refreshes_a_queued_bound_method(monkeypatch):
+    browser = Browser()
+    variables = {'page': 2, 'type': 'ANIME'}
+    assert database.get(browser.get_base_res, 1, variables, max_stale=4)['fetch'] == 1
+    key = database.hash_function(browser.get_base_res, (variables,), {})
+    age(key, 2)
+
+    # The plugin invocation exits before its background refresh runs
+    class NotStarted:
+        def __init__(self, target, daemon=None):
+            pass
+
+        def start(self):
+            pass
+
+    monkeypatch.setattr(database.threading, 'Thread', NotStarted)
+    assert database.get(browser.get_base_res, 1, variables, max_stale=4)['fetch'] == 1
+    monkeypatch.setattr(database.threading, 'Thread', threading.Thread)
+    assert queued() == [key]
+
+    # Entries younger than REFRESH_QUEUE_DELAY are left to the invocation that queued them
+    assert database.process_refresh_queue() == 0
+    with database.SQL(control.cacheFile) as cursor:
+        cursor.execute('UPDATE refresh_queue SET queued=queued-?', (database.REFRESH_QUEUE_DELAY + 1,))
+        cursor.connection.commit()
+
+    assert database.process_refresh_queue() == 1
+    assert Browser.instances == 2  # the service rebuilt the browser from settings
+    assert FETCHES == [variables, variables]
+    assert queued() == []
+    assert database.get(browser.get_base_res, 1, variables, max_stale=4) == {'page': 2, 'perpage': 25, 'fetch': 2}
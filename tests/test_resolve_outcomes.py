@@ -0,0 +1,103 @@
+"""resolve_outcomes folds synthetic resolve histories into decayed counts and penalties"""
+import pytest
+
+from resources.lib.ui import resolve_outcomes
+
+DAY = 86400
+HALF_LIFE = resolve_outcomes.HALF_LIFE_DAYS * DAY
+
+
+def replay(history):
+    """Fold [(seconds, success, ttfb)] into a row the way record() stores it"""
+    row = None
+    for now, success, ttfb in history:
+        attempts, successes, ttfb = resolve_outcomes.update(row, success, ttfb, now)
+        row = {'attempts': attempts, 'successes': successes, 'ttfb': ttfb, 'date': now}
+    return row
+
+
+def stats(row):
+    return {'attempts': row['attempts'], 'successes': row['successes'], 'ttfb': row['ttfb']}
+
+
+def test_outcomes_on_the_same_day_simply_add_up():
+    row = replay([(0, True, 2.0), (0, False, None), (0, False, None)])
+    assert row['attempts'] == 3
+    assert row['successes'] == 1
+
+
+def test_history_halves_after_the_half_life():
+    row = replay([(0, False, None)] * 4 + [(HALF_LIFE, True, 1.0)])
+    assert row['attempts'] == pytest.approx(4 * 0.5 + 1)
+    assert row['successes'] == pytest.approx(1)
+
+
+def test_ttfb_is_an_exponential_average_of_successes():
+    row = replay([(0, True, 10.0), (0, False, None), (0, True, 0.0)])
+    assert row['ttfb'] == pytest.approx(10.0 * (1 - resolve_outcomes.TTFB_WEIGHT))
+
+
+def test_failing_needs_enough_attempts():
+    assert not resolve_outcomes.failing(stats(replay([(0, False, None)] * (resolve_outcomes.MIN_ATTEMPTS - 1))))
+    assert resolve_outcomes.failing(stats(replay([(0, False, None)] * resolve_outcomes.MIN_ATTEMPTS)))
+
+
+def test_old_failures_fade_out():
+    failures = [(0, False, None)] * 10
+    # The same three successes outweigh the failures only once those are three half-lives old
+    assert resolve_outcomes.failing(stats(replay(failures + [(0, True, 1.0)] * 3)))
+    assert not resolve_outcomes.failing(stats(replay(failures + [(3 * HALF_LIFE, True, 1.0)] * 3)))
+
+
+def test_penalty_demotes_sources_sharing_a_failing_key():
+    sources = [
+        {'provider': 'nyaa', 'type': 'torrent', 'debrid_provider': 'Real-Debrid', 'release_title': '[BadGroup] Show - 01'},
+        {'provider': 'nyaa', 'type': 'torrent', 'debrid_provider': 'Real-Debrid', 'release_title': '[GoodGroup] Show - 01'},
+        {'provider': 'animepahe', 'type': 'embed', 'hash': 'https://Kwik.example/e/1'},
+        {'provider': 'animepahe', 'type': 'embed', 'hash': 'https://other.example/e/1'},
+    ]
+    history = {
+        ('group', 'badgroup'): replay([(0, False, None)] * 4),
+        ('group', 'goodgroup'): replay([(0, True, 1.0)] * 4),
+        ('host', 'kwik.example'): replay([(0, False, None), (0, False, None), (0, True, 3.0), (0, False, None)]),
+        ('provider', 'nyaa'): replay([(0, True, 1.0), (0, False, None)] * 3),
+    }
+    penalty = resolve_outcomes.penalty_function(sources, {key: stats(row) for key, row in history.items()})
+    assert [penalty(source) for source in sources] == [1, 0, 1, 0]
+
+
+def test_record_and_load_round_trip(cache_db):
+    source = {'provider': 'nyaa', 'type': 'torrent', 'debrid_provider': 'Torbox', 'release_title': '[Grp] Show'}
+    for _ in range(3):
+        resolve_outcomes.record(source, False)
+    resolve_outcomes.record(source, True, 2.5)
+    loaded = resolve_outcomes.load(resolve_outcomes.source_keys(source))
+    assert set(loaded) == {('provider', 'nyaa'), ('debrid', 'Torbox'), ('group', 'grp')}
+    for entry in loaded.values():
+        assert entry['attempts'] == pytest.approx(4, rel=1e-3)
+        assert entry['successes'] == pytest.approx(1, rel=1e-3)
+        assert entry['ttfb'] == 2.5
+    assert resolve_outcomes.penalty_function([source])(source) == 1
+
+
+def test_autoplay_walk_past_dead_releases_does_not_sink_the_provider(cache_db):
+    # Autoplay tries three dead Nyaa/Real-Debrid releases before the fourth plays
+    def nyaa(group):
+        return {'provider': 'nyaa', 'type': 'torrent', 'debrid_provider': 'Real-Debrid', 'release_title': f'[{group}] Show - 01'}
+
+    for group in ('DeadA', 'DeadB', 'DeadC'):
+        resolve_outcomes.record(nyaa(group), False)
+    resolve_outcomes.record(nyaa('Played'), True, 2.0)
+    stats_ = resolve_outcomes.load([('provider', 'nyaa'), ('debrid', 'Real-Debrid')])
+    assert all(resolve_outcomes.failing(entry) for entry in stats_.values())
+
+    sources = [nyaa('Played'), nyaa('Other'), {'provider': 'animepahe', 'type': 'embed', 'hash': 'https://kwik.example/e/1'}]
+    penalty = resolve_outcomes.penalty_function(sources)
+    assert [penalty(source) for source in sources] == [0, 0, 0]
+
+
+def test_only_host_and_group_keys_demote():
+    source = {'provider': 'nyaa', 'type': 'torrent', 'debrid_provider': 'Real-Debrid', 'release_title': '[Grp] Show - 01'}
+    failed = stats(replay([(0, False, None)] * 5))
+    assert resolve_outcomes.penalty_function([source], {('provider', 'nyaa'): failed, ('debrid', 'Real-Debrid'): failed})(source) == 0
+    assert resolve_outcomes.penalty_function([source], {('group', 'grp'): failed})(source) == 1
@@ -0,0 +1,97 @@
+"""database.get runs a slow function once for concurrent misses of the same key"""
+import threading
+import time
+
+import pytest
+
+from resources.lib.ui import control, database
+
+THREADS = 32
+
+
+def slow_function(calls):
+    def fetch(item):
+        calls.append(item)
+        time.sleep(0.3)
+        return {'item': item}
+    return fetch
+
+
+def hammer(function, lease):
+    barrier = threading.Barrier(THREADS)
+    results = []
+
+    def worker():
+        barrier.wait()
+        results.append(database.get(function, 1, 'episode', lease=lease))
+
+    threads = [threading.Thread(target=worker) for _ in range(THREADS)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results
+
+
+def lease_table_exists():
+    with database.SQL(control.cacheFile) as cursor:
+        cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='cache_lease'")
+        return cursor.fetchone() is not None
+
+
+@pytest.mark.parametrize('lease', [False, True])
+def test_one_computation_for_concurrent_misses(cache_db, lease):
+    calls = []
+    results = hammer(slow_function(calls), lease)
+    assert calls == ['episode']
+    assert results == [{'item': 'episode'}] * THREADS
+    assert lease_table_exists() is lease
+
+
+def test_plain_misses_do_not_write_leases(cache_db, monkeypatch):
+    writes = []
+    monkeypatch.setattr(database, 'lease_acquire', lambda *args: writes.append(args) or True)
+    monkeypatch.setattr(database, 'lease_release', lambda *args: writes.append(args))
+    for i in range(20):
+        assert database.get(lambda x: x, 1, i) == i
+    assert writes == []
+
+
+def test_leased_key_is_picked_up_from_another_invocation(cache_db):
+    # A lease held by another invocation: this one waits for its result instead of computing
+    calls = []
+    key = 'provider_scrape'
+    assert database.lease_acquire(key, 'other-invocation')
+
+    def other_invocation():
+        time.sleep(0.5)
+        database.cache_insert(key, repr(['from other']), 1)
+        database.lease_release(key, 'other-invocation')
+
+    threading.Thread(target=other_invocation).start()
+    value = database.single_flight(key, 1, lambda: calls.append(1) or repr(['computed']), lease=True)
+    assert value == repr(['from other'])
+    assert calls == []
+
+
+def test_result_stored_just_before_release_is_not_recomputed(cache_db, monkeypatch):
+    # The holder stores and releases after the waiter's cache poll, right before its next lease attempt
+    calls = []
+    key = 'provider_scrape'
+    assert database.lease_acquire(key, 'other-invocation')
+    monkeypatch.setattr(database, 'LEASE_POLL', 0)
+    acquire = database.lease_acquire
+    attempts = []
+
+    def lease_acquire(key, owner):
+        attempts.append(owner)
+        if len(attempts) == 2:
+            database.cache_insert(key, repr(['from other']), 1)
+            database.lease_release(key, 'other-invocation')
+        return acquire(key, owner)
+
+    monkeypatch.setattr(database, 'lease_acquire', lease_acquire)
+    value = database.single_flight(key, 1, lambda: calls.append(1) or repr(['computed']), lease=True)
+    assert value == repr(['from other'])
+    assert calls == []
+    assert acquire(key, 'next-invocation')
@@ -0,0 +1,83 @@
+"""compile_sort_key must order sources exactly like the multi-pass sort it replaced"""
+import random
+from operator import itemgetter
+
+import pytest
+
+from resources.lib.windows import sort_select
+
+
+def multi_pass_sort(list_, options):
+    """The sort_by_* passes sortSources used to apply, from the last level to the first"""
+    def ranked(field, groups, method, reverse, match):
+        for i in range(len(sort_select.SORT_OPTIONS[method]), 0, -1):
+            list_.sort(key=lambda x: match(x[field], groups[int(options[f'{method}.{i}'])]), reverse=reverse)
+
+    for x in range(len(sort_select.SORT_METHODS), 0, -1):
+        reverse = not options[f'sortmethod.{x}.reverse']
+        method = sort_select.SORT_METHODS[int(options[f'sortmethod.{x}'])]
+        if method in sort_select.VALUE_FIELDS:
+            list_.sort(key=itemgetter(sort_select.VALUE_FIELDS[method]), reverse=reverse)
+        elif method == 'source type':
+            ranked('type', sort_select.source_type, method, reverse, lambda value, group: value in group)
+        elif method == 'debrid provider':
+            ranked('debrid_provider', sort_select.debrid_provider, method, reverse, lambda value, group: value in group)
+        elif method == 'audio':
+            ranked('lang', sort_select.audio, method, reverse, lambda value, option: value == option)
+        elif method == 'subtitles':
+            ranked('sub', sort_select.subtitles, method, reverse, lambda value, option: value == option)
+    return list_
+
+
+def make_sources(rng, count):
+    types = ['local', 'cloud', 'torrent', 'torrent (uncached)', 'hoster', 'direct', 'embed', 'none', 'other']
+    providers = ['Real-Debrid', 'Premiumize', 'Alldebrid', 'Debrid-Link', 'Torbox', 'EasyDebrid', 'none', '']
+    return [{
+        'id': i,
+        'type': rng.choice(types),
+        'debrid_provider': rng.choice(providers),
+        'lang': rng.choice([0, 1, 2, 3, 'none']),
+        'sub': rng.choice([0, 'none', 1]),
+        'quality': rng.randint(0, 4),
+        'byte_size': rng.choice([0, 350, 700, 1400]),
+        'seeders': rng.randint(0, 5),
+        'channel': rng.choice([2, 6, 8]),
+    } for i in range(count)]
+
+
+def random_options(rng):
+    options = {}
+    for x in range(1, len(sort_select.SORT_METHODS) + 1):
+        options[f'sortmethod.{x}'] = rng.randrange(len(sort_select.SORT_METHODS))
+        options[f'sortmethod.{x}.reverse'] = rng.random() < 0.3
+    for method in sort_select.RANKED_FIELDS:
+        slots = len(sort_select.SORT_OPTIONS[method])
+        for i in range(1, slots + 1):
+            options[f'{method}.{i}'] = rng.randrange(slots)
+    return options
+
+
+PRESETS = [sort_select.default_sort_options, sort_select.default_sub_options, sort_select.default_dub_options,
+           sort_select.default_multi_audio_options, sort_select.default_multi_sub_options]
+
+
+@pytest.mark.parametrize('options', PRESETS)
+def test_presets_match_multi_pass(options):
+    sources = make_sources(random.Random(1), 400)
+    expected = [s['id'] for s in multi_pass_sort(list(sources), options)]
+    assert [s['id'] for s in sort_select.sort_sources(list(sources), options)] == expected
+
+
+def test_random_configurations_match_multi_pass():
+    rng = random.Random(7)
+    for _ in range(300):
+        options = random_options(rng)
+        sources = make_sources(rng, rng.randint(0, 80))
+        expected = [s['id'] for s in multi_pass_sort(list(sources), options)]
+        assert [s['id'] for s in sort_select.sort_sources(list(sources), options)] == expected, options
+
+
+def test_penalty_sorts_ahead_of_every_level():
+    sources = make_sources(random.Random(3), 50)
+    ordered = sort_select.sort_sources(list(sources), sort_select.default_sort_options, penalty=lambda s: s['id'] % 2)
+    assert [s['id'] % 2 for s in ordered] == sorted(s['id'] % 2 for s in sources)
@@ -0,0 +1,103 @@
+"""stream_select over a corpus of stream layouts seen in anime releases"""
+import pytest
+
+from resources.lib.ui import stream_select
+
+
+def audio(index, language, name=''):
+    return {'index': index, 'language': language, 'name': name, 'channels': 2}
+
+
+def sub(index, language, name='', default=False, forced=False, impaired=False):
+    return {'index': index, 'language': language, 'name': name,
+            'isdefault': default, 'isforced': forced, 'isimpaired': impaired}
+
+
+DUAL_AUDIO = [audio(0, 'jpn', 'Japanese'), audio(1, 'eng', 'English')]
+FANSUB = [sub(0, 'eng', 'Signs & Songs', default=True), sub(1, 'eng', 'Full Subtitles')]
+DUAL_SUBS = [sub(0, 'eng', 'Signs/Songs [Group]', forced=True), sub(1, 'eng', 'Dialogue [Group]', default=True),
+             sub(2, 'eng', 'English (SDH)', impaired=True)]
+MULTI_LANGUAGE = [sub(0, 'eng', 'English', default=True), sub(1, 'spa', 'Español (España)'),
+                  sub(2, 'spa', 'Español (Latinoamérica)'), sub(3, 'por', 'Português (Brasil)'),
+                  sub(4, 'ger', 'Deutsch'), sub(5, 'ara', 'العربية')]
+
+# (layout, settings, expected (audio, audio rule, subtitle, subtitle rule, show subtitles))
+CORPUS = [
+    ('sub release, english subs',
+     [audio(0, 'jpn')], FANSUB,
+     {'general.subtitles': 1},
+     (0, 'language', 1, 'full dialogue', True)),
+    ('dual audio, wants dub and no subs',
+     DUAL_AUDIO, FANSUB,
+     {'general.audio': 1, 'general.subtitles': 0},
+     (1, 'language', 0, 'default', False)),
+    ('signs track listed first must not win',
+     DUAL_AUDIO, DUAL_SUBS,
+     {'general.subtitles': 1},
+     (0, 'language', 1, 'full dialogue', True)),
+    ('signs keyword picks the signs track',
+     DUAL_AUDIO, DUAL_SUBS,
+     {'general.audio': 1, 'general.subtitles': 1, 'general.subtitles.keyword': True, 'subtitles.keywords': 2},
+     (1, 'language', 0, 'preferred', True)),
+    ('impaired flag preferred',
+     DUAL_AUDIO, DUAL_SUBS,
+     {'general.subtitles': 1, 'general.subtitles.type': True, 'subtitles.types': 2},
+     (0, 'language', 2, 'preferred', True)),
+    ('forced flag does not select a partial track without signs keywords',
+     DUAL_AUDIO, DUAL_SUBS,
+     {'general.subtitles': 1, 'general.subtitles.type': True, 'subtitles.types': 1},
+     (0, 'language', 1, 'full dialogue', True)),
+    ('custom keyword',
+     [audio(0, 'jpn')], MULTI_LANGUAGE,
+     {'general.subtitles': 3, 'general.subtitles.keyword': True, 'subtitles.keywords': 3,
+      'subtitles.customkeyword': 'Latinoamérica'},
+     (0, 'language', 2, 'preferred', True)),
+    ('first track of the preferred language',
+     [audio(0, 'jpn')], MULTI_LANGUAGE,
+     {'general.subtitles': 3},
+     (0, 'language', 1, 'full dialogue', True)),
+    ('missing language falls back to the default track',
+     [audio(0, 'jpn')], MULTI_LANGUAGE,
+     {'general.subtitles': 10},
+     (0, 'language', 0, 'default', True)),
+    ('missing language and no default falls back to the first track',
+     [audio(0, 'jpn')], [sub(0, 'spa'), sub(1, 'ger')],
+     {'general.subtitles': 1},
+     (0, 'language', 0, 'first', True)),
+    ('only partial tracks in the language',
+     [audio(0, 'jpn')], [sub(0, 'eng', 'Signs'), sub(1, 'spa', 'Completos', default=True)],
+     {'general.subtitles': 1},
+     (0, 'language', 0, 'language', True)),
+    ('dub without a matching audio track keeps the current audio',
+     [audio(0, 'jpn'), audio(1, 'ger')], FANSUB,
+     {'general.audio': 1, 'general.subtitles': 1},
+     (None, None, 1, 'full dialogue', True)),
+    ('hardsubbed embed with no streams',
+     [], [],
+     {'general.subtitles': 1},
+     (None, None, None, None, True)),
+    ('untagged streams',
+     [audio(0, ''), audio(1, '')], [sub(0, ''), sub(1, '', default=True)],
+     {'general.subtitles': 1},
+     (None, None, 1, 'default', True)),
+    ('full dialogue named track beats a songs-only one',
+     [audio(0, 'jpn')], [sub(0, 'eng', 'Songs only'), sub(1, 'eng', 'Full (Dialogue + Signs)')],
+     {'general.subtitles': 1, 'general.subtitles.keyword': True, 'subtitles.keywords': 1},
+     (0, 'language', 1, 'preferred', True)),
+]
+
+
+@pytest.mark.parametrize('name,audio_streams,subtitle_streams,settings,expected', CORPUS, ids=[c[0] for c in CORPUS])
+def test_corpus(name, audio_streams, subtitle_streams, settings, expected):
+    prefs = stream_select.preferences_from_settings(settings)
+    selection = stream_select.select(audio_streams, subtitle_streams, prefs)
+    assert (selection.audio, selection.audio_rule, selection.subtitle, selection.subtitle_rule,
+            selection.show_subtitles) == expected
+
+
+@pytest.mark.parametrize('name,partial', [
+    ('Signs & Songs', True), ('[Signs]', True), ('Songs Only', True), ('S&S', True), ('Forced', True),
+    ('Full Subtitles', False), ('Dialogue', False), ('English', False), ('', False), (None, False),
+])
+def test_partial_sub_names(name, partial):
+    assert stream_select.is_partial_sub(name) is partial
@@ -0,0 +1,13 @@
+"""Token persistence through SQLiteStore"""
+from resources.lib.ui import token_manager
+
+
+def test_store_round_trip(cache_db):
+    store = token_manager.SQLiteStore('service')
+    assert store.load() == (None, 0)
+    store.save('abc', 1234)
+    assert store.load() == ('abc', 1234)
+
+
+def test_locked_database_loads_no_token(locked_db):
+    assert token_manager.SQLiteStore('service').load() == (None, 0)
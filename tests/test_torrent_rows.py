@@ -0,0 +1,110 @@
+"""torrent_rows must yield exactly the records the BeautifulSoup parsers it replaced built"""
+import base64
+import os
+import re
+
+import pytest
+
+from resources.lib.ui import torrent_rows
+
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures')
+
+
+def fixture(name):
+    with open(os.path.join(FIXTURES, name), encoding='utf-8') as f:
+        return f.read()
+
+
+def soup_nyaa_rows(html):
+    """Nyaa Sources.parse_nyaa_rows before torrent_rows"""
+    from bs4 import BeautifulSoup, SoupStrainer
+    mlink = SoupStrainer('div', {'class': 'table-responsive'})
+    soup = BeautifulSoup(html, "html.parser", parse_only=mlink)
+    rex = r'(magnet:)+[^"]*'
+    list_ = [
+        {'magnet': i.find('a', {'href': re.compile(rex)}).get('href'),
+         'name': i.find_all('a', {'class': None})[1].get('title'),
+         'size': i.find_all('td', {'class': 'text-center'})[1].text.replace('i', ''),
+         'downloads': int(i.find_all('td', {'class': 'text-center'})[-1].text),
+         'seeders': int(i.find_all('td', {'class': 'text-center'})[-3].text)
+         } for i in soup.select("tr.danger,tr.default,tr.success")
+    ]
+    for torrent in list_:
+        torrent['hash'] = re.findall(r'btih:(.*?)(?:&|$)', torrent['magnet'])[0]
+    return list_
+
+
+def soup_animetosho_rows(html):
+    """AnimeTosho Sources.parse_animetosho_rows before torrent_rows"""
+    from bs4 import BeautifulSoup
+    soup = BeautifulSoup(html, "html.parser")
+    soup_all = soup.find('div', id='content').find_all('div', class_='home_list_entry')
+    rex = r'(magnet:)+[^"]*'
+    list_ = []
+    for entry in soup_all:
+        list_item = {
+            'name': entry.find('div', class_='link').a.text,
+            'magnet': entry.find('a', {'href': re.compile(rex)}).get('href'),
+            'size': entry.find('div', class_='size').text,
+            'downloads': 0,
+            'torrent': entry.find('a', class_='dllink').get('href')
+        }
+        try:
+            list_item['seeders'] = int(re.match(r'Seeders: (\d+)', entry.find('span', {'title': re.compile(r'Seeders')}).get('title')).group(1))
+        except AttributeError:
+            list_item['seeders'] = -1
+        try:
+            list_item['hash'] = re.match(r'https://animetosho.org/storage/torrent/([^/]+)', list_item['torrent']).group(1)
+        except AttributeError:
+            try:
+                hash_32 = re.search(r'btih:(\w+)&tr=http', list_item['magnet']).group(1)
+                list_item['hash'] = base64.b16encode(base64.b32decode(hash_32)).decode().lower()
+            except AttributeError:
+                continue
+        list_.append(list_item)
+    return list_
+
+
+def stdlib(monkeypatch):
+    monkeypatch.setattr(torrent_rows, 'lxml_html', None)
+
+
+def lxml(monkeypatch):
+    pytest.importorskip('lxml')
+    from lxml import html as lxml_html
+    monkeypatch.setattr(torrent_rows, 'lxml_html', lxml_html)
+
+
+BACKENDS = [stdlib, lxml]
+PAGES = [
+    ('nyaa_search.html', torrent_rows.iter_nyaa_rows, soup_nyaa_rows),
+    ('animetosho_search.html', torrent_rows.iter_animetosho_rows, soup_animetosho_rows),
+]
+
+
+@pytest.mark.parametrize('backend', BACKENDS, ids=lambda backend: backend.__name__)
+@pytest.mark.parametrize('page, extract, soup_rows', PAGES, ids=lambda value: value if isinstance(value, str) else '')
+def test_records_match_beautifulsoup(monkeypatch, backend, page, extract, soup_rows):
+    pytest.importorskip('bs4')
+    backend(monkeypatch)
+    html = fixture(page)
+    expected = soup_rows(html)
+    assert len(expected) > 50
+    assert list(extract(html)) == expected
+
+
+def test_fixtures_cover_the_fallbacks():
+    rows = list(torrent_rows.iter_animetosho_rows(fixture('animetosho_search.html')))
+    assert any(row['seeders'] == -1 for row in rows)
+    assert any('animetosho.org/storage/torrent/' not in row['torrent'] for row in rows)
+    assert all(re.fullmatch('[0-9a-f]{40}', row['hash']) for row in rows)
+
+
+@pytest.mark.parametrize('backend', BACKENDS, ids=lambda backend: backend.__name__)
+def test_malformed_rows_are_skipped(monkeypatch, backend):
+    backend(monkeypatch)
+    html = fixture('nyaa_search.html')
+    # Drop the magnet of the first row: the old parser failed the whole page, the extractor skips the row
+    first_magnet = re.search(r'<a href="magnet:[^"]*">', html).group(0)
+    rows = list(torrent_rows.iter_nyaa_rows(html.replace(first_magnet, '<a href="#">', 1)))
+    assert len(rows) == len(list(torrent_rows.iter_nyaa_rows(html))) - 1